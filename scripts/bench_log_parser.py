@@ -0,0 +1,61 @@
+"""Lines per second `espro logs` can parse and filter, one message per line.
+
+Run with ``uv run python scripts/bench_log_parser.py`` (or ``invoke bench``).
+Compares against parsing and rendering every line with aioesphomeapi, which
+is what the command did before filtering parsed records.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import time
+
+import aioesphomeapi
+from rich.console import Console
+from rich.text import Text
+
+from espro.core.log_parser import LogFilter, parse_log_text
+
+TAGS = ("sensor", "wifi", "api.connection", "dallas.temp.sensor", "mqtt")
+
+
+def _spam(count: int) -> list[str]:
+    return [
+        f"\x1b[0;36m[D][{TAGS[i % 5]}:{i % 300:03d}]: 'Probe {i % 40}': "
+        f"Sending state {i * 0.1:.2f}\x1b[0m"
+        for i in range(count)
+    ]
+
+
+def parse_and_filter(lines: list[str], log_filter: LogFilter) -> float:
+    started = time.perf_counter()
+    for line in lines:
+        log_filter.apply(parse_log_text(line))
+    return len(lines) / (time.perf_counter() - started)
+
+
+def legacy(lines: list[str]) -> float:
+    console = Console(file=io.StringIO(), force_terminal=True)
+    parser = aioesphomeapi.LogParser(strip_ansi_escapes=False)
+    started = time.perf_counter()
+    for line in lines:
+        console.print(Text.from_ansi(parser.parse_line(line, "[12:00:00]")))
+    return len(lines) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=20_000)
+    args = parser.parse_args()
+
+    lines = _spam(args.lines)
+    rate = parse_and_filter(lines, LogFilter(["sensor"], r"Probe 1\d'"))
+    print(f"parse+filter:        {rate:>12,.0f} lines/s")
+    baseline = legacy(lines[: max(args.lines // 10, 1)])
+    print(f"legacy parse+render: {baseline:>12,.0f} lines/s")
+    print(f"speedup:             {rate / baseline:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,25 @@
 
 from __future__ import annotations
 
-from importlib.metadata import version
+from importlib import import_module
 
-from .config import DatabaseConfig, ScanningConfig, Settings, get_settings
-from .database import Database
-from .models import DeviceRegistry, LogicalDevice, PhysicalDevice, ScanResult
+# Not typing.TYPE_CHECKING: importing typing alone costs the client ~15ms
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .async_database import AsyncDatabase
+    from .config import (
+        DaemonConfig,
+        DatabaseConfig,
+        ScanningConfig,
+        Settings,
+        get_settings,
+    )
+    from .database import Database
+    from .models import DeviceRegistry, LogicalDevice, PhysicalDevice, ScanResult
 
 __all__ = [
+    "AsyncDatabase",
+    "DaemonConfig",
     "Database",
     "DatabaseConfig",
     "DeviceRegistry",
@@ -21,4 +33,27 @@ __all__ = [
     "get_settings",
 ]
 
-__version__ = version("espro")
+# Exports load on first access, so ``espro.client`` can start without pydantic
+_EXPORTS = {
+    "AsyncDatabase": ".async_database",
+    "DaemonConfig": ".config",
+    "DatabaseConfig": ".config",
+    "ScanningConfig": ".config",
+    "Settings": ".config",
+    "get_settings": ".config",
+    "Database": ".database",
+    "DeviceRegistry": ".models",
+    "LogicalDevice": ".models",
+    "PhysicalDevice": ".models",
+    "ScanResult": ".models",
+}
+
+
+def __getattr__(name: str) -> object:
+    if name == "__version__":
+        from importlib.metadata import version
+
+        return version("espro")
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,141 @@
+"""Event-loop friendly facade over :class:`~espro.database.Database`."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import TypeVar
+
+from espro.database import Database
+from espro.models import (
+    DeviceEntities,
+    DeviceRegistry,
+    HealthReport,
+    PhysicalDevice,
+    ScanResult,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# (mtime_ns, size) of a file, or None when it does not exist
+_Stamp = tuple[int, int] | None
+
+
+def _stamp(path: Path) -> _Stamp:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class AsyncDatabase:
+    """Runs all file I/O on one dedicated thread and caches what it reads.
+
+    Writes are ordered by the single worker. Reads of devices.toml and the
+    current scan are served from memory and reloaded only when the file's
+    mtime or size changes, so edits made outside the process are still seen.
+    While a scan write is in flight, further ``save_scan`` calls only replace
+    the pending scan; the writer then persists the newest one, so a burst of
+    scans costs at most two writes.
+    """
+
+    def __init__(self, db: Database) -> None:
+        self._db = db
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="espro-db"
+        )
+        self._registry: DeviceRegistry | None = None
+        self._registry_stamp: _Stamp = None
+        self._scan: ScanResult | None = None
+        self._scan_stamp: _Stamp = None
+        self._scan_cached = False
+        self._pending_scan: ScanResult | None = None
+        self._writing_scan = False
+        self.scan_writes = 0
+
+    @property
+    def db(self) -> Database:
+        return self._db
+
+    async def _run(self, func: Callable[..., T], *args: object) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    async def load_devices(self) -> DeviceRegistry:
+        stamp = await self._run(_stamp, self._db.devices_path)
+        if self._registry is None or stamp != self._registry_stamp:
+            self._registry = await self._run(self._db.load_devices)
+            self._registry_stamp = stamp
+        return self._registry.model_copy(deep=True)
+
+    async def save_devices(self, registry: DeviceRegistry) -> None:
+        # Snapshot so callers can keep mutating their copy during the write
+        self._registry = registry.model_copy(deep=True)
+        await self._run(self._db.save_devices, self._registry)
+        self._registry_stamp = await self._run(_stamp, self._db.devices_path)
+
+    async def load_current_scan(self) -> ScanResult | None:
+        if self._pending_scan is None:
+            stamp = await self._run(_stamp, self._db.current_scan_path)
+            if not self._scan_cached or stamp != self._scan_stamp:
+                self._scan = await self._run(self._db.load_current_scan)
+                self._scan_stamp = stamp
+                self._scan_cached = True
+        return self._scan.model_copy(deep=True) if self._scan else None
+
+    async def save_scan(
+        self,
+        devices: list[PhysicalDevice],
+        network: str,
+        missing: list[PhysicalDevice] | None = None,
+    ) -> ScanResult:
+        scan = ScanResult(
+            scan_timestamp=datetime.now(timezone.utc),
+            network=network,
+            devices=devices,
+            missing=missing or [],
+        )
+        self._scan = scan
+        self._scan_cached = True
+        self._pending_scan = scan
+        # An active writer picks up the newest pending scan when it is done
+        if not self._writing_scan:
+            await self._drain_scans()
+        return scan
+
+    async def _drain_scans(self) -> None:
+        self._writing_scan = True
+        try:
+            while self._pending_scan is not None:
+                scan, self._pending_scan = self._pending_scan, None
+                await self._run(self._db.write_scan, scan)
+                self._scan_stamp = await self._run(_stamp, self._db.current_scan_path)
+                self.scan_writes += 1
+        finally:
+            self._writing_scan = False
+
+    async def save_health(self, report: HealthReport) -> None:
+        await self._run(self._db.save_health, report)
+
+    async def load_entities(self, logical_name: str) -> DeviceEntities | None:
+        return await self._run(self._db.load_entities, logical_name)
+
+    async def save_entities(self, catalog: DeviceEntities) -> None:
+        await self._run(self._db.save_entities, catalog)
+
+    async def flush(self) -> None:
+        """Persist any scan still waiting behind an interrupted write."""
+        if not self._writing_scan and self._pending_scan is not None:
+            await self._drain_scans()
+
+    async def close(self) -> None:
+        await self.flush()
+        await asyncio.to_thread(self._executor.shutdown)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Annotated
 
 import typer
@@ -7,13 +8,26 @@ import typer
 from espro.utils.log_setup import setup_logging
 
 from .commands import config as config_cmd
+from .commands.automap import register as register_automap
+from .commands.ble import register as register_ble
+from .commands.check_configs import register as register_check_configs
+from .commands.daemon import register as register_daemon
 from .commands.device_logs import register as register_logs
 from .commands.devices import register as register_devices
+from .commands.entities import register as register_entities
+from .commands.health import register as register_health
+from .commands.history import register as register_history
 from .commands.info import register as register_info
 from .commands.init import register as register_init
 from .commands.mock import register as register_mock
+from .commands.ota import register as register_ota
+from .commands.record import register as register_record
+from .commands.redact import register as register_redact
 from .commands.scan import register as register_scan
+from .commands.serve import register as register_serve
+from .commands.status import register as register_status
 from .commands.validate import register as register_validate
+from .profiling import start_profile, start_timings
 
 app = typer.Typer(
     help="ESPro - Professional ESPHome infrastructure manager", no_args_is_help=True
@@ -27,15 +41,36 @@ register_devices(app)
 register_info(app)
 register_validate(app)
 register_mock(app)
+register_record(app)
 register_logs(app)
+register_health(app)
+register_daemon(app)
+register_ota(app)
+register_check_configs(app)
+register_entities(app)
+register_automap(app)
+register_ble(app)
+register_redact(app)
+register_serve(app)
+register_status(app)
+register_history(app)
 
 
 @app.callback(invoke_without_command=True)
 def main(
+    ctx: typer.Context,
     version: Annotated[
         bool,
         typer.Option("--version", "-v", help="Show version and exit"),
     ] = False,
+    timings: Annotated[
+        bool,
+        typer.Option("--timings", help="Print a per-phase timing breakdown"),
+    ] = False,
+    profile: Annotated[
+        Path | None,
+        typer.Option("--profile", help="Write cProfile stats for the command"),
+    ] = None,
 ) -> None:
     """ESPro CLI."""
     setup_logging()
@@ -45,3 +80,8 @@ def main(
 
         typer.echo(f"espro version {get_version('espro')}")
         raise typer.Exit()
+
+    if timings:
+        ctx.call_on_close(start_timings())
+    if profile is not None:
+        ctx.call_on_close(start_profile(profile))
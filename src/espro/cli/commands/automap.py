@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from espro.cli.helpers import (
+    LiveOption,
+    MaxAgeOption,
+    build_database,
+    load_scan_or_discover,
+    load_settings_or_exit,
+)
+from espro.core.automap import apply_bindings, auto_map
+
+
+def automap(
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Show bindings without saving them"
+    ),
+    max_age: MaxAgeOption = None,
+    live: LiveOption = False,
+) -> None:
+    """Bind discovered devices to free rule slots in devices.toml."""
+    settings = load_settings_or_exit()
+    db = build_database(settings)
+    registry = db.load_devices()
+
+    console = Console()
+
+    # Nothing to bind without rules; skip a possibly live discovery
+    if not registry.rules:
+        console.print(f"[yellow]⚠[/yellow] No [[rules]] defined in {db.devices_path}.")
+        return
+    scan = load_scan_or_discover(db, settings, max_age, live)
+    if not scan:
+        console.print(
+            "[yellow]⚠[/yellow] No scan results available and discovery found "
+            "no devices."
+        )
+        raise typer.Exit(1)
+
+    result = auto_map(registry, scan.devices)
+
+    if result.bindings:
+        table = Table()
+        table.add_column("Logical", style="cyan")
+        table.add_column("Physical", style="green")
+        table.add_column("Role", style="magenta")
+        for binding in result.bindings:
+            table.add_row(binding.logical, binding.physical, binding.role)
+        console.print(table)
+    else:
+        console.print("No new devices to bind.")
+
+    for device in result.unplaced:
+        console.print(
+            f"[yellow]⚠[/yellow] No free slot for '{device.name}' ({device.ip})"
+        )
+
+    if result.bindings and not dry_run:
+        apply_bindings(registry, result.bindings)
+        db.save_devices(registry)
+        console.print(
+            f"[green]✓[/green] Bound {len(result.bindings)} device(s) in {db.devices_path}"
+        )
+
+
+def register(app: typer.Typer) -> None:
+    app.command()(automap)
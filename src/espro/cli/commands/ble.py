@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Annotated
+
+import typer
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+
+from espro.cli.helpers import (
+    LiveOption,
+    MaxAgeOption,
+    build_database,
+    load_scan_or_discover,
+    load_settings_or_exit,
+)
+from espro.config import ScanningConfig
+from espro.core import resolve_hosts
+from espro.core.ble import BLEAggregator, close_proxies, subscribe_proxies
+
+
+def _render(aggregator: BLEAggregator, elapsed: float, limit: int) -> Table:
+    devices = aggregator.devices()
+    rate = aggregator.received / elapsed if elapsed else 0.0
+    table = Table(
+        caption=(
+            f"{len(devices)} BLE device(s) via {len(aggregator.proxies)} proxy(ies), "
+            f"{rate:,.0f} adv/s, {aggregator.duplicates:,} duplicate(s), "
+            f"{aggregator.dropped:,} dropped"
+        )
+    )
+    table.add_column("Address", style="cyan")
+    table.add_column("Name", style="green")
+    table.add_column("Mfr", justify="right")
+    table.add_column("Best RSSI", justify="right")
+    table.add_column("Via")
+    table.add_column("Proxies", justify="right")
+    table.add_column("Adv", justify="right")
+    table.add_column("Unique", justify="right")
+
+    for device in devices[:limit]:
+        best = device.best()
+        table.add_row(
+            device.mac,
+            device.name,
+            f"0x{device.manufacturer:04X}" if device.manufacturer is not None else "",
+            str(best[1]) if best else "",
+            best[0] if best else "",
+            str(len(device.rssi)),
+            str(device.adverts),
+            str(device.unique),
+        )
+    return table
+
+
+async def _watch(
+    targets: dict[str, str],
+    config: ScanningConfig,
+    aggregator: BLEAggregator,
+    duration: float | None,
+    limit: int,
+    console: Console,
+) -> None:
+    sessions = await subscribe_proxies(targets, config, aggregator)
+    active = [session for session in sessions if session.client is not None]
+    for session in sessions:
+        if session.error:
+            console.print(f"[dim]{session.logical}: {session.error}[/dim]")
+    if not active:
+        console.print("[yellow]⚠[/yellow] No Bluetooth proxies reachable.")
+        return
+
+    console.print(f"Listening on {len(active)} proxy(ies)...")
+    started = time.monotonic()
+    try:
+        with Live(console=console, auto_refresh=False) as live:
+            while duration is None or time.monotonic() - started < duration:
+                await asyncio.sleep(1.0)
+                aggregator.process()
+                live.update(
+                    _render(aggregator, time.monotonic() - started, limit),
+                    refresh=True,
+                )
+    finally:
+        await close_proxies(sessions)
+
+
+def ble(
+    names: Annotated[
+        list[str] | None,
+        typer.Argument(help="Logical devices to listen on (default: all)"),
+    ] = None,
+    window: float = typer.Option(
+        10.0, "--window", "-w", min=0.1, help="Deduplication window in seconds"
+    ),
+    duration: float | None = typer.Option(
+        None, "--duration", "-d", min=1, help="Stop after this many seconds"
+    ),
+    limit: int = typer.Option(30, "--limit", "-n", min=1, help="Rows to show"),
+    max_age: MaxAgeOption = None,
+    live: LiveOption = False,
+) -> None:
+    """Live table of BLE devices heard by the fleet's Bluetooth proxies."""
+    settings = load_settings_or_exit()
+    db = build_database(settings)
+    registry = db.load_devices()
+
+    console = Console()
+
+    if not registry.logical_devices:
+        console.print("[yellow]⚠[/yellow] No logical devices defined.")
+        return
+
+    scan = load_scan_or_discover(db, settings, max_age, live)
+    targets = resolve_hosts(registry, scan)
+    if names:
+        unknown = sorted(set(names) - targets.keys())
+        if unknown:
+            console.print(f"[red]Unknown logical device(s):[/red] {', '.join(unknown)}")
+            raise typer.Exit(1)
+        targets = {name: targets[name] for name in names}
+
+    aggregator = BLEAggregator(window=window)
+    try:
+        asyncio.run(
+            _watch(targets, settings.scanning, aggregator, duration, limit, console)
+        )
+    except KeyboardInterrupt:
+        console.print("\n[green]Stopped.[/green]")
+
+
+def register(app: typer.Typer) -> None:
+    app.command()(ble)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from espro.cli.helpers import build_database, load_settings_or_exit
+from espro.core import ConfigCache
+from espro.core.esphome_lib import esphome_version
+from espro.utils.timing import span
+
+
+def check_configs(
+    names: Annotated[
+        list[str] | None,
+        typer.Argument(help="Logical devices to check (default: all with a config)"),
+    ] = None,
+    render: Annotated[
+        Path | None,
+        typer.Option(
+            "--render",
+            file_okay=False,
+            help="Write each device's rendered config to this directory",
+        ),
+    ] = None,
+    clear_cache: bool = typer.Option(
+        False, "--clear-cache", help="Drop cached results before checking"
+    ),
+) -> None:
+    """Validate the ESPHome configs of logical devices, reusing cached results."""
+    settings = load_settings_or_exit()
+    db = build_database(settings)
+    registry = db.load_devices()
+
+    console = Console()
+
+    selected = [
+        (name, config, device.substitutions)
+        for name, device in sorted(registry.logical_devices.items())
+        if (config := device.config) and (not names or name in names)
+    ]
+    if names:
+        unknown = sorted(set(names) - registry.logical_devices.keys())
+        if unknown:
+            console.print(
+                f"[red]✗[/red] Unknown logical device(s): {', '.join(unknown)}"
+            )
+            raise typer.Exit(1)
+    if not selected:
+        console.print("[yellow]⚠[/yellow] No logical devices have a config set.")
+        return
+
+    try:
+        version = esphome_version()
+    except ImportError as exc:
+        console.print(f"[red]✗[/red] ESPHome is not available: {exc}")
+        raise typer.Exit(1) from exc
+
+    cache = ConfigCache(db.config_cache_dir, version)
+    if clear_cache:
+        cache.clear()
+
+    table = Table()
+    table.add_column("Logical", style="cyan")
+    table.add_column("Config", style="green")
+    table.add_column("Status")
+    table.add_column("Source")
+
+    failed = 0
+    with span("cli.check_configs"):
+        for name, config, substitutions in selected:
+            check = cache.check(db.path / config, substitutions)
+            if check.valid:
+                status = "[green]valid[/green]"
+            else:
+                failed += 1
+                status = f"[red]{check.errors[0]}[/red]"
+            source = "cache" if check.cached else "esphome"
+            table.add_row(name, config, status, source)
+
+            if render and check.valid:
+                render.mkdir(parents=True, exist_ok=True)
+                (render / f"{name}.yaml").write_text(check.rendered)
+
+    console.print(table)
+    console.print(
+        f"\n{len(selected)} device(s) checked, "
+        f"{cache.validations} ESPHome validation(s) run"
+    )
+
+    if failed:
+        raise typer.Exit(1)
+
+
+def register(app: typer.Typer) -> None:
+    app.command("check-configs")(check_configs)
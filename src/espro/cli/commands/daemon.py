@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+from typing import cast
+
+import typer
+from rich.console import Console
+from typer.core import TyperGroup
+
+from espro.cli.delegation import DelegationServer
+from espro.cli.helpers import build_database, load_settings_or_exit
+from espro.core import Daemon, FleetMetrics
+
+
+async def _run(runner: Daemon, control: DelegationServer | None) -> None:
+    started = control is not None and await control.start()
+    try:
+        await runner.run()
+    finally:
+        if started and control is not None:
+            await control.close()
+
+
+def daemon(
+    ctx: typer.Context,
+    metrics_port: int | None = typer.Option(
+        None,
+        "--metrics-port",
+        min=0,
+        max=65535,
+        help="Serve OpenMetrics on this port (0 disables; default: daemon.metrics_port)",
+    ),
+    metrics_host: str | None = typer.Option(
+        None,
+        "--metrics-host",
+        help="Metrics bind address (default: daemon.metrics_host)",
+    ),
+    logs: bool | None = typer.Option(
+        None,
+        "--logs/--no-logs",
+        help="Keep log sessions open to count log lines and reconnects",
+    ),
+    workers: int | None = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        min=1,
+        max=64,
+        help="Shard device sessions over N processes (default: daemon.workers)",
+    ),
+    control_socket: bool | None = typer.Option(
+        None,
+        "--socket/--no-socket",
+        help="Answer read-only commands on a socket in the data directory",
+    ),
+) -> None:
+    """Run periodic discovery and health probing in the foreground."""
+    settings = load_settings_or_exit()
+    overrides = {
+        key: value
+        for key, value in {
+            "metrics_port": metrics_port,
+            "metrics_host": metrics_host,
+            "subscribe_logs": logs,
+            "workers": workers,
+            "control_socket": control_socket,
+        }.items()
+        if value is not None
+    }
+    if overrides:
+        settings = settings.model_copy(
+            update={"daemon": settings.daemon.model_copy(update=overrides)}
+        )
+
+    db = build_database(settings)
+    config = settings.daemon
+    metrics = FleetMetrics() if config.metrics_port else None
+    runner = Daemon(db, settings, metrics)
+    control = None
+    if config.control_socket:
+        commands = cast(TyperGroup, ctx.find_root().command)
+        control = DelegationServer(db, settings, commands, runner)
+
+    console = Console()
+    console.print(
+        f"Starting daemon (scan every {config.scan_interval:g}s, "
+        f"probe every {config.probe_interval:g}s)..."
+    )
+    if metrics:
+        console.print(
+            f"Metrics: http://{config.metrics_host}:{config.metrics_port}/metrics"
+        )
+    if config.workers > 1:
+        console.print(f"Device sessions: {config.workers} worker processes")
+    if control is not None:
+        console.print(f"CLI commands answered on {control.path}")
+    if settings.alerts.rules:
+        console.print(f"Alert rules: {len(settings.alerts.rules)}")
+    console.print("Press Ctrl+C to stop.\n")
+
+    try:
+        asyncio.run(_run(runner, control))
+    except KeyboardInterrupt:
+        console.print("\n[green]Daemon stopped.[/green]")
+
+
+def register(app: typer.Typer) -> None:
+    app.command()(daemon)
@@ -1,12 +1,25 @@
 from __future__ import annotations
 
 import asyncio
+import re
+import sys
 from datetime import datetime
+from typing import Annotated
 
 import aioesphomeapi as api
 import typer
 from rich.console import Console
-from rich.text import Text
+
+from espro.core.log_parser import (
+    LOG_FORMATS,
+    LogFilter,
+    LogRecord,
+    parse_log_text,
+    render_json,
+    render_pretty,
+    render_raw,
+)
+from espro.utils.redaction import Redactor
 
 
 def _parse_log_level(value: str) -> api.LogLevel:
@@ -30,6 +43,9 @@ async def _subscribe_logs(
     port: int,
     level: api.LogLevel,
     dump_config: bool,
+    log_filter: LogFilter,
+    output: str,
+    redactor: Redactor,
     console: Console,
 ) -> None:
     client = api.APIClient(host, port=port, password=None)
@@ -39,22 +55,34 @@ async def _subscribe_logs(
     console.print(f"Connected to [green]{info.name}[/green] ({host}:{port})\n")
 
     stop_event = asyncio.Event()
-    parser = api.LogParser(strip_ansi_escapes=False)
+    loop = asyncio.get_running_loop()
+    pending: list[LogRecord] = []
 
     def _coerce_log_message(message: object) -> str:
         if isinstance(message, (bytes, bytearray, memoryview)):
             return bytes(message).decode("utf-8", errors="backslashreplace")
         return str(message)
 
+    def _flush() -> None:
+        batch = pending[:]
+        pending.clear()
+        if output == "pretty":
+            console.print(render_pretty(batch), highlight=False, soft_wrap=True)
+        else:
+            rendered = render_raw(batch) if output == "raw" else render_json(batch)
+            sys.stdout.write(rendered + "\n")
+            sys.stdout.flush()
+
     def on_log(msg: object) -> None:
-        text = _coerce_log_message(getattr(msg, "message", ""))
+        text = redactor.redact_text(_coerce_log_message(getattr(msg, "message", "")))
         timestamp = datetime.now().strftime("%H:%M:%S")
-        for line in text.splitlines():
-            formatted = parser.parse_line(line, timestamp)
-            if formatted:
-                console.print(
-                    Text.from_ansi(formatted), highlight=False, soft_wrap=True
-                )
+        records = log_filter.apply(parse_log_text(text, timestamp))
+        if not records:
+            return
+        # Messages decoded from the same socket read are rendered together
+        if not pending:
+            loop.call_soon(_flush)
+        pending.extend(records)
 
     client.subscribe_logs(on_log, log_level=level, dump_config=dump_config)
 
@@ -75,9 +103,25 @@ def logs(
         "--dump-config/--no-dump-config",
         help="Request the device to dump its config when subscribing",
     ),
+    tags: Annotated[
+        list[str] | None,
+        typer.Option(
+            "--tag", "-t", help="Only show these log tags (globs, repeatable)"
+        ),
+    ] = None,
+    grep: str | None = typer.Option(
+        None, "--grep", "-g", help="Only show messages matching this regex"
+    ),
+    output: str = typer.Option(
+        "pretty", "--format", "-f", help=f"Output format: {', '.join(LOG_FORMATS)}"
+    ),
+    redact: bool = typer.Option(
+        False, "--redact", help="Redact IPs, MACs, SSIDs and keys in log messages"
+    ),
 ) -> None:
     """Stream logs from an ESPHome device."""
-    console = Console()
+    # json/raw records go to stdout; keep status lines out of the stream
+    console = Console(stderr=output != "pretty")
 
     try:
         log_level = _parse_log_level(level)
@@ -86,11 +130,32 @@ def logs(
         console.print(f"Valid levels: {', '.join(_log_level_names())}")
         raise typer.Exit(1) from None
 
+    if output not in LOG_FORMATS:
+        console.print(f"[red]Invalid format:[/red] {output}")
+        console.print(f"Valid formats: {', '.join(LOG_FORMATS)}")
+        raise typer.Exit(1)
+    try:
+        log_filter = LogFilter(tags or (), grep)
+    except re.error as exc:
+        console.print(f"[red]Invalid --grep pattern:[/red] {exc}")
+        raise typer.Exit(1) from None
+
     console.print(f"Connecting to {host}:{port}...")
     console.print("Press Ctrl+C to stop.\n")
 
     try:
-        asyncio.run(_subscribe_logs(host, port, log_level, dump_config, console))
+        asyncio.run(
+            _subscribe_logs(
+                host,
+                port,
+                log_level,
+                dump_config,
+                log_filter,
+                output,
+                Redactor(enabled=redact),
+                console,
+            )
+        )
     except KeyboardInterrupt:
         console.print("\n[green]Disconnected.[/green]")
     except (
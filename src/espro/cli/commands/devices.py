@@ -1,45 +1,73 @@
 from __future__ import annotations
 
+from typing import Annotated
+
 import typer
 from rich.console import Console
 from rich.table import Table
 
 from espro.cli.helpers import build_database, load_settings_or_exit
+from espro.database import Database
+from espro.models import DeviceRegistry
+from espro.utils.timing import span
 
 
-def list_devices() -> None:
-    """List logical device mappings."""
-    settings = load_settings_or_exit()
-    db = build_database(settings)
-    registry = db.load_devices()
-
-    console = Console()
-
+def print_devices(console: Console, db: Database, registry: DeviceRegistry) -> None:
     if not registry.logical_devices:
         console.print("No logical devices defined.")
         console.print(f"Use 'espro add' to create mappings or edit {db.devices_path}")
         return
 
-    table = Table()
-    table.add_column("Logical Name", style="cyan")
-    table.add_column("Physical Device", style="green")
-    table.add_column("Notes")
+    with span("cli.render"):
+        table = Table()
+        table.add_column("Logical Name", style="cyan")
+        table.add_column("Physical Device", style="green")
+        table.add_column("Role", style="magenta")
+        table.add_column("Notes")
 
-    for name, device in sorted(registry.logical_devices.items()):
-        table.add_row(name, device.physical, device.notes or "")
+        for name, device in sorted(registry.logical_devices.items()):
+            table.add_row(name, device.physical, device.role or "", device.notes or "")
 
-    console.print(table)
+        console.print(table)
+
+
+def list_devices() -> None:
+    """List logical device mappings."""
+    settings = load_settings_or_exit()
+    db = build_database(settings)
+    print_devices(Console(), db, db.load_devices())
 
 
 def add_device(
     name: str = typer.Argument(..., help="Logical device name"),
     physical: str = typer.Argument(..., help="Physical device (hostname or IP)"),
     notes: str | None = typer.Option(None, "--notes", help="Optional notes"),
+    role: str | None = typer.Option(
+        None, "--role", help="Optional role used to target groups of devices"
+    ),
+    config: str | None = typer.Option(
+        None, "--config", help="ESPHome YAML, relative to the data directory"
+    ),
+    substitutions: Annotated[
+        list[str] | None,
+        typer.Option("--sub", help="ESPHome substitution as KEY=VALUE (repeatable)"),
+    ] = None,
 ) -> None:
     """Add or update a logical device mapping."""
     settings = load_settings_or_exit()
     db = build_database(settings)
-    db.add_logical_device(name, physical, notes)
+
+    parsed: dict[str, str] = {}
+    for item in substitutions or []:
+        key, sep, value = item.partition("=")
+        if not sep or not key:
+            typer.echo(f"Invalid substitution '{item}', expected KEY=VALUE", err=True)
+            raise typer.Exit(1)
+        parsed[key] = value
+
+    db.add_logical_device(
+        name, physical, notes, role=role, config=config, substitutions=parsed
+    )
 
     console = Console()
     console.print(f"[green]✓[/green] Mapped '{name}' → '{physical}'")
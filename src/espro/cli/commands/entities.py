@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Annotated
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from espro.cli.helpers import (
+    LiveOption,
+    MaxAgeOption,
+    build_database,
+    load_scan_or_discover,
+    load_settings_or_exit,
+)
+from espro.core import EntityIndex, fetch_catalog, resolve_hosts
+from espro.models import DeviceEntities
+from espro.utils.timing import span
+
+
+def entities(
+    query: Annotated[
+        list[str] | None,
+        typer.Argument(help="Search terms, e.g. 'temperature sensors garage'"),
+    ] = None,
+    offline: bool = typer.Option(
+        False, "--offline", help="Search cached entity lists without contacting devices"
+    ),
+    refresh: bool = typer.Option(
+        False, "--refresh", help="Re-enumerate entities even if firmware is unchanged"
+    ),
+    concurrency: int | None = typer.Option(
+        None,
+        "--concurrency",
+        "-c",
+        min=1,
+        help="Max devices queried at once (default: scanning.parallel_scans)",
+    ),
+    max_age: MaxAgeOption = None,
+    live: LiveOption = False,
+) -> None:
+    """Search entities across the fleet."""
+    settings = load_settings_or_exit()
+    db = build_database(settings)
+    registry = db.load_devices()
+
+    console = Console()
+
+    if not registry.logical_devices:
+        console.print("[yellow]⚠[/yellow] No logical devices defined.")
+        return
+
+    cached: dict[str, DeviceEntities | None] = {
+        name: db.load_entities(name) for name in registry.logical_devices
+    }
+    catalogs = [catalog for catalog in cached.values() if catalog is not None]
+
+    if not offline:
+        scan = load_scan_or_discover(db, settings, max_age, live)
+        targets = resolve_hosts(registry, scan)
+        previous = {} if refresh else cached
+        with span("cli.fetch_entities"):
+            results = asyncio.run(
+                fetch_catalog(targets, settings.scanning, previous, concurrency)
+            )
+
+        catalogs = []
+        refreshed = 0
+        for result in results:
+            if result.refreshed and result.catalog is not None:
+                db.save_entities(result.catalog)
+                refreshed += 1
+            if result.error:
+                console.print(
+                    f"[yellow]⚠[/yellow] {result.logical}: {result.error}"
+                    + (" (using cached entities)" if result.catalog else "")
+                )
+            if result.catalog is not None:
+                catalogs.append(result.catalog)
+        console.print(
+            f"{len(results)} device(s) queried, {refreshed} re-enumerated, "
+            f"{len(results) - refreshed} unchanged or unreachable"
+        )
+
+    with span("cli.index"):
+        index = EntityIndex(catalogs)
+        hits = index.search(" ".join(query or []))
+
+    with span("cli.render"):
+        table = Table()
+        table.add_column("Logical", style="cyan")
+        table.add_column("Type", style="magenta")
+        table.add_column("Object ID", style="green")
+        table.add_column("Name")
+        table.add_column("Class / Unit")
+        for hit in hits:
+            entity = hit.entity
+            detail = " ".join(
+                part
+                for part in (entity.device_class, entity.unit_of_measurement)
+                if part
+            )
+            table.add_row(
+                hit.logical_name,
+                entity.entity_type,
+                entity.object_id,
+                entity.name,
+                detail,
+            )
+        console.print(table)
+
+    console.print(f"{len(hits)} of {len(index)} entities match")
+
+
+def register(app: typer.Typer) -> None:
+    app.command()(entities)
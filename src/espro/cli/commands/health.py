@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Annotated
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from espro.cli.helpers import (
+    LiveOption,
+    MaxAgeOption,
+    build_database,
+    load_scan_or_discover,
+    load_settings_or_exit,
+)
+from espro.core import probe_fleet, resolve_hosts
+from espro.utils.timing import span
+
+
+def _format_ms(value: float | None) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def health(
+    names: Annotated[
+        list[str] | None,
+        typer.Argument(help="Logical devices to probe (default: all)"),
+    ] = None,
+    rounds: int = typer.Option(5, "--rounds", "-r", min=1, help="Pings per device"),
+    concurrency: int | None = typer.Option(
+        None,
+        "--concurrency",
+        "-c",
+        min=1,
+        help="Max devices probed at once (default: scanning.parallel_scans)",
+    ),
+    save: bool = typer.Option(
+        True, "--save/--no-save", help="Append the summary to the health history"
+    ),
+    max_age: MaxAgeOption = None,
+    live: LiveOption = False,
+) -> None:
+    """Measure API connect time and ping latency for logical devices."""
+    settings = load_settings_or_exit()
+    db = build_database(settings)
+    registry = db.load_devices()
+
+    console = Console()
+
+    if not registry.logical_devices:
+        console.print("[yellow]⚠[/yellow] No logical devices defined.")
+        return
+
+    scan = load_scan_or_discover(db, settings, max_age, live)
+    targets = resolve_hosts(registry, scan)
+    if names:
+        unknown = sorted(set(names) - targets.keys())
+        if unknown:
+            console.print(f"[red]Unknown logical device(s):[/red] {', '.join(unknown)}")
+            raise typer.Exit(1)
+        targets = {name: targets[name] for name in names}
+
+    console.print(f"Probing {len(targets)} device(s), {rounds} round(s) each...")
+    with span("cli.probe"):
+        report = asyncio.run(
+            probe_fleet(
+                targets, settings.scanning, rounds=rounds, concurrency=concurrency
+            )
+        )
+
+    table = Table()
+    table.add_column("Logical", style="cyan")
+    table.add_column("Host", style="green")
+    table.add_column("Connect ms", justify="right")
+    table.add_column("RTT min", justify="right")
+    table.add_column("RTT p50", justify="right")
+    table.add_column("RTT p99", justify="right")
+    table.add_column("OK", justify="right")
+    table.add_column("Errors", justify="right")
+
+    for device in report.devices:
+        errors = f"[red]{device.errors}[/red]" if device.errors else "0"
+        table.add_row(
+            device.logical_name,
+            device.host,
+            _format_ms(device.connect_ms),
+            _format_ms(device.rtt_min_ms),
+            _format_ms(device.rtt_p50_ms),
+            _format_ms(device.rtt_p99_ms),
+            f"{device.pings_ok}/{device.rounds}",
+            errors,
+        )
+
+    console.print(table)
+
+    unreachable = sum(1 for device in report.devices if device.connect_ms is None)
+    if unreachable:
+        console.print(f"\n[red]{unreachable} device(s) unreachable[/red]")
+    else:
+        console.print(f"\n[green]All {len(report.devices)} device(s) reachable[/green]")
+
+    if save:
+        db.save_health(report)
+        console.print(
+            f"[green]✓[/green] Saved health summary to {db.health_history_path}"
+        )
+
+
+def register(app: typer.Typer) -> None:
+    app.command()(health)
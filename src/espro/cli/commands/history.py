@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from espro.cli.helpers import build_database, load_settings_or_exit
+from espro.core.recorder import open_series, recorded_entities, summarize
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_WINDOW_RE = re.compile(r"(\d+(?:\.\d+)?)([smhd]?)")
+
+
+def parse_window(value: str) -> float:
+    """``90`` (seconds), ``15m``, ``24h`` or ``7d`` in seconds."""
+    match = _WINDOW_RE.fullmatch(value.strip())
+    if match is None or float(match[1]) <= 0:
+        raise typer.BadParameter(f"expected e.g. 90s, 15m, 24h or 7d, got '{value}'")
+    return float(match[1]) * _UNITS[match[2] or "s"]
+
+
+def _value(value: float | None) -> str:
+    return "-" if value is None else f"{value:.4g}"
+
+
+def print_history(
+    console: Console, series_dir: Path, target: str, window: float, width: int
+) -> int:
+    """Print stats and sparklines for ``logical.entity`` or every entity of a device."""
+    logical, _, entity = target.rpartition(".")
+    if not logical or entity not in recorded_entities(series_dir, logical):
+        logical, entity = target, ""
+    entities = [entity] if entity else recorded_entities(series_dir, logical)
+    if not entities:
+        console.print(f"[yellow]⚠[/yellow] No history recorded for '{target}'.")
+        console.print("Set record_states = true under \\[daemon] and run espro daemon.")
+        return 1
+
+    table = Table(title=logical)
+    table.add_column("Entity", style="cyan")
+    table.add_column("Last", justify="right")
+    table.add_column("Min", justify="right")
+    table.add_column("Mean", justify="right")
+    table.add_column("Max", justify="right")
+    table.add_column("Points", justify="right")
+    table.add_column("History")
+    tiers = set()
+    for name in entities:
+        series = open_series(series_dir, logical, name)
+        summary = summarize(series, window, width) if series else None
+        if series is not None:
+            series.close()
+        if summary is None:
+            table.add_row(name, "-", "-", "-", "-", "0", "")
+            continue
+        tiers.add(summary.tier_label)
+        table.add_row(
+            name,
+            _value(summary.last),
+            _value(summary.minimum),
+            _value(summary.mean),
+            _value(summary.maximum),
+            str(summary.points),
+            summary.sparkline,
+        )
+    # Which tier answered depends on how far back each one reaches
+    table.caption = ", ".join(sorted(tiers))
+    console.print(table)
+    return 0
+
+
+def history(
+    target: str = typer.Argument(
+        ..., help="logical.entity (e.g. kitchen.temperature) or a logical device"
+    ),
+    since: str = typer.Option(
+        "24h", "--since", "-s", help="Window to summarize, e.g. 30m, 24h or 7d"
+    ),
+    width: int = typer.Option(
+        48, "--width", "-w", min=8, max=400, help="Sparkline width in characters"
+    ),
+) -> None:
+    """Show recorded entity history with stats and sparklines."""
+    window = parse_window(since)
+    settings = load_settings_or_exit()
+    db = build_database(settings)
+    exit_code = print_history(Console(), db.series_dir, target, window, width)
+    if exit_code:
+        raise typer.Exit(exit_code)
+
+
+def register(app: typer.Typer) -> None:
+    app.command()(history)
@@ -8,6 +8,7 @@ from espro.cli.helpers import (
     load_settings_or_exit,
     resolve_config_path_or_exit,
 )
+from espro.core.latency import deadline
 
 
 def info() -> None:
@@ -29,6 +30,12 @@ def info() -> None:
     console.print("\n[bold]Configuration[/bold]")
     console.print(f"Scan label: {settings.scanning.default_network}")
     console.print(f"mDNS timeout: {settings.scanning.timeout}s")
+    scanning = settings.scanning
+    if scanning.adaptive_timeout:
+        console.print(
+            f"Probe timeouts: learned p99 x {scanning.timeout_factor:g}, "
+            f"{scanning.min_timeout:g}-{scanning.max_timeout:g}s"
+        )
     console.print(f"API port: {settings.scanning.port}")
 
     console.print("\n[bold]Statistics[/bold]")
@@ -38,6 +45,16 @@ def info() -> None:
         console.print(f"Last scan: {current_scan.scan_timestamp}")
         console.print(f"Physical devices found: {len(current_scan.devices)}")
         console.print(f"Scan network: {current_scan.network}")
+        learned = [
+            deadline(device.latency, scanning)
+            for device in current_scan.devices
+            if device.latency is not None
+        ]
+        if learned:
+            console.print(
+                f"Probe deadlines: {min(learned):.2f}-{max(learned):.2f}s "
+                f"({len(learned)} device(s) with latency history)"
+            )
     else:
         console.print("No scans recorded yet")
 
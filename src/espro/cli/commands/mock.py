@@ -1,25 +1,106 @@
 from __future__ import annotations
 
 import asyncio
+from pathlib import Path
+from typing import Annotated, Any
 
 import typer
 from rich.console import Console
 
 from espro.core import run_mock_device
+from espro.core.capture import ReplayDevice, read_capture
+from espro.core.mock_faults import FaultProfile, parse_faults
 
 
 def mock(
-    name: str = typer.Option("mock-switch-1", "--name", "-n", help="Device name"),
+    name: str | None = typer.Option(
+        None, "--name", "-n", help="Device name (default: mock-switch-1)"
+    ),
     port: int = typer.Option(6053, "--port", "-p", help="Port to listen on"),
     mac: str = typer.Option("AA:BB:CC:DD:EE:FF", "--mac", help="MAC address to report"),
+    ota_port: int | None = typer.Option(
+        None, "--ota-port", help="Also accept ESPHome OTA uploads on this port"
+    ),
+    ble: int = typer.Option(
+        0, "--ble", min=0, help="Act as a Bluetooth proxy relaying N fake BLE devices"
+    ),
+    sensor: float = typer.Option(
+        0.0,
+        "--sensor",
+        min=0,
+        help="Also expose a temperature sensor reporting every N seconds",
+    ),
+    count: int = typer.Option(
+        1, "--count", min=1, help="Run N devices on consecutive ports"
+    ),
+    faults: str | None = typer.Option(
+        None,
+        "--faults",
+        help="Inject faults, e.g. 'latency=0.05,jitter=0..0.2,half-open=0.1'. "
+        "Ranges are drawn per device. Known: handshake-delay, latency, jitter, "
+        "disconnect-after, half-open, read-delay, recv-buffer, mdns-flap",
+    ),
+    seed: int = typer.Option(0, "--seed", help="Seed for reproducible faults"),
+    replay: Annotated[
+        Path | None,
+        typer.Option(
+            "--replay",
+            exists=True,
+            dir_okay=False,
+            help="Serve a session captured with espro record",
+        ),
+    ] = None,
+    speed: float = typer.Option(
+        1.0, "--speed", min=0.01, help="Replay states and logs N times as fast"
+    ),
+    loop: bool = typer.Option(
+        True, "--loop/--once", help="Start the replay over when it ends"
+    ),
 ) -> None:
     """Run a mock ESPHome device for development."""
+    profile: FaultProfile | None = None
+    if faults:
+        try:
+            profile = parse_faults(faults, seed)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc), param_hint="--faults") from None
+    replay_options: dict[str, Any] = {}
+    if replay is not None:
+        try:
+            capture = read_capture(replay)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc), param_hint="--replay") from None
+        name = name or capture.name
+        replay_options = {
+            "device_class": ReplayDevice,
+            "capture": capture,
+            "speed": speed,
+            "loop": loop,
+        }
+    name = name or "mock-switch-1"
     console = Console()
-    console.print(f"Starting mock device '{name}' on port {port}...")
+    if count > 1:
+        console.print(
+            f"Starting {count} mock devices '{name}-N' on ports {port}-{port + count - 1}..."
+        )
+    else:
+        console.print(f"Starting mock device '{name}' on port {port}...")
     console.print("Press Ctrl+C to stop.\n")
 
     try:
-        asyncio.run(run_mock_device(name=name, port=port, mac_address=mac))
+        asyncio.run(
+            run_mock_device(
+                name=name,
+                port=port,
+                mac_address=mac,
+                ota_port=ota_port,
+                ble_devices=ble,
+                sensor_interval=sensor,
+                faults=profile,
+                count=count,
+                **replay_options,
+            )
+        )
     except KeyboardInterrupt:
         console.print("\n[green]Mock device stopped.[/green]")
 
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import subprocess
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from espro.cli.helpers import (
+    LiveOption,
+    MaxAgeOption,
+    build_database,
+    load_scan_or_discover,
+    load_settings_or_exit,
+)
+from espro.core.esphome_lib import esphome_version
+from espro.core.ota import (
+    STATUS_FAILED,
+    STATUS_UPDATED,
+    OTAError,
+    OTAOutcome,
+    OTATarget,
+    RolloutOptions,
+    compile_firmware,
+    default_ota_port,
+    run_rollout,
+)
+from espro.core.resolver import match_physical, select_logical
+
+_STATUS_STYLE = {STATUS_UPDATED: "green", STATUS_FAILED: "red"}
+
+
+def ota(
+    firmware: Annotated[
+        Path,
+        typer.Argument(
+            exists=True, dir_okay=False, help="Firmware .bin or ESPHome YAML"
+        ),
+    ],
+    targets: str | None = typer.Option(
+        None,
+        "--targets",
+        "-t",
+        help="Comma-separated logical-name globs or role:<glob> selectors",
+    ),
+    canary: int = typer.Option(1, "--canary", min=0, help="Devices in first wave"),
+    wave_size: int = typer.Option(10, "--wave-size", min=1, help="Devices per wave"),
+    concurrency: int = typer.Option(
+        10, "--concurrency", "-c", min=1, help="Max simultaneous uploads"
+    ),
+    max_failures: int = typer.Option(
+        0, "--max-failures", min=0, help="Halt once failures exceed this count"
+    ),
+    gate_timeout: float = typer.Option(
+        120.0, "--gate-timeout", min=0, help="Seconds to wait for a device to come back"
+    ),
+    expect_version: str | None = typer.Option(
+        None,
+        "--expect-version",
+        help="ESPHome version devices must report after update",
+    ),
+    ota_port: int | None = typer.Option(
+        None, "--ota-port", help="Override the per-platform OTA port"
+    ),
+    password: str | None = typer.Option(None, "--password", help="OTA password"),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Skip confirmation"),
+    max_age: MaxAgeOption = None,
+    live: LiveOption = False,
+) -> None:
+    """Roll firmware out to logical devices in canary-first waves."""
+    settings = load_settings_or_exit()
+    db = build_database(settings)
+    registry = db.load_devices()
+    scan = load_scan_or_discover(db, settings, max_age, live)
+
+    console = Console()
+
+    names = select_logical(registry, targets)
+    if not names:
+        console.print("[yellow]⚠[/yellow] No logical devices match the targets.")
+        raise typer.Exit(1)
+
+    devices = scan.devices if scan else []
+    by_ip = {device.ip: device for device in devices}
+    by_name = {device.name: device for device in devices}
+    plan: list[OTATarget] = []
+    for name in names:
+        physical_ref = registry.logical_devices[name].physical
+        found = match_physical(physical_ref, by_ip, by_name)
+        port = ota_port or default_ota_port(found.model if found else "")
+        plan.append(OTATarget(name, found.ip if found else physical_ref, port))
+
+    if firmware.suffix.lower() in (".yaml", ".yml"):
+        console.print(f"Compiling {firmware}...")
+        try:
+            firmware = compile_firmware(firmware)
+            expect_version = expect_version or esphome_version()
+        except subprocess.CalledProcessError as exc:
+            console.print(
+                f"[red]✗[/red] ESPHome compile failed (exit {exc.returncode})"
+            )
+            raise typer.Exit(1) from None
+        except (OTAError, ImportError) as exc:
+            console.print(f"[red]✗[/red] {exc}")
+            raise typer.Exit(1) from None
+
+    options = RolloutOptions(
+        canary=canary,
+        wave_size=wave_size,
+        concurrency=concurrency,
+        max_failures=max_failures,
+        gate_timeout=gate_timeout,
+        password=password,
+        expected_version=expect_version,
+    )
+
+    console.print(f"Firmware: {firmware}")
+    console.print(
+        f"Targets: {len(plan)} device(s), canary {canary}, waves of {wave_size}, "
+        f"{concurrency} parallel"
+    )
+    if not yes:
+        typer.confirm("Proceed with OTA rollout?", abort=True)
+
+    def _report(outcome: OTAOutcome) -> None:
+        style = _STATUS_STYLE.get(outcome.status, "yellow")
+        detail = outcome.version or outcome.error or ""
+        console.print(
+            f"  [{style}]{outcome.status}[/{style}] {outcome.logical} "
+            f"(wave {outcome.wave}) {detail}"
+        )
+
+    outcomes = asyncio.run(
+        run_rollout(plan, firmware, settings.scanning, options, on_outcome=_report)
+    )
+
+    table = Table()
+    table.add_column("Logical", style="cyan")
+    table.add_column("Host", style="green")
+    table.add_column("Wave", justify="right")
+    table.add_column("Status")
+    table.add_column("Version / Error")
+    table.add_column("Seconds", justify="right")
+    for outcome in outcomes:
+        style = _STATUS_STYLE.get(outcome.status, "yellow")
+        table.add_row(
+            outcome.logical,
+            outcome.host,
+            str(outcome.wave),
+            f"[{style}]{outcome.status}[/{style}]",
+            outcome.version or outcome.error or "",
+            f"{outcome.seconds:.1f}",
+        )
+    console.print()
+    console.print(table)
+
+    if any(outcome.status != STATUS_UPDATED for outcome in outcomes):
+        raise typer.Exit(1)
+
+
+def register(app: typer.Typer) -> None:
+    app.command()(ota)
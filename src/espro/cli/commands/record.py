@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Annotated
+
+import aioesphomeapi as api
+import typer
+from rich.console import Console
+
+from espro.core.capture import SUFFIX, record_session, write_capture
+
+from .device_logs import _log_level_names, _parse_log_level
+
+
+def record(
+    host: str = typer.Argument(..., help="Device hostname or IP address"),
+    port: int = typer.Option(6053, "--port", "-p", help="Port to connect to"),
+    duration: float = typer.Option(
+        60.0, "--duration", "-d", min=0, help="Seconds of states and logs to capture"
+    ),
+    output: Annotated[
+        Path | None,
+        typer.Option("--output", "-o", help=f"Capture file (default: <host>{SUFFIX})"),
+    ] = None,
+    level: str = typer.Option("debug", "--level", "-l", help="Log level to capture"),
+) -> None:
+    """Record a device's API session for replay with espro mock --replay."""
+    console = Console()
+    try:
+        log_level = _parse_log_level(level)
+    except KeyError:
+        console.print(f"[red]Invalid log level:[/red] {level}")
+        console.print(f"Valid levels: {', '.join(_log_level_names())}")
+        raise typer.Exit(1) from None
+
+    path = output or Path(f"{host}{SUFFIX}")
+    console.print(f"Recording {host}:{port} for {duration:g}s...")
+    try:
+        capture = asyncio.run(record_session(host, port, duration, log_level))
+    except (
+        api.APIConnectionError,
+        api.InvalidAuthAPIError,
+        ConnectionError,
+        OSError,
+        TimeoutError,
+    ) as exc:
+        console.print(f"[red]Error:[/red] {exc}")
+        raise typer.Exit(1) from None
+
+    size = write_capture(path, capture)
+    counts = capture.counts()
+    console.print(
+        f"[green]✓[/green] Saved {path} ({size / 1024:.1f} KiB): "
+        f"{counts['entities']} entities, {counts['states']} states, "
+        f"{counts['logs']} log lines from {capture.name}"
+    )
+
+
+def register(app: typer.Typer) -> None:
+    app.command()(record)
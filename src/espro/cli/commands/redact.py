@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import io
+import sys
+from pathlib import Path
+from typing import Annotated, cast
+
+import typer
+
+from espro.utils.redaction import Redactor
+
+READ_SIZE = 1 << 18
+
+
+def _write(data: bytes, redactor: Redactor) -> None:
+    sys.stdout.write(redactor.redact_text(data.decode("utf-8", "backslashreplace")))
+    sys.stdout.flush()
+
+
+def _copy(source: io.BufferedIOBase, redactor: Redactor) -> None:
+    # read1 returns what is available: big batches under load, single lines
+    # as they arrive when following a live stream
+    pending = b""
+    while chunk := source.read1(READ_SIZE):
+        pending += chunk
+        cut = pending.rfind(b"\n") + 1
+        if cut:
+            _write(pending[:cut], redactor)
+            pending = pending[cut:]
+    if pending:
+        _write(pending, redactor)
+
+
+def redact(
+    path: Annotated[
+        Path | None, typer.Argument(help="Log or dump to redact (default: stdin)")
+    ] = None,
+) -> None:
+    """Strip IPs, MACs, SSIDs and keys from text before sharing it."""
+    redactor = Redactor()
+    if path is None:
+        _copy(cast(io.BufferedIOBase, sys.stdin.buffer), redactor)
+        return
+    try:
+        with path.open("rb") as handle:
+            _copy(handle, redactor)
+    except OSError as exc:
+        typer.echo(f"Cannot read {path}: {exc}", err=True)
+        raise typer.Exit(1) from None
+
+
+def register(app: typer.Typer) -> None:
+    app.command()(redact)
@@ -1,19 +1,155 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
+import sys
+from typing import IO, Annotated
 
 import typer
 from rich.console import Console
 from rich.table import Table
 
 from espro.cli.helpers import build_database, load_settings_or_exit
-from espro.core import scan_network
+from espro.config import ScanningConfig
+from espro.core import Discovery, scan_network
+from espro.core.scan_cache import scan_age
+from espro.models import DeviceRegistry, PhysicalDevice, ScanResult
 from espro.utils.redaction import Redactor
+from espro.utils.timing import span
 
 logger = logging.getLogger(__name__)
 
 
+def _print_devices(
+    console: Console,
+    devices: list[PhysicalDevice],
+    physical_to_logical: dict[str, str],
+    redact: bool,
+) -> None:
+    redactor = Redactor(enabled=redact)
+    table = Table()
+    table.add_column("IP", style="cyan")
+    table.add_column("Physical", style="green")
+    table.add_column("Logical", style="yellow")
+    table.add_column("MAC Address")
+    table.add_column("Model")
+    table.add_column("Version")
+    show_interface = any(device.interface for device in devices)
+    if show_interface:
+        table.add_column("Interface")
+
+    for device in devices:
+        # Format: "name (Friendly Name)" or just "name"
+        if device.friendly_name:
+            physical_col = f"{device.name} ({device.friendly_name})"
+        else:
+            physical_col = device.name
+        if device.mdns is False:
+            physical_col += " [yellow](no mDNS)[/yellow]"
+        logical_col = _logical_for(device, physical_to_logical)
+        row = [
+            redactor.redact_ip(device.ip),
+            physical_col,
+            logical_col,
+            redactor.redact_mac(device.mac_address),
+            device.model,
+            redactor.redact_version(device.esphome_version),
+        ]
+        if show_interface:
+            row.append(device.interface or "")
+        table.add_row(*row)
+
+    console.print(table)
+    console.print(f"\n[green]Found {len(devices)} device(s)[/green]")
+
+
+def _logical_for(device: PhysicalDevice, physical_to_logical: dict[str, str]) -> str:
+    return (
+        physical_to_logical.get(device.ip)
+        or physical_to_logical.get(device.name)
+        or physical_to_logical.get(f"{device.name}.local")
+        or ""
+    )
+
+
+def _print_json(
+    out: IO[str],
+    devices: list[PhysicalDevice],
+    physical_to_logical: dict[str, str],
+    redact: bool,
+) -> None:
+    redactor = Redactor(enabled=redact)
+    rows = []
+    for device in devices:
+        row = device.model_dump(mode="json")
+        row["esphome_version"] = redactor.redact_version(device.esphome_version)
+        row["logical"] = _logical_for(device, physical_to_logical) or None
+        rows.append(row)
+    # IPs and MACs also hide in TXT records, so the whole document is redacted
+    out.write(redactor.redact_text(json.dumps(rows, indent=2)) + "\n")
+
+
+def print_scan(
+    console: Console,
+    out: IO[str],
+    devices: list[PhysicalDevice],
+    registry: DeviceRegistry,
+    redact: bool,
+    as_json: bool,
+) -> None:
+    """Print devices as a table on ``console`` or as JSON on ``out``."""
+    if not devices:
+        console.print("No ESPHome devices found.")
+        if as_json:
+            out.write("[]\n")
+        return
+
+    # Build reverse lookup: physical name -> logical name
+    physical_to_logical = {
+        ld.physical: name for name, ld in registry.logical_devices.items()
+    }
+
+    with span("cli.render"):
+        if as_json:
+            _print_json(out, devices, physical_to_logical, redact)
+        else:
+            _print_devices(console, devices, physical_to_logical, redact)
+
+
+def _discover(
+    console: Console,
+    network: str,
+    scanning: ScanningConfig,
+    previous: ScanResult | None,
+    fast: bool,
+) -> Discovery:
+    console.print("Discovering ESPHome devices via mDNS...")
+    logger.info(
+        "mDNS discovery settings: timeout=%.2fs, label=%s",
+        scanning.timeout,
+        network,
+    )
+    known = previous.devices if previous else None
+    if known:
+        console.print(f"Probing {len(known)} last-known address(es) directly...")
+
+    with span("cli.discover"):
+        try:
+            return asyncio.run(
+                scan_network(
+                    network,
+                    scanning,
+                    known=known,
+                    fast=fast,
+                    missing=previous.missing if previous else None,
+                )
+            )
+        except RuntimeError as exc:
+            console.print(f"[red]✗[/red] {exc}")
+            raise typer.Exit(1) from exc
+
+
 def scan(
     network: str | None = typer.Argument(
         None,
@@ -28,12 +164,44 @@ def scan(
         "--redact",
         help="Redact sensitive values in output",
     ),
+    as_json: bool = typer.Option(
+        False, "--json", help="Print discovered devices as JSON on stdout"
+    ),
+    fast: bool = typer.Option(
+        False,
+        "--fast",
+        help="Stop browsing once every previously seen device answers directly",
+    ),
+    cold: bool = typer.Option(
+        False, "--cold", help="Ignore last-known addresses and rely on mDNS only"
+    ),
+    max_age: float | None = typer.Option(
+        None,
+        "--max-age",
+        min=0,
+        help="Show the saved scan instead if younger than this many seconds",
+    ),
+    interfaces: Annotated[
+        list[str] | None,
+        typer.Option(
+            "--interface",
+            "-i",
+            help=(
+                "Interface name, local address or subnet to browse on (repeatable; "
+                "overrides scanning.interfaces, '*' for all)"
+            ),
+        ),
+    ] = None,
 ) -> None:
     """Discover ESPHome devices via mDNS."""
-    console = Console()
+    # With --json, progress goes to stderr so stdout stays parseable
+    console = Console(stderr=as_json)
 
     settings = load_settings_or_exit()
     db = build_database(settings)
+    scanning = settings.scanning
+    if interfaces:
+        scanning = scanning.model_copy(update={"interfaces": tuple(interfaces)})
 
     if network is None:
         network = settings.scanning.default_network
@@ -45,59 +213,36 @@ def scan(
             "Note: network argument is stored as a scan label; discovery uses mDNS."
         )
 
-    console.print("Discovering ESPHome devices via mDNS...")
-    logger.info(
-        "mDNS discovery settings: timeout=%.2fs, label=%s",
-        settings.scanning.timeout,
-        network,
+    previous = None if cold else db.load_current_scan()
+    reused = (
+        max_age is not None and previous is not None and scan_age(previous) <= max_age
     )
-    devices = asyncio.run(scan_network(network, settings.scanning))
-
+    if reused and previous is not None:
+        console.print(f"Reusing the scan from {scan_age(previous):.0f}s ago.")
+        discovery = Discovery(previous.devices, previous.missing)
+    else:
+        discovery = _discover(console, network, scanning, previous, fast)
+    devices = discovery.devices
+    print_scan(console, sys.stdout, devices, db.load_devices(), redact, as_json)
     if not devices:
-        console.print("No ESPHome devices found.")
         return
 
-    # Build reverse lookup: physical name -> logical name
-    registry = db.load_devices()
-    physical_to_logical = {
-        ld.physical: name for name, ld in registry.logical_devices.items()
-    }
-
-    redactor = Redactor(enabled=redact)
-    table = Table()
-    table.add_column("IP", style="cyan")
-    table.add_column("Physical", style="green")
-    table.add_column("Logical", style="yellow")
-    table.add_column("MAC Address")
-    table.add_column("Model")
-    table.add_column("Version")
-
-    for device in devices:
-        # Format: "name (Friendly Name)" or just "name"
-        if device.friendly_name:
-            physical_col = f"{device.name} ({device.friendly_name})"
-        else:
-            physical_col = device.name
-        logical_col = (
-            physical_to_logical.get(device.ip)
-            or physical_to_logical.get(device.name)
-            or physical_to_logical.get(f"{device.name}.local")
-            or ""
-        )
-        table.add_row(
-            redactor.redact_ip(device.ip),
-            physical_col,
-            logical_col,
-            redactor.redact_mac(device.mac_address),
-            device.model,
-            redactor.redact_version(device.esphome_version),
+    answered = {device.ip for device in devices}
+    quiet = [n for n in discovery.neighbors if n.ip not in answered]
+    if quiet:
+        redactor = Redactor(enabled=redact)
+        console.print(
+            f"[blue]i[/blue] {len(quiet)} Espressif device(s) in the neighbor "
+            "table did not answer the ESPHome API:"
         )
-
-    console.print(table)
-    console.print(f"\n[green]Found {len(devices)} device(s)[/green]")
-
-    if save:
-        db.save_scan(devices, network)
+        for neighbor in quiet:
+            console.print(
+                f"  • {redactor.redact_ip(neighbor.ip)} "
+                f"({redactor.redact_mac(neighbor.mac)}, {neighbor.interface})"
+            )
+
+    if save and not reused:
+        db.save_scan(devices, network, discovery.missing)
         console.print(f"[green]✓[/green] Saved scan results to {db.path}")
 
 
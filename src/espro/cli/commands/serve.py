@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+
+import typer
+from rich.console import Console
+
+from espro.cli.helpers import build_database, load_settings_or_exit
+from espro.core import Daemon, FleetMetrics
+from espro.core.api import RESOURCES, run_api_server
+
+
+def serve(
+    port: int | None = typer.Option(
+        None, "--port", "-p", min=1, max=65535, help="Port (default: serve.port)"
+    ),
+    host: str | None = typer.Option(
+        None, "--host", help="Bind address (default: serve.host)"
+    ),
+    daemon: bool | None = typer.Option(
+        None,
+        "--daemon/--no-daemon",
+        help="Also run discovery and probing, publishing live state",
+    ),
+) -> None:
+    """Serve the registry, latest scan and mappings over a local HTTP API."""
+    settings = load_settings_or_exit()
+    overrides = {
+        key: value
+        for key, value in {"port": port, "host": host, "daemon": daemon}.items()
+        if value is not None
+    }
+    config = settings.serve.model_copy(update=overrides)
+    db = build_database(settings)
+
+    console = Console()
+    base = f"http://{config.host}:{config.port}/v1"
+    console.print(f"API at {base}: {', '.join(RESOURCES)}, devices/<logical>, changes")
+    runner = None
+    if config.daemon:
+        metrics = FleetMetrics() if settings.daemon.metrics_port else None
+        runner = Daemon(db, settings, metrics)
+        console.print("Running discovery and probing for live state.")
+    console.print("Press Ctrl+C to stop.\n")
+
+    try:
+        asyncio.run(run_api_server(db, config, runner))
+    except KeyboardInterrupt:
+        console.print("\n[green]Stopped.[/green]")
+    except OSError as exc:
+        console.print(f"[red]Error:[/red] {exc}")
+        raise typer.Exit(1) from None
+
+
+def register(app: typer.Typer) -> None:
+    app.command()(serve)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import os
+import time
+
+import typer
+from rich.console import Console
+
+from espro.cli.helpers import build_database, load_settings_or_exit
+from espro.client import daemon_running
+from espro.core import Daemon, validate_mappings
+from espro.core.scan_cache import scan_age
+from espro.database import Database
+from espro.models import DeviceRegistry, ScanResult
+
+
+def _duration(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {secs}s"
+    return f"{secs}s"
+
+
+def print_status(
+    console: Console,
+    db: Database,
+    registry: DeviceRegistry,
+    current_scan: ScanResult | None,
+    daemon: Daemon | None = None,
+) -> None:
+    """Summarize the fleet; ``daemon`` is set when answering from the daemon."""
+    if daemon is not None:
+        uptime = _duration(time.time() - daemon.started_at)
+        console.print(
+            f"Daemon: [green]running[/green] (pid {os.getpid()}, up {uptime})"
+        )
+    elif daemon_running(db.control_socket_path):
+        console.print("Daemon: [green]running[/green] (not queried)")
+    else:
+        console.print("Daemon: [yellow]not running[/yellow]")
+    console.print(f"Data directory: {db.path}")
+    console.print(f"Logical devices: {len(registry.logical_devices)}")
+
+    if current_scan is None:
+        console.print("No scans recorded yet")
+        return
+    console.print(
+        f"Last scan: {_duration(scan_age(current_scan))} ago, "
+        f"{len(current_scan.devices)} device(s)"
+    )
+    if registry.logical_devices:
+        result = validate_mappings(registry, current_scan)
+        errors = f"[red]{len(result.errors)}[/red]" if result.errors else "0"
+        console.print(f"Mappings: {result.valid_count} valid, {errors} error(s)")
+
+    if daemon is not None and daemon.last_probe:
+        probed = [
+            health
+            for logical, health in daemon.last_probe.items()
+            if logical in registry.logical_devices
+        ]
+        reachable = sum(1 for health in probed if health.pings_ok)
+        console.print(f"Reachable at last probe: {reachable}/{len(probed)}")
+
+
+def status() -> None:
+    """Show whether the daemon runs and a summary of the fleet."""
+    settings = load_settings_or_exit()
+    db = build_database(settings)
+    print_status(Console(), db, db.load_devices(), db.load_current_scan())
+
+
+def register(app: typer.Typer) -> None:
+    app.command()(status)
@@ -3,30 +3,35 @@ from __future__ import annotations
 import typer
 from rich.console import Console
 
-from espro.cli.helpers import build_database, load_settings_or_exit
+from espro.cli.helpers import (
+    LiveOption,
+    MaxAgeOption,
+    build_database,
+    load_scan_or_discover,
+    load_settings_or_exit,
+)
 from espro.core import validate_mappings
+from espro.models import DeviceRegistry, ScanResult
+from espro.utils.timing import span
 
 
-def validate() -> None:
-    """Validate logical device mappings against scan results."""
-    settings = load_settings_or_exit()
-    db = build_database(settings)
-    registry = db.load_devices()
-    current_scan = db.load_current_scan()
-
-    console = Console()
-
+def print_validation(
+    console: Console, registry: DeviceRegistry, current_scan: ScanResult | None
+) -> int:
+    """Print the validation report; returns the exit code."""
     if not current_scan:
         console.print(
-            "[yellow]⚠[/yellow] No scan results available. Run 'espro scan' first."
+            "[yellow]⚠[/yellow] No scan results available and discovery found "
+            "no devices."
         )
-        raise typer.Exit(1)
+        return 1
 
     if not registry.logical_devices:
         console.print("[yellow]⚠[/yellow] No logical devices defined.")
-        return
+        return 0
 
-    result = validate_mappings(registry, current_scan)
+    with span("cli.validate"):
+        result = validate_mappings(registry, current_scan)
 
     if result.errors:
         console.print("[red]✗[/red] Validation errors:\n")
@@ -52,8 +57,19 @@ def validate() -> None:
         for name, ip in result.unmapped_devices:
             console.print(f"  • {name} ({ip})")
 
-    if result.errors:
-        raise typer.Exit(1)
+    return 1 if result.errors else 0
+
+
+def validate(max_age: MaxAgeOption = None, live: LiveOption = False) -> None:
+    """Validate logical device mappings against scan results."""
+    settings = load_settings_or_exit()
+    db = build_database(settings)
+    registry = db.load_devices()
+    current_scan = load_scan_or_discover(db, settings, max_age, live)
+
+    exit_code = print_validation(Console(), registry, current_scan)
+    if exit_code:
+        raise typer.Exit(exit_code)
 
 
 def register(app: typer.Typer) -> None:
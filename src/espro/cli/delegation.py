@@ -0,0 +1,217 @@
+"""Answer delegated CLI commands inside ``espro daemon``.
+
+``espro.client`` sends one JSON line with the command line and how the
+terminal renders; the reply is one JSON document with the exit code and
+captured output. Commands run the same print functions as in-process, on
+the registry and scan held in memory (reloaded only when their files
+change). Anything that needs fresh discovery or disk writes answers
+``{"fallback": true}`` so the client runs it in-process instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import logging
+import os
+from collections.abc import Callable
+from typing import Any, TextIO
+
+import typer
+from rich.console import Console
+from typer.core import TyperGroup
+
+from espro.client import daemon_running
+from espro.config import Settings
+from espro.core import Daemon
+from espro.core.api import FleetView
+from espro.core.scan_cache import scan_age
+from espro.database import Database
+from espro.models import ScanResult
+
+from .commands.devices import print_devices
+from .commands.history import parse_window, print_history
+from .commands.scan import print_scan
+from .commands.status import print_status
+from .commands.validate import print_validation
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUEST = 64 * 1024
+
+Reply = dict[str, object]
+# Commands that read live daemon state run on its event loop; the others
+# only read files and are rendered in a worker thread
+ON_LOOP = frozenset({"status"})
+
+
+class _Fallback(Exception):
+    pass
+
+
+class DelegationServer:
+    def __init__(
+        self,
+        db: Database,
+        settings: Settings,
+        commands: TyperGroup,
+        daemon: Daemon | None = None,
+    ) -> None:
+        self._db = db
+        self._settings = settings
+        self._commands = commands
+        self._daemon = daemon
+        self.view = FleetView(db)
+        self._server: asyncio.AbstractServer | None = None
+        self._handlers: dict[str, Callable[[dict[str, Any], Console, Console], int]] = {
+            "list": self._list,
+            "scan": self._scan,
+            "validate": self._validate,
+            "status": self._status,
+            "history": self._history,
+        }
+
+    @property
+    def path(self) -> str:
+        return str(self._db.control_socket_path)
+
+    async def start(self) -> bool:
+        """Listen on the control socket; False if another daemon already does."""
+        path = self._db.control_socket_path
+        if path.exists():
+            if daemon_running(path):
+                logger.warning("Another daemon answers on %s; not delegating", path)
+                return False
+            # Left behind by a daemon that did not shut down cleanly
+            path.unlink()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._server = await asyncio.start_unix_server(
+            self._handle_client, path=self.path, limit=MAX_REQUEST
+        )
+        os.chmod(path, 0o600)
+        logger.info("Answering CLI commands on %s", path)
+        return True
+
+    async def close(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        self._db.control_socket_path.unlink(missing_ok=True)
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            line = await reader.readline()
+            if line:
+                writer.write(json.dumps(await self.answer(line)).encode())
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def answer(self, line: bytes) -> Reply:
+        """Run one JSON request line; never raises."""
+        try:
+            request = json.loads(line)
+            return await self.run(
+                list(request["argv"]), request.get("width"), request.get("color")
+            )
+        except _Fallback:
+            return {"fallback": True}
+        except Exception:
+            logger.exception("Delegated command failed; client runs it in-process")
+            return {"fallback": True}
+
+    async def run(self, argv: list[str], width: int | None, color: str | None) -> Reply:
+        name, args = argv[0], argv[1:]
+        handler = self._handlers.get(name)
+        command = self._commands.commands.get(name)
+        if handler is None or command is None:
+            raise _Fallback
+        try:
+            with command.make_context(name, args) as ctx:
+                params = ctx.params
+        except Exception:
+            # Usage errors are reported by the in-process CLI
+            raise _Fallback from None
+
+        await asyncio.to_thread(self.view.load)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        out = self._console(stdout, width, color)
+        err = self._console(stderr, width, color)
+        if name in ON_LOOP:
+            exit_code = handler(params, out, err)
+        else:
+            exit_code = await asyncio.to_thread(handler, params, out, err)
+        return {
+            "exit": exit_code,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+        }
+
+    @staticmethod
+    def _console(file: TextIO, width: int | None, color: str | None) -> Console:
+        return Console(
+            file=file,
+            width=width or 80,
+            force_terminal=color is not None,
+            color_system=color,  # type: ignore[arg-type]
+        )
+
+    def _fresh_scan(self, max_age: float) -> ScanResult:
+        scan = self.view.scan
+        if scan is None or scan_age(scan) > max_age:
+            raise _Fallback
+        return scan
+
+    def _list(self, _params: dict[str, Any], out: Console, _err: Console) -> int:
+        print_devices(out, self._db, self.view.registry)
+        return 0
+
+    def _scan(self, params: dict[str, Any], out: Console, err: Console) -> int:
+        # Labels, saving and interface choices only matter for a new discovery
+        if any(params[key] for key in ("network", "save", "cold", "interfaces")):
+            raise _Fallback
+        max_age = params["max_age"]
+        # Stands in for a live scan while the daemon keeps it this fresh
+        scan = self._fresh_scan(
+            max_age if max_age is not None else 2 * self._settings.daemon.scan_interval
+        )
+        console = err if params["as_json"] else out
+        console.print(f"Daemon scan from {scan_age(scan):.0f}s ago.")
+        print_scan(
+            console,
+            out.file,
+            scan.devices,
+            self.view.registry,
+            params["redact"],
+            params["as_json"],
+        )
+        return 0
+
+    def _validate(self, params: dict[str, Any], out: Console, _err: Console) -> int:
+        if params["live"]:
+            raise _Fallback
+        max_age = params["max_age"]
+        self._fresh_scan(
+            max_age if max_age is not None else self._settings.scanning.max_age
+        )
+        return print_validation(out, self.view.registry, self.view.scan)
+
+    def _status(self, _params: dict[str, Any], out: Console, _err: Console) -> int:
+        print_status(out, self._db, self.view.registry, self.view.scan, self._daemon)
+        return 0
+
+    def _history(self, params: dict[str, Any], out: Console, _err: Console) -> int:
+        try:
+            window = parse_window(params["since"])
+        except typer.BadParameter:
+            raise _Fallback from None
+        return print_history(
+            out, self._db.series_dir, params["target"], window, params["width"]
+        )
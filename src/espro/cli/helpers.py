@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
+from typing import Annotated
 
 import typer
 
@@ -10,7 +12,24 @@ from espro.config import (
     get_settings,
     resolve_config_path,
 )
+from espro.core.scan_cache import get_scan
 from espro.database import Database
+from espro.models import ScanResult
+
+MaxAgeOption = Annotated[
+    float | None,
+    typer.Option(
+        "--max-age",
+        min=0,
+        help=(
+            "Reuse the saved scan if younger than this many seconds, else "
+            "rediscover (default: scanning.max_age)"
+        ),
+    ),
+]
+LiveOption = Annotated[
+    bool, typer.Option("--live", help="Run a fresh discovery instead of reusing")
+]
 
 
 def load_settings_or_exit() -> Settings:
@@ -32,3 +51,19 @@ def resolve_config_path_or_exit(allow_missing: bool = False) -> tuple[Path, bool
 def build_database(settings: Settings, data_dir: Path | None = None) -> Database:
     path = data_dir or data_dir_from_settings(settings)
     return Database(path)
+
+
+def load_scan_or_discover(
+    db: Database, settings: Settings, max_age: float | None, live: bool
+) -> ScanResult | None:
+    """The saved scan while fresh, otherwise a new (saved) discovery."""
+    try:
+        scan, discovered = asyncio.run(
+            get_scan(db, settings.scanning, max_age=max_age, live=live)
+        )
+    except RuntimeError as exc:
+        typer.echo(f"Discovery failed, using the saved scan: {exc}", err=True)
+        return db.load_current_scan()
+    if discovered and scan is not None:
+        typer.echo(f"Discovered {len(scan.devices)} device(s)", err=True)
+    return scan
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from espro.utils import timing
+
+
+def start_timings() -> Callable[[], None]:
+    """Enable phase timers; the returned callback prints the breakdown."""
+    timing.reset()
+    timing.enable()
+    started = time.perf_counter()
+
+    def _finish() -> None:
+        total = time.perf_counter() - started
+        timing.disable()
+
+        table = Table(title="Timings")
+        table.add_column("Phase", style="cyan")
+        table.add_column("Calls", justify="right")
+        table.add_column("Total ms", justify="right")
+        table.add_column("% of run", justify="right")
+        for phase in timing.report():
+            share = 100 * phase.total / total if total else 0.0
+            table.add_row(
+                phase.name,
+                str(phase.calls),
+                f"{phase.total * 1000:.1f}",
+                f"{share:.1f}",
+            )
+        table.add_row("total", "1", f"{total * 1000:.1f}", "100.0", style="bold")
+        Console(stderr=True).print(table)
+
+    return _finish
+
+
+def start_profile(path: Path) -> Callable[[], None]:
+    """Start cProfile; the returned callback stops it and writes ``path``."""
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    def _finish() -> None:
+        profiler.disable()
+        profiler.dump_stats(path)
+        Console(stderr=True).print(f"[green]✓[/green] Wrote profile to {path}")
+
+    return _finish
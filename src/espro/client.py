@@ -0,0 +1,145 @@
+"""Console entry point that forwards read-only commands to a running daemon.
+
+``espro daemon`` listens on a Unix socket in the data directory and answers
+``list``, ``scan``, ``validate``, ``status`` and ``history`` from the state
+it already holds in memory. This module only needs the standard library, so a
+delegated command costs interpreter startup plus one round trip; anything
+else, or no daemon, falls through to the full CLI.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+import tomllib
+
+DELEGATED = frozenset({"list", "scan", "validate", "status", "history"})
+HELP_FLAGS = frozenset({"--help", "-h"})
+# Mirrors espro.database.CONTROL_SOCKET_FILE
+SOCKET_FILE = "espro.sock"
+NO_DELEGATE_ENV_VAR = "ESPRO_NO_DAEMON"
+TIMEOUT = 10.0
+
+
+def _expand(value: str) -> str:
+    return os.path.expandvars(os.path.expanduser(value))
+
+
+def socket_path() -> str | None:
+    """The daemon socket for the active config, like ``Database.control_socket_path``.
+
+    Returns None when the config cannot be read; the full CLI then reports why.
+    """
+    # Same resolution as espro.config, without pydantic (or even pathlib)
+    env_path = os.environ.get("ESPRO_CONFIG")
+    if env_path:
+        config_path = _expand(env_path)
+    else:
+        config_home = os.environ.get(
+            "XDG_CONFIG_HOME", os.path.join(os.path.expanduser("~"), ".config")
+        )
+        config_path = os.path.join(config_home, "espro", "config.toml")
+    data_path = None
+    try:
+        with open(config_path, "rb") as handle:
+            data_path = tomllib.load(handle).get("database", {}).get("path")
+    except FileNotFoundError:
+        if env_path:
+            return None
+    except (OSError, tomllib.TOMLDecodeError, AttributeError):
+        return None
+    if data_path is None:
+        data_home = os.environ.get(
+            "XDG_DATA_HOME", os.path.join(os.path.expanduser("~"), ".local", "share")
+        )
+        return os.path.join(data_home, "espro", SOCKET_FILE)
+    if not isinstance(data_path, str):
+        return None
+    return os.path.join(_expand(data_path), SOCKET_FILE)
+
+
+def _terminal() -> dict[str, object]:
+    """How the daemon should render for our stdout."""
+    width = None
+    color = None
+    if sys.stdout.isatty():
+        try:
+            width = os.get_terminal_size(sys.stdout.fileno()).columns
+        except OSError:
+            width = None
+        if "NO_COLOR" not in os.environ:
+            term = os.environ.get("TERM", "")
+            if os.environ.get("COLORTERM") in ("truecolor", "24bit"):
+                color = "truecolor"
+            elif "256" in term:
+                color = "256"
+            elif term != "dumb":
+                color = "standard"
+    columns = os.environ.get("COLUMNS", "")
+    if columns.isdigit():
+        width = int(columns)
+    return {"width": width, "color": color}
+
+
+def delegate(
+    argv: list[str], path: str | None = None, timeout: float = TIMEOUT
+) -> dict[str, object] | None:
+    """Run ``argv`` in the daemon; None when it must run in-process instead.
+
+    A reply carries ``exit``, ``stdout`` and ``stderr``. Delegated commands
+    are read-only, so falling back after a timeout is always safe.
+    """
+    path = path or socket_path()
+    if path is None:
+        return None
+    request = {"argv": argv, **_terminal()}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            chunks = []
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+    except OSError:
+        return None
+    try:
+        reply = json.loads(b"".join(chunks))
+    except ValueError:
+        return None
+    if not isinstance(reply, dict) or reply.get("fallback"):
+        return None
+    return reply
+
+
+def daemon_running(path: str | os.PathLike[str]) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1.0)
+            sock.connect(os.fspath(path))
+    except OSError:
+        return False
+    return True
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    if (
+        argv
+        and argv[0] in DELEGATED
+        and not HELP_FLAGS.intersection(argv)
+        and not os.environ.get(NO_DELEGATE_ENV_VAR)
+    ):
+        reply = delegate(argv)
+        if reply is not None:
+            sys.stdout.write(str(reply.get("stdout", "")))
+            sys.stderr.write(str(reply.get("stderr", "")))
+            sys.stdout.flush()
+            exit_code = reply.get("exit", 0)
+            sys.exit(exit_code if isinstance(exit_code, int) else 1)
+
+    from espro.cli.app import app
+
+    app()
@@ -4,11 +4,13 @@ from __future__ import annotations
 
 import json
 import os
+import re
 import tomllib
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
 
 # Constants
 APP_NAME = "espro"
@@ -51,6 +53,116 @@ class ScanningConfig(BaseModel):
     port: int = Field(default=6053, ge=1, le=65535)
     timeout: float = Field(default=2.0, gt=0)
     parallel_scans: int = Field(default=255, ge=1, le=255)
+    # Interface names, local addresses or subnets to browse concurrently;
+    # "*" means every non-loopback IPv4 interface, empty uses zeroconf defaults
+    interfaces: tuple[str, ...] = ()
+    # Probe Espressif MACs from the ARP/neighbor table alongside mDNS
+    arp_prefilter: bool = True
+    # Commands reuse a saved scan younger than this many seconds
+    max_age: float = Field(default=900.0, ge=0)
+    # Probe known devices with a deadline learned from their own connect
+    # latency: p99 estimate x timeout_factor, within min_timeout..max_timeout
+    adaptive_timeout: bool = True
+    timeout_factor: float = Field(default=3.0, gt=0)
+    min_timeout: float = Field(default=0.25, gt=0)
+    max_timeout: float = Field(default=5.0, gt=0)
+
+
+class DaemonConfig(BaseModel):
+    model_config = {"frozen": True, "extra": "forbid"}
+
+    scan_interval: float = Field(default=60.0, gt=0)
+    probe_interval: float = Field(default=30.0, gt=0)
+    subscribe_logs: bool = False
+    metrics_host: str = "127.0.0.1"
+    # 0 disables the metrics endpoint
+    metrics_port: int = Field(default=0, ge=0, le=65535)
+    # Fleet-wide pacing of long-lived API connections
+    connect_rate: float = Field(default=10.0, gt=0)
+    connect_burst: int = Field(default=10, ge=1)
+    backoff_initial: float = Field(default=1.0, gt=0)
+    backoff_max: float = Field(default=300.0, gt=0)
+    # Roles connected first, most important first
+    priority_roles: tuple[str, ...] = ()
+    # Reconnect immediately when a device re-announces itself via mDNS
+    watch_mdns: bool = True
+    # Apply devices.toml edits as they happen instead of at the next scan
+    watch_registry: bool = True
+    # Worker processes holding device sessions; 1 keeps them in the daemon
+    workers: int = Field(default=1, ge=1, le=64)
+    # Record numeric entity states to per-entity series (espro history)
+    record_states: bool = False
+    # Answer list/scan/validate/status/history for the CLI on a socket in the data dir
+    control_socket: bool = True
+
+
+class ServeConfig(BaseModel):
+    model_config = {"frozen": True, "extra": "forbid"}
+
+    host: str = "127.0.0.1"
+    port: int = Field(default=8053, ge=1, le=65535)
+    # How often the registry and scan files are polled without inotify
+    refresh_interval: float = Field(default=1.0, gt=0)
+    # Also run discovery and probing in-process and publish live state
+    daemon: bool = False
+
+
+AlertLevel = Literal[
+    "error", "warning", "info", "config", "debug", "verbose", "very_verbose"
+]
+
+
+class AlertRule(BaseModel):
+    """Fires when ``threshold`` matching log lines arrive within ``window``.
+
+    Counting is per device, so "3 WiFi disconnects in 5 minutes on any
+    device" is ``threshold = 3`` and ``window = 300``.
+    """
+
+    model_config = {"frozen": True, "extra": "forbid"}
+
+    name: str
+    # Regex searched in the message text (without the [L][tag:line] header)
+    pattern: str | None = None
+    # Glob over the log tag, e.g. "dallas*"
+    tag: str | None = None
+    # Minimum severity; "warning" also matches errors
+    level: AlertLevel | None = None
+    threshold: int = Field(default=1, ge=1)
+    window: float = Field(default=0.0, ge=0)
+    # Quiet period per device after firing; defaults to the window
+    cooldown: float | None = Field(default=None, ge=0)
+
+    @field_validator("pattern")
+    @classmethod
+    def _check_pattern(cls, value: str | None) -> str | None:
+        if value is not None:
+            try:
+                re.compile(value)
+            except re.error as exc:
+                raise ValueError(f"invalid pattern {value!r}: {exc}") from exc
+        return value
+
+    @model_validator(mode="after")
+    def _check_window(self) -> AlertRule:
+        if self.threshold > 1 and not self.window:
+            raise ValueError("a threshold above 1 needs a window")
+        if self.pattern is None and self.tag is None and self.level is None:
+            raise ValueError("a rule needs a pattern, tag or level")
+        return self
+
+
+class AlertsConfig(BaseModel):
+    model_config = {"frozen": True, "extra": "forbid"}
+
+    rules: tuple[AlertRule, ...] = ()
+    stdout: bool = True
+    # POSTed one JSON object per alert; empty disables
+    webhook_url: str = ""
+    # MQTT broker for alert messages; empty disables
+    mqtt_host: str = ""
+    mqtt_port: int = Field(default=1883, ge=1, le=65535)
+    mqtt_topic: str = "espro/alerts"
 
 
 class Settings(BaseModel):
@@ -58,6 +170,9 @@ class Settings(BaseModel):
 
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
     scanning: ScanningConfig = Field(default_factory=ScanningConfig)
+    daemon: DaemonConfig = Field(default_factory=DaemonConfig)
+    serve: ServeConfig = Field(default_factory=ServeConfig)
+    alerts: AlertsConfig = Field(default_factory=AlertsConfig)
 
 
 # Config loading functions
@@ -114,8 +229,60 @@ def render_settings_toml(settings: Settings) -> str:
         f"port = {settings.scanning.port}",
         f"timeout = {settings.scanning.timeout}",
         f"parallel_scans = {settings.scanning.parallel_scans}",
+        "interfaces = ["
+        + ", ".join(_toml_string(entry) for entry in settings.scanning.interfaces)
+        + "]",
+        f"arp_prefilter = {str(settings.scanning.arp_prefilter).lower()}",
+        f"max_age = {settings.scanning.max_age}",
+        f"adaptive_timeout = {str(settings.scanning.adaptive_timeout).lower()}",
+        f"timeout_factor = {settings.scanning.timeout_factor}",
+        f"min_timeout = {settings.scanning.min_timeout}",
+        f"max_timeout = {settings.scanning.max_timeout}",
+        "",
+        "[daemon]",
+        f"scan_interval = {settings.daemon.scan_interval}",
+        f"probe_interval = {settings.daemon.probe_interval}",
+        f"subscribe_logs = {str(settings.daemon.subscribe_logs).lower()}",
+        f"metrics_host = {_toml_string(settings.daemon.metrics_host)}",
+        f"metrics_port = {settings.daemon.metrics_port}",
+        f"connect_rate = {settings.daemon.connect_rate}",
+        f"connect_burst = {settings.daemon.connect_burst}",
+        f"backoff_initial = {settings.daemon.backoff_initial}",
+        f"backoff_max = {settings.daemon.backoff_max}",
+        "priority_roles = ["
+        + ", ".join(_toml_string(role) for role in settings.daemon.priority_roles)
+        + "]",
+        f"watch_mdns = {str(settings.daemon.watch_mdns).lower()}",
+        f"watch_registry = {str(settings.daemon.watch_registry).lower()}",
+        f"workers = {settings.daemon.workers}",
+        f"record_states = {str(settings.daemon.record_states).lower()}",
+        f"control_socket = {str(settings.daemon.control_socket).lower()}",
+        "",
+        "[serve]",
+        f"host = {_toml_string(settings.serve.host)}",
+        f"port = {settings.serve.port}",
+        f"refresh_interval = {settings.serve.refresh_interval}",
+        f"daemon = {str(settings.serve.daemon).lower()}",
+        "",
+        "[alerts]",
+        f"stdout = {str(settings.alerts.stdout).lower()}",
+        f"webhook_url = {_toml_string(settings.alerts.webhook_url)}",
+        f"mqtt_host = {_toml_string(settings.alerts.mqtt_host)}",
+        f"mqtt_port = {settings.alerts.mqtt_port}",
+        f"mqtt_topic = {_toml_string(settings.alerts.mqtt_topic)}",
         "",
     ]
+    for rule in settings.alerts.rules:
+        lines.extend(["[[alerts.rules]]", f"name = {_toml_string(rule.name)}"])
+        for key in ("pattern", "tag", "level"):
+            value = getattr(rule, key)
+            if value is not None:
+                lines.append(f"{key} = {_toml_string(value)}")
+        lines.append(f"threshold = {rule.threshold}")
+        lines.append(f"window = {rule.window}")
+        if rule.cooldown is not None:
+            lines.append(f"cooldown = {rule.cooldown}")
+        lines.append("")
     return "\n".join(lines)
 
 
@@ -128,8 +295,12 @@ __all__ = [
     "APP_NAME",
     "CONFIG_ENV_VAR",
     "CONFIG_FILENAME",
+    "AlertRule",
+    "AlertsConfig",
+    "DaemonConfig",
     "DatabaseConfig",
     "ScanningConfig",
+    "ServeConfig",
     "Settings",
     "data_dir_from_settings",
     "default_config_path",
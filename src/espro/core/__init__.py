@@ -1,12 +1,32 @@
 from __future__ import annotations
 
+from .config_cache import ConfigCache
+from .daemon import Daemon
+from .entities import EntityIndex, fetch_catalog
+from .health import probe_device, probe_fleet
+from .metrics import FleetMetrics
 from .mock_device import run_mock_device
-from .scanner import check_device, detect_local_network, scan_network
+from .resolver import resolve_hosts
+from .scanner import (
+    Discovery,
+    check_device,
+    detect_local_network,
+    scan_network,
+)
 from .validator import validate_mappings
 
 __all__ = [
+    "ConfigCache",
+    "Daemon",
+    "Discovery",
+    "EntityIndex",
+    "FleetMetrics",
     "check_device",
     "detect_local_network",
+    "fetch_catalog",
+    "probe_device",
+    "probe_fleet",
+    "resolve_hosts",
     "run_mock_device",
     "scan_network",
     "validate_mappings",
@@ -0,0 +1,317 @@
+"""Continuous evaluation of log alert rules across device log streams."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import re
+import sys
+import time
+import urllib.request
+from array import array
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from fnmatch import translate
+from typing import Protocol
+
+from espro.config import AlertRule, AlertsConfig
+from espro.utils.mqtt import MQTTPublisher
+
+from .log_parser import LEVELS, LogRecord
+
+logger = logging.getLogger(__name__)
+
+# ESPHome levels from most to least severe; unknown levels sort last
+_SEVERITY = {letter: rank for rank, letter in enumerate(LEVELS)}
+_LETTERS = {name: letter for letter, name in LEVELS.items()}
+ALERT_QUEUE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Alert:
+    rule: str
+    device: str
+    count: int
+    window: float
+    tag: str
+    message: str
+    timestamp: datetime
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "rule": self.rule,
+            "device": self.device,
+            "count": self.count,
+            "window": self.window,
+            "tag": self.tag,
+            "message": self.message,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+    def summary(self) -> str:
+        within = f" within {self.window:g}s" if self.window else ""
+        return (
+            f"[ALERT] {self.rule} on {self.device}: "
+            f"{self.count} match(es){within}, last [{self.tag}] {self.message}"
+        )
+
+
+class _Window:
+    """Times of the last ``threshold`` matches in a fixed ring.
+
+    The rule fires when the oldest of them is still inside the window, which
+    is an O(1) check and a fixed amount of memory per rule and device.
+    """
+
+    __slots__ = ("index", "quiet_until", "times")
+
+    def __init__(self, threshold: int) -> None:
+        self.times = array("d", [-math.inf]) * threshold
+        self.index = 0
+        self.quiet_until = -math.inf
+
+    def hit(self, now: float, window: float) -> bool:
+        times = self.times
+        times[self.index] = now
+        self.index = (self.index + 1) % len(times)
+        return now - times[self.index] <= window
+
+
+@dataclass(frozen=True)
+class _Plan:
+    """Rules that can fire for one (level, tag) pair."""
+
+    always: tuple[int, ...]
+    patterned: tuple[int, ...]
+    combined: re.Pattern[str] | None
+    # Patterned rules the combined regex does not cover
+    separate: tuple[int, ...]
+
+
+class AlertEngine:
+    """Matches parsed log records against every rule with one regex per line.
+
+    Level and tag conditions are resolved once per distinct (level, tag) pair.
+    The message patterns of the remaining rules are joined into a single
+    alternation, so the common case of no match costs one search; only a hit
+    checks which other rules also match.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[AlertRule],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rules = list(rules)
+        self._clock = clock
+        self._tags = [
+            re.compile(translate(rule.tag)) if rule.tag else None for rule in self.rules
+        ]
+        self._patterns = {
+            index: re.compile(rule.pattern)
+            for index, rule in enumerate(self.rules)
+            if rule.pattern
+        }
+        self._plans: dict[tuple[str, str], _Plan] = {}
+        self._combined: dict[tuple[int, ...], re.Pattern[str] | None] = {}
+        self._windows: dict[tuple[int, str], _Window] = {}
+
+    @property
+    def most_verbose_level(self) -> str | None:
+        """Letter of the most verbose level any rule asks for, if any."""
+        letters = [_LETTERS[rule.level] for rule in self.rules if rule.level]
+        return max(letters, key=_SEVERITY.__getitem__) if letters else None
+
+    def _combine(self, indices: tuple[int, ...]) -> re.Pattern[str] | None:
+        if indices not in self._combined:
+            source = "|".join(f"(?P<r{i}>{self.rules[i].pattern})" for i in indices)
+            try:
+                self._combined[indices] = re.compile(source)
+            except re.error:
+                # Inline global flags are only allowed at the start of the
+                # whole pattern; such sets fall back to one search per rule
+                logger.debug("Alert patterns %s cannot be combined", indices)
+                self._combined[indices] = None
+        return self._combined[indices]
+
+    def _plan(self, level: str, tag: str) -> _Plan:
+        severity = _SEVERITY.get(level, len(_SEVERITY))
+        always: list[int] = []
+        patterned: list[int] = []
+        for index, rule in enumerate(self.rules):
+            tag_re = self._tags[index]
+            if tag_re is not None and not tag_re.match(tag):
+                continue
+            if rule.level and severity > _SEVERITY[_LETTERS[rule.level]]:
+                continue
+            (patterned if rule.pattern else always).append(index)
+        # Rules with groups are searched on their own: wrapping them in the
+        # alternation renumbers their groups and breaks backreferences
+        joinable = tuple(i for i in patterned if not self._patterns[i].groups)
+        combined = self._combine(joinable) if joinable else None
+        plan = _Plan(
+            tuple(always),
+            tuple(patterned),
+            combined,
+            tuple(i for i in patterned if combined is None or i not in joinable),
+        )
+        self._plans[level, tag] = plan
+        return plan
+
+    def _matching(self, plan: _Plan, message: str) -> Iterable[int]:
+        if not plan.patterned:
+            return plan.always
+        candidates = plan.patterned
+        first = -1
+        if plan.combined is not None:
+            found = plan.combined.search(message)
+            if found is None:
+                candidates = plan.separate
+            elif found.lastgroup:
+                first = int(found.lastgroup[1:])
+        hits = [
+            index
+            for index in candidates
+            if index == first or self._patterns[index].search(message)
+        ]
+        return plan.always + tuple(hits)
+
+    def feed(self, device: str, records: Iterable[LogRecord]) -> list[Alert]:
+        alerts: list[Alert] = []
+        plans = self._plans
+        for record in records:
+            plan = plans.get((record.level, record.tag)) or self._plan(
+                record.level, record.tag
+            )
+            if not plan.always and not plan.patterned:
+                continue
+            for index in self._matching(plan, record.message):
+                alert = self._count(index, device, record)
+                if alert is not None:
+                    alerts.append(alert)
+        return alerts
+
+    def _count(self, index: int, device: str, record: LogRecord) -> Alert | None:
+        rule = self.rules[index]
+        window = self._windows.get((index, device))
+        if window is None:
+            window = self._windows[index, device] = _Window(rule.threshold)
+        now = self._clock()
+        if not window.hit(now, rule.window) or now < window.quiet_until:
+            return None
+        cooldown = rule.window if rule.cooldown is None else rule.cooldown
+        window.quiet_until = now + cooldown
+        return Alert(
+            rule=rule.name,
+            device=device,
+            count=rule.threshold,
+            window=rule.window,
+            tag=record.tag,
+            message=record.message,
+            timestamp=datetime.now(timezone.utc),
+        )
+
+
+class AlertSink(Protocol):
+    async def send(self, alert: Alert) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class StdoutSink:
+    async def send(self, alert: Alert) -> None:
+        sys.stdout.write(alert.summary() + "\n")
+        sys.stdout.flush()
+
+    async def close(self) -> None:
+        pass
+
+
+class WebhookSink:
+    def __init__(self, url: str, timeout: float = 5.0) -> None:
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, body: bytes) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    async def send(self, alert: Alert) -> None:
+        await asyncio.to_thread(self._post, json.dumps(alert.as_dict()).encode())
+
+    async def close(self) -> None:
+        pass
+
+
+class MQTTSink:
+    def __init__(self, publisher: MQTTPublisher, topic: str) -> None:
+        self.publisher = publisher
+        self.topic = topic
+
+    async def send(self, alert: Alert) -> None:
+        await self.publisher.publish(
+            f"{self.topic}/{alert.device}", json.dumps(alert.as_dict()).encode()
+        )
+
+    async def close(self) -> None:
+        await self.publisher.close()
+
+
+def build_sinks(config: AlertsConfig) -> list[AlertSink]:
+    sinks: list[AlertSink] = []
+    if config.stdout:
+        sinks.append(StdoutSink())
+    if config.webhook_url:
+        sinks.append(WebhookSink(config.webhook_url))
+    if config.mqtt_host:
+        sinks.append(
+            MQTTSink(
+                MQTTPublisher(config.mqtt_host, config.mqtt_port), config.mqtt_topic
+            )
+        )
+    return sinks
+
+
+class AlertDispatcher:
+    """Delivers alerts off the log callback path through a bounded queue."""
+
+    def __init__(self, sinks: Sequence[AlertSink]) -> None:
+        self.sinks = list(sinks)
+        self._queue: asyncio.Queue[Alert] = asyncio.Queue(ALERT_QUEUE_SIZE)
+        self.dropped = 0
+
+    def submit(self, alerts: Iterable[Alert]) -> None:
+        for alert in alerts:
+            try:
+                self._queue.put_nowait(alert)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                logger.warning("Alert queue full, dropped '%s'", alert.rule)
+
+    async def run(self) -> None:
+        while True:
+            alert = await self._queue.get()
+            for sink in self.sinks:
+                try:
+                    await sink.send(alert)
+                except Exception as exc:
+                    logger.warning(
+                        "Delivering alert via %s failed: %s", type(sink).__name__, exc
+                    )
+            self._queue.task_done()
+
+    async def join(self) -> None:
+        await self._queue.join()
+
+    async def close(self) -> None:
+        for sink in self.sinks:
+            await sink.close()
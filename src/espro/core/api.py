@@ -0,0 +1,263 @@
+"""Local HTTP API over the registry, latest scan and resolved mappings.
+
+Every resource is rendered to JSON once per change and served from memory,
+so a lookup is a dict access. Resources carry a content version, exposed as
+the ETag for conditional GETs, and ``/v1/changes`` long-polls until the
+version moves past ``since``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import secrets
+import time
+from pathlib import Path
+
+from espro.config import ServeConfig
+from espro.database import Database
+from espro.models import DeviceHealth, DeviceRegistry, ScanResult
+from espro.utils.file_watch import FileWatcher
+from espro.utils.http_server import HTTPRequest, HTTPResponse, start_http_server
+
+from .daemon import Daemon
+from .resolver import match_physical
+
+logger = logging.getLogger(__name__)
+
+RESOURCES = ("registry", "scan", "mappings", "live")
+JSON_TYPE = "application/json"
+MAX_POLL_TIMEOUT = 60.0
+DEFAULT_POLL_TIMEOUT = 30.0
+
+FileStamp = tuple[int, int] | None
+
+
+def _json(value: object) -> bytes:
+    return json.dumps(value, separators=(",", ":"), sort_keys=True).encode()
+
+
+def _stamp(path: Path) -> FileStamp:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FleetView:
+    """Versioned, pre-rendered JSON views of the fleet.
+
+    ``load`` only touches the disk and may run in a thread; ``render`` and
+    ``update_live`` must run on the event loop that serves requests.
+    """
+
+    def __init__(self, db: Database) -> None:
+        self._db = db
+        # Distinguishes ETags across restarts, when versions start over
+        self.boot = secrets.token_hex(4)
+        self.version = 0
+        self.registry = DeviceRegistry()
+        self.scan: ScanResult | None = None
+        self._stamps: dict[Path, FileStamp] = {}
+        self._live: dict[str, dict[str, object]] = {}
+        self._bodies: dict[str, tuple[int, bytes]] = {}
+        self._devices: dict[str, tuple[int, bytes]] = {}
+        self._changed = asyncio.Event()
+        self._live_pending = False
+
+    def _file_changed(self, path: Path) -> bool:
+        stamp = _stamp(path)
+        if path in self._stamps and self._stamps[path] == stamp:
+            return False
+        self._stamps[path] = stamp
+        return True
+
+    def load(self) -> bool:
+        """Reload the registry and scan if their files changed on disk."""
+        changed = False
+        if self._file_changed(self._db.devices_path):
+            try:
+                self.registry = self._db.load_devices()
+                changed = True
+            except ValueError as exc:
+                logger.warning("Keeping the previous registry: %s", exc)
+        if self._file_changed(self._db.current_scan_path):
+            self.scan = self._db.load_current_scan()
+            changed = True
+        return changed
+
+    def refresh(self) -> list[str]:
+        return self.render() if self.load() else []
+
+    def etag(self, version: int) -> str:
+        return f'"{self.boot}-{version}"'
+
+    def resource(self, name: str) -> tuple[int, bytes] | None:
+        return self._bodies.get(name)
+
+    def device(self, logical: str) -> tuple[int, bytes] | None:
+        return self._devices.get(logical)
+
+    def versions(self) -> dict[str, int]:
+        return {name: version for name, (version, _body) in self._bodies.items()}
+
+    def _bump(self, store: dict[str, tuple[int, bytes]], key: str, body: bytes) -> bool:
+        current = store.get(key)
+        if current is not None and current[1] == body:
+            return False
+        self.version += 1
+        store[key] = (self.version, body)
+        return True
+
+    def _device_view(self, logical: str) -> dict[str, object]:
+        device = self.registry.logical_devices[logical]
+        devices = self.scan.devices if self.scan else []
+        found = match_physical(
+            device.physical,
+            {d.ip: d for d in devices},
+            {d.name: d for d in devices},
+        )
+        return {
+            "logical": logical,
+            "physical": device.physical,
+            "role": device.role,
+            "host": found.ip if found else device.physical,
+            "online": found is not None,
+            "ip": found.ip if found else None,
+            "mac": found.mac_address if found else None,
+            "name": found.name if found else None,
+            "esphome_version": found.esphome_version if found else None,
+            "live": self._live.get(logical),
+        }
+
+    def render(self) -> list[str]:
+        """Re-render every resource; returns the names whose content changed."""
+        changed = []
+        if self._bump(
+            self._bodies, "registry", _json(self.registry.model_dump(mode="json"))
+        ):
+            changed.append("registry")
+        scan = self.scan.model_dump(mode="json") if self.scan else None
+        if self._bump(self._bodies, "scan", _json(scan)):
+            changed.append("scan")
+
+        mappings = {
+            name: self._device_view(name) for name in self.registry.logical_devices
+        }
+        for name in set(self._devices) - set(mappings):
+            del self._devices[name]
+        for name, view in mappings.items():
+            self._bump(self._devices, name, _json(view))
+        if self._bump(self._bodies, "mappings", _json(mappings)):
+            changed.append("mappings")
+        if self._bump(self._bodies, "live", _json(self._live)):
+            changed.append("live")
+        if changed:
+            self._notify()
+        return changed
+
+    def update_live(self, health: DeviceHealth) -> None:
+        self._live[health.logical_name] = {
+            "connect_ms": health.connect_ms,
+            "rtt_ms": health.rtt_p50_ms,
+            "errors": health.errors,
+            "last_error": health.last_error,
+            "probed_at": time.time(),
+        }
+        # Results finishing in the same loop turn are published together
+        if not self._live_pending:
+            self._live_pending = True
+            asyncio.get_running_loop().call_soon(self._publish_live)
+
+    def _publish_live(self) -> None:
+        self._live_pending = False
+        self.render()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self, since: int, timeout: float) -> int:
+        """Wait until the version exceeds ``since``; returns the current one."""
+        if self.version <= since:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._changed.wait(), timeout)
+        return self.version
+
+
+class FleetAPI:
+    def __init__(self, view: FleetView) -> None:
+        self.view = view
+
+    def _cached(self, request: HTTPRequest, entry: tuple[int, bytes]) -> HTTPResponse:
+        version, body = entry
+        etag = self.view.etag(version)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        wanted = request.headers.get("if-none-match", "")
+        if wanted == "*" or etag in (tag.strip() for tag in wanted.split(",")):
+            return HTTPResponse(status=304, headers=headers)
+        return HTTPResponse(body=body, content_type=JSON_TYPE, headers=headers)
+
+    async def _changes(self, request: HTTPRequest) -> HTTPResponse:
+        try:
+            since = int(request.query.get("since", "0"))
+            timeout = float(request.query.get("timeout", DEFAULT_POLL_TIMEOUT))
+        except ValueError:
+            return HTTPResponse(status=400, body=b"bad since/timeout\n")
+        version = await self.view.wait(since, min(max(timeout, 0.0), MAX_POLL_TIMEOUT))
+        return HTTPResponse(
+            body=_json({"version": version, "resources": self.view.versions()}),
+            content_type=JSON_TYPE,
+        )
+
+    async def handle(self, request: HTTPRequest) -> HTTPResponse:
+        if request.method not in ("GET", "HEAD"):
+            return HTTPResponse(status=405, body=b"method not allowed\n")
+        path = request.path.rstrip("/")
+        if path in ("", "/v1"):
+            index = {
+                "version": self.view.version,
+                "endpoints": [f"/v1/{name}" for name in RESOURCES]
+                + ["/v1/devices/<logical>", "/v1/changes?since=<version>"],
+            }
+            return HTTPResponse(body=_json(index), content_type=JSON_TYPE)
+        if path == "/v1/changes":
+            return await self._changes(request)
+        entry = None
+        if path.startswith("/v1/devices/"):
+            entry = self.view.device(path.removeprefix("/v1/devices/"))
+        elif path.startswith("/v1/"):
+            entry = self.view.resource(path.removeprefix("/v1/"))
+        if entry is None:
+            return HTTPResponse(status=404, body=b"not found\n")
+        return self._cached(request, entry)
+
+
+async def _watch_files(view: FleetView, db: Database, interval: float) -> None:
+    async def _changed(_paths: set[Path]) -> None:
+        if await asyncio.to_thread(view.load):
+            view.render()
+
+    await FileWatcher([db.devices_path, db.current_scan_path], _changed, interval).run()
+
+
+async def run_api_server(
+    db: Database, config: ServeConfig, daemon: Daemon | None = None
+) -> None:
+    """Serve the fleet API until cancelled, optionally with a live daemon."""
+    view = FleetView(db)
+    view.refresh()
+    server = await start_http_server(FleetAPI(view).handle, config.host, config.port)
+    logger.info("API listening on http://%s:%d/v1", config.host, config.port)
+    tasks = [_watch_files(view, db, config.refresh_interval)]
+    if daemon is not None:
+        daemon.on_probe = view.update_live
+        tasks.append(daemon.run())
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        server.close()
+        await server.wait_closed()
@@ -0,0 +1,146 @@
+"""Bind discovered "cattle" devices to numbered logical slots via rules."""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass, field
+from fnmatch import translate
+
+from espro.models import DeviceRegistry, LogicalDevice, MappingRule, PhysicalDevice
+
+logger = logging.getLogger(__name__)
+
+_WILDCARDS = re.compile(r"[*?\[]")
+
+
+@dataclass(frozen=True)
+class Binding:
+    logical: str
+    physical: str
+    role: str
+
+
+@dataclass
+class AutoMapResult:
+    bindings: list[Binding] = field(default_factory=list)
+    # Devices that matched a rule whose slot pool is full
+    unplaced: list[PhysicalDevice] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class _CompiledRule:
+    index: int
+    name: re.Pattern[str] | None
+    model: re.Pattern[str] | None
+    mac_prefix: str
+
+
+class RuleMatcher:
+    """Rules compiled once and bucketed by the literal prefix of their name glob.
+
+    Matching a device only looks up the prefixes of its own name, so the cost
+    per device is bounded by the name length plus the rules that share its
+    prefix, not by the total number of rules.
+    """
+
+    def __init__(self, rules: list[MappingRule]) -> None:
+        self._by_prefix: dict[str, list[_CompiledRule]] = {}
+        for index, rule in enumerate(rules):
+            glob = rule.match.name_glob
+            prefix = _WILDCARDS.split(glob, maxsplit=1)[0] if glob else ""
+            compiled = _CompiledRule(
+                index=index,
+                name=re.compile(translate(glob)) if glob else None,
+                model=(
+                    re.compile(translate(rule.match.model), re.IGNORECASE)
+                    if rule.match.model
+                    else None
+                ),
+                mac_prefix=_mac_digits(rule.match.mac_prefix or ""),
+            )
+            self._by_prefix.setdefault(prefix, []).append(compiled)
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._by_prefix})
+
+    def match(self, device: PhysicalDevice) -> int | None:
+        """Index of the first rule (in file order) that matches ``device``."""
+        name = device.name
+        best: int | None = None
+        for length in self._prefix_lengths:
+            if length > len(name):
+                break
+            for rule in self._by_prefix.get(name[:length], ()):
+                if best is not None and rule.index >= best:
+                    break
+                if _matches(rule, device):
+                    best = rule.index
+                    break
+        return best
+
+
+def _mac_digits(value: str) -> str:
+    return re.sub(r"[^0-9A-F]", "", value.upper())
+
+
+def _matches(rule: _CompiledRule, device: PhysicalDevice) -> bool:
+    if rule.name is not None and not rule.name.match(device.name):
+        return False
+    if rule.model is not None and not rule.model.match(device.model):
+        return False
+    return not rule.mac_prefix or _mac_digits(device.mac_address).startswith(
+        rule.mac_prefix
+    )
+
+
+def _bound_refs(registry: DeviceRegistry) -> set[str]:
+    refs = set()
+    for logical in registry.logical_devices.values():
+        refs.add(logical.physical)
+        refs.add(logical.physical.removesuffix(".local"))
+    return refs
+
+
+def auto_map(registry: DeviceRegistry, devices: list[PhysicalDevice]) -> AutoMapResult:
+    """Assign unbound matching devices to the lowest free slot of their rule.
+
+    Slots already in the registry are never reassigned, so a device keeps its
+    logical name across scans even while it is offline.
+    """
+    result = AutoMapResult()
+    if not registry.rules:
+        return result
+
+    matcher = RuleMatcher(registry.rules)
+    bound = _bound_refs(registry)
+    free = [
+        [name for name in rule.slot_names() if name not in registry.logical_devices]
+        for rule in registry.rules
+    ]
+
+    for device in sorted(devices, key=lambda d: d.name):
+        if device.name in bound or device.ip in bound:
+            continue
+        index = matcher.match(device)
+        if index is None:
+            continue
+        rule = registry.rules[index]
+        if not free[index]:
+            result.unplaced.append(device)
+            continue
+        logical = free[index].pop(0)
+        bound.add(device.name)
+        result.bindings.append(Binding(logical, device.name, rule.role))
+
+    if result.unplaced:
+        logger.warning(
+            "%d matching device(s) left unmapped; slot pools are full",
+            len(result.unplaced),
+        )
+    return result
+
+
+def apply_bindings(registry: DeviceRegistry, bindings: list[Binding]) -> None:
+    for binding in bindings:
+        registry.logical_devices[binding.logical] = LogicalDevice(
+            physical=binding.physical, role=binding.role
+        )
@@ -0,0 +1,297 @@
+"""Fleet-wide view of BLE advertisements relayed by ESPHome Bluetooth proxies."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from array import array
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+import aioesphomeapi
+
+from espro.config import ScanningConfig
+
+from .health import PROBE_ERRORS
+
+logger = logging.getLogger(__name__)
+
+RING_CAPACITY = 1 << 16
+
+_AD_SHORT_NAME = 0x08
+_AD_COMPLETE_NAME = 0x09
+_AD_MANUFACTURER = 0xFF
+
+
+def format_address(address: int) -> str:
+    return ":".join(f"{byte:02X}" for byte in address.to_bytes(6, "big"))
+
+
+def parse_advertisement(data: bytes) -> tuple[str, int | None]:
+    """Local name and manufacturer (company) id from AD structures."""
+    name = ""
+    manufacturer = None
+    offset = 0
+    while offset + 1 < len(data):
+        length = data[offset]
+        if not length:
+            break
+        kind = data[offset + 1]
+        value = data[offset + 2 : offset + 1 + length]
+        if kind == _AD_COMPLETE_NAME or (kind == _AD_SHORT_NAME and not name):
+            name = value.decode("utf-8", errors="replace")
+        elif kind == _AD_MANUFACTURER and len(value) >= 2:
+            manufacturer = int.from_bytes(value[:2], "little")
+        offset += 1 + length
+    return name, manufacturer
+
+
+class AdvertisementRing:
+    """Preallocated column arrays holding advertisements not yet aggregated.
+
+    Callbacks only append here; :meth:`BLEAggregator.process` drains it in
+    batches. When producers outrun processing the oldest entries are
+    overwritten and counted as dropped, so memory never grows.
+    """
+
+    def __init__(self, capacity: int = RING_CAPACITY) -> None:
+        self.capacity = capacity
+        self.address = array("Q", bytes(8 * capacity))
+        self.rssi = array("b", bytes(capacity))
+        self.address_type = array("B", bytes(capacity))
+        self.proxy = array("H", bytes(2 * capacity))
+        self.seen = array("d", bytes(8 * capacity))
+        self.data: list[bytes] = [b""] * capacity
+        self._start = 0
+        self._size = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(
+        self,
+        address: int,
+        rssi: int,
+        address_type: int,
+        proxy: int,
+        seen: float,
+        data: bytes,
+    ) -> None:
+        if self._size == self.capacity:
+            self._start = (self._start + 1) % self.capacity
+            self._size -= 1
+            self.dropped += 1
+        slot = (self._start + self._size) % self.capacity
+        self.address[slot] = address
+        self.rssi[slot] = max(-128, min(127, rssi))
+        self.address_type[slot] = address_type
+        self.proxy[slot] = proxy
+        self.seen[slot] = seen
+        self.data[slot] = data
+        self._size += 1
+
+    def drain(self) -> Iterable[int]:
+        """Slots of all pending entries in arrival order; empties the ring."""
+        start, size = self._start, self._size
+        self._start = (start + size) % self.capacity
+        self._size = 0
+        end = start + size
+        if end <= self.capacity:
+            return range(start, end)
+        return list(range(start, self.capacity)) + list(range(end - self.capacity))
+
+
+@dataclass(slots=True)
+class BLEDevice:
+    address: int
+    address_type: int
+    first_seen: float
+    last_seen: float
+    name: str = ""
+    manufacturer: int | None = None
+    adverts: int = 0
+    unique: int = 0
+    payload: bytes = b""
+    payload_seen: float = 0.0
+    # proxy -> (best RSSI in the current window, when it was heard)
+    rssi: dict[str, tuple[int, float]] = field(default_factory=dict)
+
+    @property
+    def mac(self) -> str:
+        return format_address(self.address)
+
+    def best(self) -> tuple[str, int] | None:
+        if not self.rssi:
+            return None
+        proxy, (rssi, _seen) = max(self.rssi.items(), key=lambda item: item[1][0])
+        return proxy, rssi
+
+
+class BLEAggregator:
+    """Deduplicates advertisements per address across proxies.
+
+    An advertisement repeating the address's previous payload within
+    ``window`` seconds, from any proxy, is a duplicate: it refreshes RSSI and
+    last-seen but is not parsed again. Each proxy keeps its best RSSI for an
+    address until that reading is older than the window.
+    """
+
+    def __init__(
+        self,
+        window: float = 10.0,
+        ttl: float = 300.0,
+        capacity: int = RING_CAPACITY,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window = window
+        self.ttl = ttl
+        self._clock = clock
+        self._ring = AdvertisementRing(capacity)
+        self.proxies: list[str] = []
+        self._proxy_index: dict[str, int] = {}
+        self._devices: dict[int, BLEDevice] = {}
+        self.received = 0
+        self.duplicates = 0
+
+    @property
+    def dropped(self) -> int:
+        return self._ring.dropped
+
+    def feed(self, proxy: str, advertisements: Iterable[Any]) -> None:
+        """Queue one raw advertisements message; cheap enough for callbacks."""
+        index = self._proxy_index.get(proxy)
+        if index is None:
+            index = self._proxy_index[proxy] = len(self.proxies)
+            self.proxies.append(proxy)
+        now = self._clock()
+        push = self._ring.push
+        count = 0
+        for adv in advertisements:
+            push(adv.address, adv.rssi, adv.address_type, index, now, adv.data)
+            count += 1
+        self.received += count
+
+    def process(self) -> int:
+        """Fold queued advertisements into the device table."""
+        ring = self._ring
+        devices = self._devices
+        proxies = self.proxies
+        window = self.window
+        processed = 0
+        for slot in ring.drain():
+            address = ring.address[slot]
+            seen = ring.seen[slot]
+            rssi = ring.rssi[slot]
+            data = ring.data[slot]
+            ring.data[slot] = b""
+            device = devices.get(address)
+            if device is None:
+                device = devices[address] = BLEDevice(
+                    address, ring.address_type[slot], seen, seen
+                )
+            device.adverts += 1
+            device.last_seen = seen
+
+            proxy = proxies[ring.proxy[slot]]
+            previous = device.rssi.get(proxy)
+            if previous is None or rssi >= previous[0] or seen - previous[1] > window:
+                device.rssi[proxy] = (rssi, seen)
+
+            if data == device.payload and seen - device.payload_seen <= window:
+                self.duplicates += 1
+            else:
+                device.unique += 1
+                name, manufacturer = parse_advertisement(data)
+                device.name = name or device.name
+                if manufacturer is not None:
+                    device.manufacturer = manufacturer
+                device.payload = data
+                device.payload_seen = seen
+            processed += 1
+        self._expire()
+        return processed
+
+    def _expire(self) -> None:
+        cutoff = self._clock() - self.ttl
+        stale = [a for a, device in self._devices.items() if device.last_seen < cutoff]
+        for address in stale:
+            del self._devices[address]
+
+    def devices(self) -> list[BLEDevice]:
+        """Known devices, strongest best RSSI first."""
+
+        def strength(device: BLEDevice) -> int:
+            best = device.best()
+            return best[1] if best else -128
+
+        return sorted(self._devices.values(), key=strength, reverse=True)
+
+
+@dataclass
+class ProxySession:
+    logical: str
+    host: str
+    client: aioesphomeapi.APIClient | None = None
+    error: str | None = None
+
+
+async def _subscribe(
+    logical: str, host: str, config: ScanningConfig, aggregator: BLEAggregator
+) -> ProxySession:
+    client = aioesphomeapi.APIClient(host, port=config.port, password="")
+    try:
+        await asyncio.wait_for(
+            client.connect(login=True, log_errors=False), timeout=config.timeout
+        )
+        info = await asyncio.wait_for(client.device_info(), timeout=config.timeout)
+    except PROBE_ERRORS as exc:
+        with contextlib.suppress(*PROBE_ERRORS):
+            await client.disconnect()
+        return ProxySession(logical, host, error=str(exc) or type(exc).__name__)
+
+    error = None
+    if client.api_version is None:
+        error = "no API version negotiated"
+    else:
+        flags = info.bluetooth_proxy_feature_flags_compat(client.api_version)
+        if not flags & aioesphomeapi.BluetoothProxyFeature.RAW_ADVERTISEMENTS:
+            error = "not a Bluetooth proxy"
+    if error is not None:
+        with contextlib.suppress(*PROBE_ERRORS):
+            await client.disconnect()
+        return ProxySession(logical, host, error=error)
+
+    client.subscribe_bluetooth_le_raw_advertisements(
+        lambda msg: aggregator.feed(logical, msg.advertisements)
+    )
+    return ProxySession(logical, host, client)
+
+
+async def subscribe_proxies(
+    targets: dict[str, str],
+    config: ScanningConfig,
+    aggregator: BLEAggregator,
+) -> list[ProxySession]:
+    """Subscribe to raw advertisements on every proxy-capable device."""
+    semaphore = asyncio.Semaphore(config.parallel_scans)
+
+    async def _bounded(logical: str, host: str) -> ProxySession:
+        async with semaphore:
+            return await _subscribe(logical, host, config, aggregator)
+
+    return list(
+        await asyncio.gather(
+            *(_bounded(logical, host) for logical, host in sorted(targets.items()))
+        )
+    )
+
+
+async def close_proxies(sessions: Iterable[ProxySession]) -> None:
+    for session in sessions:
+        if session.client is not None:
+            with contextlib.suppress(*PROBE_ERRORS):
+                await session.client.disconnect()
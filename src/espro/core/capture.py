@@ -0,0 +1,274 @@
+"""Recorded ESPHome API sessions, and a mock device that replays them.
+
+A capture holds the device info and entity list a device answered with,
+followed by its state and log messages with their timing, all as the raw
+protobuf payloads. The file is gzip-compressed: a magic line, a JSON
+header line, then per message the milliseconds since the previous one,
+its kind, message type and payload, each length as a varint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import aioesphomeapi
+from aioesphomeapi.core import MESSAGE_TYPE_TO_PROTO
+
+from .mock_device import (
+    MSG_DEVICE_INFO_RESPONSE,
+    MSG_SUBSCRIBE_LOGS_REQUEST,
+    MSG_SUBSCRIBE_STATES_REQUEST,
+    MockESPHomeDevice,
+    decode_varint,
+    encode_varint,
+    pb,
+)
+
+if TYPE_CHECKING:
+    from asyncio import StreamWriter
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ESPROCAP1\n"
+SUFFIX = ".espcap"
+
+KIND_INFO = 0
+KIND_ENTITY = 1
+KIND_STATE = 2
+KIND_LOG = 3
+
+_PROTO_TO_TYPE = {proto: msg_type for msg_type, proto in MESSAGE_TYPE_TO_PROTO.items()}
+
+
+def _kind(proto: type) -> int | None:
+    name = proto.__name__
+    if name == "DeviceInfoResponse":
+        return KIND_INFO
+    if name.startswith("ListEntities") and name.endswith("Response"):
+        return KIND_ENTITY
+    if name == "SubscribeLogsResponse":
+        return KIND_LOG
+    if name.endswith("StateResponse"):
+        return KIND_STATE
+    return None
+
+
+@dataclass(frozen=True)
+class Record:
+    # Seconds since the state and log subscriptions started
+    offset: float
+    kind: int
+    msg_type: int
+    payload: bytes
+
+
+@dataclass
+class Capture:
+    name: str = ""
+    host: str = ""
+    recorded_at: str = ""
+    duration: float = 0.0
+    records: list[Record] = field(default_factory=list)
+
+    def of_kind(self, kind: int) -> list[Record]:
+        return [record for record in self.records if record.kind == kind]
+
+    def counts(self) -> dict[str, int]:
+        names = ("info", "entities", "states", "logs")
+        return {name: len(self.of_kind(kind)) for kind, name in enumerate(names)}
+
+
+def write_capture(path: Path, capture: Capture) -> int:
+    """Write ``capture`` to ``path``; returns the compressed size."""
+    header = {
+        "name": capture.name,
+        "host": capture.host,
+        "recorded_at": capture.recorded_at,
+        "duration": capture.duration,
+    }
+    body = bytearray(MAGIC)
+    body += json.dumps(header).encode() + b"\n"
+    previous = 0
+    for record in capture.records:
+        millis = round(record.offset * 1000)
+        body += encode_varint(max(millis - previous, 0))
+        body += encode_varint(record.kind)
+        body += encode_varint(record.msg_type)
+        body += encode_varint(len(record.payload))
+        body += record.payload
+        previous = max(millis, previous)
+    path.write_bytes(gzip.compress(bytes(body), mtime=0))
+    return path.stat().st_size
+
+
+def read_capture(path: Path) -> Capture:
+    try:
+        data = gzip.decompress(path.read_bytes())
+    except (OSError, EOFError) as exc:
+        raise ValueError(f"{path} is not a capture: {exc}") from None
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a capture")
+    end = data.index(b"\n", len(MAGIC))
+    header = json.loads(data[len(MAGIC) : end])
+    records = []
+    position = end + 1
+    millis = 0
+    try:
+        while position < len(data):
+            values = []
+            for _ in range(4):
+                value, used = decode_varint(data, position)
+                values.append(value)
+                position += used
+            delta, kind, msg_type, length = values
+            millis += delta
+            payload = data[position : position + length]
+            if len(payload) != length:
+                raise ValueError("Truncated payload")
+            position += length
+            records.append(Record(millis / 1000, kind, msg_type, payload))
+    except ValueError as exc:
+        raise ValueError(f"{path} is truncated: {exc}") from None
+    return Capture(
+        name=header.get("name", ""),
+        host=header.get("host", ""),
+        recorded_at=header.get("recorded_at", ""),
+        duration=float(header.get("duration", 0.0)),
+        records=records,
+    )
+
+
+async def record_session(
+    host: str,
+    port: int,
+    duration: float,
+    log_level: aioesphomeapi.LogLevel = aioesphomeapi.LogLevel.LOG_LEVEL_DEBUG,
+    timeout: float = 10.0,
+) -> Capture:
+    """Capture a device's info, entities, states and logs for ``duration`` seconds."""
+    client = aioesphomeapi.APIClient(host, port=port, password="")
+    await asyncio.wait_for(client.connect(login=True), timeout)
+    capture = Capture(
+        host=host, recorded_at=datetime.now().isoformat(timespec="seconds")
+    )
+    started = time.monotonic()
+
+    def on_message(msg: Any) -> None:
+        kind = _kind(type(msg))
+        if kind is None:
+            return
+        offset = max(time.monotonic() - started, 0.0) if kind >= KIND_STATE else 0.0
+        capture.records.append(
+            Record(offset, kind, _PROTO_TO_TYPE[type(msg)], msg.SerializeToString())
+        )
+
+    # APIClient only hands out decoded models; the connection sees the protobufs
+    connection: Any = client._get_connection()
+    remove = connection.add_message_callback(on_message, tuple(_PROTO_TO_TYPE))
+    try:
+        info = await asyncio.wait_for(client.device_info(), timeout)
+        capture.name = info.name
+        await asyncio.wait_for(client.list_entities_services(), timeout)
+        started = time.monotonic()
+        client.subscribe_states(lambda _state: None)
+        client.subscribe_logs(lambda _msg: None, log_level=log_level)
+        await asyncio.sleep(duration)
+    finally:
+        capture.duration = time.monotonic() - started
+        remove()
+        await client.disconnect()
+    return capture
+
+
+@dataclass
+class ReplayDevice(MockESPHomeDevice):
+    """Answers with a capture's device info and entities, then replays its
+    states and logs to each subscriber, ``speed`` times as fast.
+
+    With ``loop``, the stream starts over after the capture's duration.
+    """
+
+    capture: Capture = field(default_factory=Capture)
+    speed: float = 1.0
+    loop: bool = True
+    replayed: int = 0
+
+    _streams: set[asyncio.Task[None]] = field(default_factory=set, repr=False)
+
+    async def stop(self) -> None:
+        for task in self._streams:
+            task.cancel()
+        await super().stop()
+
+    async def _send_device_info(self, writer: "StreamWriter") -> None:
+        recorded = self.capture.of_kind(KIND_INFO)
+        if not recorded:
+            await super()._send_device_info(writer)
+            return
+        # Each replay keeps its own identity so a fleet of them stays distinct
+        msg = pb.DeviceInfoResponse()
+        msg.ParseFromString(recorded[0].payload)
+        msg.name = self.name
+        msg.friendly_name = self.friendly_name
+        msg.mac_address = self.mac_address
+        await self._send(MSG_DEVICE_INFO_RESPONSE, msg, writer)
+
+    async def _send_entities(self, writer: "StreamWriter") -> None:
+        self.list_entities_requests += 1
+        for record in self.capture.of_kind(KIND_ENTITY):
+            await self._send_payload(record.msg_type, record.payload, writer)
+
+    async def _handle_message(
+        self, msg_type: int, payload: bytes, writer: "StreamWriter"
+    ) -> None:
+        if msg_type == MSG_SUBSCRIBE_STATES_REQUEST:
+            self._start_stream(writer, self.capture.of_kind(KIND_STATE))
+        elif msg_type == MSG_SUBSCRIBE_LOGS_REQUEST:
+            request = pb.SubscribeLogsRequest()
+            request.ParseFromString(payload)
+            logs = []
+            for record in self.capture.of_kind(KIND_LOG):
+                msg = pb.SubscribeLogsResponse()
+                msg.ParseFromString(record.payload)
+                if msg.level <= request.level:
+                    logs.append(record)
+            self._start_stream(writer, logs)
+        else:
+            await super()._handle_message(msg_type, payload, writer)
+
+    def _start_stream(self, writer: "StreamWriter", records: list[Record]) -> None:
+        if not records:
+            return
+        task = asyncio.create_task(self._stream(writer, records))
+        self._streams.add(task)
+        task.add_done_callback(self._streams.discard)
+
+    async def _stream(self, writer: "StreamWriter", records: list[Record]) -> None:
+        loop = asyncio.get_running_loop()
+        period = max(self.capture.duration, records[-1].offset)
+        started = loop.time()
+        cycle = 0
+        try:
+            while not writer.is_closing():
+                for record in records:
+                    due = started + (cycle * period + record.offset) / self.speed
+                    delay = due - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    if writer.is_closing():
+                        return
+                    await self._send_payload(record.msg_type, record.payload, writer)
+                    self.replayed += 1
+                if not self.loop or period <= 0:
+                    return
+                cycle += 1
+        except (ConnectionResetError, BrokenPipeError):
+            return
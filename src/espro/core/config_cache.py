@@ -0,0 +1,191 @@
+"""Content-addressed cache of ESPHome config validation results.
+
+Entries are keyed by the main YAML's path and content, the substitutions and
+the ESPHome version. Each entry also records a digest of every file the YAML
+loader pulled in (packages, ``!include``, secrets), so an edit to any of them
+invalidates exactly the configs that use it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import shutil
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from espro.utils.timing import span
+
+from .esphome_lib import esphome_module
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT = 1
+
+
+@dataclass
+class ConfigCheck:
+    config_path: str
+    errors: list[str]
+    rendered: str
+    esphome_version: str
+    # resolved input path -> sha256 of its contents
+    inputs: dict[str, str] = field(default_factory=dict)
+    cached: bool = False
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+
+# (config path, substitutions) -> (errors, rendered YAML, files loaded)
+Validator = Callable[[Path, dict[str, str]], tuple[list[str], str, list[Path]]]
+
+
+def esphome_validate(
+    config_path: Path, substitutions: dict[str, str]
+) -> tuple[list[str], str, list[Path]]:
+    """Validate and render ``config_path`` with ESPHome's own config loader."""
+    yaml_util = esphome_module("yaml_util")
+    config = esphome_module("config")
+    core = esphome_module("core")
+
+    core.CORE.reset()
+    core.CORE.config_path = config_path
+    with yaml_util.track_yaml_loads() as loaded:
+        try:
+            result = config.load_config(dict(substitutions), skip_external_update=True)
+        except core.EsphomeError as exc:
+            return [str(exc)], "", list(loaded)
+
+    errors = [error.msg for error in result.errors]
+    rendered = "" if errors else yaml_util.dump(config.strip_default_ids(result))
+    return errors, rendered, list(loaded)
+
+
+def _file_digest(path: Path) -> str:
+    with path.open("rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+class ConfigCache:
+    def __init__(
+        self,
+        cache_dir: Path,
+        esphome_version: str,
+        validator: Validator = esphome_validate,
+    ) -> None:
+        self._cache_dir = cache_dir
+        self._esphome_version = esphome_version
+        self._validator = validator
+        # Per-run memo: shared includes are hashed once, not once per device.
+        self._digests: dict[Path, str | None] = {}
+        self._results: dict[str, ConfigCheck] = {}
+        self.validations = 0
+
+    @property
+    def path(self) -> Path:
+        return self._cache_dir
+
+    def _digest(self, path: Path) -> str | None:
+        if path not in self._digests:
+            try:
+                self._digests[path] = _file_digest(path)
+            except OSError:
+                self._digests[path] = None
+        return self._digests[path]
+
+    def _key(self, config_path: Path, substitutions: dict[str, str]) -> str | None:
+        digest = self._digest(config_path)
+        if digest is None:
+            return None
+        material = json.dumps(
+            {
+                "format": CACHE_FORMAT,
+                "config": str(config_path),
+                "content": digest,
+                "substitutions": sorted(substitutions.items()),
+                "esphome": self._esphome_version,
+            }
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self._cache_dir / f"{key}.json"
+
+    def _load(self, key: str) -> ConfigCheck | None:
+        path = self._entry_path(key)
+        try:
+            with span("config_cache.load"):
+                check = ConfigCheck(**json.loads(path.read_text()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as exc:
+            logger.debug("Ignoring unreadable cache entry %s: %s", path, exc)
+            return None
+
+        for input_path, digest in check.inputs.items():
+            if self._digest(Path(input_path)) != digest:
+                logger.debug("Cache entry for %s is stale", check.config_path)
+                return None
+        check.cached = True
+        return check
+
+    def _store(self, key: str, check: ConfigCheck) -> None:
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        data = asdict(check)
+        data.pop("cached")
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data))
+        tmp_path.replace(path)
+
+    def check(
+        self, config_path: Path, substitutions: dict[str, str] | None = None
+    ) -> ConfigCheck:
+        """Return the validation result for a config, validating only on a miss."""
+        config_path = config_path.resolve()
+        substitutions = substitutions or {}
+        key = self._key(config_path, substitutions)
+        if key is None:
+            return ConfigCheck(
+                config_path=str(config_path),
+                errors=[f"Config file not found: {config_path}"],
+                rendered="",
+                esphome_version=self._esphome_version,
+            )
+
+        if key in self._results:
+            return self._results[key]
+
+        check = self._load(key)
+        if check is None:
+            self.validations += 1
+            with span("config_cache.validate"):
+                errors, rendered, loaded = self._validator(config_path, substitutions)
+            inputs = {config_path, *(path.resolve() for path in loaded)}
+            check = ConfigCheck(
+                config_path=str(config_path),
+                errors=errors,
+                rendered=rendered,
+                esphome_version=self._esphome_version,
+                inputs={
+                    str(path): digest
+                    for path in sorted(inputs)
+                    if (digest := self._digest(path)) is not None
+                },
+            )
+            # Failures can stem from files that were missing and so never got
+            # tracked as inputs; only persist results we can invalidate.
+            if check.valid:
+                self._store(key, check)
+
+        self._results[key] = check
+        return check
+
+    def clear(self) -> None:
+        shutil.rmtree(self._cache_dir, ignore_errors=True)
+        self._digests.clear()
+        self._results.clear()
@@ -0,0 +1,216 @@
+"""Pacing of long-lived API connections across the fleet.
+
+Starting a daemon, or a WiFi AP reboot, would otherwise make every session
+reconnect at once. ESPs accept only a few API clients and the network
+suffers, so connects go through one scheduler. It enforces a global token
+bucket, per-device exponential backoff with jitter, and priority ordering.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections.abc import Callable, Iterable
+
+from zeroconf import ServiceStateChange, Zeroconf
+from zeroconf.asyncio import AsyncServiceBrowser, AsyncZeroconf
+
+from espro.config import DaemonConfig
+
+from .scanner import MDNS_SERVICE_TYPE
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 when one is ready now)."""
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+    async def acquire(self) -> None:
+        while (wait := self.delay()) > 0:
+            await asyncio.sleep(wait)
+        self._tokens -= 1
+
+
+class ConnectScheduler:
+    """Decides when each device may attempt its next connection.
+
+    ``turn`` waits out the device's backoff, then queues it for a token;
+    queued devices are served lowest priority value first, then FIFO. Report
+    the outcome with ``succeeded`` or ``failed``. A dropped session counts as
+    a failure, so a fleet-wide outage reconnects with spread-out delays.
+    ``wake`` cancels a device's backoff, e.g. when it re-announces via mDNS.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 10,
+        backoff_initial: float = 1.0,
+        backoff_max: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ) -> None:
+        self._bucket = TokenBucket(rate, burst, clock)
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._failures: dict[str, int] = {}
+        self._ready_at: dict[str, float] = {}
+        self._wakers: dict[str, asyncio.Event] = {}
+        self._queue: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._pump: asyncio.Task[None] | None = None
+        self.started = clock()
+        self.connected_at: dict[str, float] = {}
+
+    @classmethod
+    def from_config(cls, config: DaemonConfig) -> ConnectScheduler:
+        return cls(
+            rate=config.connect_rate,
+            burst=config.connect_burst,
+            backoff_initial=config.backoff_initial,
+            backoff_max=config.backoff_max,
+        )
+
+    def backoff(self, failures: int) -> float:
+        """Jittered delay after ``failures`` consecutive failures."""
+        if failures <= 0:
+            return 0.0
+        ceiling = min(self.backoff_max, self.backoff_initial * 2 ** (failures - 1))
+        # Equal jitter: never retry immediately, never all at the same moment
+        return ceiling / 2 + self._rng.uniform(0, ceiling / 2)
+
+    async def turn(self, name: str, priority: int = 0) -> None:
+        delay = self._ready_at.get(name, 0.0) - self._clock()
+        if delay > 0:
+            waker = self._wakers.setdefault(name, asyncio.Event())
+            waker.clear()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(waker.wait(), delay)
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), future))
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._run_pump())
+        await future
+
+    async def _run_pump(self) -> None:
+        while self._queue:
+            await self._bucket.acquire()
+            while self._queue:
+                _priority, _sequence, future = heapq.heappop(self._queue)
+                if not future.done():
+                    future.set_result(None)
+                    break
+
+    def succeeded(self, name: str) -> None:
+        self._failures.pop(name, None)
+        self._ready_at.pop(name, None)
+        self.connected_at[name] = self._clock()
+
+    def failed(self, name: str) -> float:
+        """Record a failed or dropped connection; returns the backoff applied."""
+        failures = self._failures.get(name, 0) + 1
+        self._failures[name] = failures
+        delay = self.backoff(failures)
+        self._ready_at[name] = self._clock() + delay
+        return delay
+
+    def wake(self, name: str) -> None:
+        if self._ready_at.pop(name, None) is None:
+            return
+        self._failures.pop(name, None)
+        waker = self._wakers.get(name)
+        if waker is not None:
+            waker.set()
+        logger.debug("Backoff for '%s' cleared", name)
+
+    def forget(self, name: str) -> None:
+        self._failures.pop(name, None)
+        self._ready_at.pop(name, None)
+        self._wakers.pop(name, None)
+        self.connected_at.pop(name, None)
+
+    def time_to_connect(
+        self, names: Iterable[str], since: float | None = None
+    ) -> float | None:
+        """Seconds from ``since`` (default: start) until all of ``names`` connected.
+
+        None while any of them has not connected since then.
+        """
+        since = self.started if since is None else since
+        latest = since
+        for name in names:
+            connected = self.connected_at.get(name)
+            if connected is None or connected < since:
+                return None
+            latest = max(latest, connected)
+        return latest - since
+
+    async def close(self) -> None:
+        if self._pump is not None:
+            self._pump.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._pump
+
+
+class AnnouncementWatcher:
+    """Calls ``on_announce(name)`` whenever an ESPHome device (re)announces."""
+
+    def __init__(self, on_announce: Callable[[str], None]) -> None:
+        self._on_announce = on_announce
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._zeroconf: AsyncZeroconf | None = None
+        self._browser: AsyncServiceBrowser | None = None
+
+    def _handler(
+        self,
+        zeroconf: Zeroconf,
+        service_type: str,
+        name: str,
+        state_change: ServiceStateChange,
+    ) -> None:
+        if state_change is ServiceStateChange.Removed or self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(
+            self._on_announce, name.removesuffix(f".{service_type}")
+        )
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._zeroconf = AsyncZeroconf()
+        self._browser = AsyncServiceBrowser(
+            self._zeroconf.zeroconf, MDNS_SERVICE_TYPE, handlers=[self._handler]
+        )
+
+    async def close(self) -> None:
+        if self._browser is not None:
+            await self._browser.async_cancel()
+        if self._zeroconf is not None:
+            await self._zeroconf.async_close()
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import aioesphomeapi
+
+from espro.async_database import AsyncDatabase
+from espro.config import Settings
+from espro.database import Database
+from espro.models import DeviceHealth, DeviceRegistry, ScanResult
+from espro.utils.file_watch import FileWatcher
+from espro.utils.http_server import HTTPRequest, HTTPResponse, start_http_server
+from espro.utils.metrics import CONTENT_TYPE
+
+from .alerts import AlertDispatcher, AlertEngine, build_sinks
+from .automap import apply_bindings, auto_map
+from .connections import AnnouncementWatcher, ConnectScheduler
+from .health import probe_device
+from .log_parser import LEVELS, LogRecord, parse_log_text
+from .metrics import FleetMetrics
+from .recorder import Recorder
+from .registry_diff import RegistryDiff, diff_registries
+from .resolver import resolve_hosts
+from .scanner import scan_network
+from .sessions import run_log_session
+from .sharding import ShardPool
+from .validator import validate_mappings
+
+logger = logging.getLogger(__name__)
+
+
+class Daemon:
+    """Long-running discovery, health probing and (optional) log sessions."""
+
+    def __init__(
+        self,
+        db: Database,
+        settings: Settings,
+        metrics: FleetMetrics | None = None,
+    ) -> None:
+        # All disk access from the event loop goes through the async facade
+        self.store = AsyncDatabase(db)
+        self._settings = settings
+        self.metrics = metrics
+        self.registry: DeviceRegistry = db.load_devices()
+        self.scan: ScanResult | None = db.load_current_scan()
+        self.started_at = time.time()
+        # Latest probe result per logical device
+        self.last_probe: dict[str, DeviceHealth] = {}
+        self._sessions: dict[str, asyncio.Task[None]] = {}
+        self.connections = ConnectScheduler.from_config(settings.daemon)
+        # Created in run() when daemon.workers > 1
+        self.shards: ShardPool | None = None
+        self._fleet_connected = False
+        # Called with every probe result, e.g. to publish live state
+        self.on_probe: Callable[[DeviceHealth], None] | None = None
+        rules = settings.alerts.rules
+        self.alerts = AlertEngine(rules) if rules else None
+        self.recorder = (
+            Recorder(db.series_dir) if settings.daemon.record_states else None
+        )
+        self.dispatcher = (
+            AlertDispatcher(build_sinks(settings.alerts)) if rules else None
+        )
+
+    def hosts(self) -> dict[str, str]:
+        return resolve_hosts(self.registry, self.scan)
+
+    @property
+    def wants_logs(self) -> bool:
+        return self._settings.daemon.subscribe_logs or self.alerts is not None
+
+    @property
+    def sessions_enabled(self) -> bool:
+        return self.wants_logs or self.recorder is not None
+
+    def apply_registry(self, registry: DeviceRegistry) -> RegistryDiff:
+        """Switch to ``registry``, touching only sessions whose mapping changed."""
+        diff = diff_registries(self.registry, registry)
+        self.registry = registry
+        if diff.reconnects and self.sessions_enabled:
+            self.sync_sessions(restart=diff.rebound)
+        return diff
+
+    async def _registry_changed(self, _paths: set[Path]) -> None:
+        try:
+            registry = await self.store.load_devices()
+        except ValueError as exc:
+            logger.warning("Keeping the previous registry: %s", exc)
+            return
+        diff = self.apply_registry(registry)
+        if diff:
+            logger.info("Reloaded %s: %s", self.store.db.devices_path, diff.describe())
+
+    async def discover_once(self) -> ScanResult:
+        scanning = self._settings.scanning
+        self.apply_registry(await self.store.load_devices())
+
+        started = time.perf_counter()
+        discovery = await scan_network(
+            scanning.default_network,
+            scanning,
+            known=self.scan.devices if self.scan else None,
+            missing=self.scan.missing if self.scan else None,
+        )
+        duration = time.perf_counter() - started
+        devices = discovery.devices
+
+        self.scan = await self.store.save_scan(
+            devices, scanning.default_network, discovery.missing
+        )
+        bindings = auto_map(self.registry, devices).bindings
+        if bindings:
+            apply_bindings(self.registry, bindings)
+            await self.store.save_devices(self.registry)
+            logger.info(
+                "Auto-mapped %s",
+                ", ".join(f"{b.physical} -> {b.logical}" for b in bindings),
+            )
+        result = validate_mappings(self.registry, self.scan)
+        logger.info(
+            "Discovery found %d device(s) in %.2fs, %d mapping error(s)",
+            len(devices),
+            duration,
+            len(result.errors),
+        )
+        if self.metrics:
+            self.metrics.observe_scan(self.registry, devices, result, duration)
+        return self.scan
+
+    async def probe_once(self) -> None:
+        scanning = self._settings.scanning
+        semaphore = asyncio.Semaphore(scanning.parallel_scans)
+
+        async def _probe(logical: str, host: str) -> None:
+            async with semaphore:
+                health, histogram = await probe_device(logical, host, scanning, 1)
+            self.last_probe[logical] = health
+            if self.on_probe is not None:
+                self.on_probe(health)
+            if self.metrics:
+                self.metrics.rtt_for(logical).merge(histogram)
+                if health.errors:
+                    self.metrics.probe_errors_for(logical).inc(health.errors)
+
+        await asyncio.gather(
+            *(_probe(logical, host) for logical, host in self.hosts().items())
+        )
+
+    def session_log_level(self) -> aioesphomeapi.LogLevel:
+        if not self.wants_logs:
+            # Sessions only for the recorder
+            return aioesphomeapi.LogLevel.LOG_LEVEL_NONE
+        level = aioesphomeapi.LogLevel.LOG_LEVEL_INFO
+        letter = self.alerts.most_verbose_level if self.alerts else None
+        if letter is not None:
+            # LEVELS is ordered like LogLevel, which starts at NONE = 0
+            level = max(level, aioesphomeapi.LogLevel(list(LEVELS).index(letter) + 1))
+        return level
+
+    def session_priority(self, logical: str) -> int:
+        roles = self._settings.daemon.priority_roles
+        device = self.registry.logical_devices.get(logical)
+        role = device.role if device else None
+        return roles.index(role) if role in roles else len(roles)
+
+    def on_announce(self, name: str) -> None:
+        """A device re-announced via mDNS: retry its session without backoff."""
+        refs = {name, f"{name}.local"}
+        if self.scan is not None:
+            refs.update(d.ip for d in self.scan.devices if d.name == name)
+        for logical, device in self.registry.logical_devices.items():
+            if device.physical not in refs:
+                continue
+            if self.shards is not None:
+                self.shards.wake(logical)
+            else:
+                self.connections.wake(logical)
+
+    def _session_connected(self, logical: str) -> None:
+        self.connections.succeeded(logical)
+        if self._fleet_connected:
+            return
+        names = self.hosts()
+        elapsed = self.connections.time_to_connect(names)
+        if elapsed is not None:
+            self._fleet_connected = True
+            logger.info("All %d log session(s) connected in %.2fs", len(names), elapsed)
+
+    def start_shards(self) -> None:
+        self.shards = ShardPool(
+            self._settings.daemon.workers,
+            self._settings,
+            self.session_log_level(),
+            self.handle_log,
+            self.handle_connected,
+        )
+        self.shards.start()
+
+    def sync_sessions(self, restart: list[str] | None = None) -> None:
+        """Start log sessions for new logical devices and stop removed ones.
+
+        Sessions in ``restart`` (rebound to another device) reconnect; the
+        shard workers do that for every device whose host changed.
+        """
+        if self.shards is not None:
+            self.shards.assign(
+                {
+                    logical: (
+                        self.registry.logical_devices[logical].physical,
+                        host,
+                        self.session_priority(logical),
+                    )
+                    for logical, host in self.hosts().items()
+                }
+            )
+            return
+        wanted = set(self.registry.logical_devices)
+        stale = set(self._sessions) - wanted
+        stale.update(set(restart or ()) & set(self._sessions))
+        for logical in stale:
+            self._sessions.pop(logical).cancel()
+            self.connections.forget(logical)
+        for logical in wanted - set(self._sessions):
+            self._sessions[logical] = asyncio.create_task(self._log_session(logical))
+
+    def handle_log(
+        self, logical: str, lines: int, records: list[LogRecord] | None
+    ) -> None:
+        """Account for log output of one session, local or from a shard worker."""
+        if self.metrics:
+            self.metrics.log_lines_for(logical).inc(lines)
+        if records and self.alerts is not None and self.dispatcher is not None:
+            alerts = self.alerts.feed(logical, records)
+            if alerts:
+                self.dispatcher.submit(alerts)
+
+    def handle_connected(self, logical: str, reconnect: bool) -> None:
+        if reconnect and self.metrics:
+            self.metrics.reconnects_for(logical).inc()
+        self._session_connected(logical)
+
+    async def _log_session(self, logical: str) -> None:
+        parse = self.alerts is not None
+        recorder = self.recorder
+
+        def on_message(message: bytes) -> None:
+            records = None
+            if parse:
+                records = parse_log_text(
+                    message.decode("utf-8", errors="backslashreplace")
+                )
+            self.handle_log(logical, message.count(b"\n") + 1, records)
+
+        await run_log_session(
+            logical,
+            lambda: self.hosts().get(logical),
+            self._settings.scanning,
+            self.connections,
+            lambda: self.session_priority(logical),
+            self.session_log_level(),
+            on_message,
+            lambda reconnect: self.handle_connected(logical, reconnect),
+            (lambda entity, value: recorder.record(logical, entity, value))
+            if recorder is not None
+            else None,
+        )
+
+    async def _handle_http(self, request: HTTPRequest) -> HTTPResponse:
+        if request.path != "/metrics" or self.metrics is None:
+            return HTTPResponse(status=404, body=b"not found\n")
+        return HTTPResponse(
+            body=self.metrics.render().encode("utf-8"), content_type=CONTENT_TYPE
+        )
+
+    async def start_metrics_server(self) -> asyncio.Server | None:
+        config = self._settings.daemon
+        if not config.metrics_port or self.metrics is None:
+            return None
+        server = await start_http_server(
+            self._handle_http, config.metrics_host, config.metrics_port
+        )
+        logger.info(
+            "Metrics endpoint at http://%s:%d/metrics",
+            config.metrics_host,
+            config.metrics_port,
+        )
+        return server
+
+    async def _discover_cycle(self) -> None:
+        await self.discover_once()
+        if self.sessions_enabled:
+            self.sync_sessions()
+
+    async def _every(
+        self, interval: float, cycle: Callable[[], Awaitable[object]]
+    ) -> None:
+        while True:
+            try:
+                await cycle()
+            except Exception:
+                logger.exception(
+                    "Daemon cycle %s failed", getattr(cycle, "__name__", cycle)
+                )
+            await asyncio.sleep(interval)
+
+    async def run(self) -> None:
+        config = self._settings.daemon
+        server = await self.start_metrics_server()
+        delivery = (
+            asyncio.create_task(self.dispatcher.run()) if self.dispatcher else None
+        )
+        sessions = self.sessions_enabled
+        if sessions and config.workers > 1:
+            self.start_shards()
+        watcher = None
+        if config.watch_mdns and sessions:
+            watcher = AnnouncementWatcher(self.on_announce)
+            await watcher.start()
+        loops = [
+            self._every(config.scan_interval, self._discover_cycle),
+            self._every(config.probe_interval, self.probe_once),
+        ]
+        if config.watch_registry:
+            loops.append(
+                FileWatcher([self.store.db.devices_path], self._registry_changed).run()
+            )
+        try:
+            await asyncio.gather(*loops)
+        finally:
+            for task in self._sessions.values():
+                task.cancel()
+            await self.connections.close()
+            if self.shards is not None:
+                await self.shards.close()
+            if watcher is not None:
+                await watcher.close()
+            if delivery is not None and self.dispatcher is not None:
+                delivery.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await delivery
+                await self.dispatcher.close()
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+            if self.recorder is not None:
+                self.recorder.close()
+            await self.store.close()
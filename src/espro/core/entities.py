@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import re
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import aioesphomeapi
+
+from espro.config import ScanningConfig
+from espro.models import DeviceEntities, EntityRecord
+
+from .health import PROBE_ERRORS
+
+logger = logging.getLogger(__name__)
+
+_CAMEL_BOUNDARY = re.compile(r"(?<!^)(?=[A-Z])")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({"a", "all", "and", "any", "at", "in", "of", "on", "the"})
+
+
+@dataclass
+class CatalogResult:
+    logical: str
+    catalog: DeviceEntities | None
+    refreshed: bool = False
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class EntityHit:
+    logical_name: str
+    entity: EntityRecord
+
+
+def entity_type(info: aioesphomeapi.EntityInfo) -> str:
+    """``BinarySensorInfo`` -> ``binary_sensor``."""
+    name = type(info).__name__.removesuffix("Info")
+    return _CAMEL_BOUNDARY.sub("_", name).lower()
+
+
+def _record(info: aioesphomeapi.EntityInfo) -> EntityRecord:
+    return EntityRecord(
+        key=info.key,
+        object_id=info.object_id,
+        name=info.name,
+        entity_type=entity_type(info),
+        device_class=getattr(info, "device_class", None) or None,
+        unit_of_measurement=getattr(info, "unit_of_measurement", None) or None,
+    )
+
+
+async def fetch_device_entities(
+    logical: str,
+    host: str,
+    config: ScanningConfig,
+    cached: DeviceEntities | None = None,
+) -> tuple[DeviceEntities, bool]:
+    """Return the device's entities and whether they had to be re-enumerated.
+
+    Firmware is identified by version and compilation time; when both match
+    ``cached`` only device info is requested.
+    """
+    client = aioesphomeapi.APIClient(host, port=config.port, password="")
+    try:
+        await asyncio.wait_for(
+            client.connect(login=True, log_errors=False), timeout=config.timeout
+        )
+        info = await asyncio.wait_for(client.device_info(), timeout=config.timeout)
+        if (
+            cached is not None
+            and cached.esphome_version == info.esphome_version
+            and cached.compilation_time == info.compilation_time
+        ):
+            return cached.model_copy(update={"host": host}), False
+
+        entities, _services = await asyncio.wait_for(
+            client.list_entities_services(), timeout=config.timeout
+        )
+    finally:
+        with contextlib.suppress(*PROBE_ERRORS):
+            await client.disconnect()
+
+    catalog = DeviceEntities(
+        logical_name=logical,
+        host=host,
+        esphome_version=info.esphome_version,
+        compilation_time=info.compilation_time,
+        fetched_at=datetime.now(timezone.utc),
+        entities=sorted(
+            (_record(entity) for entity in entities), key=lambda e: e.object_id
+        ),
+    )
+    return catalog, True
+
+
+async def fetch_catalog(
+    targets: dict[str, str],
+    config: ScanningConfig,
+    cached: dict[str, DeviceEntities | None],
+    concurrency: int | None = None,
+) -> list[CatalogResult]:
+    """Refresh entity lists across the fleet; unreachable devices keep their cache."""
+    semaphore = asyncio.Semaphore(concurrency or config.parallel_scans)
+
+    async def _fetch(logical: str, host: str) -> CatalogResult:
+        previous = cached.get(logical)
+        async with semaphore:
+            try:
+                catalog, refreshed = await fetch_device_entities(
+                    logical, host, config, previous
+                )
+            except PROBE_ERRORS as exc:
+                error = str(exc) or type(exc).__name__
+                logger.debug("Entity fetch from '%s' failed: %s", logical, error)
+                return CatalogResult(logical, previous, error=error)
+        return CatalogResult(logical, catalog, refreshed=refreshed)
+
+    return list(
+        await asyncio.gather(
+            *(_fetch(logical, host) for logical, host in sorted(targets.items()))
+        )
+    )
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric runs with a light plural fold ("sensors")."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class EntityIndex:
+    """Inverted index over entity name, object_id, type and logical device."""
+
+    def __init__(self, catalogs: Iterable[DeviceEntities]) -> None:
+        self._hits: list[EntityHit] = []
+        self._postings: dict[str, set[int]] = {}
+        for catalog in sorted(catalogs, key=lambda c: c.logical_name):
+            for entity in catalog.entities:
+                position = len(self._hits)
+                self._hits.append(EntityHit(catalog.logical_name, entity))
+                fields = (
+                    catalog.logical_name,
+                    entity.name,
+                    entity.object_id,
+                    entity.entity_type,
+                    entity.device_class or "",
+                )
+                for field_value in fields:
+                    for token in tokenize(field_value):
+                        self._postings.setdefault(token, set()).add(position)
+        self._terms = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self._hits)
+
+    def _match(self, term: str) -> set[int]:
+        """Positions of entities with any token starting with ``term``."""
+        matched: set[int] = set()
+        index = bisect_left(self._terms, term)
+        while index < len(self._terms) and self._terms[index].startswith(term):
+            matched |= self._postings[self._terms[index]]
+            index += 1
+        return matched
+
+    def search(self, query: str) -> list[EntityHit]:
+        """Entities matching every query term; stopwords are ignored."""
+        terms = [term for term in tokenize(query) if term not in _STOPWORDS]
+        if not terms:
+            return list(self._hits)
+
+        result = self._match(terms[0])
+        for term in terms[1:]:
+            if not result:
+                break
+            result &= self._match(term)
+        return [self._hits[position] for position in sorted(result)]
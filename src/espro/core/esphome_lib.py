@@ -0,0 +1,19 @@
+"""Lazy access to the ESPHome package.
+
+Importing esphome pulls in its whole config machinery, so it is only loaded
+by the commands that validate, compile or upload firmware.
+"""
+
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+
+
+def esphome_module(name: str) -> ModuleType:
+    """Import ``esphome.<name>``; raises ImportError if ESPHome is missing."""
+    return importlib.import_module(f"esphome.{name}")
+
+
+def esphome_version() -> str:
+    return esphome_module("const").__version__
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Any, cast
+
+import aioesphomeapi
+import aioesphomeapi.api_pb2  # type: ignore[import-untyped]
+
+from espro.config import ScanningConfig
+from espro.models import DeviceHealth, HealthReport
+from espro.utils.histogram import DEFAULT_BOUNDS_MS, LatencyHistogram
+
+pb: Any = cast(Any, aioesphomeapi.api_pb2)
+
+logger = logging.getLogger(__name__)
+
+PROBE_ERRORS = (
+    aioesphomeapi.APIConnectionError,
+    aioesphomeapi.InvalidAuthAPIError,
+    ConnectionError,
+    OSError,
+    TimeoutError,
+)
+
+
+async def _ping(client: aioesphomeapi.APIClient, timeout: float) -> None:
+    # APIClient has no public ping; reuse the connection's request/response helper
+    # so the round trip is a single MSG_PING_REQUEST/MSG_PING_RESPONSE exchange.
+    connection: Any = client._get_connection()
+    await connection.send_message_await_response(
+        pb.PingRequest(), pb.PingResponse, timeout
+    )
+
+
+async def probe_device(
+    logical_name: str,
+    host: str,
+    config: ScanningConfig,
+    rounds: int = 5,
+) -> tuple[DeviceHealth, LatencyHistogram]:
+    """Connect once and measure ``rounds`` API ping round trips."""
+    histogram = LatencyHistogram()
+    health = DeviceHealth(logical_name=logical_name, host=host, rounds=rounds)
+
+    client = aioesphomeapi.APIClient(host, port=config.port, password="")
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(
+            client.connect(login=True, log_errors=False), timeout=config.timeout
+        )
+    except PROBE_ERRORS as exc:
+        logger.debug("Health probe connect to %s failed: %s", host, exc)
+        health.errors = rounds
+        health.last_error = str(exc) or type(exc).__name__
+        return health, histogram
+    health.connect_ms = (time.perf_counter() - started) * 1000
+
+    try:
+        for _ in range(rounds):
+            sent = time.perf_counter()
+            try:
+                await _ping(client, config.timeout)
+            except PROBE_ERRORS as exc:
+                health.errors += 1
+                health.last_error = str(exc) or type(exc).__name__
+                continue
+            histogram.record((time.perf_counter() - sent) * 1000)
+    finally:
+        with contextlib.suppress(*PROBE_ERRORS):
+            await client.disconnect()
+
+    health.pings_ok = histogram.count
+    if histogram.count:
+        health.rtt_min_ms = histogram.min
+        health.rtt_p50_ms = histogram.percentile(0.5)
+        health.rtt_p99_ms = histogram.percentile(0.99)
+    health.rtt_buckets = list(histogram.counts)
+    return health, histogram
+
+
+async def probe_fleet(
+    targets: Mapping[str, str],
+    config: ScanningConfig,
+    rounds: int = 5,
+    concurrency: int | None = None,
+) -> HealthReport:
+    """Probe every ``logical name -> host`` target with bounded concurrency."""
+    semaphore = asyncio.Semaphore(concurrency or config.parallel_scans)
+
+    async def _bounded(name: str, host: str) -> DeviceHealth:
+        async with semaphore:
+            health, _ = await probe_device(name, host, config, rounds)
+            return health
+
+    devices = await asyncio.gather(
+        *(_bounded(name, host) for name, host in sorted(targets.items()))
+    )
+    logger.debug("Health probe complete: %d device(s)", len(devices))
+    return HealthReport(
+        timestamp=datetime.now(timezone.utc),
+        bucket_bounds_ms=list(DEFAULT_BOUNDS_MS),
+        devices=list(devices),
+    )
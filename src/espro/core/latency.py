@@ -0,0 +1,69 @@
+"""Per-device probe deadlines learned from observed connect latency.
+
+Every direct probe of a known device updates an exponentially weighted
+mean and variance of how long it took to connect and answer. The next
+probe waits for roughly that device's p99 times ``timeout_factor``, so a
+wired device that answers in 20 ms is given up on quickly while one behind
+a mesh repeater gets the time it usually needs.
+"""
+
+from __future__ import annotations
+
+import math
+
+from espro.config import ScanningConfig
+from espro.models import ConnectLatency
+
+# Weight of the newest sample
+ALPHA = 0.25
+# Samples needed before the learned deadline replaces the global timeout
+MIN_SAMPLES = 3
+# p99 of a normal distribution, in standard deviations above the mean
+P99_Z = 2.33
+# Scans a silent device with history is still probed for before it is dropped
+MAX_MISSES = 3
+
+
+def observe(previous: ConnectLatency | None, seconds: float) -> ConnectLatency:
+    if previous is None:
+        return ConnectLatency(mean=seconds)
+    delta = seconds - previous.mean
+    return ConnectLatency(
+        mean=previous.mean + ALPHA * delta,
+        variance=(1 - ALPHA) * (previous.variance + ALPHA * delta * delta),
+        samples=previous.samples + 1,
+    )
+
+
+def observe_miss(
+    previous: ConnectLatency | None, deadline: float
+) -> ConnectLatency | None:
+    """Count a probe that ran into ``deadline``.
+
+    The miss enters the estimate as a sample at the deadline, so a device
+    that slowed down gets more time next scan.
+    """
+    if previous is None:
+        return None
+    updated = observe(previous, deadline)
+    return updated.model_copy(
+        update={"samples": previous.samples, "misses": previous.misses + 1}
+    )
+
+
+def p99(latency: ConnectLatency) -> float:
+    return latency.mean + P99_Z * math.sqrt(latency.variance)
+
+
+def deadline(latency: ConnectLatency | None, config: ScanningConfig) -> float:
+    """How long to wait for a device with ``latency`` history."""
+    if (
+        not config.adaptive_timeout
+        or latency is None
+        or latency.samples < MIN_SAMPLES
+        # Missed twice in a row: probably gone, so wait no longer than before
+        or latency.misses >= 2
+    ):
+        return config.timeout
+    learned = p99(latency) * config.timeout_factor
+    return min(max(learned, config.min_timeout), config.max_timeout)
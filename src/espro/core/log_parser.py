@@ -0,0 +1,190 @@
+"""Structured parsing, filtering and rendering of ESPHome log output.
+
+Lines look like ``[D][sensor:094]: 'Temperature': Sending state 21.5`` with an
+optional ANSI colour wrapper, an optional ``[HH:MM:SS]`` device timestamp and
+an optional ``[task]`` after the tag. Lines starting with whitespace continue
+the previous entry of the same message.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from fnmatch import translate
+
+from rich.text import Text
+
+LEVELS = {
+    "E": "error",
+    "W": "warning",
+    "I": "info",
+    "C": "config",
+    "D": "debug",
+    "V": "verbose",
+    "VV": "very_verbose",
+}
+LOG_FORMATS = ("pretty", "raw", "json")
+
+_LEVEL_STYLES = {
+    "E": "bold red",
+    "W": "yellow",
+    "I": "green",
+    "C": "magenta",
+    "D": "cyan",
+    "V": "dim",
+    "VV": "dim",
+}
+
+_ANSI_RE = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]")
+_LINE_RE = re.compile(
+    r"(?:\[(?P<time>\d{1,2}:\d{2}:\d{2}(?:\.\d+)?)\])?"
+    r"\[(?P<level>VV|[EWICDV])\]"
+    r"\[(?P<tag>[^:\]]+)(?::(?P<line>\d+))?\]"
+    r"(?:\[[^\]]*\])?"
+    r": ?(?P<message>.*)"
+)
+_COMPONENT_RE = re.compile(r"'([^']+)'")
+
+
+@dataclass(slots=True)
+class LogRecord:
+    level: str
+    tag: str
+    line: int | None
+    component: str | None
+    message: str
+    device_time: str | None
+    raw: str
+    received: str | None = None
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "received": self.received,
+            "device_time": self.device_time,
+            "level": LEVELS.get(self.level, ""),
+            "tag": self.tag,
+            "line": self.line,
+            "component": self.component,
+            "message": self.message,
+        }
+
+
+def parse_log_text(text: str, received: str | None = None) -> list[LogRecord]:
+    """Parse one log message, which may span several lines, into records.
+
+    Lines that match no header and are not continuations are kept with an
+    empty level and tag, so nothing the device sent is dropped.
+    """
+    records: list[LogRecord] = []
+    match = _LINE_RE.match
+    previous: LogRecord | None = None
+    for raw in text.split("\n"):
+        line = _ANSI_RE.sub("", raw) if "\x1b" in raw else raw
+        line = line.rstrip()
+        if not line:
+            continue
+
+        header = match(line)
+        if header is not None:
+            level, tag, number, message, device_time = header.group(
+                "level", "tag", "line", "message", "time"
+            )
+            component = (
+                _COMPONENT_RE.match(message) if message.startswith("'") else None
+            )
+            previous = LogRecord(
+                level,
+                tag,
+                int(number) if number else None,
+                component.group(1) if component else None,
+                message,
+                device_time,
+                raw,
+                received,
+            )
+            records.append(previous)
+        elif previous is not None and line[0].isspace():
+            records.append(
+                LogRecord(
+                    previous.level,
+                    previous.tag,
+                    previous.line,
+                    previous.component,
+                    line.strip(),
+                    previous.device_time,
+                    raw,
+                    received,
+                )
+            )
+        else:
+            records.append(LogRecord("", "", None, None, line, None, raw, received))
+    return records
+
+
+class LogFilter:
+    """Keeps records whose tag matches any glob and whose message matches a regex.
+
+    Tag decisions are memoized, since a device only logs from a few dozen tags.
+    """
+
+    def __init__(
+        self, tags: Iterable[str] = (), pattern: str | re.Pattern[str] | None = None
+    ) -> None:
+        tags = list(tags)
+        self._tags = (
+            re.compile("|".join(f"(?:{translate(tag)})" for tag in tags))
+            if tags
+            else None
+        )
+        self._pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self._tag_cache: dict[str, bool] = {}
+
+    def _tag_allowed(self, tags: re.Pattern[str], tag: str) -> bool:
+        allowed = self._tag_cache.get(tag)
+        if allowed is None:
+            allowed = tags.match(tag) is not None
+            self._tag_cache[tag] = allowed
+        return allowed
+
+    def apply(self, records: list[LogRecord]) -> list[LogRecord]:
+        tags = self._tags
+        if tags is not None:
+            records = [r for r in records if self._tag_allowed(tags, r.tag)]
+        if self._pattern is not None:
+            search = self._pattern.search
+            records = [record for record in records if search(record.message)]
+        return records
+
+
+def render_raw(records: Iterable[LogRecord]) -> str:
+    return "\n".join(record.raw for record in records)
+
+
+def render_json(records: Iterable[LogRecord]) -> str:
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    return "\n".join(dumps(record.as_dict()) for record in records)
+
+
+def render_pretty(records: Iterable[LogRecord]) -> Text:
+    """One :class:`~rich.text.Text` for the whole batch, styled per level."""
+    text = Text()
+    for record in records:
+        if text:
+            text.append("\n")
+        if record.received:
+            text.append(f"[{record.received}]", style="dim")
+        if record.device_time:
+            text.append(f"[{record.device_time}]", style="dim")
+        if record.level:
+            location = (
+                f"{record.tag}:{record.line:03d}"
+                if record.line is not None
+                else record.tag
+            )
+            text.append(f"[{record.level}]", style=_LEVEL_STYLES[record.level])
+            text.append(f"[{location}]", style="blue")
+            text.append(": ")
+        text.append(record.message, style="red" if record.level == "E" else None)
+    return text
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from espro.models import DeviceRegistry, PhysicalDevice, ValidationResult
+from espro.utils.histogram import LatencyHistogram
+from espro.utils.metrics import (
+    CounterChild,
+    GaugeChild,
+    MetricsRegistry,
+)
+
+
+class FleetMetrics:
+    """espro metric families plus helpers that fold domain events into them."""
+
+    def __init__(self, registry: MetricsRegistry | None = None) -> None:
+        self.registry = registry or MetricsRegistry()
+        metrics = self.registry
+        self.device_up = metrics.gauge(
+            "espro_device_up",
+            "Whether the logical device was found by the last discovery.",
+            ("logical",),
+        )
+        self.discovered_devices = metrics.gauge(
+            "espro_discovered_devices",
+            "Physical ESPHome devices found by the last discovery.",
+        )
+        self.scan_duration = metrics.gauge(
+            "espro_scan_duration_seconds",
+            "Wall time of the last discovery run.",
+        )
+        self.scans = metrics.counter("espro_scans", "Discovery runs completed.")
+        self.validation_errors = metrics.gauge(
+            "espro_registry_validation_errors",
+            "Registry validation errors from the last discovery.",
+            ("logical",),
+        )
+        self.api_rtt = metrics.histogram(
+            "espro_device_api_rtt_seconds",
+            "Native API ping round-trip time.",
+            ("logical",),
+        )
+        self.probe_errors = metrics.counter(
+            "espro_device_probe_errors",
+            "Failed API connects or pings.",
+            ("logical",),
+        )
+        self.reconnects = metrics.counter(
+            "espro_device_reconnects",
+            "Reconnects of long-lived device sessions.",
+            ("logical",),
+        )
+        self.log_lines = metrics.counter(
+            "espro_device_log_lines",
+            "Log lines received from the device.",
+            ("logical",),
+        )
+
+    def log_lines_for(self, logical: str) -> CounterChild:
+        return self.log_lines.labels(logical)
+
+    def reconnects_for(self, logical: str) -> CounterChild:
+        return self.reconnects.labels(logical)
+
+    def rtt_for(self, logical: str) -> LatencyHistogram:
+        return self.api_rtt.labels(logical)
+
+    def probe_errors_for(self, logical: str) -> CounterChild:
+        return self.probe_errors.labels(logical)
+
+    def observe_scan(
+        self,
+        registry: DeviceRegistry,
+        devices: list[PhysicalDevice],
+        result: ValidationResult,
+        duration: float,
+    ) -> None:
+        self.scans.labels().inc()
+        self.scan_duration.labels().set(duration)
+        self.discovered_devices.labels().set(len(devices))
+
+        missing = set(result.missing_devices)
+        self.device_up.clear()
+        self.validation_errors.clear()
+        for logical in registry.logical_devices:
+            up: GaugeChild = self.device_up.labels(logical)
+            up.set(0 if logical in missing else 1)
+            self.validation_errors.labels(logical).set(1 if logical in missing else 0)
+
+    def render(self) -> str:
+        return self.registry.render()
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
+import random
 import socket
+import time
 from dataclasses import dataclass, field
+from datetime import datetime
 from typing import TYPE_CHECKING, Any, cast
 
 import aioesphomeapi.api_pb2  # type: ignore[import-untyped]
 from zeroconf import ServiceInfo
 from zeroconf.asyncio import AsyncZeroconf
 
+from .mock_faults import FaultProfile, Faults
+
 pb: Any = cast(Any, aioesphomeapi.api_pb2)
 
 if TYPE_CHECKING:
@@ -27,18 +33,46 @@ MSG_PING_RESPONSE = 8
 MSG_DEVICE_INFO_REQUEST = 9
 MSG_DEVICE_INFO_RESPONSE = 10
 MSG_LIST_ENTITIES_REQUEST = 11
+MSG_LIST_ENTITIES_SENSOR_RESPONSE = 16
 MSG_LIST_ENTITIES_SWITCH_RESPONSE = 17
 MSG_LIST_ENTITIES_DONE_RESPONSE = 19
 MSG_SUBSCRIBE_STATES_REQUEST = 20
+MSG_SENSOR_STATE_RESPONSE = 25
 MSG_SWITCH_STATE_RESPONSE = 26
 MSG_SUBSCRIBE_LOGS_REQUEST = 28
 MSG_SUBSCRIBE_LOGS_RESPONSE = 29
 MSG_SWITCH_COMMAND_REQUEST = 33
+MSG_SUBSCRIBE_BLUETOOTH_LE_ADVERTISEMENTS_REQUEST = 66
+MSG_UNSUBSCRIBE_BLUETOOTH_LE_ADVERTISEMENTS_REQUEST = 87
+MSG_BLUETOOTH_LE_RAW_ADVERTISEMENTS_RESPONSE = 93
 
 LOG_LEVEL_INFO = 3
 LOG_LEVEL_DEBUG = 5
 MDNS_SERVICE_TYPE = "_esphomelib._tcp.local."
 
+# PASSIVE_SCAN | RAW_ADVERTISEMENTS
+BLUETOOTH_PROXY_FEATURES = 0x01 | 0x20
+# Simulated BLE peripherals share addresses across mocks, so several mock
+# proxies hear the same devices
+MOCK_BLE_ADDRESS_BASE = 0xC0FFEE000000
+MOCK_BLE_COMPANY_ID = 0xFFFF
+
+# ESPHome native OTA (protocol v2), server side of esphome.espota2
+OTA_MAGIC = bytes([0x6C, 0x26, 0xF7, 0x5C, 0x45])
+OTA_VERSION_2_0 = 2
+OTA_BLOCK_SIZE = 8192
+OTA_RESPONSE_OK = 0x00
+OTA_RESPONSE_HEADER_OK = 0x40
+OTA_RESPONSE_AUTH_OK = 0x41
+OTA_RESPONSE_UPDATE_PREPARE_OK = 0x42
+OTA_RESPONSE_BIN_MD5_OK = 0x43
+OTA_RESPONSE_RECEIVE_OK = 0x44
+OTA_RESPONSE_UPDATE_END_OK = 0x45
+OTA_RESPONSE_CHUNK_OK = 0x47
+OTA_RESPONSE_ERROR_MAGIC = 0x80
+OTA_RESPONSE_ERROR_MD5_MISMATCH = 0x8B
+MOCK_FIRMWARE_PREFIX = b"espro-mock-firmware:"
+
 
 def _resolve_mdns_address() -> str:
     try:
@@ -72,6 +106,12 @@ def decode_varint(data: bytes, offset: int = 0) -> tuple[int, int]:
     raise ValueError("Incomplete varint")
 
 
+def make_mock_firmware(esphome_version: str, size: int = 64 * 1024) -> bytes:
+    """Build a fake image; the mock reports ``esphome_version`` after flashing it."""
+    header = MOCK_FIRMWARE_PREFIX + esphome_version.encode("utf-8") + b"\n"
+    return header + bytes(max(size - len(header), 0))
+
+
 def make_frame(msg_type: int, payload: bytes) -> bytes:
     return b"\x00" + encode_varint(len(payload)) + encode_varint(msg_type) + payload
 
@@ -109,29 +149,94 @@ class MockESPHomeDevice:
     mac_address: str = "AA:BB:CC:DD:EE:FF"
     model: str = "ESP32"
     esphome_version: str = "2024.12.0"
+    compilation_time: str = "Jan  1 2025, 00:00:00"
     port: int = 6053
+    host: str = "0.0.0.0"
+    advertise: bool = True
+    ota_port: int | None = None
+    reboot_delay: float = 1.0
 
     switch_state: bool = False
     switch_key: int = 1
     switch_name: str = "Relay"
     switch_object_id: str = "relay"
+    list_entities_requests: int = 0
+
+    # A temperature sensor reporting every N seconds; 0 disables it
+    sensor_interval: float = 0.0
+    sensor_value: float = 21.0
+    sensor_key: int = 2
+
+    # Synthetic DEBUG sensor lines per second on top of the heartbeat
+    log_rate: float = 0.0
+
+    # Simulated BLE peripherals relayed as a Bluetooth proxy; 0 disables
+    ble_devices: int = 0
+    ble_rate: float = 200.0
+    ble_batch: int = 16
+
+    faults: Faults = field(default_factory=Faults)
+    half_open_connections: int = 0
+    dropped_connections: int = 0
 
     _server: asyncio.Server | None = field(default=None, repr=False)
+    _clients: set["StreamWriter"] = field(default_factory=set, repr=False)
     _subscribers: set["StreamWriter"] = field(default_factory=set, repr=False)
     _log_subscribers: set["StreamWriter"] = field(default_factory=set, repr=False)
     _log_task: asyncio.Task[None] | None = field(default=None, repr=False)
+    _log_spam_task: asyncio.Task[None] | None = field(default=None, repr=False)
+    _sensor_task: asyncio.Task[None] | None = field(default=None, repr=False)
+    _ble_subscribers: set["StreamWriter"] = field(default_factory=set, repr=False)
+    _ble_task: asyncio.Task[None] | None = field(default=None, repr=False)
     _zeroconf: AsyncZeroconf | None = field(default=None, repr=False)
     _service_info: ServiceInfo | None = field(default=None, repr=False)
+    _ota_server: asyncio.Server | None = field(default=None, repr=False)
+    _rebooting: bool = field(default=False, repr=False)
+    _rng: random.Random = field(default_factory=random.Random, repr=False)
+    _flap_task: asyncio.Task[None] | None = field(default=None, repr=False)
 
     async def start(self) -> None:
+        self._rng = self.faults.rng(self.name)
         self._server = await asyncio.start_server(
-            self._handle_client, "0.0.0.0", self.port
+            self._handle_client, self.host, self.port
         )
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+        if self.faults.recv_buffer:
+            # Accepted sockets inherit it, so the advertised TCP window stays small
+            for sock in self._server.sockets:
+                sock.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_RCVBUF, self.faults.recv_buffer
+                )
         logger.info("Mock device '%s' listening on port %d", self.name, self.port)
-        await self._register_mdns()
+        if self.ota_port is not None:
+            self._ota_server = await asyncio.start_server(
+                self._handle_ota, self.host, self.ota_port
+            )
+            self.ota_port = self._ota_server.sockets[0].getsockname()[1]
+            logger.info(
+                "Mock device '%s' accepting OTA on port %d", self.name, self.ota_port
+            )
+        if self.advertise:
+            await self._register_mdns()
+            if self.faults.mdns_flap:
+                self._flap_task = asyncio.create_task(self._flap_mdns())
 
     async def stop(self) -> None:
+        if self._flap_task is not None:
+            self._flap_task.cancel()
         await self._unregister_mdns()
+        for task in (
+            self._ble_task,
+            self._log_task,
+            self._log_spam_task,
+            self._sensor_task,
+        ):
+            if task is not None:
+                task.cancel()
+        if self._ota_server:
+            self._ota_server.close()
+            await self._ota_server.wait_closed()
         if self._server:
             self._server.close()
             await self._server.wait_closed()
@@ -177,6 +282,15 @@ class MockESPHomeDevice:
         await zeroconf.async_unregister_service(service_info)
         await zeroconf.async_close()
 
+    async def _flap_mdns(self) -> None:
+        while True:
+            await asyncio.sleep(self._rng.expovariate(1 / self.faults.mdns_flap))
+            if self._zeroconf is None:
+                await self._register_mdns()
+            else:
+                logger.info("Mock device '%s' withdrawing mDNS", self.name)
+                await self._unregister_mdns()
+
     async def run_forever(self) -> None:
         await self.start()
         if self._server:
@@ -186,30 +300,72 @@ class MockESPHomeDevice:
         self, reader: "StreamReader", writer: "StreamWriter"
     ) -> None:
         addr = writer.get_extra_info("peername")
+        if self._rebooting:
+            writer.close()
+            return
+        faults = self.faults
+        if faults.half_open and self._rng.random() < faults.half_open:
+            await self._ignore_client(reader, writer)
+            return
         logger.info("Client connected: %s", addr)
+        self._clients.add(writer)
         buffer = bytearray()
+        drop = None
+        if faults.disconnect_after:
+            drop = asyncio.get_running_loop().call_later(
+                self._rng.expovariate(1 / faults.disconnect_after),
+                self._drop_client,
+                writer,
+            )
 
         try:
             while True:
+                if faults.read_delay:
+                    await asyncio.sleep(faults.read_delay)
                 data = await reader.read(4096)
                 if not data:
                     break
 
                 buffer.extend(data)
                 frames = parse_frames(bytes(buffer))
+                if frames:
+                    # Offsets are absolute, so drop everything up to the last frame
+                    del buffer[: frames[-1][2]]
 
-                for msg_type, payload, consumed in frames:
-                    buffer = buffer[consumed:]
+                for msg_type, payload, _end in frames:
                     await self._handle_message(msg_type, payload, writer)
 
         except (ConnectionResetError, BrokenPipeError):
             logger.debug("Client disconnected: %s", addr)
         finally:
+            if drop is not None:
+                drop.cancel()
+            self._clients.discard(writer)
             self._subscribers.discard(writer)
             self._log_subscribers.discard(writer)
+            self._ble_subscribers.discard(writer)
             writer.close()
             await writer.wait_closed()
 
+    async def _ignore_client(
+        self, reader: "StreamReader", writer: "StreamWriter"
+    ) -> None:
+        # Accept the connection, then read and never answer
+        self.half_open_connections += 1
+        logger.debug("Leaving %s half-open", writer.get_extra_info("peername"))
+        try:
+            while await reader.read(4096):
+                pass
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    def _drop_client(self, writer: "StreamWriter") -> None:
+        self.dropped_connections += 1
+        logger.debug("Dropping %s", writer.get_extra_info("peername"))
+        writer.transport.abort()
+
     async def _handle_message(
         self, msg_type: int, payload: bytes, writer: "StreamWriter"
     ) -> None:
@@ -228,18 +384,33 @@ class MockESPHomeDevice:
         elif msg_type == MSG_SUBSCRIBE_STATES_REQUEST:
             self._subscribers.add(writer)
             await self._send_switch_state(writer)
+            if self.sensor_interval:
+                await self._send_sensor_state(writer)
+                if self._sensor_task is None or self._sensor_task.done():
+                    self._sensor_task = asyncio.create_task(self._emit_sensor_states())
         elif msg_type == MSG_SWITCH_COMMAND_REQUEST:
             await self._handle_switch_command(payload, writer)
         elif msg_type == MSG_SUBSCRIBE_LOGS_REQUEST:
             await self._handle_subscribe_logs(writer)
+        elif msg_type == MSG_SUBSCRIBE_BLUETOOTH_LE_ADVERTISEMENTS_REQUEST:
+            self._handle_subscribe_ble(writer)
+        elif msg_type == MSG_UNSUBSCRIBE_BLUETOOTH_LE_ADVERTISEMENTS_REQUEST:
+            self._ble_subscribers.discard(writer)
         elif msg_type == MSG_DISCONNECT_REQUEST:
             await self._send_disconnect_response(writer)
             writer.close()
 
     async def _send(self, msg_type: int, msg: object, writer: "StreamWriter") -> None:
         payload = msg.SerializeToString()  # type: ignore[attr-defined]
-        frame = make_frame(msg_type, payload)
-        writer.write(frame)
+        await self._send_payload(msg_type, payload, writer)
+
+    async def _send_payload(
+        self, msg_type: int, payload: bytes, writer: "StreamWriter"
+    ) -> None:
+        delay = self.faults.delay(self._rng)
+        if delay:
+            await asyncio.sleep(delay)
+        writer.write(make_frame(msg_type, payload))
         await writer.drain()
 
     async def _send_hello_response(self, writer: "StreamWriter") -> None:
@@ -248,6 +419,8 @@ class MockESPHomeDevice:
         msg.api_version_minor = 14
         msg.name = self.name
         msg.server_info = "MockESPHomeDevice"
+        if self.faults.handshake_delay:
+            await asyncio.sleep(self.faults.handshake_delay)
         await self._send(MSG_HELLO_RESPONSE, msg, writer)
 
     async def _send_ping_response(self, writer: "StreamWriter") -> None:
@@ -260,9 +433,13 @@ class MockESPHomeDevice:
         msg.mac_address = self.mac_address
         msg.model = self.model
         msg.esphome_version = self.esphome_version
+        msg.compilation_time = self.compilation_time
+        if self.ble_devices:
+            msg.bluetooth_proxy_feature_flags = BLUETOOTH_PROXY_FEATURES
         await self._send(MSG_DEVICE_INFO_RESPONSE, msg, writer)
 
     async def _send_entities(self, writer: "StreamWriter") -> None:
+        self.list_entities_requests += 1
         switch = pb.ListEntitiesSwitchResponse()
         switch.object_id = self.switch_object_id
         switch.key = self.switch_key
@@ -271,6 +448,15 @@ class MockESPHomeDevice:
         switch.device_id = 0
         await self._send(MSG_LIST_ENTITIES_SWITCH_RESPONSE, switch, writer)
 
+        if self.sensor_interval:
+            sensor = pb.ListEntitiesSensorResponse()
+            sensor.object_id = "temperature"
+            sensor.key = self.sensor_key
+            sensor.name = "Temperature"
+            sensor.unit_of_measurement = "°C"
+            sensor.accuracy_decimals = 1
+            await self._send(MSG_LIST_ENTITIES_SENSOR_RESPONSE, sensor, writer)
+
         await self._send(
             MSG_LIST_ENTITIES_DONE_RESPONSE, pb.ListEntitiesDoneResponse(), writer
         )
@@ -282,6 +468,23 @@ class MockESPHomeDevice:
         msg.device_id = 0
         await self._send(MSG_SWITCH_STATE_RESPONSE, msg, writer)
 
+    async def _send_sensor_state(self, writer: "StreamWriter") -> None:
+        msg = pb.SensorStateResponse()
+        msg.key = self.sensor_key
+        msg.state = self.sensor_value
+        await self._send(MSG_SENSOR_STATE_RESPONSE, msg, writer)
+
+    async def _emit_sensor_states(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self.sensor_interval)
+            # A slow random walk, like a room temperature
+            self.sensor_value = round(self.sensor_value + random.uniform(-0.2, 0.2), 2)
+            for subscriber in list(self._subscribers):
+                try:
+                    await self._send_sensor_state(subscriber)
+                except (ConnectionResetError, BrokenPipeError):
+                    self._subscribers.discard(subscriber)
+
     async def _handle_switch_command(
         self, payload: bytes, writer: "StreamWriter"
     ) -> None:
@@ -315,6 +518,10 @@ class MockESPHomeDevice:
 
         if self._log_task is None or self._log_task.done():
             self._log_task = asyncio.create_task(self._emit_periodic_logs())
+        if self.log_rate and (
+            self._log_spam_task is None or self._log_spam_task.done()
+        ):
+            self._log_spam_task = asyncio.create_task(self._emit_log_spam())
 
     async def _send_log(self, writer: "StreamWriter", level: int, message: str) -> None:
         msg = pb.SubscribeLogsResponse()
@@ -340,17 +547,193 @@ class MockESPHomeDevice:
                     f"[{self.name}] Heartbeat #{counter}, switch={'ON' if self.switch_state else 'OFF'}",
                 )
 
+    def _handle_subscribe_ble(self, writer: "StreamWriter") -> None:
+        if not self.ble_devices:
+            return
+        self._ble_subscribers.add(writer)
+        if self._ble_task is None or self._ble_task.done():
+            self._ble_task = asyncio.create_task(self._emit_ble_advertisements())
+
+    def _ble_payload(self, index: int) -> bytes:
+        name = f"mock-ble-{index}".encode()
+        # The manufacturer data changes every 5s like a periodic sensor reading
+        reading = (int(time.monotonic() / 5) + index) & 0xFF
+        return (
+            bytes([2, 0x01, 0x06])
+            + bytes([len(name) + 1, 0x09])
+            + name
+            + bytes([4, 0xFF])
+            + MOCK_BLE_COMPANY_ID.to_bytes(2, "little")
+            + bytes([reading])
+        )
+
+    async def _emit_ble_advertisements(self) -> None:
+        rng = random.Random(self.name)
+        # Each proxy sits at its own distance from each peripheral
+        base_rssi = [rng.randint(-95, -45) for _ in range(self.ble_devices)]
+        interval = self.ble_batch / self.ble_rate
+        index = 0
+        while self._ble_subscribers:
+            msg = pb.BluetoothLERawAdvertisementsResponse()
+            for _ in range(self.ble_batch):
+                adv = msg.advertisements.add()
+                adv.address = MOCK_BLE_ADDRESS_BASE + index
+                adv.rssi = base_rssi[index] + rng.randint(-4, 4)
+                adv.address_type = 0
+                adv.data = self._ble_payload(index)
+                index = (index + 1) % self.ble_devices
+            for subscriber in list(self._ble_subscribers):
+                try:
+                    await self._send(
+                        MSG_BLUETOOTH_LE_RAW_ADVERTISEMENTS_RESPONSE, msg, subscriber
+                    )
+                except (ConnectionResetError, BrokenPipeError):
+                    self._ble_subscribers.discard(subscriber)
+            await asyncio.sleep(interval)
+
+    async def _emit_log_spam(self) -> None:
+        # Batches every 10ms, like a device flushing its log buffer
+        per_batch = max(1, round(self.log_rate / 100))
+        interval = per_batch / self.log_rate
+        counter = 0
+        while self._log_subscribers:
+            for _ in range(per_batch):
+                counter += 1
+                await self._broadcast_log(
+                    LOG_LEVEL_DEBUG,
+                    f"\x1b[0;36m[D][sensor:094]: 'Probe {counter % 16}': "
+                    f"Sending state {counter % 1000 / 10:.1f} °C with 1 decimals "
+                    "of accuracy\x1b[0m",
+                )
+            await asyncio.sleep(interval)
+
+    async def _handle_ota(self, reader: "StreamReader", writer: "StreamWriter") -> None:
+        try:
+            if await reader.readexactly(len(OTA_MAGIC)) != OTA_MAGIC:
+                writer.write(bytes([OTA_RESPONSE_ERROR_MAGIC]))
+                return
+            writer.write(bytes([OTA_RESPONSE_OK, OTA_VERSION_2_0]))
+            await reader.readexactly(1)  # client feature flags; we support none
+            writer.write(bytes([OTA_RESPONSE_HEADER_OK, OTA_RESPONSE_AUTH_OK]))
+
+            size = int.from_bytes(await reader.readexactly(4), "big")
+            writer.write(bytes([OTA_RESPONSE_UPDATE_PREPARE_OK]))
+            expected_md5 = (await reader.readexactly(32)).decode("ascii")
+            writer.write(bytes([OTA_RESPONSE_BIN_MD5_OK]))
+
+            image = bytearray()
+            while len(image) < size:
+                image += await reader.readexactly(
+                    min(OTA_BLOCK_SIZE, size - len(image))
+                )
+                writer.write(bytes([OTA_RESPONSE_CHUNK_OK]))
+                await writer.drain()
+
+            if hashlib.md5(image).hexdigest() != expected_md5:
+                writer.write(bytes([OTA_RESPONSE_ERROR_MD5_MISMATCH]))
+                return
+            writer.write(bytes([OTA_RESPONSE_RECEIVE_OK, OTA_RESPONSE_UPDATE_END_OK]))
+            await writer.drain()
+            await reader.readexactly(1)  # end acknowledgement
+        except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError):
+            logger.debug("OTA upload to '%s' aborted", self.name)
+            return
+        finally:
+            writer.close()
+
+        self._apply_firmware(bytes(image))
+        await self._reboot()
+
+    def _apply_firmware(self, image: bytes) -> None:
+        if image.startswith(MOCK_FIRMWARE_PREFIX):
+            header = image[len(MOCK_FIRMWARE_PREFIX) :].split(b"\n", 1)[0]
+            self.esphome_version = header.decode("utf-8", errors="replace")
+        self.compilation_time = datetime.now().strftime("%b %d %Y, %H:%M:%S")
+        logger.info(
+            "Mock device '%s' flashed %d bytes (version %s)",
+            self.name,
+            len(image),
+            self.esphome_version,
+        )
+
+    async def _reboot(self) -> None:
+        self._rebooting = True
+        for client in list(self._clients):
+            client.close()
+        try:
+            await asyncio.sleep(self.reboot_delay)
+        finally:
+            self._rebooting = False
+
+
+def _offset_mac(mac: str, offset: int) -> str:
+    value = (int(mac.replace(":", ""), 16) + offset) % (1 << 48)
+    digits = f"{value:012X}"
+    return ":".join(digits[i : i + 2] for i in range(0, 12, 2))
+
+
+async def start_mock_fleet(
+    size: int,
+    profile: FaultProfile | None = None,
+    device_class: type[MockESPHomeDevice] = MockESPHomeDevice,
+    **kwargs: Any,
+) -> list[MockESPHomeDevice]:
+    """Start ``size`` unadvertised mocks on 127.0.0.2, .3, ... sharing one port.
+
+    Each device draws its faults from ``profile``, so a seed reproduces the
+    whole fleet's misbehaviour. ``kwargs`` go to every ``device_class``.
+    """
+    devices: list[MockESPHomeDevice] = []
+    port = 0
+    for n in range(size):
+        name = f"mock-{n}"
+        device = device_class(
+            name=name,
+            mac_address=_offset_mac("AA:BB:CC:00:00:00", n),
+            host=f"127.0.0.{n + 2}",
+            port=port,
+            advertise=False,
+            faults=profile.sample(name) if profile else Faults(),
+            **kwargs,
+        )
+        await device.start()
+        port = device.port
+        devices.append(device)
+    return devices
+
 
 async def run_mock_device(
     name: str = "mock-switch-1",
     port: int = 6053,
     friendly_name: str | None = None,
     mac_address: str = "AA:BB:CC:DD:EE:FF",
+    ota_port: int | None = None,
+    ble_devices: int = 0,
+    sensor_interval: float = 0.0,
+    faults: FaultProfile | None = None,
+    count: int = 1,
+    device_class: type[MockESPHomeDevice] = MockESPHomeDevice,
+    **kwargs: Any,
 ) -> None:
-    device = MockESPHomeDevice(
-        name=name,
-        friendly_name=friendly_name or name.replace("-", " ").title(),
-        mac_address=mac_address,
-        port=port,
-    )
-    await device.run_forever()
+    devices = []
+    for n in range(count):
+        # Further devices get their own name, port and MAC
+        device_name = f"{name}-{n + 1}" if count > 1 else name
+        device = device_class(
+            name=device_name,
+            friendly_name=friendly_name or device_name.replace("-", " ").title(),
+            mac_address=_offset_mac(mac_address, n),
+            port=port + n,
+            ota_port=None if ota_port is None else ota_port + n,
+            ble_devices=ble_devices,
+            sensor_interval=sensor_interval,
+            faults=faults.sample(device_name) if faults else Faults(),
+            **kwargs,
+        )
+        await device.start()
+        devices.append(device)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for device in devices:
+            await device.stop()
@@ -0,0 +1,92 @@
+"""Misbehaviour a mock device can inject, fixed or drawn per device.
+
+A :class:`FaultProfile` holds a range for each fault; every mock in a fleet
+draws its own :class:`Faults` from it with a generator seeded from the
+profile seed and the device name, so a benchmark replays the same fleet.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field, fields, replace
+from typing import Any
+
+
+@dataclass(frozen=True)
+class Faults:
+    # Seconds before answering the hello, as on a busy or far-away device
+    handshake_delay: float = 0.0
+    # Seconds added before every frame sent, plus up to ``jitter`` more
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Mean seconds until a connection is dropped (exponential); 0 never drops
+    disconnect_after: float = 0.0
+    # Chance that a connection is accepted but never answered
+    half_open: float = 0.0
+    # Seconds between socket reads, so the client's writes back up
+    read_delay: float = 0.0
+    # Receive buffer (SO_RCVBUF) of the listening socket in bytes; 0 keeps the default
+    recv_buffer: int = 0
+    # Mean seconds between withdrawing and re-announcing the mDNS service
+    mdns_flap: float = 0.0
+    seed: int = 0
+
+    def __bool__(self) -> bool:
+        return any(
+            getattr(self, spec.name) for spec in fields(self) if spec.name != "seed"
+        )
+
+    def rng(self, name: str) -> random.Random:
+        """The generator a device named ``name`` draws its faults from."""
+        return random.Random(f"{self.seed}:{name}")
+
+    def delay(self, rng: random.Random) -> float:
+        return self.latency + (rng.uniform(0.0, self.jitter) if self.jitter else 0.0)
+
+
+FAULT_NAMES = tuple(spec.name for spec in fields(Faults) if spec.name != "seed")
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+    """Per-fault ``(low, high)`` ranges that devices draw from uniformly."""
+
+    ranges: dict[str, tuple[float, float]] = field(default_factory=dict)
+    seed: int = 0
+
+    def sample(self, name: str) -> Faults:
+        rng = random.Random(f"{self.seed}:{name}:profile")
+        values: dict[str, Any] = {}
+        for fault in FAULT_NAMES:
+            if fault not in self.ranges:
+                continue
+            low, high = self.ranges[fault]
+            value = rng.uniform(low, high) if high > low else low
+            values[fault] = int(value) if fault == "recv_buffer" else value
+        return replace(Faults(seed=self.seed), **values)
+
+
+def parse_faults(spec: str, seed: int = 0) -> FaultProfile:
+    """Parse ``latency=0.05,jitter=0..0.2,half-open=0.1`` into a profile.
+
+    A single value applies to every device; ``low..high`` draws per device.
+    """
+    ranges: dict[str, tuple[float, float]] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, sep, value = item.partition("=")
+        fault = key.strip().replace("-", "_")
+        if not sep or fault not in FAULT_NAMES:
+            known = ", ".join(name.replace("_", "-") for name in FAULT_NAMES)
+            raise ValueError(f"unknown fault '{key.strip()}' (known: {known})")
+        low_text, dots, high_text = value.partition("..")
+        try:
+            low = float(low_text)
+            high = float(high_text) if dots else low
+        except ValueError:
+            raise ValueError(f"invalid value for {fault}: '{value}'") from None
+        if low < 0 or high < low:
+            raise ValueError(f"invalid range for {fault}: '{value}'")
+        if fault == "half_open" and high > 1:
+            raise ValueError("half-open is a probability between 0 and 1")
+        ranges[fault] = (low, high)
+    return FaultProfile(ranges, seed)
@@ -0,0 +1,141 @@
+"""Espressif hardware candidates from the kernel neighbor (ARP) table."""
+
+from __future__ import annotations
+
+import logging
+import shutil
+import subprocess
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PROC_ARP = Path("/proc/net/arp")
+# ATF_COM: the entry holds a resolved hardware address
+_ARP_COMPLETE = 0x2
+
+# IEEE MA-L assignments to Espressif Inc.
+_ESPRESSIF_PREFIXES = (
+    "08:3A:8D", "08:3A:F2", "08:B6:1F", "08:D1:F9", "08:F9:E0", "0C:8B:95",
+    "0C:B8:15", "0C:DC:7E", "10:06:1C", "10:52:1C", "10:91:A8", "10:97:BD",
+    "14:2B:2F", "18:8B:0E", "18:FE:34", "1C:69:20", "1C:9D:C2", "24:0A:C4",
+    "24:4C:AB", "24:58:7C", "24:62:AB", "24:6F:28", "24:A1:60", "24:B2:DE",
+    "24:D7:EB", "24:DC:C3", "24:EC:4A", "28:37:2F", "2C:3A:E8", "2C:BC:BB",
+    "2C:F4:32", "30:30:F9", "30:83:98", "30:AE:A4", "30:C6:F7", "34:5F:45",
+    "34:85:18", "34:86:5D", "34:94:54", "34:98:7A", "34:AB:95", "34:B4:72",
+    "34:CD:B0", "38:18:2B", "3C:61:05", "3C:71:BF", "3C:84:27", "3C:E9:0E",
+    "40:22:D8", "40:4C:CA", "40:91:51", "40:F5:20", "44:17:93", "48:27:E2",
+    "48:31:B7", "48:3F:DA", "48:55:19", "48:CA:43", "48:E7:29", "4C:11:AE",
+    "4C:75:25", "4C:EB:D6", "50:02:91", "54:32:04", "54:43:B2", "54:5A:A6",
+    "58:BF:25", "58:CF:79", "5C:CF:7F", "60:01:94", "60:55:F9", "64:B7:08",
+    "64:E8:33", "68:67:25", "68:B6:B3", "68:C6:3A", "70:03:9F", "70:04:1D",
+    "70:B8:F6", "74:4D:BD", "78:1C:3C", "78:21:84", "78:42:1C", "78:E3:6D",
+    "7C:87:CE", "7C:9E:BD", "7C:DF:A1", "80:64:6F", "80:65:99", "80:7D:3A",
+    "84:0D:8E", "84:1F:E8", "84:CC:A8", "84:F3:EB", "84:F7:03", "84:FC:E6",
+    "88:13:BF", "8C:4B:14", "8C:AA:B5", "8C:CE:4E", "90:15:06", "90:38:0C",
+    "90:97:D5", "94:3C:C6", "94:54:C5", "94:B5:55", "94:B9:7E", "94:E6:86",
+    "98:3D:AE", "98:88:E0", "98:CD:AC", "98:F4:AB", "A0:20:A6", "A0:76:4E",
+    "A0:A3:B3", "A0:B7:65", "A0:DD:6C", "A4:7B:9D", "A4:CF:12", "A4:E5:7C",
+    "A8:03:2A", "A8:42:E3", "A8:46:74", "A8:48:FA", "AC:0B:FB", "AC:67:B2",
+    "AC:D0:74", "B0:81:84", "B0:A7:32", "B0:B2:1C", "B4:3A:45", "B4:8A:0A",
+    "B4:E6:2D", "B8:D6:1A", "B8:F0:09", "BC:DD:C2", "BC:FF:4D", "C0:49:EF",
+    "C0:4E:30", "C4:4F:33", "C4:5B:BE", "C4:DD:57", "C4:DE:E2", "C8:2B:96",
+    "C8:2E:18", "C8:C9:A3", "C8:F0:9E", "CC:50:E3", "CC:7B:5C", "CC:8D:A2",
+    "CC:DB:A7", "D0:EF:76", "D4:8A:FC", "D4:D4:DA", "D4:F9:8D", "D8:13:2A",
+    "D8:A0:1D", "D8:BC:38", "D8:BF:C0", "D8:F1:5B", "DC:06:75", "DC:1E:D5",
+    "DC:4F:22", "DC:54:75", "DC:DA:0C", "E0:5A:1B", "E0:98:06", "E0:E2:E6",
+    "E4:65:B8", "E4:B0:63", "E8:06:90", "E8:31:CD", "E8:68:E7", "E8:6B:EA",
+    "E8:9F:6D", "E8:DB:84", "EC:62:60", "EC:64:C9", "EC:94:CB", "EC:C9:FF",
+    "EC:DA:3B", "EC:FA:BC", "F0:08:D1", "F0:9E:9E", "F0:F5:BD", "F4:12:FA",
+    "F4:65:0B", "F4:CF:A2", "FC:01:2C", "FC:B4:67", "FC:E8:C0", "FC:F5:C4",
+)  # fmt: skip
+
+ESPRESSIF_OUIS = array(
+    "I", sorted({int(p.replace(":", ""), 16) for p in _ESPRESSIF_PREFIXES})
+)
+
+
+@dataclass(frozen=True)
+class Neighbor:
+    ip: str
+    mac: str
+    interface: str
+
+
+def mac_oui(mac: str) -> int | None:
+    """The 24-bit OUI of ``mac`` in any common notation, or None."""
+    digits = mac.replace(":", "").replace("-", "").replace(".", "")
+    if len(digits) != 12:
+        return None
+    try:
+        return int(digits[:6], 16)
+    except ValueError:
+        return None
+
+
+def is_espressif(mac: str) -> bool:
+    oui = mac_oui(mac)
+    if oui is None:
+        return False
+    index = bisect_left(ESPRESSIF_OUIS, oui)
+    return index < len(ESPRESSIF_OUIS) and ESPRESSIF_OUIS[index] == oui
+
+
+def parse_proc_arp(text: str) -> list[Neighbor]:
+    neighbors = []
+    for line in text.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 6:
+            continue
+        ip, _hw_type, flags, mac, _mask, device = fields[:6]
+        if not int(flags, 16) & _ARP_COMPLETE or mac == "00:00:00:00:00:00":
+            continue
+        neighbors.append(Neighbor(ip, mac.upper(), device))
+    return neighbors
+
+
+def parse_ip_neigh(text: str) -> list[Neighbor]:
+    """Parse ``ip -4 neigh show`` output, skipping unresolved entries."""
+    neighbors = []
+    for line in text.splitlines():
+        fields = line.split()
+        if "lladdr" not in fields or "dev" not in fields:
+            continue
+        if fields[-1] in ("FAILED", "INCOMPLETE"):
+            continue
+        mac = fields[fields.index("lladdr") + 1]
+        device = fields[fields.index("dev") + 1]
+        neighbors.append(Neighbor(fields[0], mac.upper(), device))
+    return neighbors
+
+
+def read_neighbors() -> list[Neighbor]:
+    """IPv4 neighbors from /proc/net/arp, falling back to ``ip neigh``."""
+    try:
+        return parse_proc_arp(PROC_ARP.read_text())
+    except OSError:
+        pass
+
+    ip_cmd = shutil.which("ip")
+    if ip_cmd is None:
+        logger.debug("No neighbor table source available")
+        return []
+    try:
+        result = subprocess.run(
+            [ip_cmd, "-4", "neigh", "show"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            check=True,
+        )
+    except (OSError, subprocess.SubprocessError) as exc:
+        logger.debug("Reading neighbor table failed: %s", exc)
+        return []
+    return parse_ip_neigh(result.stdout)
+
+
+def espressif_neighbors() -> list[Neighbor]:
+    """Neighbors whose MAC belongs to Espressif, i.e. likely ESP8266/ESP32."""
+    return [neighbor for neighbor in read_neighbors() if is_espressif(neighbor.mac)]
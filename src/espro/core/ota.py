@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import aioesphomeapi
+
+from espro.config import ScanningConfig
+
+from .esphome_lib import esphome_module
+from .health import PROBE_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# ESPHome's default native OTA ports per platform
+OTA_PORT_ESP32 = 3232
+OTA_PORT_ESP8266 = 8266
+OTA_PORT_RP2040 = 2040
+
+STATUS_UPDATED = "updated"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+Uploader = Callable[[str, int, str | None, Path], Awaitable[None]]
+
+
+class OTAError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class OTATarget:
+    logical: str
+    host: str
+    ota_port: int
+
+
+@dataclass
+class OTAOutcome:
+    logical: str
+    host: str
+    wave: int
+    status: str
+    version: str | None = None
+    error: str | None = None
+    seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class RolloutOptions:
+    canary: int = 1
+    wave_size: int = 10
+    concurrency: int = 10
+    max_failures: int = 0
+    gate_timeout: float = 120.0
+    poll_interval: float = 2.0
+    password: str | None = None
+    expected_version: str | None = None
+
+
+def default_ota_port(model: str) -> int:
+    normalized = model.upper()
+    if "8266" in normalized:
+        return OTA_PORT_ESP8266
+    if "RP2040" in normalized:
+        return OTA_PORT_RP2040
+    return OTA_PORT_ESP32
+
+
+def plan_waves(names: list[str], canary: int, wave_size: int) -> list[list[str]]:
+    """Split ``names`` into a canary wave followed by waves of ``wave_size``."""
+    waves: list[list[str]] = []
+    remaining = list(names)
+    if canary > 0 and remaining:
+        waves.append(remaining[:canary])
+        remaining = remaining[canary:]
+    size = max(wave_size, 1)
+    waves.extend(remaining[i : i + size] for i in range(0, len(remaining), size))
+    return waves
+
+
+async def esphome_upload(
+    host: str, port: int, password: str | None, firmware: Path
+) -> None:
+    """Upload ``firmware`` with ESPHome's own OTA client in a worker thread."""
+    espota2 = esphome_module("espota2")
+    code, _ = await asyncio.to_thread(espota2.run_ota, host, port, password, firmware)
+    if code != 0:
+        raise OTAError(f"Upload to {host}:{port} failed")
+
+
+def _build_name(config_path: Path) -> str:
+    """Node name ESPHome built ``config_path`` under.
+
+    ESPHome names the build directory after ``esphome: name:`` and records it
+    in ``.esphome/storage/<config file>.json``; fall back to the file stem.
+    """
+    storage = config_path.parent / ".esphome" / "storage" / f"{config_path.name}.json"
+    try:
+        name = json.loads(storage.read_text()).get("name")
+    except (OSError, ValueError, AttributeError):
+        name = None
+    return name if isinstance(name, str) and name else config_path.stem
+
+
+def compile_firmware(config_path: Path) -> Path:
+    """Compile an ESPHome YAML and return the resulting OTA image."""
+    subprocess.run(
+        [sys.executable, "-m", "esphome", "compile", str(config_path)], check=True
+    )
+    build_dir = config_path.parent / ".esphome" / "build" / _build_name(config_path)
+    for image in ("firmware.ota.bin", "firmware.bin"):
+        candidates = list(build_dir.glob(f".pioenvs/*/{image}"))
+        if candidates:
+            return max(candidates, key=lambda path: path.stat().st_mtime)
+    raise OTAError(f"No firmware image found under {build_dir}")
+
+
+async def fetch_build(host: str, config: ScanningConfig) -> tuple[str, str] | None:
+    """Return ``(esphome_version, compilation_time)`` or None if unreachable."""
+    client = aioesphomeapi.APIClient(host, port=config.port, password="")
+    try:
+        await asyncio.wait_for(
+            client.connect(login=True, log_errors=False), timeout=config.timeout
+        )
+        info = await asyncio.wait_for(client.device_info(), timeout=config.timeout)
+        return info.esphome_version, info.compilation_time
+    except PROBE_ERRORS:
+        return None
+    finally:
+        with contextlib.suppress(*PROBE_ERRORS):
+            await client.disconnect()
+
+
+async def wait_for_update(
+    host: str,
+    config: ScanningConfig,
+    options: RolloutOptions,
+    previous_build: str,
+) -> str:
+    """Poll until the device is back on new firmware; return its version."""
+    deadline = time.monotonic() + options.gate_timeout
+    seen: tuple[str, str] | None = None
+    while time.monotonic() < deadline:
+        seen = await fetch_build(host, config)
+        if seen is not None:
+            version, build = seen
+            version_ok = (
+                options.expected_version is None or version == options.expected_version
+            )
+            if version_ok and build != previous_build:
+                return version
+        await asyncio.sleep(options.poll_interval)
+
+    if seen is None:
+        raise OTAError("device did not come back online")
+    raise OTAError(
+        f"device is online at {seen[0]} "
+        f"(expected {options.expected_version or 'a new build'})"
+    )
+
+
+async def _update_one(
+    target: OTATarget,
+    wave: int,
+    firmware: Path,
+    config: ScanningConfig,
+    options: RolloutOptions,
+    uploader: Uploader,
+) -> OTAOutcome:
+    started = time.perf_counter()
+    outcome = OTAOutcome(logical=target.logical, host=target.host, wave=wave, status="")
+    try:
+        # Without the running build there is no telling the new firmware
+        # from the old one answering again before it reboots
+        before = await fetch_build(target.host, config)
+        if before is None:
+            raise OTAError("device is not reachable before the upload")
+        await uploader(target.host, target.ota_port, options.password, firmware)
+        outcome.version = await wait_for_update(target.host, config, options, before[1])
+        outcome.status = STATUS_UPDATED
+    except (OTAError, *PROBE_ERRORS) as exc:
+        outcome.status = STATUS_FAILED
+        outcome.error = str(exc) or type(exc).__name__
+        logger.warning("OTA of '%s' failed: %s", target.logical, outcome.error)
+    outcome.seconds = time.perf_counter() - started
+    return outcome
+
+
+async def run_rollout(
+    targets: list[OTATarget],
+    firmware: Path,
+    config: ScanningConfig,
+    options: RolloutOptions,
+    uploader: Uploader = esphome_upload,
+    on_outcome: Callable[[OTAOutcome], None] | None = None,
+) -> list[OTAOutcome]:
+    """Upload in canary-first waves, gating each wave on post-update health."""
+    by_name = {target.logical: target for target in targets}
+    waves = plan_waves(
+        [target.logical for target in targets], options.canary, options.wave_size
+    )
+    semaphore = asyncio.Semaphore(max(options.concurrency, 1))
+    outcomes: list[OTAOutcome] = []
+    failures = 0
+
+    async def _bounded(name: str, wave: int) -> OTAOutcome:
+        async with semaphore:
+            outcome = await _update_one(
+                by_name[name], wave, firmware, config, options, uploader
+            )
+        if on_outcome:
+            on_outcome(outcome)
+        return outcome
+
+    for index, wave in enumerate(waves, start=1):
+        if failures > options.max_failures:
+            for name in wave:
+                skipped = OTAOutcome(
+                    logical=name,
+                    host=by_name[name].host,
+                    wave=index,
+                    status=STATUS_SKIPPED,
+                    error="rollout halted",
+                )
+                outcomes.append(skipped)
+                if on_outcome:
+                    on_outcome(skipped)
+            continue
+
+        logger.info("OTA wave %d/%d: %s", index, len(waves), ", ".join(wave))
+        results = await asyncio.gather(*(_bounded(name, index) for name in wave))
+        outcomes.extend(results)
+        failures += sum(1 for result in results if result.status == STATUS_FAILED)
+        if failures > options.max_failures:
+            logger.error(
+                "Halting rollout after wave %d: %d failure(s) exceed threshold %d",
+                index,
+                failures,
+                options.max_failures,
+            )
+
+    return outcomes
@@ -0,0 +1,310 @@
+"""Short-term per-entity history in fixed-size, memory-mapped ring buffers.
+
+Every entity gets one file under ``series/<logical>/<entity>.ts`` holding
+three rings of float64s: raw samples, 1-minute and 15-minute aggregates
+(mean, min, max). Each sample also feeds the open aggregate buckets, which
+are written to their ring when the next bucket starts. Files never grow,
+so disk use and resident memory are bounded, and a restart just maps the
+files again. Readers map them read-only and see the writer's samples
+immediately.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import mmap
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ESPROTS1"
+SUFFIX = ".ts"
+# (bucket seconds, slots, doubles per slot); bucket 0 keeps raw samples
+TIERS = ((0, 4096, 2), (60, 1440, 4), (900, 672, 4))
+TIER_LABELS = ("raw samples", "1-min averages", "15-min averages")
+# Header, in doubles: the magic, then head and count per tier, then the
+# open bucket (start, sum, min, max, n) of every aggregated tier
+HEADER = 32
+_HEAD = 1
+_PENDING = 1 + 2 * len(TIERS)
+_PENDING_FIELDS = 5
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+MAX_OPEN = 256
+
+# (timestamp, mean, min, max); raw samples repeat the value
+Point = tuple[float, float, float, float]
+
+
+def _offsets() -> tuple[list[int], int]:
+    offsets = []
+    position = HEADER
+    for _bucket, slots, width in TIERS:
+        offsets.append(position)
+        position += slots * width
+    return offsets, position * 8
+
+
+_TIER_OFFSETS, FILE_SIZE = _offsets()
+
+
+def _name(value: str) -> str:
+    return quote(value, safe="")
+
+
+def series_path(directory: Path, logical: str, entity: str) -> Path:
+    return directory / _name(logical) / f"{_name(entity)}{SUFFIX}"
+
+
+class Series:
+    """One entity's rings, mapped from its file."""
+
+    def __init__(self, path: Path, writable: bool = True) -> None:
+        self.path = path
+        if writable:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        else:
+            fd = os.open(path, os.O_RDONLY)
+        try:
+            fresh = os.fstat(fd).st_size != FILE_SIZE
+            if fresh and writable:
+                if os.fstat(fd).st_size:
+                    logger.warning("Resetting %s: unexpected size", path)
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, FILE_SIZE)
+            elif fresh:
+                raise ValueError(f"{path} is not a series file")
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            self._map = mmap.mmap(fd, FILE_SIZE, access=access)
+        finally:
+            os.close(fd)
+        if fresh:
+            self._map[:8] = MAGIC
+        elif self._map[:8] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a series file")
+        self._values = memoryview(self._map).cast("d")
+
+    def close(self) -> None:
+        self._values.release()
+        self._map.close()
+
+    def _put(self, tier: int, values: tuple[float, ...]) -> None:
+        _bucket, slots, width = TIERS[tier]
+        data = self._values
+        head = int(data[_HEAD + 2 * tier])
+        start = _TIER_OFFSETS[tier] + head * width
+        for index, value in enumerate(values):
+            data[start + index] = value
+        data[_HEAD + 2 * tier] = (head + 1) % slots
+        data[_HEAD + 2 * tier + 1] = min(data[_HEAD + 2 * tier + 1] + 1, slots)
+
+    def append(self, value: float, timestamp: float | None = None) -> None:
+        timestamp = time.time() if timestamp is None else timestamp
+        self._put(0, (timestamp, value))
+        data = self._values
+        for tier in range(1, len(TIERS)):
+            bucket = TIERS[tier][0]
+            base = _PENDING + _PENDING_FIELDS * (tier - 1)
+            start = timestamp - timestamp % bucket
+            count = data[base + 4]
+            if count and data[base] != start:
+                self._put(
+                    tier,
+                    (
+                        data[base],
+                        data[base + 1] / count,
+                        data[base + 2],
+                        data[base + 3],
+                    ),
+                )
+                count = 0
+            if count:
+                data[base + 1] += value
+                data[base + 2] = min(data[base + 2], value)
+                data[base + 3] = max(data[base + 3], value)
+                data[base + 4] = count + 1
+            else:
+                data[base] = start
+                data[base + 1] = value
+                data[base + 2] = value
+                data[base + 3] = value
+                data[base + 4] = 1
+
+    def _ring(self, tier: int) -> Iterator[Point]:
+        _bucket, slots, width = TIERS[tier]
+        data = self._values
+        head = int(data[_HEAD + 2 * tier])
+        count = int(data[_HEAD + 2 * tier + 1])
+        offset = _TIER_OFFSETS[tier]
+        for position in range(head - count, head):
+            start = offset + (position % slots) * width
+            if width == 2:
+                value = data[start + 1]
+                yield data[start], value, value, value
+            else:
+                yield data[start], data[start + 1], data[start + 2], data[start + 3]
+
+    def points(self, tier: int, since: float = 0.0) -> list[Point]:
+        """Chronological points of ``tier`` from ``since`` on.
+
+        Aggregated tiers end with the bucket still being filled.
+        """
+        points = [point for point in self._ring(tier) if point[0] >= since]
+        if tier:
+            base = _PENDING + _PENDING_FIELDS * (tier - 1)
+            data = self._values
+            count = data[base + 4]
+            if count and data[base] >= since:
+                points.append(
+                    (data[base], data[base + 1] / count, data[base + 2], data[base + 3])
+                )
+        return points
+
+    def oldest(self, tier: int) -> float | None:
+        first = next(self._ring(tier), None)
+        return first[0] if first else None
+
+    def last(self) -> tuple[float, float] | None:
+        _bucket, slots, width = TIERS[0]
+        data = self._values
+        if not data[_HEAD + 1]:
+            return None
+        start = _TIER_OFFSETS[0] + ((int(data[_HEAD]) - 1) % slots) * width
+        return data[start], data[start + 1]
+
+
+class Recorder:
+    """Appends state updates to their entity's series.
+
+    At most ``max_open`` files stay mapped; the least recently written are
+    unmapped first, which also bounds open file handles on large fleets.
+    """
+
+    def __init__(self, directory: Path, max_open: int = MAX_OPEN) -> None:
+        self.directory = directory
+        self._max_open = max_open
+        self._open: OrderedDict[tuple[str, str], Series] = OrderedDict()
+        self.samples = 0
+
+    def series(self, logical: str, entity: str) -> Series:
+        key = (logical, entity)
+        series = self._open.get(key)
+        if series is not None:
+            self._open.move_to_end(key)
+            return series
+        series = Series(series_path(self.directory, logical, entity))
+        self._open[key] = series
+        while len(self._open) > self._max_open:
+            self._open.popitem(last=False)[1].close()
+        return series
+
+    def record(
+        self, logical: str, entity: str, value: float, timestamp: float | None = None
+    ) -> None:
+        if math.isnan(value):
+            # ESPHome reports NaN while a sensor has no reading
+            return
+        self.series(logical, entity).append(value, timestamp)
+        self.samples += 1
+
+    def close(self) -> None:
+        while self._open:
+            self._open.popitem()[1].close()
+
+
+def recorded_entities(directory: Path, logical: str) -> list[str]:
+    folder = directory / _name(logical)
+    if not folder.is_dir():
+        return []
+    return sorted(
+        unquote(path.name.removesuffix(SUFFIX)) for path in folder.glob(f"*{SUFFIX}")
+    )
+
+
+def open_series(directory: Path, logical: str, entity: str) -> Series | None:
+    """Map an entity's series read-only; None if nothing was recorded."""
+    try:
+        return Series(series_path(directory, logical, entity), writable=False)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+@dataclass
+class Summary:
+    tier: int
+    points: int
+    last: float | None
+    minimum: float
+    mean: float
+    maximum: float
+    sparkline: str
+
+    @property
+    def tier_label(self) -> str:
+        return TIER_LABELS[self.tier]
+
+
+def sparkline(points: list[Point], since: float, until: float, width: int) -> str:
+    """Means of ``points`` in ``width`` equal time slices, as block characters."""
+    if not points or width < 1:
+        return ""
+    sums = [0.0] * width
+    counts = [0] * width
+    span = max(until - since, 1e-9)
+    for timestamp, mean, _low, _high in points:
+        column = min(int((timestamp - since) / span * width), width - 1)
+        if column >= 0:
+            sums[column] += mean
+            counts[column] += 1
+    means = [total / n if n else None for total, n in zip(sums, counts, strict=True)]
+    present = [mean for mean in means if mean is not None]
+    low, high = min(present), max(present)
+    scale = (len(SPARK_CHARS) - 1) / (high - low) if high > low else 0.0
+    return "".join(
+        " " if mean is None else SPARK_CHARS[round((mean - low) * scale)]
+        for mean in means
+    )
+
+
+def summarize(
+    series: Series, window: float, width: int = 60, now: float | None = None
+) -> Summary | None:
+    """Stats and a sparkline over the last ``window`` seconds.
+
+    Uses the finest tier that still reaches back to the window's start, or
+    else the one reaching back furthest.
+    """
+    now = time.time() if now is None else now
+    since = now - window
+    chosen = len(TIERS) - 1
+    for tier in range(len(TIERS)):
+        oldest = series.oldest(tier)
+        if oldest is not None and oldest <= since:
+            chosen = tier
+            break
+    else:
+        reach = [(series.oldest(tier), tier) for tier in range(len(TIERS))]
+        known = [(oldest, tier) for oldest, tier in reach if oldest is not None]
+        if known:
+            chosen = min(known)[1]
+    points = series.points(chosen, since)
+    if not points:
+        return None
+    last = series.last()
+    return Summary(
+        tier=chosen,
+        points=len(points),
+        last=last[1] if last else None,
+        minimum=min(point[2] for point in points),
+        mean=sum(point[1] for point in points) / len(points),
+        maximum=max(point[3] for point in points),
+        sparkline=sparkline(points, since, now, width),
+    )
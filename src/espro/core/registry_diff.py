@@ -0,0 +1,68 @@
+"""What changed between two versions of the device registry.
+
+Long-running processes reload ``devices.toml`` when it changes and act on
+the delta only: a new mapping connects one device, a removed one
+disconnects it, and a mapping pointed at another physical device rebinds
+it. Edits to roles, notes or configs touch no connection at all.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from espro.models import DeviceRegistry
+
+
+@dataclass
+class RegistryDiff:
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    # Logical names now mapped to a different physical device
+    rebound: list[str] = field(default_factory=list)
+    # Same physical device, other fields (role, notes, config) edited
+    updated: list[str] = field(default_factory=list)
+    rules_changed: bool = False
+
+    @property
+    def reconnects(self) -> list[str]:
+        """Devices whose sessions must start, stop or restart."""
+        return sorted(self.added + self.removed + self.rebound)
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.added
+            or self.removed
+            or self.rebound
+            or self.updated
+            or self.rules_changed
+        )
+
+    def describe(self) -> str:
+        parts = [
+            f"{label} {', '.join(names)}"
+            for label, names in (
+                ("added", self.added),
+                ("removed", self.removed),
+                ("rebound", self.rebound),
+                ("updated", self.updated),
+            )
+            if names
+        ]
+        if self.rules_changed:
+            parts.append("rules changed")
+        return "; ".join(parts) or "no changes"
+
+
+def diff_registries(old: DeviceRegistry, new: DeviceRegistry) -> RegistryDiff:
+    before, after = old.logical_devices, new.logical_devices
+    diff = RegistryDiff(
+        added=sorted(set(after) - set(before)),
+        removed=sorted(set(before) - set(after)),
+        rules_changed=old.rules != new.rules,
+    )
+    for name in sorted(set(before) & set(after)):
+        if before[name].physical != after[name].physical:
+            diff.rebound.append(name)
+        elif before[name] != after[name]:
+            diff.updated.append(name)
+    return diff
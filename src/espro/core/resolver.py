@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from fnmatch import fnmatchcase
+
+from espro.models import DeviceRegistry, PhysicalDevice, ScanResult
+
+
+def match_physical(
+    physical_ref: str,
+    by_ip: dict[str, PhysicalDevice],
+    by_name: dict[str, PhysicalDevice],
+) -> PhysicalDevice | None:
+    if physical_ref in by_ip:
+        return by_ip[physical_ref]
+    if physical_ref in by_name:
+        return by_name[physical_ref]
+    return by_name.get(physical_ref.replace(".local", ""))
+
+
+def resolve_hosts(registry: DeviceRegistry, scan: ScanResult | None) -> dict[str, str]:
+    """Map logical names to the best known address for their physical device.
+
+    Devices present in the scan resolve to their IP; anything else falls back to
+    the literal physical reference so the API client can resolve it itself.
+    """
+    devices = scan.devices if scan else []
+    by_ip = {device.ip: device for device in devices}
+    by_name = {device.name: device for device in devices}
+
+    hosts: dict[str, str] = {}
+    for logical_name, logical_device in registry.logical_devices.items():
+        found = match_physical(logical_device.physical, by_ip, by_name)
+        hosts[logical_name] = found.ip if found else logical_device.physical
+    return hosts
+
+
+def select_logical(registry: DeviceRegistry, targets: str | None) -> list[str]:
+    """Return logical names matching comma-separated ``targets`` selectors.
+
+    A selector is a glob over logical names (``kitchen_*``) or over roles
+    (``role:plug*``). ``None`` or an empty string selects every device.
+    """
+    names = sorted(registry.logical_devices)
+    if not targets:
+        return names
+
+    selected: set[str] = set()
+    for selector in (part.strip() for part in targets.split(",")):
+        if not selector:
+            continue
+        if selector.startswith("role:"):
+            pattern = selector.removeprefix("role:")
+            selected.update(
+                name
+                for name in names
+                if (role := registry.logical_devices[name].role)
+                and fnmatchcase(role, pattern)
+            )
+        else:
+            selected.update(name for name in names if fnmatchcase(name, selector))
+    return [name for name in names if name in selected]
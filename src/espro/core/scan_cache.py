@@ -0,0 +1,91 @@
+"""Shared policy for reusing the saved scan.
+
+Commands that need discovery results reuse ``current.json`` while it is
+younger than ``max_age``. Otherwise they run an early-exit discovery seeded
+with the last-known addresses and save it, so a cron job running several
+commands in a row discovers once. A lock file makes concurrent commands
+wait for a discovery already in flight instead of starting their own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from espro.config import ScanningConfig
+from espro.database import Database
+from espro.models import ScanResult
+
+from .scanner import scan_network
+
+if sys.platform != "win32":
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+
+def scan_age(scan: ScanResult, now: datetime | None = None) -> float:
+    """Seconds since ``scan`` was taken."""
+    now = now or datetime.now(timezone.utc)
+    return (now - scan.scan_timestamp).total_seconds()
+
+
+def _fresh(scan: ScanResult | None, max_age: float) -> bool:
+    return scan is not None and scan_age(scan) <= max_age
+
+
+@asynccontextmanager
+async def _discovery_lock(path: Path) -> AsyncIterator[None]:
+    if sys.platform == "win32":
+        yield
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as handle:
+        await asyncio.to_thread(fcntl.flock, handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+async def get_scan(
+    db: Database,
+    config: ScanningConfig,
+    max_age: float | None = None,
+    live: bool = False,
+) -> tuple[ScanResult | None, bool]:
+    """The saved scan if fresh enough, else a new discovery.
+
+    ``max_age`` defaults to ``config.max_age``; ``live`` always discovers.
+    Returns the scan and whether it was discovered just now. A discovery
+    that finds nothing keeps (and returns) the saved scan.
+    """
+    max_age = config.max_age if max_age is None else max_age
+    scan = db.load_current_scan()
+    if not live and _fresh(scan, max_age):
+        return scan, False
+
+    async with _discovery_lock(db.scan_lock_path):
+        if not live:
+            # Another command may have refreshed it while we waited
+            scan = db.load_current_scan()
+            if _fresh(scan, max_age):
+                return scan, False
+        network = config.default_network
+        discovery = await scan_network(
+            network,
+            config,
+            known=scan.devices if scan else None,
+            fast=True,
+            missing=scan.missing if scan else None,
+        )
+        if not discovery.devices:
+            logger.warning("Discovery found no devices; keeping the saved scan")
+            return scan, False
+        db.save_scan(discovery.devices, network, discovery.missing)
+    return db.load_current_scan(), True
@@ -1,21 +1,53 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import ipaddress
 import logging
 import socket
 import string
 import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 
 import aioesphomeapi
-from zeroconf import ServiceBrowser, ServiceInfo, ServiceListener, Zeroconf
+import ifaddr
+from zeroconf import (
+    InterfaceChoice,
+    ServiceBrowser,
+    ServiceInfo,
+    ServiceListener,
+    Zeroconf,
+)
 
 from espro.config import ScanningConfig
-from espro.models import PhysicalDevice
+from espro.models import ConnectLatency, PhysicalDevice
+from espro.utils.timing import span
+
+from .latency import MAX_MISSES, deadline, observe, observe_miss
+from .neighbors import Neighbor, espressif_neighbors
 
 logger = logging.getLogger(__name__)
 
 MDNS_SERVICE_TYPE = "_esphomelib._tcp.local."
+ALL_INTERFACES = "*"
+
+
+@dataclass
+class Discovery:
+    devices: list[PhysicalDevice]
+    # Devices with latency history that missed their probe and were not
+    # announced, carried to the next scan
+    missing: list[PhysicalDevice] = field(default_factory=list)
+    # Espressif entries of the neighbor table, read when arp_prefilter is on
+    neighbors: list[Neighbor] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class BrowseInterface:
+    label: str
+    address: str
 
 
 def _decode_txt_properties(properties: dict[bytes, bytes | None]) -> dict[str, str]:
@@ -109,10 +141,12 @@ class ESPHomeListener(ServiceListener):
         self._found: dict[str, PhysicalDevice] = {}
 
     def add_service(self, zc: Zeroconf, type_: str, name: str) -> None:
-        info = zc.get_service_info(type_, name, timeout=self._info_timeout_ms)
+        with span("mdns.service_info"):
+            info = zc.get_service_info(type_, name, timeout=self._info_timeout_ms)
         if not info:
             return
-        device = _device_from_service_info(info, name)
+        with span("mdns.parse"):
+            device = _device_from_service_info(info, name)
         if device is None:
             return
         with self._lock:
@@ -131,15 +165,23 @@ class ESPHomeListener(ServiceListener):
             return list(self._found.values())
 
 
-async def check_device(ip: str, config: ScanningConfig) -> PhysicalDevice | None:
+async def _timed_check(
+    ip: str, config: ScanningConfig, timeout: float | None
+) -> tuple[PhysicalDevice, float] | None:
+    """The device at ``ip`` and how long it took to answer, or None."""
     logger.debug("Checking %s", ip)
     try:
         api = aioesphomeapi.APIClient(ip, port=config.port, password="")
-        await asyncio.wait_for(
-            api.connect(login=True, log_errors=False),
-            timeout=config.timeout,
+        started = time.perf_counter()
+
+        async def _connect() -> aioesphomeapi.DeviceInfo:
+            await api.connect(login=True, log_errors=False)
+            return await api.device_info()
+
+        info = await asyncio.wait_for(
+            _connect(), timeout=config.timeout if timeout is None else timeout
         )
-        info = await api.device_info()
+        elapsed = time.perf_counter() - started
         await api.disconnect()
         device = PhysicalDevice(
             ip=ip,
@@ -149,8 +191,10 @@ async def check_device(ip: str, config: ScanningConfig) -> PhysicalDevice | None
             model=info.model,
             esphome_version=info.esphome_version,
         )
-        logger.debug("Found device '%s' at %s", device.name, ip)
-        return device
+        logger.debug(
+            "Found device '%s' at %s in %.0fms", device.name, ip, elapsed * 1000
+        )
+        return device, elapsed
     except (asyncio.TimeoutError, TimeoutError):
         logger.debug("No response from %s (timeout)", ip)
         return None
@@ -164,33 +208,308 @@ async def check_device(ip: str, config: ScanningConfig) -> PhysicalDevice | None
         return None
 
 
-async def scan_network(network: str, config: ScanningConfig) -> list[PhysicalDevice]:
+async def check_device(
+    ip: str, config: ScanningConfig, timeout: float | None = None
+) -> PhysicalDevice | None:
+    """Connect and read device info within ``timeout`` (default ``config.timeout``).
+
+    The returned device's ``latency`` holds how long that took.
+    """
+    checked = await _timed_check(ip, config, timeout)
+    if checked is None:
+        return None
+    device, elapsed = checked
+    return device.model_copy(update={"latency": ConnectLatency(mean=elapsed)})
+
+
+def _ipv4_interfaces() -> list[tuple[str, ipaddress.IPv4Interface]]:
+    found = []
+    for adapter in ifaddr.get_adapters():
+        for ip in adapter.ips:
+            if ip.is_IPv4:
+                address = ipaddress.IPv4Interface(f"{ip.ip}/{ip.network_prefix}")
+                found.append((adapter.nice_name, address))
+    return found
+
+
+def resolve_interfaces(entries: Iterable[str]) -> list[BrowseInterface]:
+    """Map interface names, local addresses or subnets to local IPv4 addresses."""
+    local = _ipv4_interfaces()
+    resolved: dict[str, BrowseInterface] = {}
+    for entry in entries:
+        network: ipaddress.IPv4Network | ipaddress.IPv6Network | None
+        try:
+            network = ipaddress.ip_network(entry, strict=False)
+        except ValueError:
+            network = None
+
+        matched = False
+        for name, interface in local:
+            if entry == ALL_INTERFACES:
+                selected = not interface.ip.is_loopback
+            elif network is not None:
+                selected = interface.ip in network
+            else:
+                selected = name == entry
+            if selected:
+                matched = True
+                address = str(interface.ip)
+                resolved.setdefault(address, BrowseInterface(name, address))
+        if not matched:
+            logger.warning("No local IPv4 address matches scan interface '%s'", entry)
+    return list(resolved.values())
+
+
+async def _browse(
+    config: ScanningConfig,
+    interface: BrowseInterface | None = None,
+    stop: asyncio.Event | None = None,
+) -> list[PhysicalDevice]:
+    interfaces = [interface.address] if interface else InterfaceChoice.All
+    label = interface.label if interface else None
+    try:
+        with span("scan.zeroconf_start"):
+            zeroconf = Zeroconf(interfaces=interfaces)
+            listener = ESPHomeListener(config.timeout)
+            ServiceBrowser(zeroconf, MDNS_SERVICE_TYPE, listener)
+    except OSError as exc:
+        if interface is None:
+            raise
+        logger.warning("Cannot browse on %s (%s): %s", label, interface.address, exc)
+        return []
+    try:
+        with span("scan.mdns_browse"):
+            if stop is None:
+                await asyncio.sleep(config.timeout)
+            else:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(stop.wait(), config.timeout)
+    finally:
+        with span("scan.zeroconf_close"):
+            await asyncio.to_thread(zeroconf.close)
+
+    devices = listener.devices()
+    if label is not None:
+        devices = [device.model_copy(update={"interface": label}) for device in devices]
+    return devices
+
+
+def merge_devices(results: Iterable[list[PhysicalDevice]]) -> list[PhysicalDevice]:
+    """Drop devices already seen by MAC or name; earlier results win."""
+    seen_macs: set[str] = set()
+    seen_names: set[str] = set()
+    merged = []
+    for devices in results:
+        for device in devices:
+            if device.mac_address in seen_macs or device.name in seen_names:
+                continue
+            if device.mac_address:
+                seen_macs.add(device.mac_address)
+            seen_names.add(device.name)
+            merged.append(device)
+    return merged
+
+
+def _latency_key(device: PhysicalDevice) -> str:
+    return device.mac_address or device.name
+
+
+async def _probe_known(
+    known: list[PhysicalDevice], config: ScanningConfig
+) -> tuple[list[PhysicalDevice], dict[str, ConnectLatency]]:
+    """Unicast API probes at last-known addresses.
+
+    Returns the confirmed devices and every candidate's updated latency
+    estimate, keyed by MAC (or name), including those that missed.
+    """
+    semaphore = asyncio.Semaphore(config.parallel_scans)
+    latencies: dict[str, ConnectLatency] = {}
+
+    async def _probe(previous: PhysicalDevice) -> PhysicalDevice | None:
+        limit = deadline(previous.latency, config)
+        async with semaphore:
+            checked = await _timed_check(previous.ip, config, limit)
+        if checked is None:
+            missed = observe_miss(previous.latency, limit)
+            if missed is not None:
+                latencies[_latency_key(previous)] = missed
+            return None
+        found, elapsed = checked
+        latency = observe(previous.latency, elapsed)
+        mac_address = _normalize_mac(found.mac_address)
+        latencies[mac_address or found.name] = latency
+        # Keep what only mDNS knows (TXT, port, interface) from the last scan
+        return previous.model_copy(
+            update={
+                "name": found.name,
+                "friendly_name": found.friendly_name or previous.friendly_name,
+                "mac_address": mac_address,
+                "model": found.model,
+                "esphome_version": found.esphome_version,
+                "latency": latency,
+            }
+        )
+
+    with span("scan.probe_known"):
+        results = await asyncio.gather(*(_probe(device) for device in known))
+    return [device for device in results if device is not None], latencies
+
+
+def _neighbor_candidates(
+    known: list[PhysicalDevice], neighbors: list[Neighbor]
+) -> list[PhysicalDevice]:
+    """Espressif MACs in the neighbor table that are not already known."""
+    known_ips = {device.ip for device in known}
+    return [
+        PhysicalDevice(
+            ip=neighbor.ip,
+            name=neighbor.ip,
+            friendly_name="",
+            mac_address=_normalize_mac(neighbor.mac),
+            model="",
+            esphome_version="",
+            interface=neighbor.interface,
+        )
+        for neighbor in neighbors
+        if neighbor.ip not in known_ips
+    ]
+
+
+def _all_confirmed(
+    known: list[PhysicalDevice], confirmed: list[PhysicalDevice]
+) -> bool:
+    macs = {device.mac_address for device in confirmed if device.mac_address}
+    names = {device.name for device in confirmed}
+    return all(
+        (device.mac_address and device.mac_address in macs) or device.name in names
+        for device in known
+    )
+
+
+async def scan_network(
+    network: str,
+    config: ScanningConfig,
+    known: list[PhysicalDevice] | None = None,
+    fast: bool = False,
+    missing: list[PhysicalDevice] | None = None,
+) -> Discovery:
+    """Browse mDNS while probing ``known`` addresses directly, then merge both.
+
+    ``missing`` devices from the last scan are probed as well. With ``fast``,
+    the browse is cut short once every known device has answered at its
+    last address.
+    """
     logger.debug(
-        "Discovering ESPHome devices via mDNS (timeout=%.2fs, label=%s)",
+        "Discovering ESPHome devices via mDNS (timeout=%.2fs, label=%s, known=%d)",
         config.timeout,
         network,
+        len(known or []),
     )
-    zeroconf = Zeroconf()
-    listener = ESPHomeListener(config.timeout)
-    ServiceBrowser(zeroconf, MDNS_SERVICE_TYPE, listener)
-    try:
-        await asyncio.sleep(config.timeout)
-    finally:
-        await asyncio.to_thread(zeroconf.close)
+    targets: list[BrowseInterface | None] = [None]
+    if config.interfaces:
+        targets = list(resolve_interfaces(config.interfaces))
+        if not targets:
+            raise RuntimeError(
+                "None of the configured scan interfaces has a local IPv4 address"
+            )
+        logger.debug(
+            "Browsing on %s",
+            ", ".join(f"{t.label} ({t.address})" for t in targets if t),
+        )
 
-    devices = listener.devices()
+    stop = asyncio.Event()
+    # One browser per interface, all sharing the same timeout window
+    browse = asyncio.gather(*(_browse(config, target, stop) for target in targets))
+
+    known = known or []
+    previous = [*known, *(missing or [])]
+    neighbors: list[Neighbor] = []
+    if config.arp_prefilter:
+        # /proc or `ip neigh`: keep the blocking read off the event loop
+        with span("scan.neighbors"):
+            neighbors = await asyncio.to_thread(espressif_neighbors)
+    # Espressif hardware in the ARP cache is probed first, with the known set
+    candidates = [*previous, *_neighbor_candidates(previous, neighbors)]
+    confirmed: list[PhysicalDevice] = []
+    latencies: dict[str, ConnectLatency] = {}
+    if candidates:
+        try:
+            confirmed, latencies = await _probe_known(candidates, config)
+        except BaseException:
+            stop.set()
+            await asyncio.gather(browse, return_exceptions=True)
+            raise
+        logger.debug(
+            "%d of %d known or neighbor-table candidate(s) confirmed by direct probe",
+            len(confirmed),
+            len(candidates),
+        )
+        if fast and known and _all_confirmed(known, confirmed):
+            stop.set()
+
+    announced = merge_devices(await browse)
+    full_browse = not stop.is_set()
+    announced_macs = {d.mac_address for d in announced if d.mac_address}
+    announced_names = {d.name for d in announced}
+    silent = [
+        device.model_copy(update={"mdns": False if full_browse else None})
+        for device in confirmed
+        if device.mac_address not in announced_macs
+        and device.name not in announced_names
+    ]
+    if full_browse and silent:
+        logger.info(
+            "%d device(s) answer the API but do not announce over mDNS: %s",
+            len(silent),
+            ", ".join(f"{d.name} ({d.ip})" for d in silent),
+        )
+
+    # Devices without a new observation keep the history they came with
+    history = {_latency_key(d): d.latency for d in previous if d.latency}
+    history.update(latencies)
+
+    # mDNS records carry TXT data, so they win over probe results; the
+    # latency history stays with the device either way
+    devices = [
+        d.model_copy(
+            update={
+                "mdns": True,
+                "latency": history.get(d.mac_address) or history.get(d.name),
+            }
+        )
+        for d in announced
+    ] + silent
     devices.sort(key=lambda device: (device.name, device.ip))
-    logger.debug("mDNS scan complete: found %d devices", len(devices))
-    return devices
+
+    found_macs = {d.mac_address for d in devices if d.mac_address}
+    found_names = {d.name for d in devices}
+    gone = []
+    for device in previous:
+        latency = latencies.get(_latency_key(device))
+        if (
+            latency is not None
+            and latency.misses <= MAX_MISSES
+            and device.mac_address not in found_macs
+            and device.name not in found_names
+        ):
+            gone.append(device.model_copy(update={"latency": latency}))
+    logger.debug("Scan complete: found %d devices, %d missing", len(devices), len(gone))
+    return Discovery(devices, gone, neighbors)
 
 
 def detect_local_network() -> str:
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
             sock.connect(("8.8.8.8", 80))
-            local_ip = sock.getsockname()[0]
-        network = ipaddress.ip_network(f"{local_ip}/24", strict=False)
-        logger.debug("Detected local network: %s", network)
-        return str(network)
+            local_ip = ipaddress.IPv4Address(sock.getsockname()[0])
     except OSError as exc:
         raise RuntimeError("Could not detect local network") from exc
+
+    for _name, interface in _ipv4_interfaces():
+        if interface.ip == local_ip:
+            network = interface.network
+            break
+    else:
+        network = ipaddress.IPv4Network(f"{local_ip}/24", strict=False)
+    logger.debug("Detected local network: %s", network)
+    return str(network)
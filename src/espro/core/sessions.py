@@ -0,0 +1,101 @@
+"""Long-lived API sessions, shared by the daemon and its shard workers.
+
+A session subscribes to the device's logs and, for the history recorder,
+to the states of its numeric entities.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import math
+from collections.abc import Callable
+
+import aioesphomeapi
+
+from espro.config import ScanningConfig
+
+from .connections import ConnectScheduler
+from .health import PROBE_ERRORS
+
+logger = logging.getLogger(__name__)
+
+
+async def run_log_session(
+    logical: str,
+    resolve_host: Callable[[], str | None],
+    config: ScanningConfig,
+    scheduler: ConnectScheduler,
+    priority: Callable[[], int],
+    log_level: aioesphomeapi.LogLevel,
+    on_message: Callable[[bytes], None],
+    on_connected: Callable[[bool], None],
+    on_state: Callable[[str, float], None] | None = None,
+) -> None:
+    """Keep a log subscription to ``logical`` open until cancelled.
+
+    ``on_connected`` receives True for reconnects. The session ends when
+    ``resolve_host`` no longer knows the device. ``LOG_LEVEL_NONE`` skips
+    the log subscription; ``on_state`` receives ``(object_id, value)`` for
+    every numeric, binary or switch state.
+    """
+    connected_before = False
+
+    def on_log(msg: object) -> None:
+        on_message(getattr(msg, "message", b""))
+
+    async def subscribe_states(
+        client: aioesphomeapi.APIClient, on_state: Callable[[str, float], None]
+    ) -> None:
+        entities, _services = await asyncio.wait_for(
+            client.list_entities_services(), timeout=config.timeout
+        )
+        names = {info.key: info.object_id for info in entities}
+
+        def _on_state(state: aioesphomeapi.EntityState) -> None:
+            value = getattr(state, "state", None)
+            name = names.get(state.key)
+            if (
+                name is None
+                or getattr(state, "missing_state", False)
+                or not isinstance(value, int | float)
+                or math.isnan(value)
+            ):
+                return
+            on_state(name, float(value))
+
+        client.subscribe_states(_on_state)
+
+    while True:
+        host = resolve_host()
+        if host is None:
+            return
+        await scheduler.turn(logical, priority())
+        client = aioesphomeapi.APIClient(host, port=config.port, password="")
+        stopped = asyncio.Event()
+
+        async def on_stop(_expected: bool, stopped: asyncio.Event = stopped) -> None:
+            stopped.set()
+
+        try:
+            await asyncio.wait_for(
+                client.connect(on_stop=on_stop, login=True, log_errors=False),
+                timeout=config.timeout,
+            )
+            on_connected(connected_before)
+            connected_before = True
+            if log_level != aioesphomeapi.LogLevel.LOG_LEVEL_NONE:
+                client.subscribe_logs(on_log, log_level=log_level)
+            if on_state is not None:
+                await subscribe_states(client, on_state)
+            logger.debug("Log session for '%s' connected to %s", logical, host)
+            await stopped.wait()
+        except PROBE_ERRORS as exc:
+            logger.debug("Log session for '%s' failed: %s", logical, exc)
+        finally:
+            with contextlib.suppress(*PROBE_ERRORS):
+                await client.disconnect()
+        # Failed connects and dropped sessions alike back off with jitter
+        delay = scheduler.failed(logical)
+        logger.debug("Reconnecting '%s' in %.1fs", logical, delay)
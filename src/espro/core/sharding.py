@@ -0,0 +1,398 @@
+"""Device sessions sharded across worker processes.
+
+Each worker runs its own event loop, connect scheduler and protobuf decoding
+for the devices a consistent-hash ring assigns to it, and ships normalized
+events back over a pipe in pickled batches. The coordinating daemon keeps
+the registry, metrics and alerting, so the fleet stays one logical unit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import pickle
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections.abc import Callable
+from multiprocessing.connection import Connection
+from typing import Any
+
+import aioesphomeapi
+
+from espro.config import Settings, data_dir_from_settings
+from espro.database import Database
+
+from .connections import ConnectScheduler
+from .log_parser import LogRecord, parse_log_text
+from .recorder import Recorder
+from .sessions import run_log_session
+
+logger = logging.getLogger(__name__)
+
+RING_REPLICAS = 64
+EVENT_BATCH = 256
+FLUSH_INTERVAL = 0.02
+JOIN_TIMEOUT = 5.0
+# A worker exiting sooner than this after its start counts as a crash loop
+STABLE_UPTIME = 30.0
+MAX_FAST_EXITS = 5
+
+# Events (worker -> coordinator)
+EVENT_LOG = 0
+EVENT_CONNECTED = 1
+# Commands (coordinator -> worker)
+COMMAND_ASSIGN = "assign"
+COMMAND_WAKE = "wake"
+COMMAND_STOP = "stop"
+
+# logical -> (host, priority)
+Assignment = dict[str, tuple[str, int]]
+
+
+def _point(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest())
+
+
+class HashRing:
+    """Consistent hashing of keys onto ``nodes`` workers.
+
+    Every node owns ``replicas`` points on a 64-bit ring; a key belongs to
+    the first point at or after its hash. Changing the node count moves only
+    about 1/N of the keys.
+    """
+
+    def __init__(self, nodes: int, replicas: int = RING_REPLICAS) -> None:
+        points = sorted(
+            (_point(f"shard-{node}-{replica}"), node)
+            for node in range(nodes)
+            for replica in range(replicas)
+        )
+        self.nodes = nodes
+        self._points = array("Q", [point for point, _node in points])
+        self._owners = array("H", [node for _point, node in points])
+
+    def node_for(self, key: str) -> int:
+        index = bisect_right(self._points, _point(key)) % len(self._points)
+        return self._owners[index]
+
+
+class _ShardWorker:
+    def __init__(
+        self,
+        index: int,
+        workers: int,
+        settings: Settings,
+        log_level: int,
+        commands: Connection,
+        events: Connection,
+    ) -> None:
+        config = settings.daemon
+        self.index = index
+        self.settings = settings
+        self.log_level = aioesphomeapi.LogLevel(log_level)
+        self.commands = commands
+        self.events = events
+        # The fleet-wide connect budget is split evenly between the workers
+        self.scheduler = ConnectScheduler(
+            rate=config.connect_rate / workers,
+            burst=max(1, config.connect_burst // workers),
+            backoff_initial=config.backoff_initial,
+            backoff_max=config.backoff_max,
+        )
+        self.parse = bool(settings.alerts.rules)
+        # Every device belongs to one worker, which then owns its series files
+        self.recorder = (
+            Recorder(Database(data_dir_from_settings(settings)).series_dir)
+            if config.record_states
+            else None
+        )
+        self.targets: Assignment = {}
+        self.sessions: dict[str, asyncio.Task[None]] = {}
+        self._pending: list[tuple[Any, ...]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+
+        def _read_commands() -> None:
+            while True:
+                try:
+                    command = self.commands.recv()
+                except (EOFError, OSError):
+                    command = (COMMAND_STOP,)
+                loop.call_soon_threadsafe(self._command, command, stop)
+                if command[0] == COMMAND_STOP:
+                    return
+
+        threading.Thread(
+            target=_read_commands, name=f"espro-shard-{self.index}", daemon=True
+        ).start()
+        try:
+            await stop.wait()
+        finally:
+            for task in self.sessions.values():
+                task.cancel()
+            await asyncio.gather(*self.sessions.values(), return_exceptions=True)
+            self._flush()
+            if self.recorder is not None:
+                self.recorder.close()
+            await self.scheduler.close()
+            self.events.close()
+
+    def _command(self, command: tuple[Any, ...], stop: asyncio.Event) -> None:
+        kind = command[0]
+        if kind == COMMAND_ASSIGN:
+            self._assign(command[1])
+        elif kind == COMMAND_WAKE:
+            self.scheduler.wake(command[1])
+        elif kind == COMMAND_STOP:
+            stop.set()
+
+    def _assign(self, targets: Assignment) -> None:
+        previous, self.targets = self.targets, targets
+        for logical in list(self.sessions):
+            # Removed, or rebound/readdressed: its connection points elsewhere
+            if logical not in targets or targets[logical][0] != previous[logical][0]:
+                self.sessions.pop(logical).cancel()
+                self.scheduler.forget(logical)
+        for logical in set(targets) - set(self.sessions):
+            self.sessions[logical] = asyncio.create_task(self._session(logical))
+
+    async def _session(self, logical: str) -> None:
+        recorder = self.recorder
+
+        def on_message(message: bytes) -> None:
+            records = None
+            if self.parse:
+                records = parse_log_text(
+                    message.decode("utf-8", errors="backslashreplace")
+                )
+            self._emit((EVENT_LOG, logical, message.count(b"\n") + 1, records))
+
+        def resolve_host() -> str | None:
+            target = self.targets.get(logical)
+            return target[0] if target else None
+
+        def priority() -> int:
+            target = self.targets.get(logical)
+            return target[1] if target else 0
+
+        await run_log_session(
+            logical,
+            resolve_host,
+            self.settings.scanning,
+            self.scheduler,
+            priority,
+            self.log_level,
+            on_message,
+            lambda reconnect: self._emit((EVENT_CONNECTED, logical, reconnect)),
+            (lambda entity, value: recorder.record(logical, entity, value))
+            if recorder is not None
+            else None,
+        )
+
+    def _emit(self, event: tuple[Any, ...]) -> None:
+        self._pending.append(event)
+        if len(self._pending) >= EVENT_BATCH:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                FLUSH_INTERVAL, self._flush
+            )
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            self.events.send_bytes(pickle.dumps(batch, pickle.HIGHEST_PROTOCOL))
+        except OSError as exc:
+            logger.debug("Shard %d lost its coordinator: %s", self.index, exc)
+
+
+def worker_main(
+    index: int,
+    workers: int,
+    settings_json: str,
+    log_level: int,
+    logging_level: int,
+    commands: Connection,
+    events: Connection,
+) -> None:
+    """Entry point of a shard worker process."""
+    logging.basicConfig(level=logging_level)
+    settings = Settings.model_validate_json(settings_json)
+    worker = _ShardWorker(index, workers, settings, log_level, commands, events)
+    asyncio.run(worker.run())
+
+
+class ShardPool:
+    """Coordinator side: owns the workers and routes devices to them."""
+
+    def __init__(
+        self,
+        workers: int,
+        settings: Settings,
+        log_level: aioesphomeapi.LogLevel,
+        on_log: Callable[[str, int, list[LogRecord] | None], None],
+        on_connected: Callable[[str, bool], None],
+    ) -> None:
+        self.ring = HashRing(workers)
+        self._settings = settings
+        self._log_level = log_level
+        self._on_log = on_log
+        self._on_connected = on_connected
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: list[Any] = [None] * workers
+        self._commands: list[Connection | None] = [None] * workers
+        self._assigned: list[Assignment] = [{} for _ in range(workers)]
+        self._owner: dict[str, int] = {}
+        self._started_at = [0.0] * workers
+        self._fast_exits = [0] * workers
+        self._restarts = ConnectScheduler.from_config(settings.daemon)
+        self._closing = False
+        self.events_received = 0
+
+    def start(self) -> None:
+        for index in range(self.ring.nodes):
+            self._spawn(index)
+
+    def _spawn(self, index: int) -> None:
+        command_reader, command_writer = self._context.Pipe(duplex=False)
+        event_reader, event_writer = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=worker_main,
+            args=(
+                index,
+                self.ring.nodes,
+                self._settings.model_dump_json(),
+                int(self._log_level),
+                logging.getLogger().getEffectiveLevel(),
+                command_reader,
+                event_writer,
+            ),
+            name=f"espro-shard-{index}",
+            daemon=True,
+        )
+        process.start()
+        # Drop the child's ends so a dead worker shows up as EOF
+        command_reader.close()
+        event_writer.close()
+        self._processes[index] = process
+        self._commands[index] = command_writer
+        self._started_at[index] = time.monotonic()
+        threading.Thread(
+            target=self._read_events,
+            args=(index, event_reader, asyncio.get_running_loop()),
+            name=f"espro-shard-{index}-events",
+            daemon=True,
+        ).start()
+        if self._assigned[index]:
+            self._send(index, (COMMAND_ASSIGN, self._assigned[index]))
+        logger.info("Shard worker %d started (pid %s)", index, process.pid)
+
+    def _read_events(
+        self, index: int, events: Connection, loop: asyncio.AbstractEventLoop
+    ) -> None:
+        while True:
+            try:
+                batch = pickle.loads(events.recv_bytes())
+            except (EOFError, OSError):
+                break
+            loop.call_soon_threadsafe(self._dispatch, batch)
+        events.close()
+        loop.call_soon_threadsafe(self._worker_exited, index)
+
+    def _dispatch(self, batch: list[tuple[Any, ...]]) -> None:
+        self.events_received += len(batch)
+        for event in batch:
+            if event[0] == EVENT_LOG:
+                self._on_log(event[1], event[2], event[3])
+            elif event[0] == EVENT_CONNECTED:
+                self._on_connected(event[1], event[2])
+
+    def _worker_exited(self, index: int) -> None:
+        if self._closing:
+            return
+        process = self._processes[index]
+        code = process.exitcode if process is not None else None
+        self._commands[index] = None
+        if time.monotonic() - self._started_at[index] < STABLE_UPTIME:
+            self._fast_exits[index] += 1
+        else:
+            self._fast_exits[index] = 1
+        failures = self._fast_exits[index]
+        if failures > MAX_FAST_EXITS:
+            logger.error(
+                "Shard worker %d exited %d times in a row right after starting "
+                "(code %s); giving up on its %d device(s)",
+                index,
+                failures,
+                code,
+                len(self._assigned[index]),
+            )
+            return
+        delay = self._restarts.backoff(failures)
+        logger.warning(
+            "Shard worker %d exited (code %s); restarting in %.1fs",
+            index,
+            code,
+            delay,
+        )
+        asyncio.get_running_loop().call_later(delay, self._respawn, index)
+
+    def _respawn(self, index: int) -> None:
+        if not self._closing:
+            self._spawn(index)
+
+    def _send(self, index: int, command: tuple[Any, ...]) -> None:
+        connection = self._commands[index]
+        if connection is None:
+            return
+        try:
+            connection.send(command)
+        except OSError as exc:
+            logger.debug("Shard worker %d unreachable: %s", index, exc)
+
+    def owner(self, key: str) -> int:
+        return self.ring.node_for(key)
+
+    def assign(self, targets: dict[str, tuple[str, str, int]]) -> None:
+        """Route ``logical -> (shard key, host, priority)`` to the workers."""
+        shards: list[Assignment] = [{} for _ in range(self.ring.nodes)]
+        self._owner = {}
+        for logical, (key, host, priority) in targets.items():
+            index = self.ring.node_for(key)
+            shards[index][logical] = (host, priority)
+            self._owner[logical] = index
+        for index, assignment in enumerate(shards):
+            if assignment != self._assigned[index]:
+                self._assigned[index] = assignment
+                self._send(index, (COMMAND_ASSIGN, assignment))
+
+    def wake(self, logical: str) -> None:
+        index = self._owner.get(logical)
+        if index is not None:
+            self._send(index, (COMMAND_WAKE, logical))
+
+    async def close(self) -> None:
+        self._closing = True
+        for index in range(self.ring.nodes):
+            self._send(index, (COMMAND_STOP,))
+        for process in self._processes:
+            if process is None:
+                continue
+            await asyncio.to_thread(process.join, JOIN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        for connection in self._commands:
+            if connection is not None:
+                connection.close()
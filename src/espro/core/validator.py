@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from espro.models import DeviceRegistry, ScanResult, ValidationResult
 
+from .resolver import match_physical
+
 
 def validate_mappings(registry: DeviceRegistry, scan: ScanResult) -> ValidationResult:
     physical_by_ip = {device.ip: device for device in scan.devices}
@@ -11,28 +13,17 @@ def validate_mappings(registry: DeviceRegistry, scan: ScanResult) -> ValidationR
     warnings: list[str] = []
     valid_count = 0
     matched_names: set[str] = set()
+    missing: list[str] = []
 
     for logical_name, logical_device in registry.logical_devices.items():
         physical_ref = logical_device.physical
-
-        found = None
-        matched_name = None
-
-        if physical_ref in physical_by_ip:
-            found = physical_by_ip[physical_ref]
-            matched_name = found.name
-        elif physical_ref in physical_by_name:
-            found = physical_by_name[physical_ref]
-            matched_name = physical_ref
-        elif physical_ref.replace(".local", "") in physical_by_name:
-            matched_name = physical_ref.replace(".local", "")
-            found = physical_by_name[matched_name]
+        found = match_physical(physical_ref, physical_by_ip, physical_by_name)
 
         if found:
             valid_count += 1
-            if matched_name:
-                matched_names.add(matched_name)
+            matched_names.add(found.name)
         else:
+            missing.append(logical_name)
             errors.append(
                 f"Logical device '{logical_name}' points to '{physical_ref}' "
                 "which was not found in scan"
@@ -49,4 +40,5 @@ def validate_mappings(registry: DeviceRegistry, scan: ScanResult) -> ValidationR
         warnings=warnings,
         valid_count=valid_count,
         unmapped_devices=unmapped,
+        missing_devices=missing,
     )
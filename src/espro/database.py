@@ -1,17 +1,36 @@
 from __future__ import annotations
 
 import json
+import logging
 import tomllib
 from datetime import datetime, timezone
 from pathlib import Path
 
 from pydantic import ValidationError
 
-from espro.models import DeviceRegistry, LogicalDevice, PhysicalDevice, ScanResult
+from espro.models import (
+    DeviceEntities,
+    DeviceRegistry,
+    HealthReport,
+    LogicalDevice,
+    PhysicalDevice,
+    ScanResult,
+)
+from espro.utils.timing import span
+
+logger = logging.getLogger(__name__)
 
 DEVICES_FILE = "devices.toml"
 PHYSICAL_DIR = "physical"
 CURRENT_SCAN_FILE = "current.json"
+SCAN_LOCK_FILE = "scan.lock"
+# Mirrored in espro.client, which must not import this module
+CONTROL_SOCKET_FILE = "espro.sock"
+HEALTH_DIR = "health"
+HEALTH_HISTORY_FILE = "history.jsonl"
+CONFIG_CACHE_DIR = "config-cache"
+ENTITIES_DIR = "entities"
+SERIES_DIR = "series"
 
 
 def _toml_string(value: str) -> str:
@@ -28,10 +47,39 @@ def _render_devices_toml(registry: DeviceRegistry) -> str:
 
     for name, device in sorted(registry.logical_devices.items()):
         fields = [f"physical = {_toml_string(device.physical)}"]
+        if device.role:
+            fields.append(f"role = {_toml_string(device.role)}")
         if device.notes:
             fields.append(f"notes = {_toml_string(device.notes)}")
+        if device.config:
+            fields.append(f"config = {_toml_string(device.config)}")
+        if device.substitutions:
+            pairs = ", ".join(
+                f"{_toml_string(key)} = {_toml_string(value)}"
+                for key, value in sorted(device.substitutions.items())
+            )
+            fields.append(f"substitutions = {{ {pairs} }}")
         lines.append(f"{_toml_string(name)} = {{ {', '.join(fields)} }}")
 
+    for rule in registry.rules:
+        lines.extend(
+            [
+                "",
+                "[[rules]]",
+                f"role = {_toml_string(rule.role)}",
+                f"slot = {_toml_string(rule.slot)}",
+                f"count = {rule.count}",
+            ]
+        )
+        if rule.start != 1:
+            lines.append(f"start = {rule.start}")
+        match = rule.match.model_dump(exclude_none=True)
+        if match:
+            pairs = ", ".join(
+                f"{key} = {_toml_string(value)}" for key, value in match.items()
+            )
+            lines.append(f"match = {{ {pairs} }}")
+
     lines.append("")
     return "\n".join(lines)
 
@@ -42,6 +90,12 @@ class Database:
         self._physical_dir = data_dir / PHYSICAL_DIR
         self._devices_path = data_dir / DEVICES_FILE
         self._current_scan_path = self._physical_dir / CURRENT_SCAN_FILE
+        self._scan_lock_path = self._physical_dir / SCAN_LOCK_FILE
+        self._control_socket_path = data_dir / CONTROL_SOCKET_FILE
+        self._health_history_path = data_dir / HEALTH_DIR / HEALTH_HISTORY_FILE
+        self._config_cache_dir = data_dir / CONFIG_CACHE_DIR
+        self._entities_dir = data_dir / ENTITIES_DIR
+        self._series_dir = data_dir / SERIES_DIR
 
     @property
     def path(self) -> Path:
@@ -55,6 +109,26 @@ class Database:
     def current_scan_path(self) -> Path:
         return self._current_scan_path
 
+    @property
+    def scan_lock_path(self) -> Path:
+        return self._scan_lock_path
+
+    @property
+    def control_socket_path(self) -> Path:
+        return self._control_socket_path
+
+    @property
+    def health_history_path(self) -> Path:
+        return self._health_history_path
+
+    @property
+    def config_cache_dir(self) -> Path:
+        return self._config_cache_dir
+
+    @property
+    def series_dir(self) -> Path:
+        return self._series_dir
+
     def ensure_dirs(self) -> None:
         self._data_dir.mkdir(parents=True, exist_ok=True)
         self._physical_dir.mkdir(parents=True, exist_ok=True)
@@ -64,7 +138,7 @@ class Database:
             return DeviceRegistry()
 
         try:
-            with self._devices_path.open("rb") as handle:
+            with span("db.toml_parse"), self._devices_path.open("rb") as handle:
                 data = tomllib.load(handle) or {}
         except tomllib.TOMLDecodeError as exc:
             raise ValueError(
@@ -72,9 +146,13 @@ class Database:
             ) from exc
 
         logical_devices = data.get("logical_devices", {})
+        rules = data.get("rules", [])
 
         try:
-            return DeviceRegistry.model_validate({"logical_devices": logical_devices})
+            with span("db.validate"):
+                return DeviceRegistry.model_validate(
+                    {"logical_devices": logical_devices, "rules": rules}
+                )
         except ValidationError as exc:
             raise ValueError(
                 f"Invalid devices file: {self._devices_path}\n{exc}"
@@ -82,13 +160,26 @@ class Database:
 
     def save_devices(self, registry: DeviceRegistry) -> None:
         self.ensure_dirs()
-        self._devices_path.write_text(_render_devices_toml(registry))
+        with span("db.save_devices"):
+            self._devices_path.write_text(_render_devices_toml(registry))
 
     def add_logical_device(
-        self, name: str, physical: str, notes: str | None = None
+        self,
+        name: str,
+        physical: str,
+        notes: str | None = None,
+        role: str | None = None,
+        config: str | None = None,
+        substitutions: dict[str, str] | None = None,
     ) -> None:
         registry = self.load_devices()
-        registry.logical_devices[name] = LogicalDevice(physical=physical, notes=notes)
+        registry.logical_devices[name] = LogicalDevice(
+            physical=physical,
+            role=role,
+            notes=notes,
+            config=config,
+            substitutions=substitutions or {},
+        )
         self.save_devices(registry)
 
     def remove_logical_device(self, name: str) -> bool:
@@ -99,25 +190,73 @@ class Database:
             return True
         return False
 
-    def save_scan(self, devices: list[PhysicalDevice], network: str) -> None:
-        scan = ScanResult(
-            scan_timestamp=datetime.now(timezone.utc),
-            network=network,
-            devices=devices,
+    def save_scan(
+        self,
+        devices: list[PhysicalDevice],
+        network: str,
+        missing: list[PhysicalDevice] | None = None,
+    ) -> None:
+        self.write_scan(
+            ScanResult(
+                scan_timestamp=datetime.now(timezone.utc),
+                network=network,
+                devices=devices,
+                missing=missing or [],
+            )
         )
 
+    def write_scan(self, scan: ScanResult) -> None:
         self._physical_dir.mkdir(parents=True, exist_ok=True)
-        with self._current_scan_path.open("w") as handle:
+        with span("db.save_scan"), self._current_scan_path.open("w") as handle:
             json.dump(scan.model_dump(mode="json"), handle, indent=2)
 
     def load_current_scan(self) -> ScanResult | None:
         if not self._current_scan_path.exists():
             return None
 
-        with self._current_scan_path.open("r") as handle:
+        with span("db.load_scan"), self._current_scan_path.open("r") as handle:
             data = json.load(handle)
 
-        return ScanResult.model_validate(data)
+        with span("db.validate"):
+            return ScanResult.model_validate(data)
+
+    def save_health(self, report: HealthReport) -> None:
+        """Append a health report to the JSON-lines history for trending."""
+        self._health_history_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._health_history_path.open("a") as handle:
+            handle.write(report.model_dump_json())
+            handle.write("\n")
+
+    def load_health_history(self) -> list[HealthReport]:
+        if not self._health_history_path.exists():
+            return []
+
+        with self._health_history_path.open("r") as handle:
+            return [
+                HealthReport.model_validate_json(line)
+                for line in handle
+                if line.strip()
+            ]
+
+    def _entities_path(self, logical_name: str) -> Path:
+        return self._entities_dir / f"{logical_name}.json"
+
+    def save_entities(self, catalog: DeviceEntities) -> None:
+        self._entities_dir.mkdir(parents=True, exist_ok=True)
+        path = self._entities_path(catalog.logical_name)
+        with span("db.save_entities"):
+            path.write_text(catalog.model_dump_json())
+
+    def load_entities(self, logical_name: str) -> DeviceEntities | None:
+        path = self._entities_path(logical_name)
+        try:
+            with span("db.load_entities"):
+                return DeviceEntities.model_validate_json(path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.debug("Ignoring unreadable entity cache %s: %s", path, exc)
+            return None
 
     def init(self, force: bool = False) -> bool:
         """Initialize data directory. Returns True if devices.toml was created."""
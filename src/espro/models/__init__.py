@@ -1,12 +1,29 @@
 from __future__ import annotations
 
-from .devices import DeviceRegistry, LogicalDevice, PhysicalDevice, ScanResult
+from .devices import (
+    ConnectLatency,
+    DeviceRegistry,
+    LogicalDevice,
+    MappingRule,
+    PhysicalDevice,
+    RuleMatch,
+    ScanResult,
+)
+from .entities import DeviceEntities, EntityRecord
+from .health import DeviceHealth, HealthReport
 from .validation import ValidationResult
 
 __all__ = [
+    "ConnectLatency",
+    "DeviceEntities",
+    "DeviceHealth",
     "DeviceRegistry",
+    "EntityRecord",
+    "HealthReport",
     "LogicalDevice",
+    "MappingRule",
     "PhysicalDevice",
+    "RuleMatch",
     "ScanResult",
     "ValidationResult",
 ]
@@ -2,7 +2,19 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+
+class ConnectLatency(BaseModel):
+    """Exponentially weighted API connect-and-answer time, in seconds."""
+
+    model_config = {"extra": "forbid"}
+
+    mean: float
+    variance: float = 0.0
+    samples: int = 1
+    # Consecutive probes that ran into their deadline
+    misses: int = 0
 
 
 class PhysicalDevice(BaseModel):
@@ -16,6 +28,12 @@ class PhysicalDevice(BaseModel):
     esphome_version: str
     port: int | None = None
     txt: dict[str, str] = Field(default_factory=dict)
+    # Local interface the device was discovered on, when browsing per interface
+    interface: str | None = None
+    # False: answered the API but was absent from a full mDNS browse
+    mdns: bool | None = None
+    # Learned from direct probes; sets this device's probe deadline
+    latency: ConnectLatency | None = None
 
 
 class ScanResult(BaseModel):
@@ -24,16 +42,62 @@ class ScanResult(BaseModel):
     scan_timestamp: datetime
     network: str
     devices: list[PhysicalDevice]
+    # Devices with latency history that missed their probe and were not
+    # announced; the next scan probes them again
+    missing: list[PhysicalDevice] = Field(default_factory=list)
 
 
 class LogicalDevice(BaseModel):
     model_config = {"extra": "forbid"}
 
     physical: str
+    role: str | None = None
     notes: str | None = None
+    # ESPHome YAML for this device, relative to the data directory
+    config: str | None = None
+    substitutions: dict[str, str] = Field(default_factory=dict)
+
+
+class RuleMatch(BaseModel):
+    model_config = {"extra": "forbid"}
+
+    # Globs; name is case-sensitive like mDNS names, model is case-insensitive
+    name_glob: str | None = None
+    model: str | None = None
+    mac_prefix: str | None = None
+
+
+class MappingRule(BaseModel):
+    """Binds matching discovered devices to free slots of a numbered pool."""
+
+    model_config = {"extra": "forbid"}
+
+    role: str
+    # Logical name template, formatted with the slot number as ``n``
+    slot: str
+    count: int = Field(gt=0)
+    start: int = Field(default=1, ge=0)
+    match: RuleMatch = Field(default_factory=RuleMatch)
+
+    @field_validator("slot")
+    @classmethod
+    def _check_slot(cls, value: str) -> str:
+        try:
+            first, second = value.format(n=0), value.format(n=1)
+        except (KeyError, IndexError, ValueError) as exc:
+            raise ValueError(f"invalid slot template {value!r}: {exc}") from exc
+        if first == second:
+            raise ValueError("slot template must include {n}")
+        return value
+
+    def slot_names(self) -> list[str]:
+        return [
+            self.slot.format(n=n) for n in range(self.start, self.start + self.count)
+        ]
 
 
 class DeviceRegistry(BaseModel):
     model_config = {"extra": "forbid"}
 
     logical_devices: dict[str, LogicalDevice] = Field(default_factory=dict)
+    rules: list[MappingRule] = Field(default_factory=list)
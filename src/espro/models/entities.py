@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class EntityRecord(BaseModel):
+    model_config = {"extra": "forbid"}
+
+    key: int
+    object_id: str
+    name: str
+    entity_type: str
+    device_class: str | None = None
+    unit_of_measurement: str | None = None
+
+
+class DeviceEntities(BaseModel):
+    model_config = {"extra": "forbid"}
+
+    logical_name: str
+    host: str
+    esphome_version: str
+    compilation_time: str
+    fetched_at: datetime
+    entities: list[EntityRecord] = Field(default_factory=list)
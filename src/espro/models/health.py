@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class DeviceHealth(BaseModel):
+    model_config = {"extra": "forbid"}
+
+    logical_name: str
+    host: str
+    rounds: int
+    pings_ok: int = 0
+    errors: int = 0
+    connect_ms: float | None = None
+    rtt_min_ms: float | None = None
+    rtt_p50_ms: float | None = None
+    rtt_p99_ms: float | None = None
+    rtt_buckets: list[int] = Field(default_factory=list)
+    last_error: str | None = None
+
+
+class HealthReport(BaseModel):
+    model_config = {"extra": "forbid"}
+
+    timestamp: datetime
+    bucket_bounds_ms: list[float]
+    devices: list[DeviceHealth]
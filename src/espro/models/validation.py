@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -9,3 +9,4 @@ class ValidationResult:
     warnings: list[str]
     valid_count: int
     unmapped_devices: list[tuple[str, str]]
+    missing_devices: list[str] = field(default_factory=list)
@@ -0,0 +1,170 @@
+"""Watch a few files for changes: inotify on Linux, polling elsewhere.
+
+inotify watches the parent directories, so files that do not exist yet and
+editors that save by renaming are both seen. Events are coalesced for
+``settle`` seconds, and a change is only reported once the file's inode,
+mtime or size actually differ from the last report.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+from collections.abc import Awaitable, Callable, Iterable
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# From <sys/inotify.h>
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+# Not IN_MODIFY: a file is only read back once its writer closed it
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+Stamp = tuple[int, int, int] | None
+
+
+def _stamp(path: Path) -> Stamp:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class _Inotify:
+    def __init__(self, directories: Iterable[Path]) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        try:
+            for directory in directories:
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def read(self) -> tuple[set[str], bool]:
+        """File names with pending events, and whether a watch was lost."""
+        names: set[str] = set()
+        lost = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return names, lost
+            offset = 0
+            while offset < len(data):
+                _wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_IGNORED:
+                    lost = True
+                elif mask & IN_Q_OVERFLOW:
+                    # Events were dropped: re-check every file
+                    names.add("")
+                else:
+                    names.add(os.fsdecode(name))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """Calls ``on_change`` with the paths whose content changed."""
+
+    def __init__(
+        self,
+        paths: Iterable[Path],
+        on_change: Callable[[set[Path]], Awaitable[None]],
+        interval: float = 1.0,
+        settle: float = 0.05,
+        use_inotify: bool = True,
+    ) -> None:
+        self.paths = list(paths)
+        self._on_change = on_change
+        self._interval = interval
+        self._settle = settle
+        self._use_inotify = use_inotify and sys.platform == "linux"
+        self._stamps = {path: _stamp(path) for path in self.paths}
+        self._names = {path.name for path in self.paths}
+        self._wake = asyncio.Event()
+        self.mode = "poll"
+
+    def changed(self) -> set[Path]:
+        changed = set()
+        for path in self.paths:
+            stamp = _stamp(path)
+            if stamp != self._stamps[path]:
+                self._stamps[path] = stamp
+                changed.add(path)
+        return changed
+
+    def _start_inotify(self) -> _Inotify | None:
+        if not self._use_inotify:
+            return None
+        directories = {path.parent for path in self.paths}
+        try:
+            for directory in directories:
+                directory.mkdir(parents=True, exist_ok=True)
+            return _Inotify(directories)
+        except (OSError, AttributeError) as exc:
+            # AttributeError: a libc without inotify symbols
+            logger.info(
+                "inotify unavailable (%s); polling every %gs", exc, self._interval
+            )
+            return None
+
+    async def run(self) -> None:
+        """Watch until cancelled."""
+        inotify = self._start_inotify()
+        loop = asyncio.get_running_loop()
+        if inotify is not None:
+            self.mode = "inotify"
+
+            def _readable() -> None:
+                names, lost = inotify.read()
+                if lost:
+                    # The directory went away; stamps still work
+                    logger.warning("Lost the inotify watch; polling instead")
+                    self.mode = "poll"
+                    loop.remove_reader(inotify.fd)
+                if lost or "" in names or names & self._names:
+                    self._wake.set()
+
+            loop.add_reader(inotify.fd, _readable)
+        try:
+            while True:
+                if self.mode == "inotify":
+                    await self._wake.wait()
+                    self._wake.clear()
+                    await asyncio.sleep(self._settle)
+                else:
+                    await asyncio.sleep(self._interval)
+                changed = self.changed()
+                if not changed:
+                    continue
+                try:
+                    await self._on_change(changed)
+                except Exception:
+                    logger.exception("Handling a change of %s failed", changed)
+        finally:
+            if inotify is not None:
+                if self.mode == "inotify":
+                    loop.remove_reader(inotify.fd)
+                inotify.close()
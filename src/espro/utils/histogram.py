@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+
+# Upper bucket bounds in milliseconds; one extra overflow bucket is implied.
+DEFAULT_BOUNDS_MS: tuple[float, ...] = (
+    1,
+    2,
+    5,
+    10,
+    20,
+    50,
+    100,
+    200,
+    500,
+    1000,
+    2000,
+    5000,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with O(log buckets) recording."""
+
+    __slots__ = ("_bounds", "count", "counts", "max", "min", "total")
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BOUNDS_MS) -> None:
+        self._bounds = bounds
+        self.counts = array("I", bytes(4 * (len(bounds) + 1)))
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    @property
+    def bounds(self) -> tuple[float, ...]:
+        return self._bounds
+
+    def record(self, value_ms: float) -> None:
+        self.counts[bisect_left(self._bounds, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms < self.min:
+            self.min = value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def percentile(self, q: float) -> float | None:
+        """Return the upper bound of the bucket holding quantile ``q`` (0..1).
+
+        The result is clamped to the observed min/max so sparse histograms do not
+        report a bucket edge that was never reached.
+        """
+        if self.count == 0:
+            return None
+        rank = max(1, int(q * self.count + 0.999999))
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                upper = self._bounds[index] if index < len(self._bounds) else self.max
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def merge(self, other: LatencyHistogram) -> None:
+        if other._bounds != self._bounds:
+            raise ValueError("Cannot merge histograms with different bounds")
+        for index, bucket_count in enumerate(other.counts):
+            self.counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
@@ -0,0 +1,110 @@
+"""Tiny asyncio HTTP/1.1 server for local read-only endpoints."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 16 * 1024
+READ_TIMEOUT = 10.0
+
+
+@dataclass
+class HTTPRequest:
+    method: str
+    path: str
+    query: dict[str, str] = field(default_factory=dict)
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class HTTPResponse:
+    status: int = 200
+    body: bytes = b""
+    content_type: str = "text/plain; charset=utf-8"
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+Handler = Callable[[HTTPRequest], Awaitable[HTTPResponse]]
+
+
+def _parse_head(raw: bytes) -> HTTPRequest:
+    lines = raw.decode("latin-1").split("\r\n")
+    method, target, _version = lines[0].split(" ", 2)
+    headers: dict[str, str] = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+    parts = urlsplit(target)
+    return HTTPRequest(
+        method=method.upper(),
+        path=parts.path or "/",
+        query=dict(parse_qsl(parts.query)),
+        headers=headers,
+    )
+
+
+def _encode_response(response: HTTPResponse, head_only: bool) -> bytes:
+    reason = HTTPStatus(response.status).phrase
+    headers = {
+        "Content-Type": response.content_type,
+        "Content-Length": str(len(response.body)),
+        "Connection": "close",
+        **response.headers,
+    }
+    head = f"HTTP/1.1 {response.status} {reason}\r\n" + "".join(
+        f"{key}: {value}\r\n" for key, value in headers.items()
+    )
+    payload = head.encode("latin-1") + b"\r\n"
+    if not head_only:
+        payload += response.body
+    return payload
+
+
+async def start_http_server(handler: Handler, host: str, port: int) -> asyncio.Server:
+    """Serve ``handler`` on ``host:port``; one request per connection."""
+
+    async def _handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            raw = await asyncio.wait_for(
+                reader.readuntil(b"\r\n\r\n"), timeout=READ_TIMEOUT
+            )
+            if len(raw) > MAX_HEADER_BYTES:
+                raise ValueError("request header too large")
+            request = _parse_head(raw[:-4])
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            TimeoutError,
+            ValueError,
+        ):
+            writer.close()
+            return
+
+        try:
+            response = await handler(request)
+        except Exception:
+            logger.exception(
+                "HTTP handler failed for %s %s", request.method, request.path
+            )
+            response = HTTPResponse(status=500, body=b"internal error\n")
+
+        try:
+            writer.write(_encode_response(response, head_only=request.method == "HEAD"))
+            await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(_handle, host, port, limit=MAX_HEADER_BYTES)
@@ -0,0 +1,209 @@
+"""Minimal OpenMetrics registry: cheap updates, text rendering only on scrape."""
+
+from __future__ import annotations
+
+import math
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from typing import Any
+
+from .histogram import DEFAULT_BOUNDS_MS, LatencyHistogram
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label(value)}"'
+        for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _Family[ChildT](ABC):
+    kind = "unknown"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...]) -> None:
+        self.name = name
+        self.help = help_text
+        self.label_names = labels
+        self._children: dict[tuple[str, ...], ChildT] = {}
+
+    @abstractmethod
+    def _new_child(self) -> ChildT: ...
+
+    @abstractmethod
+    def _render_samples(self) -> Iterator[str]: ...
+
+    def labels(self, *values: str) -> ChildT:
+        """Return the child for ``values``; cache it on hot paths."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(
+                    f"{self.name} expects labels {self.label_names}, got {values}"
+                )
+            child = self._new_child()
+            self._children[values] = child
+        return child
+
+    def remove(self, *values: str) -> None:
+        self._children.pop(values, None)
+
+    def clear(self) -> None:
+        self._children.clear()
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._render_samples()
+
+
+class _ScalarFamily[ScalarT: (CounterChild, GaugeChild)](_Family[ScalarT]):
+    def _render_samples(self) -> Iterator[str]:
+        for values, child in sorted(self._children.items()):
+            labels = _format_labels(self.label_names, values)
+            yield f"{self._sample_name}{labels} {_format_value(child.value)}"
+
+    @property
+    def _sample_name(self) -> str:
+        return self.name
+
+
+class Counter(_ScalarFamily[CounterChild]):
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    @property
+    def _sample_name(self) -> str:
+        return f"{self.name}_total"
+
+
+class Gauge(_ScalarFamily[GaugeChild]):
+    kind = "gauge"
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+
+class Histogram(_Family[LatencyHistogram]):
+    """Histogram over milliseconds, exported in seconds per Prometheus convention."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...],
+        bounds_ms: tuple[float, ...] = DEFAULT_BOUNDS_MS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self._bounds_ms = bounds_ms
+
+    def _new_child(self) -> LatencyHistogram:
+        return LatencyHistogram(self._bounds_ms)
+
+    def _render_samples(self) -> Iterator[str]:
+        for values, child in sorted(self._children.items()):
+            cumulative = 0
+            for index, bucket_count in enumerate(child.counts):
+                cumulative += bucket_count
+                le = (
+                    _format_value(child.bounds[index] / 1000)
+                    if index < len(child.bounds)
+                    else "+Inf"
+                )
+                labels = _format_labels((*self.label_names, "le"), (*values, le))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.label_names, values)
+            yield f"{self.name}_count{labels} {child.count}"
+            yield f"{self.name}_sum{labels} {_format_value(child.total / 1000)}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._families: dict[str, _Family[Any]] = {}
+
+    def _register(self, family: _Family[Any]) -> None:
+        if family.name in self._families:
+            raise ValueError(f"Metric already registered: {family.name}")
+        self._families[family.name] = family
+
+    def counter(
+        self, name: str, help_text: str, labels: tuple[str, ...] = ()
+    ) -> Counter:
+        family = Counter(name, help_text, labels)
+        self._register(family)
+        return family
+
+    def gauge(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Gauge:
+        family = Gauge(name, help_text, labels)
+        self._register(family)
+        return family
+
+    def histogram(
+        self, name: str, help_text: str, labels: tuple[str, ...] = ()
+    ) -> Histogram:
+        family = Histogram(name, help_text, labels)
+        self._register(family)
+        return family
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "CounterChild",
+    "Gauge",
+    "GaugeChild",
+    "Histogram",
+    "MetricsRegistry",
+]
@@ -0,0 +1,97 @@
+"""Minimal MQTT 3.1.1 client that publishes QoS 0 messages."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import struct
+
+logger = logging.getLogger(__name__)
+
+CONNECT = 0x10
+CONNACK = 0x20
+PUBLISH = 0x30
+DISCONNECT = 0xE0
+
+
+def _remaining_length(length: int) -> bytes:
+    encoded = bytearray()
+    while True:
+        length, digit = divmod(length, 128)
+        encoded.append(digit | (0x80 if length else 0))
+        if not length:
+            return bytes(encoded)
+
+
+def _string(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return struct.pack("!H", len(data)) + data
+
+
+def _packet(kind: int, body: bytes) -> bytes:
+    return bytes([kind]) + _remaining_length(len(body)) + body
+
+
+def connect_packet(client_id: str) -> bytes:
+    # Clean session, keepalive disabled: the broker never drops us for idling
+    return _packet(
+        CONNECT, _string("MQTT") + bytes([4, 0x02]) + b"\0\0" + _string(client_id)
+    )
+
+
+def publish_packet(topic: str, payload: bytes, retain: bool = False) -> bytes:
+    return _packet(PUBLISH | (0x01 if retain else 0), _string(topic) + payload)
+
+
+class MQTTPublisher:
+    """Keeps one broker connection open and reconnects once per failed publish."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 1883,
+        client_id: str = "espro",
+        timeout: float = 5.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.client_id = client_id
+        self.timeout = timeout
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=self.timeout
+        )
+        writer.write(connect_packet(self.client_id))
+        await writer.drain()
+        ack = await asyncio.wait_for(reader.readexactly(4), timeout=self.timeout)
+        if ack[0] != CONNACK or ack[3] != 0:
+            writer.close()
+            raise ConnectionError(f"MQTT broker refused connection (code {ack[3]})")
+        return writer
+
+    async def publish(self, topic: str, payload: bytes, retain: bool = False) -> None:
+        for attempt in range(2):
+            try:
+                if self._writer is None:
+                    self._writer = await self._connect()
+                self._writer.write(publish_packet(topic, payload, retain))
+                await self._writer.drain()
+                return
+            except (OSError, asyncio.IncompleteReadError) as exc:
+                self._writer = None
+                if attempt:
+                    raise ConnectionError(f"MQTT publish failed: {exc}") from exc
+                logger.debug("MQTT connection lost, reconnecting: %s", exc)
+
+    async def close(self) -> None:
+        if self._writer is None:
+            return
+        writer, self._writer = self._writer, None
+        try:
+            writer.write(bytes([DISCONNECT, 0]))
+            await writer.drain()
+        except OSError:
+            pass
+        writer.close()
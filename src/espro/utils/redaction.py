@@ -1,7 +1,116 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass, field
 
+REDACTED = "[redacted]"
+
+_SECRET_LABELS = (
+    "password",
+    "passwd",
+    "api_key",
+    "apikey",
+    "encryption_key",
+    "token",
+    "secret",
+    "psk",
+)
+_HEX = "0123456789abcdefABCDEF"
+_BASE64 = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/")
+
+
+def _literals(words: tuple[str, ...]) -> str:
+    # Plain literal branches (no IGNORECASE) let the regex engine skip ahead
+    # to candidate positions instead of trying every branch at every offset
+    variants = {v for word in words for v in (word, word.capitalize(), word.upper())}
+    return "|".join(sorted(variants, key=len, reverse=True))
+
+
+# A quoted value runs to its closing quote, spaces and all; an unquoted one
+# ends at whitespace or punctuation
+_VALUE = r"""(?:"[^"\n]*"|'[^'\n]*'|[^\s"',;}]+)"""
+
+
+# Each finder starts on a literal or a small character class and is
+# extended backwards by hand, which is an order of magnitude faster than
+# one alternation with leading lookbehinds. Finders with hints only run when
+# one of the (lowercase) hints occurs in the text. Earlier kinds win
+# overlaps: a secret that looks like an IP is still a secret.
+_FINDERS: tuple[tuple[str, tuple[str, ...], re.Pattern[str]], ...] = (
+    (
+        "secret",
+        ("pass", "key", "token", "secret", "psk"),
+        re.compile(
+            rf"""(?:{_literals(_SECRET_LABELS)})["']?[ \t]*[:=][ \t]*{_VALUE}"""
+        ),
+    ),
+    ("key", (), re.compile(r"=(?<=[A-Za-z0-9+/]{43}=)(?![A-Za-z0-9+/=])")),
+    (
+        "mac",
+        (),
+        re.compile(
+            r":(?<=[0-9A-Fa-f]{2}:)[0-9A-Fa-f]{2}"
+            r"(?::[0-9A-Fa-f]{2}){4}(?![0-9A-Fa-f:])"
+        ),
+    ),
+    (
+        "mac",
+        (),
+        re.compile(
+            r"-(?<=[0-9A-Fa-f]{2}-)[0-9A-Fa-f]{2}"
+            r"(?:-[0-9A-Fa-f]{2}){4}(?![0-9A-Fa-f-])"
+        ),
+    ),
+    (
+        "macbare",
+        ("mac",),
+        re.compile(
+            rf"""(?:{_literals(("mac",))})["']?[ \t]*[:=][ \t]*["']?"""
+            r"[0-9A-Fa-f]{12}(?![0-9A-Fa-f])"
+        ),
+    ),
+    ("ip", (), re.compile(r"\.(?<=\d\.)\d{1,3}\.\d{1,3}\.\d{1,3}(?![\d.])")),
+    (
+        "ssid",
+        ("ssid", "connecting to"),
+        re.compile(
+            rf"""\b(?:{_literals(("ssid",))})["']?[ \t]*[:=][ \t]*{_VALUE}"""
+            r"""|Connecting to[ \t]+(?:"[^"\n]*"|'[^'\n]*')"""
+        ),
+    ),
+)
+_QUOTED_TAIL_RE = re.compile(r""""[^"\n]*"$|'[^'\n]*'$""")
+_SEPARATOR_RE = re.compile(r"^.*?[:=][ \t]*")
+
+
+def _mask_value(value: str) -> str:
+    """Replace the value after a label, keeping the label and its quotes."""
+    quoted = _QUOTED_TAIL_RE.search(value)
+    if quoted:
+        quote = quoted.group()[0]
+        return f"{value[: quoted.start()]}{quote}{REDACTED}{quote}"
+    separator = _SEPARATOR_RE.match(value)
+    return (separator.group() if separator else "") + REDACTED
+
+
+def _find_start(kind: str, text: str, start: int) -> int:
+    """Where a finder match really begins, or -1 if it is not a match."""
+    if kind == "key":
+        start -= 43
+        return -1 if start and text[start - 1] in _BASE64 else start
+    if kind == "mac":
+        start -= 2
+        return -1 if start and text[start - 1] in _HEX + ":-" else start
+    if kind == "ip":
+        # Up to three digits before the first dot, not part of a longer number
+        first = start
+        while first > start - 3 and first and text[first - 1].isdigit():
+            first -= 1
+        if first and (text[first - 1].isdigit() or text[first - 1] == "."):
+            return -1
+        return first
+    return start
+
 
 @dataclass
 class Redactor:
@@ -20,16 +129,19 @@ class Redactor:
     def redact_mac(self, mac: str) -> str:
         if not self.enabled:
             return mac
-        parts = mac.split(":")
+        separator = "-" if "-" in mac else ":"
+        parts = mac.split(separator)
         if len(parts) != 6:
             return mac
-        prefix = ":".join(parts[:3])
-        counter = self._mac_map.get(mac)
+        prefix = separator.join(parts[:3])
+        # The same device gets the same token however its MAC was spelled
+        key = ":".join(parts).upper()
+        counter = self._mac_map.get(key)
         if counter is None:
             self._mac_counter += 1
             counter = self._mac_counter
-            self._mac_map[mac] = counter
-        return f"{prefix}:xx:xx:{counter:02d}"
+            self._mac_map[key] = counter
+        return f"{prefix}{separator}xx{separator}xx{separator}{counter:02d}"
 
     def redact_version(self, version: str | None) -> str:
         if not self.enabled:
@@ -38,3 +150,45 @@ class Redactor:
             return "" if version is None else version
         major = version.split(".", 1)[0]
         return f"{major}.x"
+
+    def _replace(self, kind: str, value: str) -> str:
+        if kind == "mac":
+            return self.redact_mac(value)
+        if kind == "ip":
+            if any(int(octet) > 255 for octet in value.split(".")):
+                return value
+            return self.redact_ip(value)
+        if kind == "macbare":
+            label, digits = value[:-12], value[-12:]
+            colons = ":".join(digits[i : i + 2] for i in range(0, 12, 2))
+            return label + self.redact_mac(colons).replace(":", "")
+        if kind in ("ssid", "secret"):
+            return _mask_value(value)
+        return REDACTED
+
+    def redact_text(self, text: str) -> str:
+        """Redact IPs, MACs, SSIDs and keys embedded in free text."""
+        if not self.enabled:
+            return text
+        lowered = text.lower()
+        spans: list[tuple[int, int, int, str]] = []
+        for rank, (kind, hints, finder) in enumerate(_FINDERS):
+            if hints and not any(hint in lowered for hint in hints):
+                continue
+            for match in finder.finditer(text):
+                start = _find_start(kind, text, match.start())
+                if start >= 0:
+                    spans.append((start, rank, match.end(), kind))
+        if not spans:
+            return text
+        spans.sort()
+        pieces: list[str] = []
+        position = 0
+        for start, _rank, end, kind in spans:
+            if start < position:
+                continue
+            pieces.append(text[position:start])
+            pieces.append(self._replace(kind, text[start:end]))
+            position = end
+        pieces.append(text[position:])
+        return "".join(pieces)
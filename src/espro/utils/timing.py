@@ -0,0 +1,102 @@
+"""Opt-in phase timers; ``span()`` is a shared no-op context when disabled."""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
+from types import TracebackType
+
+_NOOP: AbstractContextManager[None] = nullcontext()
+_lock = threading.Lock()
+_enabled = False
+# name -> [total seconds, calls]
+_totals: dict[str, list[float]] = {}
+
+
+@dataclass(frozen=True)
+class PhaseTiming:
+    name: str
+    total: float
+    calls: int
+
+
+class _Span:
+    __slots__ = ("_name", "_started")
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        record(self._name, time.perf_counter() - self._started)
+
+
+def span(name: str) -> AbstractContextManager[None]:
+    """Time the enclosed block under ``name`` when timings are enabled."""
+    if not _enabled:
+        return _NOOP
+    return _Span(name)
+
+
+def record(name: str, seconds: float) -> None:
+    if not _enabled:
+        return
+    with _lock:
+        entry = _totals.get(name)
+        if entry is None:
+            _totals[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    with _lock:
+        _totals.clear()
+
+
+def report() -> list[PhaseTiming]:
+    """Return recorded phases, slowest first."""
+    with _lock:
+        phases = [
+            PhaseTiming(name=name, total=total, calls=int(calls))
+            for name, (total, calls) in _totals.items()
+        ]
+    phases.sort(key=lambda phase: phase.total, reverse=True)
+    return phases
+
+
+__all__ = [
+    "PhaseTiming",
+    "disable",
+    "enable",
+    "is_enabled",
+    "record",
+    "report",
+    "reset",
+    "span",
+]
@@ -29,6 +29,12 @@ def test(c):
     c.run("uv run pytest --cov=src --cov-report=term-missing")
 
 
+@task
+def bench(c):
+    """Benchmark log parsing throughput."""
+    c.run("uv run python scripts/bench_log_parser.py")
+
+
 @task
 def clean(c):
     """Preview files to delete (safe mode)."""
@@ -0,0 +1,18 @@
+"""Shared test data builders."""
+
+from __future__ import annotations
+
+from espro.models import PhysicalDevice
+
+
+def make_device(
+    ip: str, name: str = "kitchen-plug", friendly_name: str = "Kitchen Plug"
+) -> PhysicalDevice:
+    return PhysicalDevice(
+        ip=ip,
+        name=name,
+        friendly_name=friendly_name,
+        mac_address="AA:BB:CC:DD:EE:FF",
+        model="ESP32",
+        esphome_version="2024.12.0",
+    )
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from espro.config import (
+    AlertRule,
+    AlertsConfig,
+    Settings,
+    load_settings,
+    write_settings,
+)
+from espro.core.alerts import AlertDispatcher, AlertEngine, MQTTSink
+from espro.core.log_parser import parse_log_text
+from espro.utils.mqtt import CONNACK, MQTTPublisher
+
+WIFI_DOWN = "\x1b[0;33m[W][wifi:1322]: WiFi Connection lost... Reconnecting\x1b[0m"
+DALLAS_ERR = "[E][dallas.temp.sensor:146]: 'Tank': Reading scratchpad failed"
+SENSOR = "[D][sensor:094]: 'Tank': Sending state 21.5"
+
+RULES = (
+    AlertRule(
+        name="wifi-flaps",
+        pattern=r"WiFi Connection lost",
+        threshold=3,
+        window=300,
+    ),
+    AlertRule(name="dallas-errors", tag="dallas*", level="error"),
+    AlertRule(name="tank", pattern=r"'Tank'", level="warning"),
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_windowed_threshold_per_device():
+    clock = _Clock()
+    engine = AlertEngine(RULES, clock=clock)
+    records = parse_log_text(WIFI_DOWN)
+
+    fired = []
+    for step in range(4):
+        clock.now = 1000 + step * 60
+        fired += engine.feed("kitchen", records)
+        # Another device's disconnects are counted separately
+        assert engine.feed("garage", records if step == 0 else []) == []
+    assert [(a.rule, a.device, a.count) for a in fired] == [
+        ("wifi-flaps", "kitchen", 3)
+    ]
+
+    # Spread out beyond the window: never fires
+    clock.now = 5000
+    for _ in range(3):
+        clock.now += 200
+        assert engine.feed("attic", records) == []
+
+    # Cooldown elapsed and the burst continues: fires again
+    clock.now = 1000 + 120 + 300
+    fired = engine.feed("kitchen", records)
+    assert [a.rule for a in fired] == ["wifi-flaps"]
+
+
+def test_tag_level_and_overlapping_patterns():
+    engine = AlertEngine(RULES, clock=_Clock())
+
+    fired = engine.feed("tank", parse_log_text(f"{DALLAS_ERR}\n{SENSOR}"))
+    # The error line matches both the tag rule and the 'Tank' pattern rule;
+    # the debug line is below the 'Tank' rule's minimum level
+    assert sorted(a.rule for a in fired) == ["dallas-errors", "tank"]
+    assert {a.tag for a in fired} == {"dallas.temp.sensor"}
+    assert engine.most_verbose_level == "W"
+
+
+def test_uncombinable_patterns_fall_back():
+    rules = [
+        AlertRule(name="ci", pattern=r"(?i)reboot"),
+        AlertRule(name="oom", pattern=r"out of memory"),
+    ]
+    engine = AlertEngine(rules, clock=_Clock())
+    records = parse_log_text("[E][app:001]: REBOOT after Out of memory")
+    assert [a.rule for a in engine.feed("x", records)] == ["ci"]
+    records = parse_log_text("[E][app:001]: out of memory, reboot")
+    assert sorted(a.rule for a in engine.feed("y", records)) == ["ci", "oom"]
+
+
+def test_backreference_rule_next_to_other_rules():
+    rules = [
+        AlertRule(name="start", pattern=r"(start)"),
+        AlertRule(name="repeat", pattern=r"(\w)\1"),
+        AlertRule(name="named", pattern=r"(?P<word>\w+) (?P=word)"),
+    ]
+    engine = AlertEngine(rules, clock=_Clock())
+    fired = engine.feed("x", parse_log_text("[E][app:001]: aa here"))
+    assert [a.rule for a in fired] == ["repeat"]
+    fired = engine.feed("y", parse_log_text("[E][app:001]: start then then"))
+    assert sorted(a.rule for a in fired) == ["named", "start"]
+    assert engine.feed("z", parse_log_text("[E][app:001]: nothing")) == []
+
+
+def test_rule_validation_and_config_round_trip(tmp_path):
+    with pytest.raises(ValidationError):
+        AlertRule(name="bad", pattern="(")
+    with pytest.raises(ValidationError):
+        AlertRule(name="burst", pattern="x", threshold=3)
+    with pytest.raises(ValidationError):
+        AlertRule(name="empty")
+
+    settings = Settings(alerts=AlertsConfig(rules=RULES, webhook_url="http://h/x"))
+    path = tmp_path / "config.toml"
+    write_settings(settings, path)
+    assert load_settings(path) == settings
+
+
+def test_dispatcher_publishes_to_mqtt():
+    received: list[bytes] = []
+
+    async def _read_packet(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+        kind = (await reader.readexactly(1))[0]
+        length, shift = 0, 0
+        while True:
+            digit = (await reader.readexactly(1))[0]
+            length |= (digit & 0x7F) << shift
+            shift += 7
+            if not digit & 0x80:
+                return kind, await reader.readexactly(length)
+
+    async def _broker(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        await _read_packet(reader)
+        writer.write(bytes([CONNACK, 2, 0, 0]))
+        await writer.drain()
+        while True:
+            kind, body = await _read_packet(reader)
+            if kind & 0xF0 == 0xE0:
+                break
+            received.append(body)
+        writer.close()
+
+    async def _run():
+        server = await asyncio.start_server(_broker, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        dispatcher = AlertDispatcher(
+            [MQTTSink(MQTTPublisher("127.0.0.1", port), "espro/alerts")]
+        )
+        task = asyncio.create_task(dispatcher.run())
+        engine = AlertEngine(RULES, clock=_Clock())
+        dispatcher.submit(engine.feed("tank", parse_log_text(DALLAS_ERR)))
+        await dispatcher.join()
+        await dispatcher.close()
+        task.cancel()
+        await asyncio.sleep(0.05)
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(_run())
+    assert len(received) == 2
+    topic_length = int.from_bytes(received[0][:2], "big")
+    assert received[0][2 : 2 + topic_length] == b"espro/alerts/tank"
+    assert b'"rule": "dallas-errors"' in received[0]
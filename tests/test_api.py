@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+from helpers import make_device
+
+from espro.core.api import FleetAPI, FleetView
+from espro.database import Database
+from espro.models import DeviceHealth, PhysicalDevice
+from espro.utils.http_server import HTTPRequest, start_http_server
+
+
+def _switch(ip: str) -> PhysicalDevice:
+    return make_device(ip, "switch-aabbcc", "Kitchen Switch")
+
+
+def _db(tmp_path) -> Database:
+    db = Database(tmp_path)
+    db.add_logical_device("kitchen_switch", "switch-aabbcc", role="switch")
+    db.add_logical_device("garage", "garage.local")
+    db.save_scan([_switch("192.168.1.50")], "mdns")
+    return db
+
+
+async def _get(
+    port: int, path: str, etag: str | None = None
+) -> tuple[int, dict, bytes]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = f"GET {path} HTTP/1.1\r\nHost: x\r\n"
+    if etag:
+        head += f"If-None-Match: {etag}\r\n"
+    writer.write(head.encode() + b"\r\n")
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    header, _, body = raw.partition(b"\r\n\r\n")
+    lines = header.decode().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, body
+
+
+def test_view_versions_follow_content(tmp_path):
+    db = _db(tmp_path)
+    view = FleetView(db)
+    assert sorted(view.refresh()) == ["live", "mappings", "registry", "scan"]
+
+    entry = view.device("kitchen_switch")
+    assert entry is not None
+    device = json.loads(entry[1])
+    assert (device["host"], device["online"], device["role"]) == (
+        "192.168.1.50",
+        True,
+        "switch",
+    )
+    garage = view.device("garage")
+    assert garage is not None and json.loads(garage[1])["host"] == "garage.local"
+
+    # Unchanged files do not even re-render
+    assert view.refresh() == []
+
+    # A new scan with the same devices only changes the scan (its timestamp)
+    time.sleep(0.01)
+    db.save_scan([_switch("192.168.1.50")], "mdns")
+    assert view.refresh() == ["scan"]
+    assert view.device("kitchen_switch") == entry
+
+    db.save_scan([_switch("192.168.1.77")], "mdns")
+    assert view.refresh() == ["scan", "mappings"]
+    moved = view.device("kitchen_switch")
+    assert moved is not None and moved[0] > entry[0]
+
+    db.remove_logical_device("garage")
+    assert view.refresh() == ["registry", "mappings"]
+    assert view.device("garage") is None
+
+
+def test_http_etags_and_long_poll(tmp_path):
+    db = _db(tmp_path)
+
+    async def _run():
+        view = FleetView(db)
+        view.refresh()
+        server = await start_http_server(FleetAPI(view).handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            status, headers, body = await _get(port, "/v1/devices/kitchen_switch")
+            assert status == 200
+            assert json.loads(body)["ip"] == "192.168.1.50"
+            etag = headers["ETag"]
+
+            status, _, body = await _get(port, "/v1/devices/kitchen_switch", etag)
+            assert (status, body) == (304, b"")
+            assert (await _get(port, "/v1/devices/nope"))[0] == 404
+
+            version = view.version
+            poll = asyncio.create_task(
+                _get(port, f"/v1/changes?since={version}&timeout=5")
+            )
+            await asyncio.sleep(0.05)
+            assert not poll.done()
+            started = time.perf_counter()
+            view.update_live(
+                DeviceHealth(
+                    logical_name="kitchen_switch",
+                    host="192.168.1.50",
+                    rounds=1,
+                    pings_ok=1,
+                    connect_ms=12.5,
+                    rtt_p50_ms=3.0,
+                )
+            )
+            _, _, body = await poll
+            woke_after = time.perf_counter() - started
+            changes = json.loads(body)
+            assert changes["version"] > version
+            assert changes["resources"]["live"] > version
+
+            status, _, body = await _get(port, "/v1/devices/kitchen_switch", etag)
+            assert status == 200
+            assert json.loads(body)["live"]["rtt_ms"] == 3.0
+
+            # Timeout without changes returns the same version
+            _, _, body = await _get(
+                port, f"/v1/changes?since={view.version}&timeout=0.05"
+            )
+            assert json.loads(body)["version"] == view.version
+            return woke_after
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    assert asyncio.run(_run()) < 0.5
+
+
+def test_lookup_is_fast_in_process(tmp_path):
+    db = Database(tmp_path)
+    for n in range(200):
+        db.add_logical_device(f"dev_{n:03d}", f"esp-{n:03d}")
+    view = FleetView(db)
+    view.refresh()
+    api = FleetAPI(view)
+    request = HTTPRequest(method="GET", path="/v1/devices/dev_150")
+
+    async def _run() -> float:
+        started = time.perf_counter()
+        for _ in range(10_000):
+            response = await api.handle(request)
+        assert response.status == 200
+        return (time.perf_counter() - started) / 10_000
+
+    assert asyncio.run(_run()) < 100e-6
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from espro import AsyncDatabase, Database
+from espro.models import LogicalDevice, PhysicalDevice
+
+
+def _device(index: int) -> PhysicalDevice:
+    return PhysicalDevice(
+        ip=f"10.0.0.{index}",
+        name=f"node-{index}",
+        friendly_name="",
+        mac_address="",
+        model="ESP32",
+        esphome_version="2026.6.5",
+    )
+
+
+def test_save_scan_bursts_coalesce_on_writer_thread(tmp_path):
+    db = Database(tmp_path)
+    threads: set[str] = set()
+    write_scan = db.write_scan
+
+    def _tracking_write(scan):
+        threads.add(threading.current_thread().name)
+        write_scan(scan)
+
+    db.write_scan = _tracking_write  # type: ignore[method-assign]
+
+    async def _run():
+        store = AsyncDatabase(db)
+        await asyncio.gather(
+            *(store.save_scan([_device(i)], "mdns") for i in range(20))
+        )
+        latest = await store.load_current_scan()
+        await store.close()
+        return store.scan_writes, latest
+
+    writes, latest = asyncio.run(_run())
+
+    assert writes <= 2
+    assert latest is not None and latest.devices[0].name == "node-19"
+    assert db.load_current_scan().devices[0].name == "node-19"
+    assert all(name.startswith("espro-db") for name in threads)
+
+
+def test_reads_are_cached_and_coherent_with_disk(tmp_path):
+    db = Database(tmp_path)
+    db.add_logical_device("kitchen", "node-1")
+    loads = 0
+    load_devices = db.load_devices
+
+    def _counting_load():
+        nonlocal loads
+        loads += 1
+        return load_devices()
+
+    db.load_devices = _counting_load  # type: ignore[method-assign]
+
+    async def _run():
+        store = AsyncDatabase(db)
+        first = await store.load_devices()
+        first.logical_devices.clear()
+        second = await store.load_devices()
+        # Edited behind the facade's back, e.g. by the CLI
+        Database(tmp_path).add_logical_device("garage", "node-2", notes="x" * 20)
+        third = await store.load_devices()
+        third.logical_devices["attic"] = LogicalDevice(physical="node-3")
+        await store.save_devices(third)
+        fourth = await store.load_devices()
+        await store.close()
+        return second, fourth
+
+    second, fourth = asyncio.run(_run())
+
+    assert list(second.logical_devices) == ["kitchen"]
+    assert sorted(fourth.logical_devices) == ["attic", "garage", "kitchen"]
+    assert loads == 2
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import pytest
+from pydantic import ValidationError
+
+from espro.core.automap import RuleMatcher, apply_bindings, auto_map
+from espro.database import Database
+from espro.models import (
+    DeviceRegistry,
+    LogicalDevice,
+    MappingRule,
+    PhysicalDevice,
+    RuleMatch,
+)
+
+
+def _device(name: str, model: str = "ESP8266", index: int = 1) -> PhysicalDevice:
+    return PhysicalDevice(
+        ip=f"10.0.0.{index}",
+        name=name,
+        friendly_name="",
+        mac_address=f"24:0A:C4:00:00:{index:02X}",
+        model=model,
+        esphome_version="2026.6.5",
+    )
+
+
+def _registry() -> DeviceRegistry:
+    return DeviceRegistry(
+        logical_devices={"desk_lamp": LogicalDevice(physical="plug-000001")},
+        rules=[
+            MappingRule(
+                role="plug",
+                slot="plug_{n:02d}",
+                count=2,
+                match=RuleMatch(name_glob="plug-*", model="esp8266"),
+            ),
+            MappingRule(
+                role="sensor",
+                slot="sensor_{n}",
+                count=5,
+                match=RuleMatch(name_glob="*", mac_prefix="24:0a:c4"),
+            ),
+        ],
+    )
+
+
+def test_rule_matcher_respects_rule_order():
+    matcher = RuleMatcher(_registry().rules)
+    assert matcher.match(_device("plug-a1b2c3")) == 0
+    assert matcher.match(_device("plug-a1b2c3", model="ESP32")) == 1
+    assert matcher.match(_device("pl")) == 1
+    other = _device("lamp").model_copy(update={"mac_address": "00:11:22:33:44:55"})
+    assert matcher.match(other) is None
+
+
+def test_auto_map_fills_free_slots_stably():
+    registry = _registry()
+    devices = [
+        _device("plug-000001", index=1),
+        _device("plug-cccccc", index=4),
+        _device("plug-aaaaaa", index=2),
+        _device("plug-bbbbbb", index=3),
+    ]
+
+    result = auto_map(registry, devices)
+    assert [(b.logical, b.physical) for b in result.bindings] == [
+        ("plug_01", "plug-aaaaaa"),
+        ("plug_02", "plug-bbbbbb"),
+    ]
+    assert [d.name for d in result.unplaced] == ["plug-cccccc"]
+
+    apply_bindings(registry, result.bindings)
+    # Re-running with a device gone and a new one present keeps old slots
+    again = auto_map(registry, [devices[2], _device("plug-dddddd", index=5)])
+    assert again.bindings == []
+    assert registry.logical_devices["plug_01"].physical == "plug-aaaaaa"
+    assert registry.logical_devices["plug_01"].role == "plug"
+
+
+def test_rules_roundtrip_and_validation(tmp_path):
+    db = Database(tmp_path)
+    registry = _registry()
+    db.save_devices(registry)
+    assert db.load_devices() == registry
+
+    with pytest.raises(ValidationError):
+        MappingRule(role="plug", slot="plug", count=3)
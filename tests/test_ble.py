@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from espro.config import ScanningConfig
+from espro.core.ble import (
+    AdvertisementRing,
+    BLEAggregator,
+    close_proxies,
+    format_address,
+    parse_advertisement,
+    subscribe_proxies,
+)
+from espro.core.mock_device import MOCK_BLE_ADDRESS_BASE, MockESPHomeDevice
+
+PAYLOAD = bytes([2, 0x01, 0x06, 6, 0x09]) + b"therm" + bytes([4, 0xFF, 0x4C, 0x00, 1])
+
+
+def _adv(address: int, rssi: int, data: bytes = PAYLOAD) -> SimpleNamespace:
+    return SimpleNamespace(address=address, rssi=rssi, address_type=0, data=data)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_parse_advertisement():
+    assert parse_advertisement(PAYLOAD) == ("therm", 0x004C)
+    assert parse_advertisement(b"") == ("", None)
+    assert parse_advertisement(bytes([9, 0x09, 0x41])) == ("A", None)
+    assert format_address(0xC0FFEE000001) == "C0:FF:EE:00:00:01"
+
+
+def test_aggregator_dedups_across_proxies_and_keeps_best_rssi():
+    clock = _Clock()
+    aggregator = BLEAggregator(window=10, ttl=60, clock=clock)
+
+    aggregator.feed("hall", [_adv(1, -80), _adv(2, -60)])
+    aggregator.feed("attic", [_adv(1, -50)])
+    clock.now += 1
+    aggregator.feed("hall", [_adv(1, -85)])
+    assert aggregator.process() == 4
+
+    first, second = aggregator.devices()
+    assert (first.address, first.best()) == (1, ("attic", -50))
+    assert first.rssi["hall"] == (-80, 100.0)
+    assert (first.adverts, first.unique, first.name) == (3, 1, "therm")
+    assert second.best() == ("hall", -60)
+    assert aggregator.duplicates == 2
+
+    # A weaker reading replaces the best once the best has aged out
+    clock.now += 20
+    aggregator.feed("attic", [_adv(1, -90, PAYLOAD + b"\x01")])
+    aggregator.process()
+    assert first.rssi["attic"] == (-90, 121.0)
+    assert first.unique == 2
+
+    # Unheard devices expire after the TTL
+    clock.now += 50
+    aggregator.process()
+    assert [d.address for d in aggregator.devices()] == [1]
+
+
+def test_ring_overflow_drops_oldest():
+    ring = AdvertisementRing(capacity=4)
+    for address in range(6):
+        ring.push(address, -70, 0, 0, float(address), b"")
+    assert ring.dropped == 2
+    assert [ring.address[slot] for slot in ring.drain()] == [2, 3, 4, 5]
+    assert len(ring) == 0
+
+
+def test_aggregator_keeps_company_id_zero():
+    clock = _Clock()
+    aggregator = BLEAggregator(window=10, clock=clock)
+    ericsson = bytes([4, 0xFF, 0x00, 0x00, 1])
+    aggregator.feed("hall", [_adv(1, -70, ericsson)])
+    aggregator.process()
+    clock.now += 20
+    # A later advert without manufacturer data keeps what was learned
+    aggregator.feed("hall", [_adv(1, -70, bytes([2, 0x01, 0x06]))])
+    aggregator.process()
+    (device,) = aggregator.devices()
+    assert device.manufacturer == 0 and device.unique == 2
+
+
+def test_aggregator_handles_many_batches():
+    aggregator = BLEAggregator()
+    batch = [_adv(MOCK_BLE_ADDRESS_BASE + i % 500, -60 - i % 30) for i in range(16)]
+    for i in range(5_000):
+        aggregator.feed(f"proxy-{i % 8}", batch)
+        if i % 100 == 0:
+            aggregator.process()
+    aggregator.process()
+    assert aggregator.received == 80_000
+    assert len(aggregator.devices()) == 16
+
+
+def test_subscribe_proxies_with_mock_devices():
+    async def _run():
+        proxies = [
+            MockESPHomeDevice(
+                name=f"proxy-{i}",
+                host="127.0.0.1",
+                port=0,
+                advertise=False,
+                ble_devices=5,
+                ble_rate=500,
+                ble_batch=5,
+            )
+            for i in range(2)
+        ]
+        plain = MockESPHomeDevice(host="127.0.0.1", port=0, advertise=False)
+        for device in [*proxies, plain]:
+            await device.start()
+        targets = {device.name: f"127.0.0.1:{device.port}" for device in proxies}
+        targets["switch"] = f"127.0.0.1:{plain.port}"
+
+        aggregator = BLEAggregator()
+        config = ScanningConfig(timeout=5)
+        try:
+            sessions = []
+            for logical, target in targets.items():
+                host, port = target.split(":")
+                sessions += await subscribe_proxies(
+                    {logical: host},
+                    config.model_copy(update={"port": int(port)}),
+                    aggregator,
+                )
+            await asyncio.sleep(0.3)
+            await close_proxies(sessions)
+        finally:
+            for device in [*proxies, plain]:
+                await device.stop()
+        aggregator.process()
+        return sessions, aggregator
+
+    sessions, aggregator = asyncio.run(_run())
+    errors = {session.logical: session.error for session in sessions}
+    assert errors == {
+        "proxy-0": None,
+        "proxy-1": None,
+        "switch": "not a Bluetooth proxy",
+    }
+
+    devices = aggregator.devices()
+    assert len(devices) == 5
+    assert sorted(aggregator.proxies) == ["proxy-0", "proxy-1"]
+    assert all(len(device.rssi) == 2 for device in devices)
+    assert {device.name for device in devices} == {f"mock-ble-{i}" for i in range(5)}
+    assert aggregator.duplicates > 0
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import aioesphomeapi
+from typer.testing import CliRunner
+
+from espro.cli.app import app
+from espro.config import ScanningConfig
+from espro.core import check_device
+from espro.core.capture import (
+    KIND_ENTITY,
+    KIND_INFO,
+    KIND_LOG,
+    Capture,
+    ReplayDevice,
+    read_capture,
+    record_session,
+    write_capture,
+)
+from espro.core.mock_device import MockESPHomeDevice, pb, start_mock_fleet
+
+
+def _record_mock() -> Capture:
+    async def _run() -> Capture:
+        device = MockESPHomeDevice(
+            host="127.0.0.1",
+            port=0,
+            advertise=False,
+            sensor_interval=0.05,
+            log_rate=40,
+        )
+        await device.start()
+        try:
+            return await record_session("127.0.0.1", device.port, 0.6)
+        finally:
+            await device.stop()
+
+    return asyncio.run(_run())
+
+
+def test_capture_round_trips_through_a_compact_file(tmp_path):
+    capture = _record_mock()
+    counts = capture.counts()
+    assert capture.name == "mock-switch-1"
+    # Switch, sensor and the end-of-list marker
+    assert (counts["info"], counts["entities"]) == (1, 3)
+    assert counts["states"] >= 5 and counts["logs"] >= 10
+
+    path = tmp_path / "kitchen.espcap"
+    size = write_capture(path, capture)
+    assert size < sum(len(record.payload) for record in capture.records)
+    loaded = read_capture(path)
+    assert loaded.name == capture.name and loaded.counts() == counts
+    assert [r.payload for r in loaded.records] == [r.payload for r in capture.records]
+    offsets = [record.offset for record in loaded.of_kind(KIND_LOG)]
+    assert offsets == sorted(offsets) and offsets[-1] <= loaded.duration + 0.01
+
+    path.write_bytes(b"not a capture")
+    result = CliRunner().invoke(app, ["mock", "--replay", str(path)])
+    assert result.exit_code == 2 and "not a capture" in result.output
+
+
+def test_replay_fleet_serves_the_capture_faster():
+    capture = _record_mock()
+    entities = [record.payload for record in capture.of_kind(KIND_ENTITY)]
+
+    async def _run() -> tuple[list[str | None], Capture, Capture, float]:
+        devices = await start_mock_fleet(
+            3, device_class=ReplayDevice, capture=capture, speed=4.0
+        )
+        port = devices[0].port
+        try:
+            found = await asyncio.gather(
+                *(
+                    check_device(device.host, ScanningConfig(port=port, timeout=2))
+                    for device in devices
+                )
+            )
+            started = time.perf_counter()
+            again = await record_session("127.0.0.2", port, capture.duration / 4)
+            took = time.perf_counter() - started
+            quiet = await record_session(
+                "127.0.0.3",
+                port,
+                0.2,
+                log_level=aioesphomeapi.LogLevel.LOG_LEVEL_INFO,
+            )
+        finally:
+            for device in devices:
+                await device.stop()
+        return [d.name if d else None for d in found], again, quiet, took
+
+    names, again, quiet, took = asyncio.run(_run())
+    assert names == ["mock-0", "mock-1", "mock-2"]
+    assert took < capture.duration
+    # Same entities and roughly the same stream, in a quarter of the time
+    assert [record.payload for record in again.of_kind(KIND_ENTITY)] == entities
+    assert again.counts()["logs"] >= capture.counts()["logs"] * 0.6
+    info = pb.DeviceInfoResponse()
+    info.ParseFromString(again.of_kind(KIND_INFO)[0].payload)
+    assert (info.name, info.model) == ("mock-0", "ESP32")
+    # The mock's debug spam is filtered out at INFO
+    levels = []
+    for record in quiet.of_kind(KIND_LOG):
+        msg = pb.SubscribeLogsResponse()
+        msg.ParseFromString(record.payload)
+        levels.append(msg.level)
+    assert levels and max(levels) <= aioesphomeapi.LogLevel.LOG_LEVEL_INFO
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from espro.core.config_cache import ConfigCache
+from espro.database import Database
+from espro.models import DeviceRegistry, LogicalDevice
+
+
+class _FakeValidator:
+    """Treats each config as including ``common.yaml`` next to it."""
+
+    def __init__(self) -> None:
+        self.calls: list[Path] = []
+
+    def __call__(self, config_path: Path, substitutions: dict[str, str]):
+        self.calls.append(config_path)
+        include = config_path.parent / "common.yaml"
+        errors = [] if "ok" in include.read_text() else ["common.yaml is broken"]
+        rendered = config_path.read_text() + include.read_text()
+        return errors, rendered, [config_path, include]
+
+
+def _write_bases(tmp_path: Path) -> list[Path]:
+    (tmp_path / "common.yaml").write_text("ok: true\n")
+    bases = []
+    for index in range(3):
+        base = tmp_path / f"base{index}.yaml"
+        base.write_text(f"esphome:\n  name: base{index}\n")
+        bases.append(base)
+    return bases
+
+
+def test_shared_configs_validate_once_per_input_set(tmp_path):
+    bases = _write_bases(tmp_path)
+    validator = _FakeValidator()
+    cache = ConfigCache(tmp_path / "cache", "2026.6.5", validator)
+
+    checks = [cache.check(bases[index % 3]) for index in range(50)]
+
+    assert len(validator.calls) == 3
+    assert cache.validations == 3
+    assert all(check.valid for check in checks)
+
+    # A new run reuses the on-disk entries without calling ESPHome.
+    rerun = ConfigCache(tmp_path / "cache", "2026.6.5", validator)
+    assert all(rerun.check(base).cached for base in bases)
+    assert len(validator.calls) == 3
+
+
+def test_cache_invalidates_on_input_change(tmp_path):
+    bases = _write_bases(tmp_path)
+    validator = _FakeValidator()
+    ConfigCache(tmp_path / "cache", "2026.6.5", validator).check(bases[0])
+
+    bases[0].write_text("esphome:\n  name: renamed\n")
+    assert (
+        not ConfigCache(tmp_path / "cache", "2026.6.5", validator)
+        .check(bases[0])
+        .cached
+    )
+
+    (tmp_path / "common.yaml").write_text("invalid\n")
+    check = ConfigCache(tmp_path / "cache", "2026.6.5", validator).check(bases[0])
+    assert check.errors == ["common.yaml is broken"]
+
+    (tmp_path / "common.yaml").write_text("ok: true\n")
+    ConfigCache(tmp_path / "cache", "2026.6.5", validator).check(bases[0])
+    upgraded = ConfigCache(tmp_path / "cache", "2026.7.0", validator)
+    upgraded.check(bases[0])
+    upgraded.check(bases[0], {"name": "kitchen"})
+    assert upgraded.validations == 2
+    assert len(validator.calls) == 5
+
+
+def test_config_and_substitutions_roundtrip(tmp_path):
+    db = Database(tmp_path)
+    db.add_logical_device(
+        "plug_1",
+        "plug-a1b2c3",
+        config="plugs/base.yaml",
+        substitutions={"name": "plug-1", "room": "hall"},
+    )
+    registry = db.load_devices()
+    assert registry == DeviceRegistry(
+        logical_devices={
+            "plug_1": LogicalDevice(
+                physical="plug-a1b2c3",
+                config="plugs/base.yaml",
+                substitutions={"name": "plug-1", "room": "hall"},
+            )
+        }
+    )
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from espro.config import DaemonConfig, DatabaseConfig, ScanningConfig, Settings
+from espro.core import Daemon, connections
+from espro.core.connections import ConnectScheduler, TokenBucket
+from espro.core.mock_device import MockESPHomeDevice
+from espro.database import Database
+
+
+def test_token_bucket_paces_after_burst(monkeypatch: pytest.MonkeyPatch):
+    now = [0.0]
+    sleeps: list[float] = []
+
+    async def _sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(connections.asyncio, "sleep", _sleep)
+    # A power-of-two rate keeps the virtual clock exact
+    bucket = TokenBucket(rate=256, burst=5, clock=lambda: now[0])
+
+    async def _run() -> None:
+        for _ in range(25):
+            await bucket.acquire()
+
+    asyncio.run(_run())
+    # The burst goes out at once, the other 20 at 256/s
+    assert sleeps == [1 / 256] * 20
+    assert now[0] == 20 / 256
+    assert bucket.delay() == 1 / 256
+
+
+def test_backoff_grows_with_jitter_and_cap():
+    scheduler = ConnectScheduler(
+        backoff_initial=1, backoff_max=30, rng=random.Random(1)
+    )
+    delays = [scheduler.failed("plug") for _ in range(8)]
+    for failures, delay in enumerate(delays, start=1):
+        ceiling = min(30, 2 ** (failures - 1))
+        assert ceiling / 2 <= delay <= ceiling
+    assert delays[-1] >= 15
+
+    scheduler.succeeded("plug")
+    assert 0.5 <= scheduler.failed("plug") <= 1
+
+
+def test_turns_follow_priority_and_wake_skips_backoff():
+    async def _run() -> tuple[list[str], float]:
+        scheduler = ConnectScheduler(rate=100, burst=1)
+        order: list[str] = []
+
+        async def _connect(name: str, priority: int) -> None:
+            await scheduler.turn(name, priority)
+            order.append(name)
+
+        await asyncio.gather(
+            _connect("bulk-1", 2),
+            _connect("bulk-2", 2),
+            _connect("alarm", 0),
+            _connect("lights", 1),
+        )
+
+        scheduler.failed("alarm")
+        scheduler.failed("alarm")
+        started = time.perf_counter()
+        waiting = asyncio.create_task(scheduler.turn("alarm"))
+        await asyncio.sleep(0.01)
+        scheduler.wake("alarm")
+        await waiting
+        await scheduler.close()
+        return order, time.perf_counter() - started
+
+    order, woken_after = asyncio.run(_run())
+    assert order == ["alarm", "lights", "bulk-1", "bulk-2"]
+    assert woken_after < 0.5
+
+
+def test_daemon_sessions_connect_fleet_at_limited_rate(tmp_path):
+    fleet_size = 12
+    db = Database(tmp_path)
+    for n in range(fleet_size):
+        db.add_logical_device(
+            f"dev_{n:02d}", f"127.0.0.{n + 2}", role="alarm" if n == 7 else None
+        )
+
+    async def _run() -> tuple[float | None, dict[str, float]]:
+        first = MockESPHomeDevice(host="127.0.0.2", port=0, advertise=False)
+        await first.start()
+        devices = [first]
+        for n in range(1, fleet_size):
+            device = MockESPHomeDevice(
+                name=f"mock-{n}",
+                host=f"127.0.0.{n + 2}",
+                port=first.port,
+                advertise=False,
+            )
+            await device.start()
+            devices.append(device)
+
+        settings = Settings(
+            database=DatabaseConfig(path=str(tmp_path)),
+            scanning=ScanningConfig(port=first.port, timeout=5),
+            daemon=DaemonConfig(
+                subscribe_logs=True,
+                connect_rate=40,
+                connect_burst=1,
+                priority_roles=("alarm",),
+                watch_mdns=False,
+            ),
+        )
+        daemon = Daemon(db, settings)
+        try:
+            daemon.sync_sessions()
+            names = list(daemon.registry.logical_devices)
+            for _ in range(200):
+                elapsed = daemon.connections.time_to_connect(names)
+                if elapsed is not None:
+                    break
+                await asyncio.sleep(0.02)
+            started = daemon.connections.started
+            connected = {
+                name: at - started
+                for name, at in daemon.connections.connected_at.items()
+            }
+        finally:
+            for task in daemon._sessions.values():
+                task.cancel()
+            await asyncio.gather(*daemon._sessions.values(), return_exceptions=True)
+            await daemon.connections.close()
+            for device in devices:
+                await device.stop()
+        return elapsed, connected
+
+    elapsed, connected = asyncio.run(_run())
+    assert elapsed is not None
+    # One immediately, then 11 more at 40/s
+    assert elapsed >= 11 / 40 * 0.8
+    assert len(connected) == fleet_size
+    # The critical role was granted the first token
+    assert connected["dev_07"] == min(connected.values())
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import typer
+from helpers import make_device
+from typer.testing import CliRunner
+
+from espro import client
+from espro.cli import delegation
+from espro.cli.app import app
+from espro.cli.delegation import DelegationServer
+from espro.config import DatabaseConfig, Settings, get_settings, write_settings
+from espro.database import Database
+from espro.models import ScanResult
+
+
+def _setup(tmp_path, monkeypatch, scan_age: float = 30) -> DelegationServer:
+    data_dir = tmp_path / "data"
+    config_path = tmp_path / "config.toml"
+    settings = Settings(database=DatabaseConfig(path=str(data_dir)))
+    write_settings(settings, config_path)
+    monkeypatch.setenv("ESPRO_CONFIG", str(config_path))
+    monkeypatch.delenv("COLUMNS", raising=False)
+    get_settings.cache_clear()
+
+    db = Database(data_dir)
+    db.add_logical_device("kitchen", "kitchen-plug", role="plug")
+    db.add_logical_device("garage", "garage-door")
+    db.write_scan(
+        ScanResult(
+            scan_timestamp=datetime.now(timezone.utc) - timedelta(seconds=scan_age),
+            network="mdns",
+            devices=[make_device("192.168.1.10")],
+        )
+    )
+    commands = typer.main.get_command(app)
+    assert isinstance(commands, typer.core.TyperGroup)
+    return DelegationServer(db, settings, commands)
+
+
+def _delegate_all(server: DelegationServer, commands: list[list[str]]) -> list:
+    async def _run() -> list:
+        assert await server.start()
+        try:
+            return [await asyncio.to_thread(client.delegate, argv) for argv in commands]
+        finally:
+            await server.close()
+
+    return asyncio.run(_run())
+
+
+def test_socket_path_matches_database(tmp_path, monkeypatch):
+    server = _setup(tmp_path, monkeypatch)
+    assert client.socket_path() == server.path
+
+    monkeypatch.delenv("ESPRO_CONFIG")
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "none"))
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "share"))
+    get_settings.cache_clear()
+    expected = Database(Path(get_settings().database.path)).control_socket_path
+    assert client.socket_path() == str(expected)
+
+
+def test_delegated_output_matches_in_process(tmp_path, monkeypatch):
+    server = _setup(tmp_path, monkeypatch)
+    runner = CliRunner()
+    listed, validated, status = _delegate_all(
+        server, [["list"], ["validate"], ["status"]]
+    )
+
+    local = runner.invoke(app, ["list"])
+    assert listed == {"exit": 0, "stdout": local.stdout, "stderr": ""}
+    assert "kitchen-plug" in listed["stdout"]
+
+    local = runner.invoke(app, ["validate"])
+    assert validated["exit"] == local.exit_code == 1
+    assert validated["stdout"] == local.stdout
+    assert "garage" in validated["stdout"]
+
+    assert "Daemon: running" in status["stdout"]
+    assert "Logical devices: 2" in status["stdout"]
+    # The socket is removed on shutdown
+    assert "Daemon: not running" in runner.invoke(app, ["status"]).stdout
+
+
+def test_scan_json_from_daemon(tmp_path, monkeypatch):
+    server = _setup(tmp_path, monkeypatch)
+    (reply,) = _delegate_all(server, [["scan", "--json"]])
+    assert reply["exit"] == 0
+    assert "Daemon scan from" in reply["stderr"]
+    rows = json.loads(reply["stdout"])
+    assert (rows[0]["ip"], rows[0]["logical"]) == ("192.168.1.10", "kitchen")
+
+
+def test_file_backed_commands_render_off_the_event_loop(tmp_path, monkeypatch):
+    server = _setup(tmp_path, monkeypatch)
+    on_main: dict[str, bool] = {}
+
+    def _record(name: str, render):
+        def _wrapped(*args, **kwargs):
+            on_main[name] = threading.current_thread() is threading.main_thread()
+            return render(*args, **kwargs)
+
+        return _wrapped
+
+    monkeypatch.setattr(
+        delegation, "print_scan", _record("scan", delegation.print_scan)
+    )
+    monkeypatch.setattr(
+        delegation, "print_status", _record("status", delegation.print_status)
+    )
+    scanned, status = _delegate_all(server, [["scan"], ["status"]])
+    assert scanned["exit"] == status["exit"] == 0
+    assert on_main == {"scan": False, "status": True}
+
+
+def test_falls_back_when_daemon_cannot_answer(tmp_path, monkeypatch):
+    server = _setup(tmp_path, monkeypatch, scan_age=3600)
+    replies = _delegate_all(
+        server,
+        [
+            ["validate", "--live"],
+            ["scan", "--save"],
+            ["list", "--bogus"],
+            ["add", "x", "y"],
+            # Older than the daemon keeps it: needs a real discovery
+            ["scan"],
+            ["scan", "--max-age", "7200"],
+        ],
+    )
+    assert replies[:5] == [None] * 5
+    assert replies[5] is not None and replies[5]["exit"] == 0
+
+    # No daemon listening
+    assert client.delegate(["list"]) is None
+
+
+def test_stale_socket_is_replaced(tmp_path, monkeypatch):
+    server = _setup(tmp_path, monkeypatch)
+    path = server._db.control_socket_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("")
+
+    async def _run() -> bool:
+        assert await server.start()
+        try:
+            # A second daemon leaves the live socket alone
+            return await _setup(tmp_path, monkeypatch).start()
+        finally:
+            await server.close()
+
+    assert asyncio.run(_run()) is False
+    assert not path.exists()
+
+
+def test_client_imports_almost_nothing():
+    code = (
+        "import sys, espro.client; "
+        "print([m for m in ('pydantic', 'typer', 'rich') if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
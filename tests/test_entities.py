@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+
+from espro.config import ScanningConfig
+from espro.core import EntityIndex, fetch_catalog
+from espro.core.mock_device import MockESPHomeDevice
+from espro.database import Database
+from espro.models import DeviceEntities, EntityRecord
+
+ROOMS = ["garage", "kitchen", "attic", "basement", "porch"]
+
+
+def _fleet(devices: int, per_device: int) -> list[DeviceEntities]:
+    catalogs = []
+    for index in range(devices):
+        room = ROOMS[index % len(ROOMS)]
+        entities = []
+        for key in range(per_device):
+            kind = ["temperature", "humidity", "door", "relay"][key % 4]
+            entity_type = {"door": "binary_sensor", "relay": "switch"}.get(
+                kind, "sensor"
+            )
+            entities.append(
+                EntityRecord(
+                    key=key,
+                    object_id=f"{room}_{kind}_{key}",
+                    name=f"{room.title()} {kind.title()} {key}",
+                    entity_type=entity_type,
+                    device_class=kind if entity_type == "sensor" else None,
+                )
+            )
+        catalogs.append(
+            DeviceEntities(
+                logical_name=f"{room}_node_{index}",
+                host=f"10.0.0.{index}",
+                esphome_version="2026.6.5",
+                compilation_time="Jun  1 2026, 00:00:00",
+                fetched_at=datetime.now(timezone.utc),
+                entities=entities,
+            )
+        )
+    return catalogs
+
+
+def test_entity_index_search():
+    index = EntityIndex(_fleet(devices=100, per_device=30))
+    assert len(index) == 3000
+
+    hits = index.search("all temperature sensors in the garage")
+    assert hits
+    assert all(hit.logical_name.startswith("garage") for hit in hits)
+    assert all(hit.entity.device_class == "temperature" for hit in hits)
+    assert len(hits) == 20 * 8
+    assert index.search("kitch rel") == index.search("kitchen relay")
+    assert index.search("nonexistent") == []
+    assert len(index.search("")) == 3000
+
+
+def test_fetch_catalog_reuses_unchanged_firmware(tmp_path):
+    db = Database(tmp_path)
+
+    async def _run():
+        device = MockESPHomeDevice(host="127.0.0.1", port=0, advertise=False)
+        await device.start()
+        try:
+            config = ScanningConfig(port=device.port, timeout=1.0)
+            targets = {"mock": "127.0.0.1"}
+            first = await fetch_catalog(targets, config, {"mock": None})
+            assert first[0].catalog is not None
+            db.save_entities(first[0].catalog)
+
+            second = await fetch_catalog(
+                targets, config, {"mock": db.load_entities("mock")}
+            )
+            device.compilation_time = "Jun  2 2026, 00:00:00"
+            third = await fetch_catalog(
+                targets, config, {"mock": db.load_entities("mock")}
+            )
+            return first, second, third, device.list_entities_requests
+        finally:
+            await device.stop()
+
+    first, second, third, requests = asyncio.run(_run())
+
+    assert first[0].refreshed
+    assert [e.object_id for e in first[0].catalog.entities] == ["relay"]
+    assert first[0].catalog.entities[0].entity_type == "switch"
+    assert not second[0].refreshed
+    assert second[0].catalog == first[0].catalog
+    assert third[0].refreshed
+    assert requests == 2
+
+
+def test_corrupt_entity_cache_is_a_miss(tmp_path):
+    db = Database(tmp_path)
+    (catalog,) = _fleet(devices=1, per_device=2)
+    db.save_entities(catalog)
+    assert db.load_entities(catalog.logical_name) == catalog
+
+    (tmp_path / "entities" / f"{catalog.logical_name}.json").write_text('{"logi')
+    assert db.load_entities(catalog.logical_name) is None
+    assert db.load_entities("missing") is None
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+
+from espro.config import ScanningConfig
+from espro.core import probe_fleet
+from espro.core.mock_device import MockESPHomeDevice
+from espro.database import Database
+from espro.utils.histogram import LatencyHistogram
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for value in [0.5] * 90 + [30.0] * 9 + [1500.0]:
+        histogram.record(value)
+
+    assert histogram.count == 100
+    assert histogram.min == 0.5
+    assert histogram.percentile(0.5) == 1
+    assert histogram.percentile(0.95) == 50
+    assert histogram.percentile(1.0) == 1500.0
+    assert LatencyHistogram().percentile(0.5) is None
+
+
+def test_probe_fleet_against_mock_device(tmp_path):
+    async def _run():
+        device = MockESPHomeDevice(host="127.0.0.1", port=0, advertise=False)
+        await device.start()
+        try:
+            config = ScanningConfig(port=device.port, timeout=1.0)
+            return await probe_fleet(
+                {"mock": "127.0.0.1", "dead": "127.0.0.2"},
+                config.model_copy(update={"timeout": 0.5}),
+                rounds=3,
+            )
+        finally:
+            await device.stop()
+
+    report = asyncio.run(_run())
+    by_name = {device.logical_name: device for device in report.devices}
+
+    assert by_name["mock"].pings_ok == 3
+    assert by_name["mock"].errors == 0
+    assert by_name["mock"].rtt_p99_ms is not None
+    assert by_name["dead"].connect_ms is None
+    assert by_name["dead"].errors == 3
+
+    db = Database(tmp_path)
+    db.save_health(report)
+    db.save_health(report)
+    assert len(db.load_health_history()) == 2
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+
+import pytest
+
+from espro.config import ScanningConfig
+from espro.core import Discovery
+from espro.core import scanner as scan_module
+from espro.core.latency import (
+    MAX_MISSES,
+    MIN_SAMPLES,
+    deadline,
+    observe,
+    observe_miss,
+)
+from espro.core.mock_device import MockESPHomeDevice, start_mock_fleet
+from espro.core.mock_faults import Faults
+from espro.models import ConnectLatency, PhysicalDevice
+
+
+def _history(samples: list[float]) -> ConnectLatency | None:
+    latency = None
+    for seconds in samples:
+        latency = observe(latency, seconds)
+    return latency
+
+
+def test_deadlines_follow_each_devices_own_latency():
+    config = ScanningConfig(timeout=2.0)
+    wired = _history([0.02, 0.025, 0.018, 0.03, 0.02])
+    mesh = _history([1.2, 1.5, 1.4, 1.6, 1.3])
+    assert deadline(wired, config) == config.min_timeout
+    assert 2.0 < deadline(mesh, config) <= config.max_timeout
+    # Too little history, or adaptive timeouts off: the global timeout
+    assert deadline(None, config) == 2.0
+    assert deadline(_history([0.02] * (MIN_SAMPLES - 1)), config) == 2.0
+    assert deadline(wired, config.model_copy(update={"adaptive_timeout": False})) == 2.0
+
+    # A miss widens the next deadline; a second one falls back to the global timeout
+    once = observe_miss(wired, config.min_timeout)
+    assert once is not None and once.misses == 1 and once.samples == wired.samples
+    assert config.min_timeout < deadline(once, config) < 2.0
+    twice = observe_miss(once, deadline(once, config))
+    assert twice is not None and deadline(twice, config) == 2.0
+    assert observe(twice, 0.02).misses == 0
+    assert observe_miss(None, 1.0) is None
+
+
+def _quiet_mdns(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def _quiet_browse(config, interface=None, stop=None):
+        stop = stop or asyncio.Event()
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(stop.wait(), config.timeout)
+        return []
+
+    monkeypatch.setattr(scan_module, "_browse", _quiet_browse)
+    monkeypatch.setattr(scan_module, "espressif_neighbors", list)
+
+
+def _known(device: MockESPHomeDevice, samples: list[float]) -> PhysicalDevice:
+    return PhysicalDevice(
+        ip=device.host,
+        name=device.name,
+        friendly_name="",
+        mac_address=device.mac_address,
+        model="ESP32",
+        esphome_version=device.esphome_version,
+        latency=_history(samples),
+    )
+
+
+def test_scan_probes_known_devices_with_learned_deadlines(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    _quiet_mdns(monkeypatch)
+    config = ScanningConfig(timeout=0.5)
+    histories = {
+        # Answers instantly, then stops answering altogether
+        "mock-0": [0.01, 0.012, 0.011],
+        # Slower than the global timeout, but always that slow
+        "mock-1": [0.6, 0.65, 0.62],
+        "mock-2": [0.01, 0.012, 0.011],
+    }
+
+    async def _scan(adaptive: bool = True) -> tuple[Discovery, float, int]:
+        fleet = await start_mock_fleet(3)
+        fleet[0].faults = Faults(half_open=1)
+        fleet[1].faults = Faults(handshake_delay=0.6)
+        known = [_known(device, histories[device.name]) for device in fleet]
+        scanning = config.model_copy(
+            update={"port": fleet[0].port, "adaptive_timeout": adaptive}
+        )
+        started = time.perf_counter()
+        try:
+            found = await scan_module.scan_network("mdns", scanning, known=known)
+        finally:
+            for device in fleet:
+                await device.stop()
+        return found, time.perf_counter() - started, fleet[0].half_open_connections
+
+    found, elapsed, half_open = asyncio.run(_scan())
+    by_name = {device.name: device for device in found.devices}
+    # The slow device is not reported missing although it needs more than
+    # the 0.5s global timeout; the dead one is given up on after 0.25s
+    assert sorted(by_name) == ["mock-1", "mock-2"]
+    assert half_open == 1
+    assert elapsed < 1.0
+    assert by_name["mock-1"].latency is not None
+    assert by_name["mock-1"].latency.samples == 4
+    assert by_name["mock-2"].latency is not None
+    assert by_name["mock-2"].latency.mean < 0.1
+
+    # With one global timeout the slow device would have been missed
+    found, _elapsed, _half_open = asyncio.run(_scan(adaptive=False))
+    assert [device.name for device in found.devices] == ["mock-2"]
+
+
+def test_missing_devices_keep_their_history_across_scans(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    _quiet_mdns(monkeypatch)
+
+    async def _scans() -> list[Discovery]:
+        (device,) = await start_mock_fleet(1)
+        device.faults = Faults(half_open=1)
+        config = ScanningConfig(port=device.port, timeout=0.3)
+        results = []
+        missing = [_known(device, [0.01, 0.012, 0.011])]
+        try:
+            for _ in range(MAX_MISSES + 1):
+                found = await scan_module.scan_network(
+                    "mdns", config, known=[], missing=missing
+                )
+                results.append(found)
+                missing = found.missing
+        finally:
+            await device.stop()
+        return results
+
+    scans = asyncio.run(_scans())
+    assert all(not found.devices for found in scans)
+    first, second = (found.missing[0].latency for found in scans[:2])
+    assert first is not None and first.misses == 1 and first.samples == 3
+    # The second miss in a row is counted, not forgotten
+    assert second is not None and second.misses == 2 and second.samples == 3
+    assert deadline(second, ScanningConfig(timeout=0.3)) == 0.3
+    # Silent for longer than MAX_MISSES scans: dropped
+    assert scans[-1].missing == []
+
+
+def test_announced_device_without_probe_keeps_history(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    history = _history([0.01, 0.012, 0.011])
+    announced = PhysicalDevice(
+        ip="192.168.1.20",
+        name="kitchen",
+        friendly_name="",
+        mac_address="AA:BB:CC:DD:EE:01",
+        model="ESP32",
+        esphome_version="2024.12.0",
+    )
+
+    async def _announce(config, interface=None, stop=None):
+        return [announced]
+
+    async def _unprobed(known, config):
+        return [], {}
+
+    monkeypatch.setattr(scan_module, "_browse", _announce)
+    monkeypatch.setattr(scan_module, "_probe_known", _unprobed)
+    monkeypatch.setattr(scan_module, "espressif_neighbors", list)
+    known = announced.model_copy(update={"ip": "192.168.1.9", "latency": history})
+    found = asyncio.run(
+        scan_module.scan_network("mdns", ScanningConfig(), known=[known])
+    )
+    assert [device.latency for device in found.devices] == [history]
+    assert found.missing == []
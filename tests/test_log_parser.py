@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+
+from espro.core.log_parser import (
+    LogFilter,
+    parse_log_text,
+    render_json,
+    render_pretty,
+    render_raw,
+)
+
+SENSOR = "\x1b[0;36m[D][sensor:094]: 'Temperature': Sending state 21.50 °C\x1b[0m"
+
+
+def _spam(count: int) -> list[str]:
+    tags = ("sensor", "wifi", "api.connection", "dallas.temp.sensor", "mqtt")
+    return [
+        f"\x1b[0;36m[D][{tags[i % 5]}:{i % 300:03d}]: 'Probe {i % 40}': "
+        f"Sending state {i * 0.1:.2f}\x1b[0m"
+        for i in range(count)
+    ]
+
+
+def test_parse_log_text_fields():
+    (record,) = parse_log_text(SENSOR, "12:00:00")
+    assert record.level == "D"
+    assert record.tag == "sensor"
+    assert record.line == 94
+    assert record.component == "Temperature"
+    assert record.message == "'Temperature': Sending state 21.50 °C"
+    assert record.device_time is None
+    assert record.raw == SENSOR
+    assert record.received == "12:00:00"
+
+    (timed,) = parse_log_text("[08:15:02.113][W][wifi:1123][wifi_task]: Lost AP")
+    assert (timed.level, timed.tag, timed.line) == ("W", "wifi", 1123)
+    assert timed.device_time == "08:15:02.113"
+    assert timed.message == "Lost AP"
+    assert timed.component is None
+
+    (verbose,) = parse_log_text("[VV][scheduler]: tick")
+    assert (verbose.level, verbose.tag, verbose.line) == ("VV", "scheduler", None)
+
+
+def test_parse_log_text_continuations_and_garbage():
+    text = "[C][wifi:600]: WiFi:\n  SSID: 'home'\n  Channel: 6\n\nboot junk"
+    records = parse_log_text(text)
+    assert [r.message for r in records] == [
+        "WiFi:",
+        "SSID: 'home'",
+        "Channel: 6",
+        "boot junk",
+    ]
+    assert [r.tag for r in records] == ["wifi", "wifi", "wifi", ""]
+    assert records[1].line == 600
+    assert records[3].level == ""
+
+
+def test_log_filter_tags_and_regex():
+    records = [record for line in _spam(10) for record in parse_log_text(line)]
+
+    sensors = LogFilter(["sensor", "dallas.*"]).apply(records)
+    assert {r.tag for r in sensors} == {"sensor", "dallas.temp.sensor"}
+
+    probe_three = LogFilter(pattern=r"'Probe 3'").apply(records)
+    assert [r.component for r in probe_three] == ["Probe 3"]
+
+    both = LogFilter(["wifi"], r"Probe [0-4]'").apply(records)
+    assert [r.tag for r in both] == ["wifi"]
+
+    assert LogFilter().apply(records) == records
+
+
+def test_renderers():
+    records = parse_log_text(SENSOR + "\n[E][ota:042]: Bad MD5", "12:00:00")
+
+    assert render_raw(records) == SENSOR + "\n[E][ota:042]: Bad MD5"
+
+    rows = [json.loads(line) for line in render_json(records).splitlines()]
+    assert rows[0]["level"] == "debug"
+    assert rows[0]["component"] == "Temperature"
+    assert rows[1] == {
+        "received": "12:00:00",
+        "device_time": None,
+        "level": "error",
+        "tag": "ota",
+        "line": 42,
+        "component": None,
+        "message": "Bad MD5",
+    }
+
+    pretty = render_pretty(records)
+    assert pretty.plain == (
+        "[12:00:00][D][sensor:094]: 'Temperature': Sending state 21.50 °C\n"
+        "[12:00:00][E][ota:042]: Bad MD5"
+    )
+    assert "\x1b" not in pretty.plain
+
+
+def test_filter_one_message_per_line():
+    lines = _spam(2_000)
+    log_filter = LogFilter(["sensor"], r"Probe 1\d'")
+    kept = [
+        record for line in lines for record in log_filter.apply(parse_log_text(line))
+    ]
+    # Every 5th line is tagged "sensor"; of those, 'Probe 10'..'Probe 19'
+    assert len(kept) == 100
+    assert {record.tag for record in kept} == {"sensor"}
+    assert all(record.raw in lines for record in kept)
+    assert "dallas.temp.sensor" in log_filter._tag_cache
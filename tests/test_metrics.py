@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+
+from espro.config import DaemonConfig, DatabaseConfig, ScanningConfig, Settings
+from espro.core import Daemon, Discovery, FleetMetrics
+from espro.core import daemon as daemon_module
+from espro.database import Database
+from espro.models import PhysicalDevice
+from espro.utils.metrics import MetricsRegistry
+
+
+def test_metrics_render_openmetrics():
+    registry = MetricsRegistry()
+    lines = registry.counter("espro_lines", "Lines.", ("logical",))
+    rtt = registry.histogram("espro_rtt_seconds", "RTT.", ("logical",))
+
+    child = lines.labels('kitchen "main"')
+    child.inc()
+    child.inc(2)
+    rtt.labels("kitchen").record(3.0)
+
+    text = registry.render()
+
+    assert "# TYPE espro_lines counter" in text
+    assert 'espro_lines_total{logical="kitchen \\"main\\""} 3' in text
+    assert 'espro_rtt_seconds_bucket{logical="kitchen",le="0.005"} 1' in text
+    assert 'espro_rtt_seconds_bucket{logical="kitchen",le="0.002"} 0' in text
+    assert 'espro_rtt_seconds_count{logical="kitchen"} 1' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_metrics_render_non_finite_values():
+    registry = MetricsRegistry()
+    skew = registry.gauge("espro_skew", "Skew.", ("device",))
+    skew.labels("a").set(float("inf"))
+    skew.labels("b").set(float("-inf"))
+    skew.labels("c").set(float("nan"))
+    skew.labels("d").set(1.5)
+
+    text = registry.render()
+
+    assert 'espro_skew{device="a"} +Inf' in text
+    assert 'espro_skew{device="b"} -Inf' in text
+    assert 'espro_skew{device="c"} NaN' in text
+    assert 'espro_skew{device="d"} 1.5' in text
+
+
+def test_daemon_discovery_updates_metrics_and_scrape(tmp_path, monkeypatch):
+    db = Database(tmp_path)
+    db.add_logical_device("kitchen", "esp-kitchen")
+    db.add_logical_device("garage", "esp-garage")
+
+    async def _fake_scan_network(_network: str, _config: ScanningConfig, **_kwargs):
+        return Discovery(
+            [
+                PhysicalDevice(
+                    ip="192.168.1.10",
+                    name="esp-kitchen",
+                    friendly_name="Kitchen",
+                    mac_address="AA:BB:CC:DD:EE:01",
+                    model="ESP32",
+                    esphome_version="2024.1.0",
+                )
+            ]
+        )
+
+    monkeypatch.setattr(daemon_module, "scan_network", _fake_scan_network)
+
+    settings = Settings(
+        database=DatabaseConfig(path=str(tmp_path)),
+        daemon=DaemonConfig(metrics_host="127.0.0.1", metrics_port=1),
+    )
+    daemon = Daemon(db, settings, FleetMetrics())
+
+    async def _run() -> bytes:
+        await daemon.discover_once()
+        server = await daemon_module.start_http_server(
+            daemon._handle_http, "127.0.0.1", 0
+        )
+        port = server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+            await writer.drain()
+            body = await reader.read()
+            writer.close()
+            return body
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    response = asyncio.run(_run()).decode()
+
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert 'espro_device_up{logical="kitchen"} 1' in response
+    assert 'espro_device_up{logical="garage"} 0' in response
+    assert 'espro_registry_validation_errors{logical="garage"} 1' in response
+    assert "espro_discovered_devices 1" in response
+    assert db.load_current_scan() is not None
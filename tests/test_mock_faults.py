@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from espro.config import ScanningConfig
+from espro.core import check_device
+from espro.core.mock_device import (
+    MSG_DEVICE_INFO_REQUEST,
+    MSG_DEVICE_INFO_RESPONSE,
+    MSG_HELLO_REQUEST,
+    MSG_HELLO_RESPONSE,
+    MSG_PING_REQUEST,
+    MSG_PING_RESPONSE,
+    MockESPHomeDevice,
+    make_frame,
+    parse_frames,
+    pb,
+    start_mock_fleet,
+)
+from espro.core.mock_faults import Faults, parse_faults
+
+
+def test_profiles_draw_reproducibly_per_device():
+    profile = parse_faults("latency=0.01, jitter=0..0.2, half-open=0.25", seed=7)
+    first = profile.sample("mock-1")
+    assert first == parse_faults(
+        "latency=0.01,jitter=0..0.2,half-open=0.25", seed=7
+    ).sample("mock-1")
+    assert first.latency == 0.01 and first.half_open == 0.25
+    assert 0 <= first.jitter <= 0.2
+    assert first.jitter != profile.sample("mock-2").jitter
+    assert first.jitter != parse_faults("jitter=0..0.2", seed=8).sample("mock-1").jitter
+    assert parse_faults("recv-buffer=4096").sample("x").recv_buffer == 4096
+    assert not Faults() and not parse_faults("").sample("x")
+
+    for spec in ("lag=1", "latency", "latency=fast", "jitter=0.2..0.1", "half-open=2"):
+        with pytest.raises(ValueError):
+            parse_faults(spec)
+
+
+def test_pipelined_frames_are_all_answered():
+    async def _run() -> list[int]:
+        device = MockESPHomeDevice(host="127.0.0.1", port=0, advertise=False)
+        await device.start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", device.port)
+            hello = pb.HelloRequest(client_info="test").SerializeToString()
+            ping = make_frame(MSG_PING_REQUEST, b"")
+            # Two requests and the start of a third in one segment
+            writer.write(
+                make_frame(MSG_HELLO_REQUEST, hello)
+                + make_frame(MSG_DEVICE_INFO_REQUEST, b"")
+                + ping[:1]
+            )
+            await asyncio.sleep(0.05)
+            writer.write(ping[1:])
+            received = b""
+            while len(parse_frames(received)) < 3:
+                received += await asyncio.wait_for(reader.read(4096), 2.0)
+            writer.close()
+            return [msg_type for msg_type, _payload, _end in parse_frames(received)]
+        finally:
+            await device.stop()
+
+    assert asyncio.run(_run()) == [
+        MSG_HELLO_RESPONSE,
+        MSG_DEVICE_INFO_RESPONSE,
+        MSG_PING_RESPONSE,
+    ]
+
+
+def test_faulty_fleet_is_reproducible():
+    profile = parse_faults("half-open=0.5,handshake-delay=0..0.2", seed=3)
+
+    async def _run() -> tuple[list[bool], list[float], list[int]]:
+        devices = await start_mock_fleet(6, profile)
+        config = ScanningConfig(port=devices[0].port, timeout=0.6)
+        try:
+
+            async def _check(device: MockESPHomeDevice) -> tuple[bool, float]:
+                started = time.perf_counter()
+                found = await check_device(device.host, config)
+                return found is not None, time.perf_counter() - started
+
+            results = await asyncio.gather(*(_check(device) for device in devices))
+            return (
+                [ok for ok, _ in results],
+                [elapsed for _, elapsed in results],
+                [device.half_open_connections for device in devices],
+            )
+        finally:
+            for device in devices:
+                await device.stop()
+
+    answered, elapsed, half_open = asyncio.run(_run())
+    assert any(answered) and not all(answered)
+    assert half_open == [0 if ok else 1 for ok in answered]
+    delays = [profile.sample(f"mock-{n}").handshake_delay for n in range(6)]
+    for ok, took, delay in zip(answered, elapsed, delays, strict=True):
+        assert took >= (delay if ok else 0.6)
+    # Same seed, same fleet behaviour
+    assert asyncio.run(_run())[0] == answered
+
+
+def test_connections_drop_and_reads_stall():
+    async def _run() -> tuple[float, int]:
+        device = MockESPHomeDevice(
+            host="127.0.0.1",
+            port=0,
+            advertise=False,
+            faults=Faults(disconnect_after=0.05, read_delay=0.2, latency=0.01),
+        )
+        await device.start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", device.port)
+            started = time.perf_counter()
+            assert await asyncio.wait_for(reader.read(4096), 2.0) == b""
+            writer.close()
+            return time.perf_counter() - started, device.dropped_connections
+        finally:
+            await device.stop()
+
+    took, dropped = asyncio.run(_run())
+    assert dropped == 1 and took < 1.0
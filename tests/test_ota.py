@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import espro.core.ota as ota_module
+from espro.config import ScanningConfig
+from espro.core.mock_device import MockESPHomeDevice, make_mock_firmware
+from espro.core.ota import (
+    STATUS_FAILED,
+    STATUS_SKIPPED,
+    STATUS_UPDATED,
+    OTAError,
+    OTATarget,
+    RolloutOptions,
+    compile_firmware,
+    plan_waves,
+    run_rollout,
+)
+from espro.core.resolver import select_logical
+from espro.models import DeviceRegistry, LogicalDevice
+
+
+def test_plan_waves_canary_first():
+    names = [f"dev{i}" for i in range(7)]
+    assert plan_waves(names, canary=1, wave_size=3) == [
+        ["dev0"],
+        ["dev1", "dev2", "dev3"],
+        ["dev4", "dev5", "dev6"],
+    ]
+    assert plan_waves(names[:2], canary=0, wave_size=5) == [["dev0", "dev1"]]
+
+
+def test_select_logical_by_role_and_glob():
+    registry = DeviceRegistry(
+        logical_devices={
+            "kitchen_plug": LogicalDevice(physical="a", role="plug"),
+            "garage_plug": LogicalDevice(physical="b", role="plug"),
+            "hall_light": LogicalDevice(physical="c"),
+        }
+    )
+    assert select_logical(registry, "role:*") == ["garage_plug", "kitchen_plug"]
+    assert select_logical(registry, "hall_*,role:none") == ["hall_light"]
+    assert len(select_logical(registry, None)) == 3
+
+
+def _run_fleet_rollout(
+    monkeypatch: pytest.MonkeyPatch,
+    uploader_factory,
+    options: RolloutOptions,
+    count: int = 3,
+) -> list:
+    # Every mock listens on 127.0.0.1; the host alias carries the index.
+    ports: dict[str, int] = {}
+    real_fetch = ota_module.fetch_build
+
+    async def _fetch(host: str, config: ScanningConfig):
+        return await real_fetch(
+            "127.0.0.1", config.model_copy(update={"port": ports[host]})
+        )
+
+    monkeypatch.setattr(ota_module, "fetch_build", _fetch)
+
+    async def _run():
+        devices = [
+            MockESPHomeDevice(
+                name=f"mock-{i}",
+                host="127.0.0.1",
+                port=0,
+                ota_port=0,
+                advertise=False,
+                reboot_delay=0.05,
+            )
+            for i in range(count)
+        ]
+        for device in devices:
+            await device.start()
+        try:
+            targets = []
+            for i, device in enumerate(devices):
+                ports[f"127.0.0.1#{i}"] = device.port
+                targets.append(
+                    OTATarget(f"dev{i}", f"127.0.0.1#{i}", device.ota_port or 0)
+                )
+            return await run_rollout(
+                targets,
+                Path("firmware.bin"),
+                ScanningConfig(timeout=0.5),
+                options,
+                uploader=uploader_factory(devices),
+            )
+        finally:
+            for device in devices:
+                await device.stop()
+
+    return asyncio.run(_run())
+
+
+def _flash(devices, fail_index: int | None = None):
+    async def _upload(host: str, port: int, password, firmware: Path) -> None:
+        index = int(host.split("#")[1])
+        if index == fail_index:
+            raise OTAError("simulated upload failure")
+        device = devices[index]
+        device._apply_firmware(make_mock_firmware("2025.2.0", size=128))
+        await device._reboot()
+
+    return _upload
+
+
+def test_rollout_updates_fleet_and_gates_on_version(monkeypatch):
+    outcomes = _run_fleet_rollout(
+        monkeypatch,
+        _flash,
+        RolloutOptions(wave_size=2, expected_version="2025.2.0", poll_interval=0.05),
+    )
+    assert [outcome.status for outcome in outcomes] == [STATUS_UPDATED] * 3
+    assert {outcome.version for outcome in outcomes} == {"2025.2.0"}
+    assert [outcome.wave for outcome in outcomes] == [1, 2, 2]
+
+
+def test_rollout_halts_after_canary_failure(monkeypatch):
+    outcomes = _run_fleet_rollout(
+        monkeypatch,
+        lambda devices: _flash(devices, fail_index=0),
+        RolloutOptions(wave_size=2, poll_interval=0.05),
+    )
+    assert [outcome.status for outcome in outcomes] == [
+        STATUS_FAILED,
+        STATUS_SKIPPED,
+        STATUS_SKIPPED,
+    ]
+
+
+def test_unreachable_device_is_not_flashed(monkeypatch):
+    uploads: list[str] = []
+
+    async def _fetch(host: str, config: ScanningConfig) -> None:
+        return None
+
+    async def _upload(host: str, port: int, password, firmware: Path) -> None:
+        uploads.append(host)
+
+    monkeypatch.setattr(ota_module, "fetch_build", _fetch)
+    outcomes = asyncio.run(
+        run_rollout(
+            [OTATarget("dev0", "127.0.0.1", 0), OTATarget("dev1", "127.0.0.2", 0)],
+            Path("firmware.bin"),
+            ScanningConfig(timeout=0.1),
+            RolloutOptions(poll_interval=0.01),
+            uploader=_upload,
+        )
+    )
+    assert [outcome.status for outcome in outcomes] == [STATUS_FAILED, STATUS_SKIPPED]
+    assert outcomes[0].error is not None and "not reachable" in outcomes[0].error
+    assert uploads == []
+
+
+def test_compile_firmware_picks_the_configs_own_image(tmp_path, monkeypatch):
+    monkeypatch.setattr(ota_module.subprocess, "run", lambda *a, **kw: None)
+    build = tmp_path / ".esphome" / "build"
+
+    def _image(node: str, name: str) -> Path:
+        path = build / node / ".pioenvs" / node / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"\xe9")
+        return path
+
+    own = _image("kitchen", "firmware.bin")
+    _image("garage", "firmware.ota.bin")  # another config, built later
+    assert compile_firmware(tmp_path / "kitchen.yaml") == own
+
+    # The node name may differ from the file name; ESPHome records it
+    storage = tmp_path / ".esphome" / "storage"
+    storage.mkdir()
+    (storage / "living.yaml.json").write_text('{"name": "garage"}')
+    assert compile_firmware(tmp_path / "living.yaml").name == "firmware.ota.bin"
+
+    with pytest.raises(OTAError, match="No firmware image"):
+        compile_firmware(tmp_path / "attic.yaml")
+
+
+def test_mock_ota_endpoint_accepts_espota2_upload(tmp_path):
+    espota2 = pytest.importorskip("esphome.espota2")
+    firmware = tmp_path / "firmware.bin"
+    firmware.write_bytes(make_mock_firmware("2025.3.0", size=20000))
+
+    async def _run() -> MockESPHomeDevice:
+        device = MockESPHomeDevice(
+            host="127.0.0.1", port=0, ota_port=0, advertise=False, reboot_delay=0
+        )
+        await device.start()
+        try:
+            code, _ = await asyncio.to_thread(
+                espota2.run_ota, "127.0.0.1", device.ota_port, None, firmware
+            )
+            assert code == 0
+        finally:
+            await device.stop()
+        return device
+
+    assert asyncio.run(_run()).esphome_version == "2025.3.0"
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from typer.testing import CliRunner
+
+from espro.cli.app import app
+from espro.config import (
+    DaemonConfig,
+    DatabaseConfig,
+    ScanningConfig,
+    Settings,
+    get_settings,
+    write_settings,
+)
+from espro.core import Daemon
+from espro.core.mock_device import MockESPHomeDevice
+from espro.core.recorder import (
+    FILE_SIZE,
+    Recorder,
+    open_series,
+    recorded_entities,
+    summarize,
+)
+from espro.database import Database
+
+
+def test_rings_downsample_and_survive_reopen(tmp_path):
+    now = 1_699_999_200.0  # on a 15-minute boundary
+    recorder = Recorder(tmp_path)
+    # A reading every 10s for 26h: more than the raw ring holds
+    for n in range(26 * 360):
+        recorder.record(
+            "kitchen", "temperature", float(n % 60), now - 26 * 3600 + n * 10
+        )
+    recorder.record("kitchen", "temperature", float("nan"), now)
+    assert recorder.samples == 26 * 360
+    recorder.close()
+
+    path = tmp_path / "kitchen" / "temperature.ts"
+    assert path.stat().st_size == FILE_SIZE
+    series = open_series(tmp_path, "kitchen", "temperature")
+    assert series is not None
+    raw = series.points(0)
+    assert len(raw) == 4096
+    assert raw[-1][1] == float((26 * 360 - 1) % 60)
+
+    # 60 one-minute buckets of six readings each; means of 0..5, 6..11, ...
+    minutes = series.points(1, since=now - 3600)
+    assert [point[1] for point in minutes[:3]] == [2.5, 8.5, 14.5]
+    assert (minutes[0][2], minutes[0][3]) == (0.0, 5.0)
+
+    # The last 30 minutes fit in the raw ring; 24h need the 1-min tier
+    recent = summarize(series, 1800, width=20, now=now)
+    assert recent is not None and recent.tier == 0 and recent.points == 180
+    day = summarize(series, 86400, width=20, now=now)
+    assert day is not None and day.tier == 1
+    assert (day.minimum, day.maximum) == (0.0, 59.0)
+    assert len(day.sparkline) == 20 and set(day.sparkline) <= set("▁▂▃▄▅▆▇█ ")
+    week = summarize(series, 7 * 86400, now=now)
+    assert week is not None and week.tier == 2
+    series.close()
+
+    # Appending after a restart continues the same rings
+    recorder = Recorder(tmp_path)
+    recorder.record("kitchen", "temperature", 99.0, now + 10)
+    recorder.close()
+    series = open_series(tmp_path, "kitchen", "temperature")
+    assert series is not None and series.last() == (now + 10, 99.0)
+    assert len(series.points(0)) == 4096
+    series.close()
+    assert recorded_entities(tmp_path, "kitchen") == ["temperature"]
+
+
+def test_recorder_bounds_open_files(tmp_path):
+    recorder = Recorder(tmp_path, max_open=4)
+    for n in range(10):
+        recorder.record(f"dev_{n}", "value", 1.0)
+    assert len(recorder._open) == 4
+    recorder.record("dev_0", "value", 2.0)
+    recorder.close()
+    series = open_series(tmp_path, "dev_0", "value")
+    assert series is not None and [p[1] for p in series.points(0)] == [1.0, 2.0]
+    series.close()
+
+
+def test_daemon_records_states_from_sessions(tmp_path, monkeypatch):
+    async def _run() -> Daemon:
+        device = MockESPHomeDevice(
+            host="127.0.0.2", port=0, advertise=False, sensor_interval=0.02
+        )
+        await device.start()
+        db = Database(tmp_path)
+        db.add_logical_device("kitchen", "127.0.0.2")
+        settings = Settings(
+            database=DatabaseConfig(path=str(tmp_path)),
+            scanning=ScanningConfig(port=device.port, timeout=5),
+            daemon=DaemonConfig(record_states=True, watch_mdns=False),
+        )
+        daemon = Daemon(db, settings)
+        assert daemon.sessions_enabled and not daemon.wants_logs
+        try:
+            daemon.sync_sessions()
+            assert daemon.recorder is not None
+            for _ in range(250):
+                if daemon.recorder.samples >= 5:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            for task in daemon._sessions.values():
+                task.cancel()
+            await asyncio.gather(*daemon._sessions.values(), return_exceptions=True)
+            await device.stop()
+            daemon.recorder.close()
+            await daemon.store.close()
+        return daemon
+
+    daemon = asyncio.run(_run())
+    assert daemon.recorder is not None and daemon.recorder.samples >= 5
+    # The switch is recorded as 0/1 next to the sensor
+    assert recorded_entities(tmp_path / "series", "kitchen") == ["relay", "temperature"]
+
+    config_path = tmp_path / "config.toml"
+    write_settings(Settings(database=DatabaseConfig(path=str(tmp_path))), config_path)
+    monkeypatch.setenv("ESPRO_CONFIG", str(config_path))
+    get_settings.cache_clear()
+    runner = CliRunner()
+    started = time.perf_counter()
+    result = runner.invoke(app, ["history", "kitchen.temperature", "--since", "1h"])
+    assert result.exit_code == 0, result.output
+    assert "temperature" in result.stdout and "relay" not in result.stdout
+    assert "raw samples" in result.stdout
+    assert time.perf_counter() - started < 1.0
+
+    result = runner.invoke(app, ["history", "kitchen"])
+    assert result.exit_code == 0 and "relay" in result.stdout
+
+    result = runner.invoke(app, ["history", "garage.temperature"])
+    assert result.exit_code == 1 and "No history" in result.stdout
+    assert runner.invoke(app, ["history", "kitchen", "--since", "soon"]).exit_code == 2
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typer.testing import CliRunner
+
+from espro.cli.app import app
+from espro.utils.redaction import Redactor
+
+DUMP = """\
+[C][wifi:443]:   SSID: 'HomeNet'
+[I][wifi:313]: WiFi Connecting to 'HomeNet'...
+[C][wifi:440]:   IP Address: 192.168.1.42 gw 192.168.1.1
+[C][wifi:441]:   BSSID: AA:BB:CC:11:22:33
+  "mac": "aabbcc112233", version 2024.12.0.1, not an ip 10.0.0.300
+api: encryption: key: "Zm9vYmFyZm9vYmFyZm9vYmFyZm9vYmFyZm9vYmFyMTI="
+ota password: hunter2, token=abc; Password: 192.168.1.5
+wifi: {ssid: "HomeNet", password: "correct horse battery"}
+[C][wifi:443]:   SSID: "HomeNet"
+{"ssid": "HomeNet", "Password": 'open sesame'} ssid=HomeNet
+"""
+
+
+def test_redact_text_covers_embedded_values():
+    redactor = Redactor()
+    assert redactor.redact_text(DUMP).splitlines() == [
+        "[C][wifi:443]:   SSID: '[redacted]'",
+        "[I][wifi:313]: WiFi Connecting to '[redacted]'...",
+        "[C][wifi:440]:   IP Address: x.x.x.42 gw x.x.x.1",
+        "[C][wifi:441]:   BSSID: AA:BB:CC:xx:xx:01",
+        '  "mac": "aabbccxxxx01", version 2024.12.0.1, not an ip 10.0.0.300',
+        'api: encryption: key: "[redacted]"',
+        "ota password: [redacted], token=[redacted]; Password: [redacted]",
+        'wifi: {ssid: "[redacted]", password: "[redacted]"}',
+        '[C][wifi:443]:   SSID: "[redacted]"',
+        """{"ssid": "[redacted]", "Password": '[redacted]'} ssid=[redacted]""",
+    ]
+
+
+def test_mac_tokens_stay_consistent():
+    redactor = Redactor()
+    assert redactor.redact_mac("AA:BB:CC:11:22:33") == "AA:BB:CC:xx:xx:01"
+    text = "aa-bb-cc-11-22-33 then DE:AD:BE:EF:00:01 then AA:BB:CC:11:22:33"
+    assert redactor.redact_text(text) == (
+        "aa-bb-cc-xx-xx-01 then DE:AD:BE:xx:xx:02 then AA:BB:CC:xx:xx:01"
+    )
+
+
+def test_disabled_redactor_passes_text_through():
+    assert Redactor(enabled=False).redact_text(DUMP) == DUMP
+
+
+def test_redact_text_leaves_plain_log_lines_alone():
+    lines = [
+        f"[12:00:{i % 60:02d}][C][wifi:440]:   IP Address: 192.168.1.{i % 250}\n"
+        if i % 20 == 0
+        else f"[12:00:{i % 60:02d}][D][sensor:094]: 'Temperature': Sending state "
+        f"21.{i % 10}0000 °C with 1 decimals of accuracy\n"
+        for i in range(2_000)
+    ]
+    redacted = Redactor().redact_text("".join(lines)).splitlines(keepends=True)
+    assert sum("x.x.x." in line for line in redacted) == 100
+    assert [line for line in redacted if "x.x.x." not in line] == [
+        line for line in lines if "IP Address" not in line
+    ]
+
+
+def test_redact_command_filters_stdin():
+    result = CliRunner().invoke(app, ["redact"], input=DUMP)
+    assert result.exit_code == 0
+    assert "192.168.1.42" not in result.stdout
+    assert "HomeNet" not in result.stdout
+    assert "x.x.x.42" in result.stdout
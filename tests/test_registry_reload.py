@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+from espro.config import DaemonConfig, DatabaseConfig, Settings
+from espro.core import Daemon
+from espro.core.registry_diff import diff_registries
+from espro.database import Database
+from espro.utils.file_watch import FileWatcher
+
+
+def _fleet(tmp_path, size: int = 50) -> Database:
+    db = Database(tmp_path)
+    for n in range(size):
+        db.add_logical_device(f"dev_{n:02d}", f"esp-{n:02d}", role="sensor")
+    return db
+
+
+def test_diff_separates_rebinds_from_edits(tmp_path):
+    db = _fleet(tmp_path, 4)
+    old = db.load_devices()
+    new = old.model_copy(deep=True)
+    new.logical_devices["dev_00"].role = "plug"
+    new.logical_devices["dev_01"].physical = "esp-99"
+    del new.logical_devices["dev_02"]
+    new.logical_devices["dev_09"] = new.logical_devices["dev_03"].model_copy(
+        update={"physical": "esp-09"}
+    )
+
+    diff = diff_registries(old, new)
+    assert (diff.added, diff.removed, diff.rebound, diff.updated) == (
+        ["dev_09"],
+        ["dev_02"],
+        ["dev_01"],
+        ["dev_00"],
+    )
+    assert diff.reconnects == ["dev_01", "dev_02", "dev_09"]
+    assert not diff_registries(old, old.model_copy(deep=True))
+
+
+@pytest.mark.parametrize(
+    "use_inotify",
+    [
+        pytest.param(
+            True,
+            marks=pytest.mark.skipif(sys.platform != "linux", reason="inotify"),
+        ),
+        False,
+    ],
+)
+def test_watcher_sees_writes_and_renames(tmp_path, use_inotify):
+    db = _fleet(tmp_path, 1)
+
+    async def _run() -> tuple[str, list[set]]:
+        seen: list[set] = []
+        changed = asyncio.Event()
+
+        async def _on_change(paths: set) -> None:
+            seen.append(paths)
+            changed.set()
+
+        watcher = FileWatcher(
+            [db.devices_path, db.current_scan_path],
+            _on_change,
+            interval=0.05,
+            use_inotify=use_inotify,
+        )
+        task = asyncio.create_task(watcher.run())
+        await asyncio.sleep(0.05)
+
+        db.add_logical_device("dev_new", "esp-new")
+        await asyncio.wait_for(changed.wait(), 1.0)
+        changed.clear()
+
+        # Editors save by writing a temporary file and renaming it over
+        tmp = tmp_path / "devices.toml.swp"
+        tmp.write_text(db.devices_path.read_text().replace("esp-new", "esp-x"))
+        os.replace(tmp, db.devices_path)
+        await asyncio.wait_for(changed.wait(), 1.0)
+
+        # Unrelated files in the same directory are ignored
+        (tmp_path / "notes.txt").write_text("hi")
+        await asyncio.sleep(0.2)
+        task.cancel()
+        return watcher.mode, seen
+
+    mode, seen = asyncio.run(_run())
+    assert mode == ("inotify" if use_inotify else "poll")
+    assert seen == [{db.devices_path}, {db.devices_path}]
+
+
+def test_one_line_edit_does_not_reconnect_the_fleet(tmp_path, monkeypatch):
+    db = _fleet(tmp_path)
+    settings = Settings(
+        database=DatabaseConfig(path=str(tmp_path)),
+        daemon=DaemonConfig(subscribe_logs=True),
+    )
+    started: list[str] = []
+
+    async def _fake_session(self: Daemon, logical: str) -> None:
+        started.append(logical)
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(Daemon, "_log_session", _fake_session)
+
+    async def _run() -> None:
+        daemon = Daemon(db, settings)
+        daemon.sync_sessions()
+        watcher = FileWatcher([db.devices_path], daemon._registry_changed)
+        watch = asyncio.create_task(watcher.run())
+        await asyncio.sleep(0.05)
+        assert len(started) == 50
+        started.clear()
+        sessions = dict(daemon._sessions)
+
+        async def _settled() -> None:
+            for _ in range(50):
+                await asyncio.sleep(0.02)
+                if daemon.registry == db.load_devices():
+                    return
+
+        # A note or role edit touches no connection
+        db.add_logical_device("dev_07", "esp-07", notes="by the door", role="door")
+        await _settled()
+        assert daemon.registry.logical_devices["dev_07"].role == "door"
+        assert started == []
+        assert daemon._sessions == sessions
+
+        # Rebinding one device restarts only its session
+        db.add_logical_device("dev_08", "esp-88", role="sensor")
+        await _settled()
+        await asyncio.sleep(0)
+        assert started == ["dev_08"]
+        assert sessions["dev_08"].cancelled()
+
+        db.remove_logical_device("dev_09")
+        db.add_logical_device("dev_50", "esp-50")
+        await _settled()
+        await asyncio.sleep(0)
+        assert started == ["dev_08", "dev_50"]
+        assert "dev_09" not in daemon._sessions
+        unchanged = [n for n in sessions if n not in ("dev_08", "dev_09")]
+        assert all(daemon._sessions[n] is sessions[n] for n in unchanged)
+
+        watch.cancel()
+        for task in daemon._sessions.values():
+            task.cancel()
+        await daemon.store.close()
+
+    asyncio.run(_run())
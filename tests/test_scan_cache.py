@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+from helpers import make_device
+from typer.testing import CliRunner
+
+from espro.cli.app import app
+from espro.config import (
+    DatabaseConfig,
+    ScanningConfig,
+    Settings,
+    get_settings,
+    write_settings,
+)
+from espro.core import Discovery, scan_cache
+from espro.core.scan_cache import get_scan, scan_age
+from espro.database import Database
+from espro.models import PhysicalDevice, ScanResult
+
+
+def _save(db: Database, age: float, ip: str = "192.168.1.10") -> None:
+    db.write_scan(
+        ScanResult(
+            scan_timestamp=datetime.now(timezone.utc) - timedelta(seconds=age),
+            network="mdns",
+            devices=[make_device(ip)],
+        )
+    )
+
+
+class _FakeDiscovery:
+    def __init__(self, devices: list[PhysicalDevice], delay: float = 0.0) -> None:
+        self.devices = devices
+        self.delay = delay
+        self.calls: list[dict[str, object]] = []
+
+    async def __call__(self, _network: str, _config: ScanningConfig, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        return Discovery(self.devices)
+
+
+def test_fresh_scan_is_reused(tmp_path, monkeypatch):
+    db = Database(tmp_path)
+    _save(db, age=60)
+    discovery = _FakeDiscovery([make_device("192.168.1.20")])
+    monkeypatch.setattr(scan_cache, "scan_network", discovery)
+
+    scan, discovered = asyncio.run(get_scan(db, ScanningConfig(), max_age=300))
+    assert scan is not None and not discovered
+    assert scan.devices[0].ip == "192.168.1.10"
+    assert discovery.calls == []
+
+
+def test_stale_or_live_scan_rediscovers_and_saves(tmp_path, monkeypatch):
+    db = Database(tmp_path)
+    _save(db, age=3600)
+    discovery = _FakeDiscovery([make_device("192.168.1.20")])
+    monkeypatch.setattr(scan_cache, "scan_network", discovery)
+
+    scan, discovered = asyncio.run(get_scan(db, ScanningConfig(max_age=900)))
+    assert scan is not None and discovered
+    assert scan.devices[0].ip == "192.168.1.20"
+    # Early-exit discovery seeded with the last-known addresses
+    assert discovery.calls[0]["fast"] is True
+    known = discovery.calls[0]["known"]
+    assert isinstance(known, list) and known[0].ip == "192.168.1.10"
+    saved = db.load_current_scan()
+    assert saved is not None and scan_age(saved) < 60
+
+    _, discovered = asyncio.run(get_scan(db, ScanningConfig(), live=True))
+    assert discovered and len(discovery.calls) == 2
+
+
+def test_empty_discovery_keeps_saved_scan(tmp_path, monkeypatch):
+    db = Database(tmp_path)
+    _save(db, age=3600)
+    monkeypatch.setattr(scan_cache, "scan_network", _FakeDiscovery([]))
+
+    scan, discovered = asyncio.run(get_scan(db, ScanningConfig(), max_age=0))
+    assert scan is not None and not discovered
+    assert scan.devices[0].ip == "192.168.1.10"
+
+
+def test_concurrent_commands_share_one_discovery(tmp_path, monkeypatch):
+    db = Database(tmp_path)
+    _save(db, age=3600)
+    discovery = _FakeDiscovery([make_device("192.168.1.20")], delay=0.2)
+    monkeypatch.setattr(scan_cache, "scan_network", discovery)
+
+    results: list[bool] = []
+
+    def _command() -> None:
+        _, discovered = asyncio.run(get_scan(Database(tmp_path), ScanningConfig()))
+        results.append(discovered)
+
+    threads = [threading.Thread(target=_command) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(discovery.calls) == 1
+    assert sorted(results) == [False, False, True]
+
+
+def test_validate_refreshes_stale_scan(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    config_path = tmp_path / "config.toml"
+    write_settings(Settings(database=DatabaseConfig(path=str(data_dir))), config_path)
+    monkeypatch.setenv("ESPRO_CONFIG", str(config_path))
+    get_settings.cache_clear()
+
+    db = Database(data_dir)
+    db.add_logical_device("kitchen", "kitchen-plug")
+    discovery = _FakeDiscovery([make_device("192.168.1.20")])
+    monkeypatch.setattr(scan_cache, "scan_network", discovery)
+
+    # No scan at all used to be an error; now it discovers
+    result = CliRunner().invoke(app, ["validate"])
+    assert result.exit_code == 0, result.output
+    assert "1 device(s) validated" in result.stdout
+    assert len(discovery.calls) == 1
+
+    result = CliRunner().invoke(app, ["validate", "--max-age", "600"])
+    assert result.exit_code == 0
+    assert len(discovery.calls) == 1
+
+    result = CliRunner().invoke(app, ["validate", "--live"])
+    assert result.exit_code == 0
+    assert len(discovery.calls) == 2
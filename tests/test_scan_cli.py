@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import json
+
 from typer.testing import CliRunner
 
 import espro.cli.commands.scan as scan_cmd
@@ -11,6 +13,7 @@ from espro.config import (
     get_settings,
     write_settings,
 )
+from espro.core import Discovery
 from espro.database import Database
 from espro.models import PhysicalDevice
 
@@ -34,17 +37,19 @@ def test_scan_shows_logical_name_for_ip_mapping(
     db = Database(data_dir)
     db.add_logical_device("test-switch", "192.168.1.199")
 
-    async def _fake_scan_network(_network: str, _config: ScanningConfig):
-        return [
-            PhysicalDevice(
-                ip="192.168.1.199",
-                name="soonoff-r3-b71cdb",
-                friendly_name="Test Switch",
-                mac_address="AA:BB:CC:DD:EE:FF",
-                model="ESP32",
-                esphome_version="2024.12.0",
-            )
-        ]
+    async def _fake_scan_network(_network: str, _config: ScanningConfig, **_kwargs):
+        return Discovery(
+            [
+                PhysicalDevice(
+                    ip="192.168.1.199",
+                    name="soonoff-r3-b71cdb",
+                    friendly_name="Test Switch",
+                    mac_address="AA:BB:CC:DD:EE:FF",
+                    model="ESP32",
+                    esphome_version="2024.12.0",
+                )
+            ]
+        )
 
     monkeypatch.setattr(scan_cmd, "scan_network", _fake_scan_network)
 
@@ -52,3 +57,57 @@ def test_scan_shows_logical_name_for_ip_mapping(
     result = runner.invoke(app, ["scan", "192.168.1.0/24"])
     assert result.exit_code == 0
     assert "test-switch" in result.stdout
+
+
+def test_timings_flag_prints_phase_breakdown(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    config_path = tmp_path / "config.toml"
+    write_settings(Settings(database=DatabaseConfig(path=str(data_dir))), config_path)
+    monkeypatch.setenv("ESPRO_CONFIG", str(config_path))
+    get_settings.cache_clear()
+
+    Database(data_dir).add_logical_device("kitchen", "esp-kitchen")
+
+    profile_path = tmp_path / "out.prof"
+    runner = CliRunner()
+    result = runner.invoke(app, ["--timings", "--profile", str(profile_path), "list"])
+
+    assert result.exit_code == 0
+    assert "db.toml_parse" in result.output
+    assert "cli.render" in result.output
+    assert profile_path.exists()
+
+
+def test_scan_json_output_is_redacted(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    config_path = tmp_path / "config.toml"
+    write_settings(Settings(database=DatabaseConfig(path=str(data_dir))), config_path)
+    monkeypatch.setenv("ESPRO_CONFIG", str(config_path))
+    get_settings.cache_clear()
+    Database(data_dir).add_logical_device("test-switch", "192.168.1.199")
+
+    async def _fake_scan_network(_network: str, _config: ScanningConfig, **_kwargs):
+        return Discovery(
+            [
+                PhysicalDevice(
+                    ip="192.168.1.199",
+                    name="soonoff-r3-b71cdb",
+                    friendly_name="Test Switch",
+                    mac_address="AA:BB:CC:DD:EE:FF",
+                    model="ESP32",
+                    esphome_version="2024.12.0",
+                    txt={"mac": "aabbccddeeff", "network": "wifi"},
+                )
+            ]
+        )
+
+    monkeypatch.setattr(scan_cmd, "scan_network", _fake_scan_network)
+
+    result = CliRunner().invoke(app, ["scan", "--json", "--redact"])
+    assert result.exit_code == 0
+    (device,) = json.loads(result.stdout)
+    assert device["logical"] == "test-switch"
+    assert device["ip"] == "x.x.x.199"
+    assert device["mac_address"] == "AA:BB:CC:xx:xx:01"
+    assert device["txt"]["mac"] == "aabbccxxxx01"
+    assert device["esphome_version"] == "2024.x"
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import ipaddress
+import threading
+
+import pytest
+
+from espro.config import ScanningConfig, Settings, load_settings, write_settings
+from espro.core import scanner as scan_module
+from espro.core.mock_device import MockESPHomeDevice
+from espro.core.neighbors import Neighbor, is_espressif, parse_ip_neigh, parse_proc_arp
+from espro.core.scanner import BrowseInterface, merge_devices, resolve_interfaces
+from espro.models import PhysicalDevice
+
+LOCAL = [
+    ("lo", ipaddress.IPv4Interface("127.0.0.1/8")),
+    ("eth0", ipaddress.IPv4Interface("192.168.1.10/24")),
+    ("eth0.20", ipaddress.IPv4Interface("10.0.20.2/24")),
+    ("eth0.30", ipaddress.IPv4Interface("10.0.30.2/24")),
+]
+
+
+def _device(name: str, mac: str, ip: str) -> PhysicalDevice:
+    return PhysicalDevice(
+        ip=ip,
+        name=name,
+        friendly_name="",
+        mac_address=mac,
+        model="ESP32",
+        esphome_version="2026.6.5",
+    )
+
+
+def test_resolve_interfaces(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(scan_module, "_ipv4_interfaces", lambda: LOCAL)
+
+    assert resolve_interfaces(["eth0.20", "10.0.30.0/24", "10.0.20.2"]) == [
+        BrowseInterface("eth0.20", "10.0.20.2"),
+        BrowseInterface("eth0.30", "10.0.30.2"),
+    ]
+    assert [i.label for i in resolve_interfaces(["*"])] == [
+        "eth0",
+        "eth0.20",
+        "eth0.30",
+    ]
+    assert resolve_interfaces(["wlan9", "172.16.0.0/12"]) == []
+
+
+def test_merge_devices_dedupes_by_mac_and_name():
+    first = [_device("plug-a", "AA:00:00:00:00:01", "10.0.20.5")]
+    second = [
+        _device("plug-a-renamed", "AA:00:00:00:00:01", "10.0.30.5"),
+        _device("plug-a", "", "10.0.30.6"),
+        _device("plug-b", "AA:00:00:00:00:02", "10.0.30.7"),
+    ]
+    merged = merge_devices([first, second])
+    assert [device.ip for device in merged] == ["10.0.20.5", "10.0.30.7"]
+
+
+def test_scan_network_browses_interfaces_concurrently(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(scan_module, "_ipv4_interfaces", lambda: LOCAL)
+
+    started: list[str] = []
+    barrier: asyncio.Barrier | None = None
+
+    async def _fake_browse(config, interface=None, stop=None):
+        nonlocal barrier
+        barrier = barrier or asyncio.Barrier(3)
+        started.append(interface.label)
+        # Only passes once all three browses are running at the same time
+        await asyncio.wait_for(barrier.wait(), 5)
+        devices = [
+            _device("shared", "AA:00:00:00:00:01", interface.address),
+            _device(f"only-{interface.label}", "", interface.address),
+        ]
+        return [d.model_copy(update={"interface": interface.label}) for d in devices]
+
+    monkeypatch.setattr(scan_module, "_browse", _fake_browse)
+
+    config = ScanningConfig(timeout=0.2, interfaces=("eth0.20", "eth0.30", "eth0"))
+    devices = asyncio.run(scan_module.scan_network("mdns", config)).devices
+
+    assert sorted(started) == ["eth0", "eth0.20", "eth0.30"]
+    assert {(d.name, d.interface) for d in devices} == {
+        ("shared", "eth0.20"),
+        ("only-eth0.20", "eth0.20"),
+        ("only-eth0.30", "eth0.30"),
+        ("only-eth0", "eth0"),
+    }
+
+
+def test_interfaces_config_roundtrip(tmp_path):
+    path = tmp_path / "config.toml"
+    settings = Settings(scanning=ScanningConfig(interfaces=("eth0.20", "10.0.30.0/24")))
+    write_settings(settings, path)
+    assert load_settings(path).scanning.interfaces == ("eth0.20", "10.0.30.0/24")
+
+
+def test_warm_start_confirms_known_devices(monkeypatch: pytest.MonkeyPatch):
+    # Whether each browse ended because the scan stopped it early
+    stopped: list[bool] = []
+
+    async def _quiet_browse(config, interface=None, stop=None):
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(stop.wait(), config.timeout)
+        stopped.append(stop.is_set())
+        return []
+
+    monkeypatch.setattr(scan_module, "_browse", _quiet_browse)
+    monkeypatch.setattr(scan_module, "espressif_neighbors", list)
+
+    known = _device("mock-switch-1", "AA:BB:CC:DD:EE:FF", "127.0.0.1")
+    known = known.model_copy(update={"txt": {"board": "esp32dev"}})
+    moved = _device("moved-plug", "AA:00:00:00:00:09", "127.0.0.2")
+
+    async def _run(devices, fast, timeout):
+        mock = MockESPHomeDevice(host="127.0.0.1", port=0, advertise=False)
+        await mock.start()
+        try:
+            config = ScanningConfig(port=mock.port, timeout=timeout)
+            discovery = await scan_module.scan_network(
+                "mdns", config, known=devices, fast=fast
+            )
+            return discovery.devices
+        finally:
+            await mock.stop()
+
+    # Every known device answers: browsing is cut short
+    found = asyncio.run(_run([known], fast=True, timeout=30.0))
+    assert stopped == [True]
+    assert [(d.name, d.ip) for d in found] == [("mock-switch-1", "127.0.0.1")]
+    assert found[0].txt == {"board": "esp32dev"}
+
+    # One device moved: browsing runs for the full timeout
+    stopped.clear()
+    found = asyncio.run(_run([known, moved], fast=True, timeout=0.5))
+    assert stopped == [False]
+    assert [d.name for d in found] == ["mock-switch-1"]
+
+
+def test_neighbor_table_parsing_and_oui_filter():
+    proc = (
+        "IP address       HW type     Flags       HW address            Mask     Device\n"
+        "10.0.20.7        0x1         0x2         24:0a:c4:12:34:56     *        eth0.20\n"
+        "10.0.20.8        0x1         0x0         00:00:00:00:00:00     *        eth0.20\n"
+        "10.0.20.1        0x1         0x2         00:11:22:33:44:55     *        eth0.20\n"
+    )
+    neighbors = parse_proc_arp(proc)
+    assert [n.ip for n in neighbors] == ["10.0.20.7", "10.0.20.1"]
+    assert [n.ip for n in neighbors if is_espressif(n.mac)] == ["10.0.20.7"]
+
+    ip_neigh = (
+        "10.0.30.9 dev eth0.30 lladdr 5c:cf:7f:aa:bb:cc STALE\n"
+        "10.0.30.10 dev eth0.30 FAILED\n"
+        "10.0.30.11 dev eth0.30 lladdr 84:f3:eb:00:00:01 FAILED\n"
+    )
+    assert parse_ip_neigh(ip_neigh) == [
+        Neighbor("10.0.30.9", "5C:CF:7F:AA:BB:CC", "eth0.30")
+    ]
+    assert is_espressif("5ccf.7faa.bbcc")
+    assert not is_espressif("not-a-mac")
+
+
+def test_neighbor_candidates_flag_devices_without_mdns(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    async def _empty_browse(config, interface=None, stop=None):
+        await asyncio.sleep(config.timeout)
+        return []
+
+    neighbor = Neighbor("127.0.0.1", "24:0A:C4:00:00:01", "lo")
+    readers: list[int] = []
+
+    def _neighbors() -> list[Neighbor]:
+        readers.append(threading.get_ident())
+        return [neighbor]
+
+    monkeypatch.setattr(scan_module, "_browse", _empty_browse)
+    monkeypatch.setattr(scan_module, "espressif_neighbors", _neighbors)
+
+    async def _run():
+        mock = MockESPHomeDevice(
+            host="127.0.0.1",
+            port=0,
+            advertise=False,
+            mac_address="24:0A:C4:00:00:01",
+        )
+        await mock.start()
+        try:
+            config = ScanningConfig(port=mock.port, timeout=0.2)
+            return await scan_module.scan_network("mdns", config)
+        finally:
+            await mock.stop()
+
+    discovery = asyncio.run(_run())
+    assert [(d.name, d.interface, d.mdns) for d in discovery.devices] == [
+        ("mock-switch-1", "lo", False)
+    ]
+    # Read once, off the event loop, and handed back for the CLI's report
+    assert discovery.neighbors == [neighbor]
+    assert len(readers) == 1 and readers[0] != threading.get_ident()
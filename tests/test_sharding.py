@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+import time
+
+import aioesphomeapi
+import pytest
+
+from espro.config import DaemonConfig, DatabaseConfig, ScanningConfig, Settings
+from espro.core import Daemon
+from espro.core.metrics import FleetMetrics
+from espro.core.mock_device import MockESPHomeDevice
+from espro.core.sharding import MAX_FAST_EXITS, HashRing, ShardPool
+from espro.database import Database
+
+
+def test_hash_ring_balances_and_moves_few_keys():
+    keys = [f"esp-{n:04d}" for n in range(4000)]
+    ring = HashRing(4)
+    owners = [ring.node_for(key) for key in keys]
+    counts = [owners.count(node) for node in range(4)]
+    assert all(600 < count < 1400 for count in counts)
+
+    grown = HashRing(5)
+    moved = sum(
+        grown.node_for(key) != owner for key, owner in zip(keys, owners, strict=True)
+    )
+    # Ideal is 1/5 of the keys; every moved key lands on the new node
+    assert moved < len(keys) * 0.3
+    assert all(
+        grown.node_for(key) == 4
+        for key, owner in zip(keys, owners, strict=True)
+        if grown.node_for(key) != owner
+    )
+
+
+def test_crash_looping_worker_backs_off_then_gives_up(caplog, monkeypatch):
+    settings = Settings(daemon=DaemonConfig(backoff_initial=0.01, backoff_max=0.02))
+    pool = ShardPool(
+        2,
+        settings,
+        aioesphomeapi.LogLevel.LOG_LEVEL_INFO,
+        lambda *_args: None,
+        lambda *_args: None,
+    )
+    spawned: list[float] = []
+
+    def _spawn(index: int) -> None:
+        spawned.append(time.monotonic())
+        pool._started_at[index] = time.monotonic()
+
+    monkeypatch.setattr(pool, "_spawn", _spawn)
+
+    async def _crash_loop() -> None:
+        _spawn(0)
+        for _ in range(MAX_FAST_EXITS + 1):
+            restarts = len(spawned)
+            pool._worker_exited(0)
+            for _ in range(50):
+                if len(spawned) > restarts:
+                    break
+                await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+
+    asyncio.run(_crash_loop())
+    # The first start plus MAX_FAST_EXITS restarts, each after a delay
+    assert len(spawned) == MAX_FAST_EXITS + 1
+    assert all(b - a >= 0.005 for a, b in itertools.pairwise(spawned))
+    assert "giving up" in caplog.text
+
+
+async def _start_fleet(size: int, **kwargs: float) -> list[MockESPHomeDevice]:
+    first = MockESPHomeDevice(host="127.0.0.2", port=0, advertise=False, **kwargs)
+    await first.start()
+    devices = [first]
+    for n in range(1, size):
+        device = MockESPHomeDevice(
+            name=f"mock-{n}",
+            host=f"127.0.0.{n + 2}",
+            port=first.port,
+            advertise=False,
+            **kwargs,
+        )
+        await device.start()
+        devices.append(device)
+    return devices
+
+
+def _sharded_daemon(tmp_path, size: int, port: int, workers: int) -> Daemon:
+    tmp_path.mkdir(exist_ok=True)
+    db = Database(tmp_path)
+    for n in range(size):
+        db.add_logical_device(f"dev_{n:02d}", f"127.0.0.{n + 2}")
+    settings = Settings(
+        database=DatabaseConfig(path=str(tmp_path)),
+        scanning=ScanningConfig(port=port, timeout=5),
+        daemon=DaemonConfig(
+            subscribe_logs=True,
+            connect_rate=100,
+            connect_burst=20,
+            watch_mdns=False,
+            workers=workers,
+        ),
+    )
+    return Daemon(db, settings, metrics=FleetMetrics())
+
+
+def _lines(daemon: Daemon, logical: str) -> float:
+    assert daemon.metrics is not None
+    return daemon.metrics.log_lines_for(logical).value
+
+
+def test_daemon_sessions_run_in_shard_workers(tmp_path):
+    fleet_size = 6
+
+    async def _run() -> tuple[Daemon, float | None, list[int]]:
+        devices = await _start_fleet(fleet_size)
+        daemon = _sharded_daemon(tmp_path, fleet_size, devices[0].port, workers=2)
+        names = list(daemon.registry.logical_devices)
+        try:
+            daemon.start_shards()
+            daemon.sync_sessions()
+            elapsed = None
+            for _ in range(500):
+                elapsed = daemon.connections.time_to_connect(names)
+                if elapsed is not None and all(_lines(daemon, n) for n in names):
+                    break
+                await asyncio.sleep(0.02)
+            assert daemon.shards is not None
+            owners = [daemon.shards.owner(f"127.0.0.{n + 2}") for n in range(6)]
+        finally:
+            if daemon.shards is not None:
+                await daemon.shards.close()
+            for device in devices:
+                await device.stop()
+        return daemon, elapsed, owners
+
+    daemon, elapsed, owners = asyncio.run(_run())
+    assert elapsed is not None
+    # Both workers own part of the fleet, and the coordinator saw every device
+    assert set(owners) == {0, 1}
+    assert all(_lines(daemon, name) > 0 for name in daemon.registry.logical_devices)
+    assert not daemon._sessions
+
+
+@pytest.mark.skipif(
+    not os.environ.get("ESPRO_BENCH"), reason="benchmark; set ESPRO_BENCH=1 to run"
+)
+@pytest.mark.skipif(
+    (os.cpu_count() or 1) < 4, reason="throughput scaling needs several cores"
+)
+def test_shard_throughput_scales_with_workers(tmp_path):
+    fleet_size = 8
+
+    async def _throughput(workers: int) -> float:
+        devices = await _start_fleet(fleet_size, log_rate=20_000)
+        daemon = _sharded_daemon(
+            tmp_path / str(workers), fleet_size, devices[0].port, workers
+        )
+        names = list(daemon.registry.logical_devices)
+        try:
+            if workers > 1:
+                daemon.start_shards()
+            daemon.sync_sessions()
+            while daemon.connections.time_to_connect(names) is None:
+                await asyncio.sleep(0.05)
+            before = sum(_lines(daemon, name) for name in names)
+            started = time.perf_counter()
+            await asyncio.sleep(2.0)
+            total = sum(_lines(daemon, name) for name in names) - before
+            return total / (time.perf_counter() - started)
+        finally:
+            if daemon.shards is not None:
+                await daemon.shards.close()
+            for task in daemon._sessions.values():
+                task.cancel()
+            await asyncio.gather(*daemon._sessions.values(), return_exceptions=True)
+            await daemon.connections.close()
+            for device in devices:
+                await device.stop()
+
+    single = asyncio.run(_throughput(1))
+    sharded = asyncio.run(_throughput(4))
+    assert sharded > single * 1.5
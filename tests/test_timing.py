@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from espro.utils import timing
+
+
+def test_span_records_only_when_enabled():
+    timing.reset()
+    with timing.span("phase"):
+        pass
+    assert timing.report() == []
+
+    timing.enable()
+    try:
+        for _ in range(3):
+            with timing.span("phase"):
+                pass
+    finally:
+        timing.disable()
+
+    [phase] = timing.report()
+    assert phase.name == "phase"
+    assert phase.calls == 3
+    timing.reset()